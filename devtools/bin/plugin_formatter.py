@@ -37,6 +37,7 @@ from six import iteritems
 
 from ansible.errors import AnsibleError
 from ansible.module_utils._text import to_bytes
+from ansible.plugins.loader import fragment_loader
 from ansible.utils import plugin_docs
 
 #####################################################################################
@@ -56,6 +57,11 @@ EXAMPLE_YAML=os.path.abspath(os.path.join(
     os.path.dirname(os.path.realpath(__file__)), os.pardir, 'examples', 'DOCUMENTATION.yml'
 ))
 
+# Doc fragments of this repo, which take precedence over Ansible's
+FRAGMENT_DIR=os.path.abspath(os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), os.pardir, os.pardir, 'plugins', 'module_docs_fragments'
+))
+
 _ITALIC = re.compile(r"I\(([^)]+)\)")
 _BOLD   = re.compile(r"B\(([^)]+)\)")
 _MODULE = re.compile(r"M\(([^)]+)\)")
@@ -445,6 +451,10 @@ def main():
     (options, args) = p.parse_args()
     validate_options(options)
 
+    # Options shared by all modules, such as token_cache, are documented in
+    # this repo's doc fragments before they are in Ansible's
+    fragment_loader.add_directory(FRAGMENT_DIR)
+
     env, template, outputname = jinja2_environment(options.template_dir, options.type)
 
     mod_info, categories, aliases = list_modules(options.module_dir)
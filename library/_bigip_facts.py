@@ -75,6 +75,16 @@ options:
     default: null
     choices: []
     aliases: []
+  concurrency:
+    description:
+      - Number of iControl calls to make at the same time when collecting
+        the fields of a fact category.
+      - Each call is made on its own connection to the BIG-IP, so values
+        larger than C(1) need the BIG-IP to accept that many connections
+        from the user.
+    required: false
+    default: 1
+    version_added: 2.5
 extends_documentation_fragment: f5
 '''
 
@@ -88,10 +98,14 @@ EXAMPLES = r'''
   delegate_to: localhost
 '''
 
+import copy
 import fnmatch
 import re
+import threading
 import traceback
 
+from multiprocessing.pool import ThreadPool
+
 try:
     from suds import MethodNotFound, WebFault
 except ImportError:
@@ -111,17 +125,34 @@ class F5(object):
         api: iControl API instance.
     """
 
-    def __init__(self, host, user, password, session=False, validate_certs=True, port=443):
+    def __init__(self, host, user, password, session=False, validate_certs=True, port=443,
+                 concurrency=1):
+        self.connection = (host, user, password, validate_certs, port)
+        self.session_id = None
         self.api = bigip_api(host, user, password, validate_certs, port)
         if session:
             self.start_session()
+        self.fetcher = FieldFetcher(self, concurrency)
 
     def start_session(self):
-        self.api = self.api.with_session_id()
+        self.session_id = self.api.System.Session.get_session_identifier()
+        self.api = self.api.with_session_id(self.session_id)
 
     def get_api(self):
         return self.api
 
+    def new_api(self):
+        """Returns another iControl API instance in the same session
+
+        bigsuds clients can not be shared between threads, so each thread
+        that makes calls needs its own. They use the session of this instance
+        so that they see the same active folder and recursive query state.
+        """
+        api = bigip_api(*self.connection)
+        if self.session_id is not None:
+            api = api.with_session_id(self.session_id)
+        return api
+
     def set_recursive_query_state(self, state):
         self.api.System.Session.set_recursive_query_state(state)
 
@@ -141,6 +172,65 @@ class F5(object):
         return self.api.System.Session.get_active_folder()
 
 
+class FieldFetcher(object):
+    """Calls the get_<field> methods of the fact classes.
+
+    With a concurrency of 1 the calls are made one after the other on the
+    API instance of the fact class. Otherwise they are made on a pool of
+    that many threads, each with its own API instance. A fact class is
+    copied for every call, with its api replaced by the one of the thread,
+    so that the fact classes themselves do not need to know about threads.
+
+    Fields that the BIG-IP does not support are skipped.
+
+    Attributes:
+        f5: F5 instance that creates the API instances of the threads.
+        concurrency: Maximum number of calls made at the same time.
+    """
+
+    def __init__(self, f5=None, concurrency=1):
+        self.f5 = f5
+        self.concurrency = concurrency
+        self._local = threading.local()
+        self._pool = None
+
+    def _thread_api(self):
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            api = self._local.api = self.f5.new_api()
+        return api
+
+    def _get(self, api_obj, field):
+        try:
+            return field, getattr(api_obj, "get_" + field)()
+        except (MethodNotFound, WebFault):
+            return None
+
+    def _get_in_thread(self, args):
+        api_obj, field = args
+        api_obj = copy.copy(api_obj)
+        api_obj.api = self._thread_api()
+        return self._get(api_obj, field)
+
+    def fetch(self, api_obj, fields):
+        """Returns (field, value) pairs of the supported fields, in order."""
+        if self.concurrency > 1 and len(fields) > 1:
+            if self._pool is None:
+                self._pool = ThreadPool(self.concurrency)
+            results = self._pool.map(
+                self._get_in_thread, [(api_obj, x) for x in fields]
+            )
+        else:
+            results = [self._get(api_obj, x) for x in fields]
+        return [x for x in results if x is not None]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
 class Interfaces(object):
     """Interfaces class.
 
@@ -156,7 +246,7 @@ class Interfaces(object):
         self.interfaces = api.Networking.Interfaces.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.interfaces = filter(re_filter.search, self.interfaces)
+            self.interfaces = list(filter(re_filter.search, self.interfaces))
 
     def get_list(self):
         return self.interfaces
@@ -261,7 +351,7 @@ class SelfIPs(object):
         self.self_ips = api.Networking.SelfIPV2.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.self_ips = filter(re_filter.search, self.self_ips)
+            self.self_ips = list(filter(re_filter.search, self.self_ips))
 
     def get_list(self):
         return self.self_ips
@@ -315,7 +405,7 @@ class Trunks(object):
         self.trunks = api.Networking.Trunk.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.trunks = filter(re_filter.search, self.trunks)
+            self.trunks = list(filter(re_filter.search, self.trunks))
 
     def get_list(self):
         return self.trunks
@@ -375,7 +465,7 @@ class Vlans(object):
         self.vlans = api.Networking.VLAN.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.vlans = filter(re_filter.search, self.vlans)
+            self.vlans = list(filter(re_filter.search, self.vlans))
 
     def get_list(self):
         return self.vlans
@@ -469,7 +559,7 @@ class VirtualServers(object):
         self.virtual_servers = api.LocalLB.VirtualServer.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.virtual_servers = filter(re_filter.search, self.virtual_servers)
+            self.virtual_servers = list(filter(re_filter.search, self.virtual_servers))
 
     def get_list(self):
         return self.virtual_servers
@@ -622,7 +712,7 @@ class Pools(object):
         self.pool_names = api.LocalLB.Pool.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.pool_names = filter(re_filter.search, self.pool_names)
+            self.pool_names = list(filter(re_filter.search, self.pool_names))
 
     def get_list(self):
         return self.pool_names
@@ -755,7 +845,7 @@ class Devices(object):
         self.devices = api.Management.Device.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.devices = filter(re_filter.search, self.devices)
+            self.devices = list(filter(re_filter.search, self.devices))
 
     def get_list(self):
         return self.devices
@@ -860,7 +950,7 @@ class DeviceGroups(object):
         self.device_groups = api.Management.DeviceGroup.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.device_groups = filter(re_filter.search, self.device_groups)
+            self.device_groups = list(filter(re_filter.search, self.device_groups))
 
     def get_list(self):
         return self.device_groups
@@ -908,7 +998,7 @@ class TrafficGroups(object):
         self.traffic_groups = api.Management.TrafficGroup.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.traffic_groups = filter(re_filter.search, self.traffic_groups)
+            self.traffic_groups = list(filter(re_filter.search, self.traffic_groups))
 
     def get_list(self):
         return self.traffic_groups
@@ -956,7 +1046,7 @@ class Rules(object):
         self.rules = api.LocalLB.Rule.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.traffic_groups = filter(re_filter.search, self.rules)
+            self.traffic_groups = list(filter(re_filter.search, self.rules))
 
     def get_list(self):
         return self.rules
@@ -989,7 +1079,7 @@ class Nodes(object):
         self.nodes = api.LocalLB.NodeAddressV2.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.nodes = filter(re_filter.search, self.nodes)
+            self.nodes = list(filter(re_filter.search, self.nodes))
 
     def get_list(self):
         return self.nodes
@@ -1046,7 +1136,7 @@ class VirtualAddresses(object):
         self.virtual_addresses = api.LocalLB.VirtualAddressV2.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.virtual_addresses = filter(re_filter.search, self.virtual_addresses)
+            self.virtual_addresses = list(filter(re_filter.search, self.virtual_addresses))
 
     def get_list(self):
         return self.virtual_addresses
@@ -1103,7 +1193,7 @@ class AddressClasses(object):
         self.address_classes = api.LocalLB.Class.get_address_class_list()
         if regex:
             re_filter = re.compile(regex)
-            self.address_classes = filter(re_filter.search, self.address_classes)
+            self.address_classes = list(filter(re_filter.search, self.address_classes))
 
     def get_list(self):
         return self.address_classes
@@ -1135,7 +1225,7 @@ class Certificates(object):
         self.certificates = [x['certificate']['cert_info']['id'] for x in self.certificate_list]
         if regex:
             re_filter = re.compile(regex)
-            self.certificates = filter(re_filter.search, self.certificates)
+            self.certificates = list(filter(re_filter.search, self.certificates))
             self.certificate_list = [x for x in self.certificate_list if x['certificate']['cert_info']['id'] in self.certificates]
 
     def get_list(self):
@@ -1162,7 +1252,7 @@ class Keys(object):
         self.keys = [x['key_info']['id'] for x in self.key_list]
         if regex:
             re_filter = re.compile(regex)
-            self.keys = filter(re_filter.search, self.keys)
+            self.keys = list(filter(re_filter.search, self.keys))
             self.key_list = [x for x in self.key_list if x['key_info']['id'] in self.keys]
 
     def get_list(self):
@@ -1187,7 +1277,7 @@ class ProfileClientSSL(object):
         self.profiles = api.LocalLB.ProfileClientSSL.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.profiles = filter(re_filter.search, self.profiles)
+            self.profiles = list(filter(re_filter.search, self.profiles))
 
     def get_list(self):
         return self.profiles
@@ -1403,36 +1493,20 @@ class ProvisionInfo(object):
         return result
 
 
-def generate_dict(api_obj, fields):
+def generate_dict(api_obj, fields, fetcher=None):
     result_dict = {}
-    lists = []
-    supported_fields = []
-    if api_obj.get_list():
-        for field in fields:
-            try:
-                api_response = getattr(api_obj, "get_" + field)()
-            except (MethodNotFound, WebFault):
-                pass
-            else:
-                lists.append(api_response)
-                supported_fields.append(field)
-        for i, j in enumerate(api_obj.get_list()):
-            temp = {}
-            temp.update([(item[0], item[1][i]) for item in zip(supported_fields, lists)])
-            result_dict[j] = temp
+    names = api_obj.get_list()
+    if names:
+        fetcher = fetcher or FieldFetcher()
+        supported = fetcher.fetch(api_obj, fields)
+        for i, j in enumerate(names):
+            result_dict[j] = dict((field, values[i]) for field, values in supported)
     return result_dict
 
 
-def generate_simple_dict(api_obj, fields):
-    result_dict = {}
-    for field in fields:
-        try:
-            api_response = getattr(api_obj, "get_" + field)()
-        except (MethodNotFound, WebFault):
-            pass
-        else:
-            result_dict[field] = api_response
-    return result_dict
+def generate_simple_dict(api_obj, fields, fetcher=None):
+    fetcher = fetcher or FieldFetcher()
+    return dict(fetcher.fetch(api_obj, fields))
 
 
 def generate_interface_dict(f5, regex):
@@ -1447,7 +1521,7 @@ def generate_interface_dict(f5, regex):
               'sfp_media_state', 'stp_active_edge_port_state',
               'stp_enabled_state', 'stp_link_type',
               'stp_protocol_detection_reset_state']
-    return generate_dict(interfaces, fields)
+    return generate_dict(interfaces, fields, f5.fetcher)
 
 
 def generate_self_ip_dict(f5, regex):
@@ -1456,7 +1530,7 @@ def generate_self_ip_dict(f5, regex):
               'enforced_firewall_policy', 'floating_state', 'fw_rule',
               'netmask', 'staged_firewall_policy', 'traffic_group',
               'vlan', 'is_traffic_group_inherited']
-    return generate_dict(self_ips, fields)
+    return generate_dict(self_ips, fields, f5.fetcher)
 
 
 def generate_trunk_dict(f5, regex):
@@ -1466,7 +1540,7 @@ def generate_trunk_dict(f5, regex):
               'lacp_timeout_option', 'link_selection_policy', 'media_speed',
               'media_status', 'operational_member_count', 'stp_enabled_state',
               'stp_protocol_detection_reset_state']
-    return generate_dict(trunks, fields)
+    return generate_dict(trunks, fields, f5.fetcher)
 
 
 def generate_vlan_dict(f5, regex):
@@ -1478,7 +1552,7 @@ def generate_vlan_dict(f5, regex):
               'sflow_poll_interval', 'sflow_poll_interval_global',
               'sflow_sampling_rate', 'sflow_sampling_rate_global',
               'source_check_state', 'true_mac_address', 'vlan_id']
-    return generate_dict(vlans, fields)
+    return generate_dict(vlans, fields, f5.fetcher)
 
 
 def generate_vs_dict(f5, regex):
@@ -1500,7 +1574,7 @@ def generate_vs_dict(f5, regex):
               'staged_firewall_policy', 'translate_address_state',
               'translate_port_state', 'type', 'vlan', 'wildmask',
               'name']
-    return generate_dict(virtual_servers, fields)
+    return generate_dict(virtual_servers, fields, f5.fetcher)
 
 
 def generate_pool_dict(f5, regex):
@@ -1517,7 +1591,7 @@ def generate_pool_dict(f5, regex):
               'queue_on_connection_limit_state', 'queue_time_limit',
               'reselect_tries', 'server_ip_tos', 'server_link_qos',
               'simple_timeout', 'slow_ramp_time', 'name']
-    return generate_dict(pools, fields)
+    return generate_dict(pools, fields, f5.fetcher)
 
 
 def generate_device_dict(f5, regex):
@@ -1530,7 +1604,7 @@ def generate_device_dict(f5, regex):
               'optional_modules', 'platform_id', 'primary_mirror_address',
               'product', 'secondary_mirror_address', 'software_version',
               'timelimited_modules', 'timezone', 'unicast_addresses']
-    return generate_dict(devices, fields)
+    return generate_dict(devices, fields, f5.fetcher)
 
 
 def generate_device_group_dict(f5, regex):
@@ -1539,7 +1613,7 @@ def generate_device_group_dict(f5, regex):
               'device', 'full_load_on_sync_state',
               'incremental_config_sync_size_maximum',
               'network_failover_enabled_state', 'sync_status', 'type']
-    return generate_dict(device_groups, fields)
+    return generate_dict(device_groups, fields, f5.fetcher)
 
 
 def generate_traffic_group_dict(f5, regex):
@@ -1548,14 +1622,14 @@ def generate_traffic_group_dict(f5, regex):
               'default_device', 'description', 'ha_load_factor',
               'ha_order', 'is_floating', 'mac_masquerade_address',
               'unit_id']
-    return generate_dict(traffic_groups, fields)
+    return generate_dict(traffic_groups, fields, f5.fetcher)
 
 
 def generate_rule_dict(f5, regex):
     rules = Rules(f5.get_api(), regex)
     fields = ['definition', 'description', 'ignore_vertification',
               'verification_status']
-    return generate_dict(rules, fields)
+    return generate_dict(rules, fields, f5.fetcher)
 
 
 def generate_node_dict(f5, regex):
@@ -1563,7 +1637,7 @@ def generate_node_dict(f5, regex):
     fields = ['name', 'address', 'connection_limit', 'description', 'dynamic_ratio',
               'monitor_instance', 'monitor_rule', 'monitor_status',
               'object_status', 'rate_limit', 'ratio', 'session_status']
-    return generate_dict(nodes, fields)
+    return generate_dict(nodes, fields, f5.fetcher)
 
 
 def generate_virtual_address_dict(f5, regex):
@@ -1572,13 +1646,13 @@ def generate_virtual_address_dict(f5, regex):
               'description', 'enabled_state', 'icmp_echo_state',
               'is_floating_state', 'netmask', 'object_status',
               'route_advertisement_state', 'traffic_group']
-    return generate_dict(virtual_addresses, fields)
+    return generate_dict(virtual_addresses, fields, f5.fetcher)
 
 
 def generate_address_class_dict(f5, regex):
     address_classes = AddressClasses(f5.get_api(), regex)
     fields = ['address_class', 'description']
-    return generate_dict(address_classes, fields)
+    return generate_dict(address_classes, fields, f5.fetcher)
 
 
 def generate_certificate_dict(f5, regex):
@@ -1612,7 +1686,7 @@ def generate_client_ssl_profile_dict(f5, regex):
               'server_name', 'session_ticket_state', 'sni_default_state',
               'sni_require_state', 'ssl_option', 'strict_resume_state',
               'unclean_shutdown_state', 'is_base_profile', 'is_system_profile']
-    return generate_dict(profiles, fields)
+    return generate_dict(profiles, fields, f5.fetcher)
 
 
 def generate_system_info_dict(f5):
@@ -1625,7 +1699,7 @@ def generate_system_info_dict(f5):
               'product_information', 'pva_version', 'system_id',
               'system_information', 'time',
               'time_zone', 'uptime']
-    return generate_simple_dict(system_info, fields)
+    return generate_simple_dict(system_info, fields, f5.fetcher)
 
 
 def generate_software_list(f5):
@@ -1637,7 +1711,7 @@ def generate_software_list(f5):
 def generate_provision_dict(f5):
     provisioned = ProvisionInfo(f5.get_api())
     fields = ['list', 'provisioned_list']
-    return generate_simple_dict(provisioned, fields)
+    return generate_simple_dict(provisioned, fields, f5.fetcher)
 
 
 def main():
@@ -1647,6 +1721,7 @@ def main():
         session=dict(type='bool', default=False),
         include=dict(type='list', required=True),
         filter=dict(type='str', required=False),
+        concurrency=dict(type='int', default=1),
     )
     argument_spec.update(meta_args)
 
@@ -1664,6 +1739,7 @@ def main():
     validate_certs = module.params['validate_certs']
     session = module.params['session']
     fact_filter = module.params['filter']
+    concurrency = module.params['concurrency']
 
     if validate_certs:
         import ssl
@@ -1690,7 +1766,7 @@ def main():
         facts = {}
 
         if len(include) > 0:
-            f5 = F5(server, user, password, session, validate_certs, server_port)
+            f5 = F5(server, user, password, session, validate_certs, server_port, concurrency)
             saved_active_folder = f5.get_active_folder()
             saved_recursive_query_state = f5.get_recursive_query_state()
             if saved_active_folder != "/":
@@ -1743,6 +1819,7 @@ def main():
             if saved_recursive_query_state and \
                saved_recursive_query_state != "STATE_ENABLED":
                 f5.set_recursive_query_state(saved_recursive_query_state)
+            f5.fetcher.close()
 
         result = dict(
             ansible_facts=facts,
@@ -219,7 +219,6 @@ name:
 import os
 import time
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
@@ -227,6 +226,15 @@ from ansible.module_utils.six import iteritems
 from collections import defaultdict
 from distutils.version import LooseVersion
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5CollectionQuery
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5CollectionQuery
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -550,9 +558,29 @@ class BaseManager(object):
         else:
             return self.remove()
 
+    def _policy_query(self, select=None):
+        criteria = "contains(name,{0}) and contains(partition,{1})".format(
+            F5CollectionQuery.quote(self.want.name),
+            F5CollectionQuery.quote(self.want.partition)
+        )
+        return F5CollectionQuery(
+            self.client.api.tm.asm.policies_s, filter=criteria, select=select
+        )
+
+    def _is_wanted_policy(self, policy):
+        if isinstance(policy, dict):
+            name, partition = policy.get('name'), policy.get('partition')
+        else:
+            name, partition = policy.name, policy.partition
+        return name == self.want.name and partition == self.want.partition
+
+    def read_policy_from_device(self):
+        query = self._policy_query()
+        return query.first(self._is_wanted_policy)
+
     def exists(self):
-        policies = self.client.api.tm.asm.policies_s.get_collection()
-        if any(p.name == self.want.name and p.partition == self.want.partition for p in policies):
+        query = self._policy_query(select=['name', 'partition'])
+        if query.first(self._is_wanted_policy):
             return True
         return False
 
@@ -623,10 +651,7 @@ class BaseManager(object):
 
     def update_on_device(self):
         params = self.changes.api_params()
-        policies = self.client.api.tm.asm.policies_s.get_collection()
-        name = self.want.name
-        partition = self.want.partition
-        resource = next((p for p in policies if p.name == name and p.partition == partition), None)
+        resource = self.read_policy_from_device()
         if resource:
             if not params['active']:
                 resource.modify(**params)
@@ -657,12 +682,11 @@ class BaseManager(object):
             return False
 
     def read_current_from_device(self):
-        policies = self.client.api.tm.asm.policies_s.get_collection()
-        for policy in policies:
-            if policy.name == self.want.name and policy.partition == self.want.partition:
-                params = policy.attrs
-                params.update(dict(self_link=policy.selfLink))
-                return Parameters(params)
+        policy = self.read_policy_from_device()
+        if policy:
+            params = policy.attrs
+            params.update(dict(self_link=policy.selfLink))
+            return Parameters(params)
         raise F5ModuleError("The policy was not found")
 
     def import_to_device(self):
@@ -701,10 +725,7 @@ class BaseManager(object):
         return result
 
     def remove_from_device(self):
-        policies = self.client.api.tm.asm.policies_s.get_collection()
-        name = self.want.name
-        partition = self.want.partition
-        resource = next((p for p in policies if p.name == name and p.partition == partition), None)
+        resource = self.read_policy_from_device()
         if resource:
             resource.delete()
 
@@ -805,23 +826,13 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
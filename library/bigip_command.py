@@ -79,6 +79,17 @@ options:
         - cli
     default: rest
     version_added: "2.5"
+  batch:
+    description:
+      - When C(yes), and the C(rest) transport is used, all of the commands
+        are sent to the device in a single request on each retry, instead of
+        one request for each command.
+      - The output of each command is separated from the others using unique
+        delimiters, so the C(stdout) and I(wait_for) conditionals are the same
+        as when this is C(no).
+    type: bool
+    default: no
+    version_added: 2.5
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk.
@@ -134,6 +145,21 @@ EXAMPLES = r'''
     validate_certs: no
   delegate_to: localhost
 
+- name: run many commands in a single request on each retry
+  bigip_command:
+    commands:
+      - show sys version
+      - show ltm pool
+      - show net interface
+    wait_for:
+      - result[0] contains BIG-IP
+    batch: yes
+    server: lb.mydomain.com
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
+
 - name: tmsh prefixes will automatically be handled
   bigip_command:
     commands:
@@ -168,11 +194,21 @@ import re
 import time
 
 from ansible.module_utils.basic import env_fallback
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import build_batch_script
+    from library.module_utils.f5networks.common import cleanup_tokens
+    from library.module_utils.f5networks.common import split_batch_output
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import build_batch_script
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+    from ansible.module_utils.f5networks.common import split_batch_output
+
 try:
     from ansible.module_utils.f5_utils import run_commands
     HAS_CLI_TRANSPORT = True
@@ -277,6 +313,8 @@ class ModuleManager(object):
         while retries > 0:
             if self.client.module.params['transport'] == 'cli' and HAS_CLI_TRANSPORT:
                 responses = run_commands(self.client.module, self.want.commands)
+            elif self.want.batch:
+                responses = self.execute_batch_on_device(commands)
             else:
                 responses = self.execute_on_device(commands)
 
@@ -348,6 +386,23 @@ class ModuleManager(object):
                 responses.append(str(output.commandResult))
         return responses
 
+    def execute_batch_on_device(self, commands):
+        """Runs all commands on the device using a single bash invocation
+
+        The returned list is the same as what ``execute_on_device`` returns.
+        That is, commands that did not produce any output are not included.
+        """
+        script, delimiter = build_batch_script(
+            [item['command'] for item in to_list(commands)]
+        )
+        output = self.client.api.tm.util.bash.exec_cmd(
+            'run',
+            utilCmdArgs='-c "{0}"'.format(script)
+        )
+        if not hasattr(output, 'commandResult'):
+            return []
+        return split_batch_output(str(output.commandResult), delimiter)
+
 
 class ArgumentSpec(object):
     def __init__(self):
@@ -378,6 +433,10 @@ class ArgumentSpec(object):
                 default='rest',
                 choices=['cli', 'rest']
             ),
+            batch=dict(
+                type='bool',
+                default=False
+            ),
             password=dict(
                 required=False,
                 fallback=(env_fallback, ['F5_PASSWORD']),
@@ -387,20 +446,10 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
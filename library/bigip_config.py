@@ -63,6 +63,33 @@ options:
       - yes
       - no
     default: yes
+  skip_unchanged_merge:
+    description:
+      - When C(yes), a hash of the C(merge_content) is recorded along with
+        the time of the last configuration change on the device, after the
+        content is merged.
+      - When the same content is merged again, and the configuration of the
+        device has not changed since it was recorded, the merge is not done
+        and the module reports no change. C(save) is also skipped in that
+        case, because it was done, if requested, when the content was
+        merged.
+      - Lines are compared without trailing whitespace, and blank lines are
+        ignored.
+      - Only applies when C(verify) is C(no) and C(reset) is C(no). A
+        verification does not change the configuration, so it is always run.
+    type: bool
+    default: no
+    version_added: 2.5
+  merge_cache:
+    description:
+      - Path to a file on the controller in which to record the merged
+        content for C(skip_unchanged_merge). The file may be shared by all
+        hosts and forks of a play.
+      - When not given, the record is kept in a file on the device itself.
+        Devices in appliance mode do not allow bash, so the record cannot be
+        kept on them. The content is then merged every time, unless this
+        option is given.
+    version_added: 2.5
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk.
@@ -101,6 +128,18 @@ EXAMPLES = r'''
     user: admin
     validate_certs: no
   delegate_to: localhost
+
+- name: Merge an SCF configuration only when it, or the device, changed
+  bigip_config:
+    merge_content: "{{ lookup('file', '/path/to/config.scf') }}"
+    verify: no
+    skip_unchanged_merge: yes
+    merge_cache: /tmp/bigip-config-merges.json
+    server: lb.mydomain.com
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
 '''
 
 RETURN = r'''
@@ -117,6 +156,7 @@ stdout_lines:
   sample: [['...', '...'], ['...'], ['...']]
 '''
 
+import hashlib
 import os
 import tempfile
 
@@ -125,13 +165,21 @@ try:
 except ImportError:
     from io import StringIO
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ControllerCache
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ControllerCache
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -176,12 +224,28 @@ class Parameters(AnsibleF5Parameters):
                     # If the mapped value is not a @property
                     self._values[map_key] = v
 
+    @property
+    def merge_hash(self):
+        if self._values['merge_content'] is None:
+            return None
+        lines = self._values['merge_content'].splitlines()
+        lines = [x.rstrip() for x in lines]
+        content = '\n'.join(x for x in lines if x)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
 
 class ModuleManager(object):
+    # Kept on the device when there is no merge_cache. It is not part of
+    # the configuration, so writing it does not change the configuration.
+    merge_record_path = '/shared/tmp/f5-ansible-config-merge'
+
     def __init__(self, client):
         self.client = client
         self.want = Parameters(self.client.module.params)
         self.changes = Parameters()
+        self.merge_cache = None
+        if self.want.merge_cache:
+            self.merge_cache = F5ControllerCache(self.want.merge_cache)
 
     def _set_changed_options(self):
         changed = {}
@@ -203,14 +267,106 @@ class ModuleManager(object):
         result = dict()
 
         try:
-            self.execute()
+            if self.merge_is_unchanged():
+                changed = False
+            else:
+                self.execute()
+                changed = True
         except iControlUnexpectedHTTPError as e:
             raise F5ModuleError(str(e))
 
         result.update(**self.changes.to_return())
-        result.update(dict(changed=True))
+        result.update(dict(changed=changed))
         return result
 
+    def should_record_merge(self):
+        if not self.want.skip_unchanged_merge or not self.want.merge_content:
+            return False
+        return not self.want.verify and not self.want.reset
+
+    def merge_is_unchanged(self):
+        """Checks if the content was merged, and nothing changed since
+
+        The content is unchanged if its hash is the one recorded after the
+        last merge, and the time of the last configuration change on the
+        device is still the one recorded with it. Any other change of the
+        configuration, including a merge of other content, changes that time.
+
+        :return bool
+        """
+        if not self.should_record_merge():
+            return False
+        recorded = self.read_merge_record()
+        if recorded is None or recorded['content'] != self.want.merge_hash:
+            return False
+        generation = self.read_config_generation_from_device()
+        if generation is None:
+            return False
+        return recorded['generation'] == generation
+
+    def read_config_generation_from_device(self):
+        try:
+            resource = self.client.api.tm.sys.dbs.db.load(
+                name='configsync.localconfigtime'
+            )
+        except iControlUnexpectedHTTPError:
+            return None
+        return str(resource.value)
+
+    def _get_merge_cache_key(self):
+        return F5ControllerCache.make_key(
+            self.client.module.params['server'],
+            self.client.module.params['server_port'],
+            'bigip_config'
+        )
+
+    def read_merge_record(self):
+        if self.merge_cache is not None:
+            return self.merge_cache.get(self._get_merge_cache_key())
+        return self.read_merge_record_from_device()
+
+    def read_merge_record_from_device(self):
+        try:
+            output = self.client.api.tm.util.bash.exec_cmd(
+                'run',
+                utilCmdArgs='-c "cat {0} 2>/dev/null"'.format(self.merge_record_path)
+            )
+        except iControlUnexpectedHTTPError:
+            # Devices in appliance mode do not allow bash. Without a record,
+            # the content is merged every time.
+            return None
+        if not hasattr(output, 'commandResult'):
+            return None
+        fields = str(output.commandResult).split()
+        if len(fields) != 2:
+            return None
+        return dict(content=fields[0], generation=fields[1])
+
+    def record_merge(self):
+        generation = self.read_config_generation_from_device()
+        if generation is None:
+            return
+        record = dict(content=self.want.merge_hash, generation=generation)
+        if self.merge_cache is not None:
+            self.merge_cache.set(self._get_merge_cache_key(), record)
+        else:
+            self.record_merge_on_device(record)
+
+    def record_merge_on_device(self, record):
+        command = 'mkdir -p {0} && echo {1} {2} > {3}'.format(
+            os.path.dirname(self.merge_record_path), record['content'],
+            record['generation'], self.merge_record_path
+        )
+        try:
+            self.client.api.tm.util.bash.exec_cmd(
+                'run',
+                utilCmdArgs='-c "{0}"'.format(command)
+            )
+        except iControlUnexpectedHTTPError:
+            # The merge was done. It is not recorded on devices in appliance
+            # mode, which do not allow bash.
+            pass
+
     def execute(self):
         responses = []
         if self.want.reset:
@@ -229,6 +385,9 @@ class ModuleManager(object):
             response = self.save()
             responses.append(response)
 
+        if self.should_record_merge() and not self.client.check_mode:
+            self.record_merge()
+
         self.changes = Parameters({
             'stdout': responses,
             'stdout_lines': self._to_lines(responses)
@@ -334,28 +493,25 @@ class ArgumentSpec(object):
             save=dict(
                 type='bool',
                 default=True
+            ),
+            skip_unchanged_merge=dict(
+                type='bool',
+                default=False
+            ),
+            merge_cache=dict(
+                type='path'
             )
         )
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
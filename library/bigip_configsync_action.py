@@ -52,11 +52,46 @@ options:
     choices:
       - yes
       - no
+  defer:
+    description:
+      - When C(yes), the sync is not run now. Instead, the device group is
+        recorded in C(sync_cache) as having one more change to sync.
+      - The sync is run when C(max_pending_changes) or C(max_pending_seconds)
+        is reached, or by the next task that runs this module for the device
+        group with C(defer) set to C(no).
+      - This lets a play make many changes and sync them once, instead of
+        once per change.
+      - Changes recorded by other tasks while a sync runs stay recorded and
+        are included in the next sync.
+    default: no
+    choices:
+      - yes
+      - no
+    version_added: 2.5
+  sync_cache:
+    description:
+      - Path of the file, on the Ansible controller, in which the pending
+        changes of device groups are recorded. Required when C(defer) is
+        C(yes).
+      - You can omit this option if the environment variable C(F5_SYNC_CACHE)
+        is set.
+    version_added: 2.5
+  max_pending_changes:
+    description:
+      - When C(defer) is C(yes), the number of pending changes at which the
+        device group is synced anyway.
+    version_added: 2.5
+  max_pending_seconds:
+    description:
+      - When C(defer) is C(yes), the age, in seconds, of the oldest pending
+        change at which the device group is synced anyway.
+    version_added: 2.5
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk.
-  - Requires the objectpath Python package on the host. This is as easy as pip
-    install objectpath.
+  - The status of the device group is read from the details of the sync
+    status of the device, so that other device groups that are not in sync
+    do not affect this module.
 requirements:
   - f5-sdk >= 2.2.3
 extends_documentation_fragment: f5
@@ -85,6 +120,31 @@ EXAMPLES = r'''
     validate_certs: no
   delegate_to: localhost
 
+- name: Record a change to the device group, to be synced later
+  bigip_configsync_actions:
+    device_group: foo-group
+    sync_device_to_group: yes
+    defer: yes
+    max_pending_changes: 20
+    max_pending_seconds: 600
+    sync_cache: ~/.ansible/f5-sync-cache.json
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+    validate_certs: no
+  delegate_to: localhost
+
+- name: Sync the changes that were recorded in the play
+  bigip_configsync_actions:
+    device_group: foo-group
+    sync_device_to_group: yes
+    sync_cache: ~/.ansible/f5-sync-cache.json
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+    validate_certs: no
+  delegate_to: localhost
+
 - name: Perform an initial sync of a device to a new device group
   bigip_configsync_actions:
     device_group: new-device-group
@@ -97,23 +157,38 @@ EXAMPLES = r'''
 '''
 
 RETURN = r'''
-# only common fields returned
+deferred:
+  description: Whether the sync was deferred instead of run.
+  returned: always
+  type: bool
+  sample: true
+pending_changes:
+  description: Number of changes to the device group that have not been synced.
+  returned: always
+  type: int
+  sample: 3
 '''
 
-import time
 import re
-
-try:
-    from objectpath import Tree
-    HAS_OBJPATH = True
-except ImportError:
-    HAS_OBJPATH = False
+import time
 
 from ansible.module_utils.basic import BOOLEANS_TRUE
-from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.basic import env_fallback
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.six import iteritems
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ConfigSyncQueue
+    from library.module_utils.f5networks.common import F5Poller
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ConfigSyncQueue
+    from ansible.module_utils.f5networks.common import F5Poller
+    from ansible.module_utils.f5networks.common import cleanup_tokens
 
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
@@ -154,6 +229,11 @@ class Parameters(AnsibleF5Parameters):
         result = self._cast_to_bool(self._values['overwrite_config'])
         return result
 
+    @property
+    def defer(self):
+        result = self._cast_to_bool(self._values['defer'])
+        return result
+
     def _cast_to_bool(self, value):
         if value is None:
             return None
@@ -187,37 +267,97 @@ class ModuleManager(object):
     def __init__(self, client):
         self.client = client
         self.want = Parameters(self.client.module.params)
+        self.queue = None
+        if self.want.sync_cache:
+            self.queue = F5ConfigSyncQueue(self.want.sync_cache)
 
     def exec_module(self):
-        result = dict()
+        result = dict(
+            deferred=False,
+            pending_changes=0
+        )
 
         try:
+            if self.want.defer:
+                pending = self.mark_dirty()
+                if not self._sync_is_due(pending):
+                    result.update(dict(
+                        changed=False,
+                        deferred=True,
+                        pending_changes=pending['changes']
+                    ))
+                    return result
+            else:
+                pending = self.read_pending()
+            started = time.time()
             changed = self.present()
+            self.clear_pending(pending, started)
         except iControlUnexpectedHTTPError as e:
             raise F5ModuleError(str(e))
 
         result.update(dict(changed=changed))
         return result
 
+    def _get_queue_key(self):
+        return F5ConfigSyncQueue.make_key(
+            self.want.server, self.want.server_port, self.want.device_group
+        )
+
+    def mark_dirty(self):
+        if self.queue is None:
+            raise F5ModuleError(
+                "The 'sync_cache' parameter is required when 'defer' is 'yes'."
+            )
+        key = self._get_queue_key()
+        if self.client.check_mode:
+            pending = self.queue.pending(key) or dict(changes=0, since=time.time())
+            pending['changes'] += 1
+            return pending
+        return self.queue.mark_dirty(key)
+
+    def read_pending(self):
+        if self.queue is None:
+            return None
+        return self.queue.pending(self._get_queue_key())
+
+    def clear_pending(self, pending, started):
+        """Removes the changes that the sync included from the queue
+
+        Other tasks may mark changes while the sync runs. Only the changes
+        that were pending before it started are removed, so that theirs are
+        synced later.
+        """
+        if self.queue is None or self.client.check_mode or not pending:
+            return
+        self.queue.consume(self._get_queue_key(), pending['changes'], since=started)
+
+    def _sync_is_due(self, pending):
+        max_changes = self.want.max_pending_changes
+        if max_changes is not None and pending['changes'] >= max_changes:
+            return True
+        max_seconds = self.want.max_pending_seconds
+        if max_seconds is not None and time.time() - pending['since'] >= max_seconds:
+            return True
+        return False
+
     def present(self):
         if not self._device_group_exists():
             raise F5ModuleError(
                 "The specified 'device_group' not not exist."
             )
-        if self._sync_to_group_required():
+        current = self.read_current_from_device()
+        if self._sync_to_group_required(current):
             raise F5ModuleError(
                 "This device group needs an initial sync. Please use "
                 "'sync_device_to_group'"
             )
-        if self.exists():
+        if self.exists(current):
             return False
         else:
             return self.execute()
 
-    def _sync_to_group_required(self):
-        resource = self.read_current_from_device()
-        status = self._get_status_from_resource(resource)
-        if status == 'Awaiting Initial Sync' and self.want.sync_group_to_device:
+    def _sync_to_group_required(self, current):
+        if current['status'] == 'Awaiting Initial Sync' and self.want.sync_group_to_device:
             return True
         return False
 
@@ -232,10 +372,8 @@ class ModuleManager(object):
         self._wait_for_sync()
         return True
 
-    def exists(self):
-        resource = self.read_current_from_device()
-        status = self._get_status_from_resource(resource)
-        if status == 'In Sync':
+    def exists(self, current):
+        if current['status'] == 'In Sync':
             return True
         else:
             return False
@@ -252,11 +390,8 @@ class ModuleManager(object):
         )
 
     def _wait_for_sync(self):
-        # Wait no more than half an hour
-        resource = self.read_current_from_device()
-        for x in range(1, 180):
-            time.sleep(3)
-            status = self._get_status_from_resource(resource)
+        def sync_finished(current):
+            status = current['status']
 
             # Changes Pending:
             #     The existing device has changes made to it that
@@ -272,32 +407,86 @@ class ModuleManager(object):
             #     after starting the sync and stay until all devices finish.
             #
             if status in ['Changes Pending']:
-                details = self._get_details_from_resource(resource)
-                self._validate_pending_status(details)
+                self._validate_pending_status(current['details'])
             elif status in ['Awaiting Initial Sync', 'Not All Devices Synced']:
                 pass
             elif status == 'In Sync':
-                return
+                return True
             else:
                 raise F5ModuleError(status)
+            return False
+
+        # Small syncs finish in seconds, so polling starts often and slows
+        # down for full syncs of large configurations.
+        poller = F5Poller(interval=2, max_interval=15)
+        poller.poll(
+            self.read_current_from_device,
+            until=sync_finished,
+            initial_delay=3,
+            timeout=540,
+            msg="Timed out waiting for the device group to sync"
+        )
 
     def read_current_from_device(self):
-        result = self.client.api.tm.cm.sync_status.load()
+        resource = self.client.api.tm.cm.sync_status.load()
+        return self._get_group_status_from_stats(resource.entries)
+
+    def _get_group_status_from_stats(self, stats):
+        """Returns the status of the device group, and its details
+
+        The status of the device is the worst status of all of its device
+        groups, so it can be "Changes Pending" because of another device
+        group. The details list each device group as "<name> (<status>):
+        <summary>", followed by lines, starting with "-", that are about that
+        device group; such as the recommended action.
+
+        When the device group is not in the details, the status and details
+        of the device are returned.
+
+        :param stats: The entries of the sync status.
+        :return: Dictionary with the ``status`` and the list of ``details``.
+        """
+        entries = dict()
+        for k, v in iteritems(stats):
+            entries = v['nestedStats']['entries']
+            break
+        details = self._get_details_from_entries(entries)
+        result = dict(
+            status=entries['status']['description'],
+            details=details
+        )
+
+        pattern = r'^{0}\s+\((?P<status>[^)]+)\)'.format(
+            re.escape(self.want.device_group)
+        )
+        for index, detail in enumerate(details):
+            matches = re.search(pattern, detail.strip())
+            if not matches:
+                continue
+            result['status'] = matches.group('status')
+            result['details'] = [detail]
+            for other in details[index + 1:]:
+                if not other.strip().startswith('-'):
+                    break
+                result['details'].append(other)
+            break
         return result
 
-    def _get_status_from_resource(self, resource):
-        resource.refresh()
-        entries = resource.entries.copy()
-        k, v = entries.popitem()
-        status = v['nestedStats']['entries']['status']['description']
-        return status
-
-    def _get_details_from_resource(self, resource):
-        resource.refresh()
-        stats = resource.entries.copy()
-        tree = Tree(stats)
-        details = list(tree.execute('$..*["details"]["description"]'))
-        result = details[::-1]
+    def _get_details_from_entries(self, entries):
+        for k, v in iteritems(entries):
+            if k.endswith('/details'):
+                details = v['nestedStats']['entries']
+                break
+        else:
+            return []
+
+        # The keys end with the position of the line in the details
+        def position(key):
+            return int(key.rsplit('/', 1)[-1])
+
+        result = []
+        for key in sorted(details, key=position):
+            result.append(details[key]['nestedStats']['entries']['details']['description'])
         return result
 
     def _validate_pending_status(self, details):
@@ -333,6 +522,20 @@ class ArgumentSpec(object):
             ),
             device_group=dict(
                 required=True
+            ),
+            defer=dict(
+                type='bool',
+                default='no'
+            ),
+            sync_cache=dict(
+                type='path',
+                fallback=(env_fallback, ['F5_SYNC_CACHE'])
+            ),
+            max_pending_changes=dict(
+                type='int'
+            ),
+            max_pending_seconds=dict(
+                type='int'
             )
         )
         self.f5_product_name = 'bigip'
@@ -347,30 +550,15 @@ class ArgumentSpec(object):
         ]
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError(
             "The python 'f5-sdk' module is required. This can be done with 'pip install f5-sdk'"
         )
 
-    if not HAS_OBJPATH:
-        raise F5ModuleError(
-            "The python 'objectpath' module is required. This can be done with 'pip install objectpath'"
-        )
-
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         mutually_exclusive=spec.mutually_exclusive,
@@ -142,12 +142,18 @@ multicast_port:
   sample: 1026
 '''
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from netaddr import IPAddress, AddrFormatError
     HAS_NETADDR = True
@@ -565,16 +571,6 @@ class ArgumentSpec(object):
         ]
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
@@ -584,7 +580,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
@@ -0,0 +1,369 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = r'''
+---
+module: bigip_device_facts
+short_description: Collect facts from F5 BIG-IP devices over iControl REST
+description:
+  - Collect facts from F5 BIG-IP devices over iControl REST.
+  - Covers the same categories as the deprecated C(bigip_facts) module,
+    except for C(system_info), without needing the SOAP API.
+  - Each category is read with a single request. Subcollections, such as the
+    members of pools or the profiles of virtual servers, are included in that
+    same request.
+version_added: "2.5"
+options:
+  include:
+    description:
+      - Fact categories to collect.
+    required: True
+    choices:
+      - address_class
+      - certificate
+      - client_ssl_profile
+      - device
+      - device_group
+      - interface
+      - key
+      - node
+      - pool
+      - provision
+      - rule
+      - self_ip
+      - software
+      - traffic_group
+      - trunk
+      - virtual_address
+      - virtual_server
+      - vlan
+      - all
+  filter:
+    description:
+      - Perform regex filter of response. Filtering is done on the name of
+        the resource. Valid filters are anything that can be provided to
+        Python's C(re) module.
+      - The filter matches anywhere in the name, as it does in C(bigip_facts).
+        Use C(^) to match the start of the name only.
+  properties:
+    description:
+      - List of the attributes of each resource to return, using the names
+        that the REST API uses. For example, C(loadBalancingMode).
+      - Only these attributes are read from the device, which makes the
+        response much smaller on devices with many resources.
+      - C(name), C(partition) and C(fullPath) are always returned, as is the
+        subcollection of the category, when it has one.
+      - When not given, all attributes are returned.
+  compact:
+    description:
+      - When C(yes), the C(kind), C(selfLink) and C(generation) attributes
+        are removed from the facts.
+      - Subcollections are also returned under the name of their attribute
+        without the C(Reference) suffix. For example, the members of a pool
+        are returned in C(members) instead of C(membersReference.items).
+    type: bool
+    default: no
+  concurrency:
+    description:
+      - Number of categories that are read from the device at the same time.
+    default: 4
+notes:
+  - Requires the f5-sdk Python package on the host. This is as easy as pip
+    install f5-sdk.
+requirements:
+  - f5-sdk >= 2.2.3
+extends_documentation_fragment: f5
+author:
+  - Tim Rupp (@caphrim007)
+'''
+
+EXAMPLES = r'''
+- name: Collect pool and virtual server facts
+  bigip_device_facts:
+    include:
+      - pool
+      - virtual_server
+    compact: yes
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+    validate_certs: no
+  delegate_to: localhost
+
+- name: Collect the load balancing mode of the web pools only
+  bigip_device_facts:
+    include: pool
+    filter: ^web_
+    properties:
+      - loadBalancingMode
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+    validate_certs: no
+  delegate_to: localhost
+'''
+
+RETURN = r'''
+pool:
+  description: The pools on the device, with their members.
+  returned: When C(pool) is included.
+  type: list
+  sample:
+    - name: web_pool
+      partition: Common
+      fullPath: /Common/web_pool
+      loadBalancingMode: round-robin
+      members:
+        - name: 10.10.10.10:80
+          address: 10.10.10.10
+          state: up
+virtual_server:
+  description: The virtual servers on the device, with their profiles.
+  returned: When C(virtual_server) is included.
+  type: list
+  sample:
+    - name: my-vs
+      partition: Common
+      fullPath: /Common/my-vs
+      destination: /Common/10.10.10.10:443
+      pool: /Common/web_pool
+      profiles:
+        - name: tcp
+          context: all
+'''
+
+import re
+
+from ansible.module_utils.f5_utils import AnsibleF5Parameters
+from ansible.module_utils.f5_utils import HAS_F5SDK
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.six import iteritems
+from multiprocessing.pool import ThreadPool
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
+try:
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+except ImportError:
+    HAS_F5SDK = False
+
+
+class Parameters(AnsibleF5Parameters):
+    @property
+    def include(self):
+        requested = self._values['include']
+        valid = sorted(CATEGORIES) + ['all']
+
+        if any(x for x in requested if x not in valid):
+            raise F5ModuleError(
+                "The valid 'include' choices are {0}".format(', '.join(valid))
+            )
+        if 'all' in requested:
+            return sorted(CATEGORIES)
+        return requested
+
+    @property
+    def concurrency(self):
+        if self._values['concurrency'] is None:
+            return 4
+        if self._values['concurrency'] < 1:
+            raise F5ModuleError(
+                "The 'concurrency' parameter must be at least 1."
+            )
+        return self._values['concurrency']
+
+
+class Category(object):
+    """A fact category and the collection that it is read from
+
+    Args:
+        path (str): Path of the collection, relative to the ``/mgmt/tm/``
+            URI.
+        subcollection (str): Attribute of the resources that references a
+            subcollection to include with each of them.
+        type (str): When given, only the resources with this ``type`` are
+            returned.
+    """
+    def __init__(self, path, subcollection=None, type=None):
+        self.path = path
+        self.subcollection = subcollection
+        self.type = type
+
+
+CATEGORIES = dict(
+    address_class=Category('ltm/data-group/internal', type='ip'),
+    certificate=Category('sys/file/ssl-cert'),
+    client_ssl_profile=Category('ltm/profile/client-ssl'),
+    device=Category('cm/device'),
+    device_group=Category('cm/device-group', 'devicesReference'),
+    interface=Category('net/interface'),
+    key=Category('sys/file/ssl-key'),
+    node=Category('ltm/node'),
+    pool=Category('ltm/pool', 'membersReference'),
+    provision=Category('sys/provision'),
+    rule=Category('ltm/rule'),
+    self_ip=Category('net/self'),
+    software=Category('sys/software/volume'),
+    traffic_group=Category('cm/traffic-group'),
+    trunk=Category('net/trunk'),
+    virtual_address=Category('ltm/virtual-address'),
+    virtual_server=Category('ltm/virtual', 'profilesReference'),
+    vlan=Category('net/vlan', 'interfacesReference'),
+)
+
+
+class ModuleManager(object):
+    # Attributes that every resource has and that say nothing about it
+    noise = ['kind', 'selfLink', 'generation']
+
+    def __init__(self, client):
+        self.client = client
+        self.want = Parameters(self.client.module.params)
+
+    def exec_module(self):
+        result = dict()
+        facts = self.read_facts_from_device(self.want.include)
+        result.update(facts)
+        result.update(dict(changed=False))
+        return result
+
+    def read_facts_from_device(self, names):
+        if self.want.concurrency == 1 or len(names) == 1:
+            collections = [self.read_category_from_device(x) for x in names]
+        else:
+            pool = ThreadPool(min(self.want.concurrency, len(names)))
+            try:
+                collections = pool.map(self.read_category_from_device, names)
+            finally:
+                pool.close()
+                pool.join()
+        result = dict()
+        for name, items in zip(names, collections):
+            result[name] = self.format_facts(CATEGORIES[name], items)
+        return result
+
+    def read_category_from_device(self, name):
+        category = CATEGORIES[name]
+        uri = '{0}tm/{1}/'.format(
+            self.client.api._meta_data['uri'], category.path
+        )
+        try:
+            response = self.client.api.icrs.get(
+                uri, params=self.query_for(category)
+            )
+        except iControlUnexpectedHTTPError as ex:
+            # The collection does not exist when the module it belongs to
+            # is not available on this version of BIG-IP.
+            if ex.response.status_code == 404:
+                return []
+            raise F5ModuleError(str(ex))
+        return response.json().get('items', [])
+
+    def query_for(self, category):
+        query = ['expandSubcollections=true']
+        if self.want.properties:
+            properties = ['name', 'partition', 'fullPath']
+            if category.subcollection:
+                properties.append(category.subcollection)
+            if category.type:
+                properties.append('type')
+            properties += [x for x in self.want.properties if x not in properties]
+            query.append('$select={0}'.format(','.join(properties)))
+        return '&'.join(query)
+
+    def format_facts(self, category, items):
+        results = []
+        for item in items:
+            if category.type and item.get('type') != category.type:
+                continue
+            if not self.filter_matches_name(item.get('name')):
+                continue
+            if self.want.compact:
+                item = self.compact(item)
+            results.append(item)
+        return results
+
+    def filter_matches_name(self, name):
+        if self.want.filter is None:
+            return True
+        matches = re.search(self.want.filter, str(name))
+        if matches:
+            return True
+        else:
+            return False
+
+    def compact(self, value):
+        if isinstance(value, list):
+            return [self.compact(x) for x in value]
+        if not isinstance(value, dict):
+            return value
+        result = dict()
+        for key, item in iteritems(value):
+            if key in self.noise:
+                continue
+            if key.endswith('Reference') and isinstance(item, dict):
+                name = key[:-len('Reference')]
+                if 'items' in item and name not in value:
+                    result[name] = self.compact(item['items'])
+                    continue
+                if 'items' not in item:
+                    # Only a link to the resource, whose name is already
+                    # given by another attribute.
+                    continue
+            result[key] = self.compact(item)
+        return result
+
+
+class ArgumentSpec(object):
+    def __init__(self):
+        self.supports_check_mode = True
+        self.argument_spec = dict(
+            include=dict(type='list', required=True),
+            filter=dict(type='str'),
+            properties=dict(type='list'),
+            compact=dict(type='bool', default=False),
+            concurrency=dict(type='int', default=4)
+        )
+        self.f5_product_name = 'bigip'
+
+
+def main():
+    if not HAS_F5SDK:
+        raise F5ModuleError("The python f5-sdk module is required")
+
+    spec = ArgumentSpec()
+
+    client = F5Client(
+        argument_spec=spec.argument_spec,
+        supports_check_mode=spec.supports_check_mode,
+        f5_product_name=spec.f5_product_name
+    )
+
+    try:
+        mm = ModuleManager(client)
+        results = mm.exec_module()
+        cleanup_tokens(client)
+        client.module.exit_json(**results)
+    except F5ModuleError as e:
+        cleanup_tokens(client)
+        client.module.fail_json(msg=str(e))
+
+
+if __name__ == '__main__':
+    main()
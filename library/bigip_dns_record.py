@@ -16,37 +16,85 @@ DOCUMENTATION = r'''
 module: bigip_dns_record
 short_description: Manage DNS resource records on a BIG-IP
 description:
-  - Manage DNS resource records on a BIG-IP
+  - Manage the DNS resource records of a ZoneRunner zone on a BIG-IP.
+  - Either a single record is given with C(type) and C(options), or many
+    records are given with C(records). The records of the zone are read
+    once, and only the records that are missing, or that are no longer
+    wanted, are sent to the device, in batches.
 version_added: "2.2"
 options:
-  user:
+  zone:
     description:
-      - BIG-IP username
+      - The zone of the records.
     required: true
-  password:
+  view:
     description:
-      - BIG-IP password
-    required: true
-  server:
+      - The view of the zone.
+    default: external
+  type:
     description:
-      - BIG-IP host
-    required: true
-    default: localhost
+      - The type of the record given in C(options).
+    choices:
+      - A
+      - AAAA
+      - CNAME
+      - DNAME
+      - DS
+      - HINFO
+      - MX
+      - NAPTR
+      - NS
+      - PTR
+      - SOA
+      - SRV
+      - TXT
+  options:
+    description:
+      - The fields of a single record of type C(type), such as
+        C(domain_name) and C(ip_address) for an C(A) record.
+      - Mutually exclusive with C(records).
+  records:
+    description:
+      - List of records. Each record is a dictionary with the key C(type)
+        and the fields of a record of that type, and optionally C(ttl).
+      - Record names that do not end with a dot are relative to C(zone).
+      - Mutually exclusive with C(options).
+    version_added: 2.5
+  ttl:
+    description:
+      - The TTL of the records that do not specify their own.
+    default: 60
+  purge:
+    description:
+      - When C(yes), records of the zone that are not given are deleted.
+        Only records of the types of the given records are deleted, and
+        C(SOA) records are never deleted.
+      - Only used when C(state) is C(present).
+    type: bool
+    default: no
+    version_added: 2.5
+  batch_size:
+    description:
+      - Maximum number of records that are added or deleted in one request.
+    default: 500
+    version_added: 2.5
   state:
     description:
-      - Whether the record should exist.  When C(absent), removes
-        the record.
-    required: false
+      - Whether the records should exist. When C(absent), removes
+        the records.
     default: present
     choices:
       - present
       - absent
 notes:
-  - Requires the bigsuds Python package on the remote host. This is as easy as
+  - Requires the bigsuds Python package on the host. This is as easy as
     pip install bigsuds
+  - A record is identified by its name, type and data. A record whose TTL
+    is changed is deleted and added again.
 requirements:
   - bigsuds
   - distutils
+extends_documentation_fragment: f5
 author:
   - Tim Rupp (@caphrim007)
 '''
@@ -56,21 +104,20 @@ EXAMPLES = r'''
   bigip_dns_record:
     user: admin
     password: secret
-    hostname: lb.mydomain.com
+    server: lb.mydomain.com
     type: A
     zone: organization.com
     state: present
     options:
-      hostname: elliot.organization.com
+      domain_name: elliot.organization.com
       ip_address: 10.1.1.1
   delegate_to: localhost
 
-- name: Add an A record to organization.com zone
-  local_action:
-    module: bigip_dns_record
+- name: Add an A record with a TTL to organization.com zone
+  bigip_dns_record:
     user: admin
     password: secret
-    hostname: lb.mydomain.com
+    server: lb.mydomain.com
     type: A
     zone: organization.com
     state: present
@@ -78,444 +125,395 @@ EXAMPLES = r'''
     options:
       domain_name: elliot.organization.com
       ip_address: 10.1.1.1
+  delegate_to: localhost
+
+- name: Make the records of the internal view of organization.com exactly these
+  bigip_dns_record:
+    user: admin
+    password: secret
+    server: lb.mydomain.com
+    zone: organization.com
+    view: internal
+    records:
+      - type: A
+        domain_name: elliot
+        ip_address: 10.1.1.1
+      - type: CNAME
+        domain_name: www
+        cname: elliot.organization.com
+        ttl: 300
+      - type: MX
+        domain_name: organization.com
+        preference: 10
+        mail: mail.organization.com
+    purge: yes
+  delegate_to: localhost
+'''
+
+RETURN = r'''
+added:
+  description: The records that were added, in zone file format.
+  returned: changed
+  type: list
+  sample: ["elliot.organization.com. 60 IN A 10.1.1.1"]
+deleted:
+  description: The records that were deleted, in zone file format.
+  returned: changed
+  type: list
+  sample: ["old.organization.com. 60 IN A 10.1.1.2"]
 '''
 
-from distutils.version import StrictVersion
 import re
+import shlex
+
+from distutils.version import StrictVersion
+
+try:
+    import bigsuds
+except ImportError:
+    pass  # Handled by f5_utils.bigsuds_found
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.f5_utils import bigip_api, bigsuds_found, f5_argument_spec
+from ansible.module_utils.six import iteritems
+from ansible.module_utils._text import to_native
 
 
-VERSION_PATTERN = 'BIG-IP_v(?P<version>\d+\.\d+\.\d+)'
+VERSION_PATTERN = r'BIG-IP_v(?P<version>\d+\.\d+\.\d+)'
 RECORDS = [
     'A', 'AAAA', 'CNAME', 'DNAME', 'DS',
     'HINFO', 'MX', 'NAPTR', 'NS', 'PTR',
     'SOA', 'SRV', 'TXT'
 ]
 
+# The field of each iControl record type that holds the name of the record,
+# and the fields that hold its data, in zone file order.
+RECORD_FIELDS = dict(
+    A=('domain_name', ['ip_address']),
+    AAAA=('domain_name', ['ip_address']),
+    CNAME=('domain_name', ['cname']),
+    DNAME=('domain_name', ['label']),
+    DS=('domain_name', ['key_tag', 'algorithm', 'digest_type', 'digest']),
+    HINFO=('domain_name', ['hardware', 'os']),
+    MX=('domain_name', ['preference', 'mail']),
+    NAPTR=('domain_name', ['order', 'preference', 'flags', 'service', 'regexp', 'replacement']),
+    NS=('domain_name', ['host_name']),
+    PTR=('ip_address', ['dname']),
+    SOA=('domain_name', ['primary', 'email', 'serial', 'refresh', 'retry', 'expire', 'neg_ttl']),
+    SRV=('domain_name', ['priority', 'weight', 'port', 'target']),
+    TXT=('domain_name', ['text']),
+)
+
+# Fields that hold domain names, which are compared case-insensitively and
+# always end with a dot
+NAME_FIELDS = [
+    'cname', 'label', 'mail', 'replacement', 'host_name', 'dname', 'primary',
+    'email', 'target'
+]
 
-class BigIpCommon(object):
-    def __init__(self, *args, **kwargs):
-        self.result = dict(changed=False, changes=dict())
-        self.params = kwargs
+# Records of all other types require 9.0.3
+REQUIRED_BIGIP_VERSIONS = dict(
+    DS='11.4.0',
+    NAPTR='11.4.0'
+)
 
-    def flush(self):
-        result = dict()
-        state = self.params['state']
 
-        if state == "present":
-            changed = self.present()
+class ResourceRecordException(Exception):
+    pass
 
-            if not self.params['check_mode']:
-                current = self.read()
-                result.update(current)
-        else:
-            changed = self.absent()
 
-        result.update(dict(changed=changed))
+class ResourceRecord(object):
+    """A resource record, as given to the module or as read from ZoneRunner
+
+    Records are identified by their name, type and data. The name and the
+    data are normalized in the same way on both sides, so that records can
+    be compared by their ``key``.
+    """
+    __slots__ = ('type', 'name', 'rdata', 'ttl')
+
+    def __init__(self, type, name, rdata, ttl):
+        self.type = type
+        self.name = name
+        self.rdata = tuple(rdata)
+        self.ttl = int(ttl)
+
+    @property
+    def key(self):
+        return self.name, self.type, self.rdata
+
+    @classmethod
+    def from_options(cls, type, options, zone, ttl):
+        if type not in RECORD_FIELDS:
+            raise ResourceRecordException(
+                'The record type %s is not supported' % type
+            )
+        name_field, fields = RECORD_FIELDS[type]
+        for param in [name_field] + fields:
+            if options.get(param, None) in [None, '']:
+                raise ResourceRecordException(
+                    'Required param %s not specified for %s record' % (param, type)
+                )
+        unknown = set(options.keys()) - set([name_field, 'ttl'] + fields)
+        if unknown:
+            raise ResourceRecordException(
+                'Unsupported params for %s record: %s' % (type, ', '.join(sorted(unknown)))
+            )
+        name = str(options[name_field])
+        if type != 'PTR':
+            name = cls._owner_name(name, zone)
+        rdata = [cls._rdata_value(x, options[x]) for x in fields]
+        if options.get('ttl', None) is not None:
+            ttl = options['ttl']
+        return cls(type, name, rdata, ttl)
+
+    @classmethod
+    def from_text(cls, text):
+        """Parses a record in zone file format
+
+        Returns:
+            ResourceRecord: The record, or None if it is of a type that is
+            not supported.
+        """
+        parts = text.split(None, 4)
+        if len(parts) < 5 or parts[3] not in RECORD_FIELDS:
+            return None
+        name, ttl, klass, type, data = parts
+        name_field, fields = RECORD_FIELDS[type]
+        if type == 'TXT':
+            values = [data.strip().strip('"')]
+        else:
+            values = shlex.split(data)
+        if type == 'PTR':
+            name = cls._ptr_address(name)
+        else:
+            name = name.lower()
+        rdata = [cls._rdata_value(x, y) for x, y in zip(fields, values)]
+        return cls(type, name, rdata, ttl)
+
+    @staticmethod
+    def _owner_name(name, zone):
+        name = name.lower()
+        if name.endswith('.'):
+            return name
+        if name == zone[:-1] or name.endswith('.' + zone[:-1]):
+            return name + '.'
+        return '%s.%s' % (name, zone)
+
+    @staticmethod
+    def _ptr_address(name):
+        # ZoneRunner names PTR records by the address that they map
+        if name.endswith('.in-addr.arpa.'):
+            return '.'.join(reversed(name[:-len('.in-addr.arpa.')].split('.')))
+        return name.lower()
+
+    @staticmethod
+    def _rdata_value(field, value):
+        value = str(value)
+        if field in NAME_FIELDS:
+            value = value.lower()
+            if not value.endswith('.'):
+                value += '.'
+        return value
+
+    def to_icontrol(self):
+        name_field, fields = RECORD_FIELDS[self.type]
+        result = dict(zip(fields, self.rdata))
+        result[name_field] = self.name
+        result['ttl'] = self.ttl
         return result
 
+    def __str__(self):
+        return '%s %s IN %s %s' % (self.name, self.ttl, self.type, ' '.join(self.rdata))
 
-def get_resource_record(module):
-    rtype = module.params['type']
 
-    if rtype == 'A':
-        return AResourceRecord(module)
-    elif rtype == 'CNAME':
-        return AResourceRecord(module)
+class ZoneRunner(object):
+    """Reads and changes the records of a zone, many at a time"""
+    def __init__(self, api, view, zone, batch_size=500):
+        self.api = api
+        self.view_zone = dict(view_name=view, zone_name=zone)
+        self.batch_size = batch_size
 
+    def read(self):
+        response = self.api.Management.ResourceRecord.get_rrs(
+            view_zones=[self.view_zone]
+        )
+        result = []
+        for text in response[0]:
+            record = ResourceRecord.from_text(text)
+            if record is not None:
+                result.append(record)
+        return result
 
-class ResourceRecord(object):
-    REQUIRED_BIGIP_VERSION = '9.0.3'
+    def add(self, records):
+        self._send('add', records)
 
-    def __init__(self, module):
-        self.module = module
+    def delete(self, records):
+        self._send('delete', records)
 
-        self.username = module.params['username']
-        self.password = module.params['password']
-        self.hostname = module.params['hostname']
-        self.type = module.params['type']
-        self.ttl = module.params['ttl']
-        self.view = module.params['view']
-        self.zone = module.params['zone']
-        self.options = module.params['options']
+    def _send(self, action, records):
+        by_type = dict()
+        for record in records:
+            by_type.setdefault(record.type, []).append(record.to_icontrol())
+        for type, items in sorted(iteritems(by_type)):
+            method = getattr(
+                self.api.Management.ResourceRecord, '%s_%s' % (action, type.lower())
+            )
+            for i in range(0, len(items), self.batch_size):
+                params = {
+                    'view_zones': [self.view_zone],
+                    '%s_records' % type.lower(): [items[i:i + self.batch_size]]
+                }
+                if type in ['A', 'AAAA']:
+                    params['sync_ptrs'] = [1]
+                method(**params)
+
+
+class ModuleManager(object):
+    def __init__(self, module, api):
+        self.module = module
+        self.api = api
+        self.params = module.params
 
+        self.zone = self.params['zone']
         if not self.zone.endswith('.'):
             self.zone += '.'
+        self.zone = self.zone.lower()
 
-        self.view_zones = [{
-            'view_name': self.view,
-            'zone_name': self.zone
-        }]
+    def exec_module(self):
+        records = self.get_records()
+        self.check_version(set(x.type for x in records))
 
-        self.client = bigsuds.BIGIP(
-            hostname=self.hostname,
-            username=self.username,
-            password=self.password,
-            debug=True
+        zone = ZoneRunner(
+            self.api, self.params['view'], self.zone, self.params['batch_size']
         )
+        add, delete = self.compare(records, zone.read())
+
+        if add or delete:
+            if not self.module.check_mode:
+                # Records whose TTL changes are deleted before they are added
+                zone.delete(delete)
+                zone.add(add)
+            return dict(
+                changed=True,
+                added=[str(x) for x in add],
+                deleted=[str(x) for x in delete]
+            )
+        return dict(changed=False)
+
+    def get_records(self):
+        if self.params['records'] is not None:
+            items = self.params['records']
+        elif self.params['options'] is not None:
+            if self.params['type'] is None:
+                raise ResourceRecordException(
+                    'The type parameter is required with options'
+                )
+            items = [dict(self.params['options'], type=self.params['type'])]
+        else:
+            raise ResourceRecordException(
+                'One of the options or records parameters is required'
+            )
+        result = []
+        for item in items:
+            if not isinstance(item, dict) or 'type' not in item:
+                raise ResourceRecordException(
+                    'Each record must be a dictionary with a type'
+                )
+            options = dict((k, v) for k, v in iteritems(item) if k != 'type')
+            result.append(ResourceRecord.from_options(
+                str(item['type']).upper(), options, self.zone, self.params['ttl']
+            ))
+        return result
 
-        self.check_required_params()
-        self.check_version()
-
-    def check_version(self):
-        response = self.client.System.SystemInfo.get_version()
+    def check_version(self, types):
+        required = [REQUIRED_BIGIP_VERSIONS[x] for x in types if x in REQUIRED_BIGIP_VERSIONS]
+        if not required:
+            return
+        response = self.api.System.SystemInfo.get_version()
         match = re.search(VERSION_PATTERN, response)
         version = match.group('version')
-
-        v1 = StrictVersion(version)
-        v2 = StrictVersion(self.REQUIRED_BIGIP_VERSION)
-
-        if v1 < v2:
-            raise ResourceRecordException('The BIG-IP version %s does not support this record type' % version)
-
-    def check_required_params(self):
-        params = self.options.keys()
-
-        for param in self.REQUIRED_PARAMS:
-            if param not in params:
-                raise ResourceRecordException('Required param %s not specified' % param)
-
-
-class AResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'ip_address'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'ip_address': self.options['ip_address'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_a(
-                view_zones=self.view_zones,
-                a_records=records,
-                sync_ptrs=[1]
+        if StrictVersion(version) < StrictVersion(max(required, key=StrictVersion)):
+            raise ResourceRecordException(
+                'The BIG-IP version %s does not support these record types' % version
             )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class AaaaResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'ip_address'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'ip_address': self.options['ip_address'],
-            'ttl': self.ttl
-        }]]
-
-        self.client.Management.ResourceRecord.add_aaaa(
-            view_zones=self.view_zones,
-            aaaa_records=records,
-            sync_ptrs=[1]
-        )
-
-
-class CnameResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'cname'
-    ]
 
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'cname': self.options['cname'],
-            'ttl': self.ttl
-        }]]
-
-        self.client.Management.ResourceRecord.add_cname(
-            view_zones=self.view_zones,
-            cname_records=records
-        )
-
-
-class DnameResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'label'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'label': self.options['label'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_dname(
-                view_zones=self.view_zones,
-                dname_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class DsResourceRecord(ResourceRecord):
-    REQUIRED_BIGIP_VERSION = '11.4.0'
-
-    REQUIRED_PARAMS = [
-        'domain_name', 'key_tag', 'algorithm', 'digest_type', 'digest'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'key_tag': self.options['label'],
-            'algorithm': self.options['algorithm'],
-            'digest_type': self.options['digest_type'],
-            'digest': self.options['digest'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_ds(
-                view_zones=self.view_zones,
-                ds_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class HinfoResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'hardware', 'os'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'hardware': self.options['hardware'],
-            'os': self.options['os'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_hinfo(
-                view_zones=self.view_zones,
-                hinfo_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class MxResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'preference', 'mail'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'preference': self.options['preference'],
-            'mail': self.options['mail'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_mx(
-                view_zones=self.view_zones,
-                mx_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class NaptrResourceRecord(ResourceRecord):
-    REQUIRED_BIGIP_VERSION = '11.4.0'
-
-    REQUIRED_PARAMS = [
-        'domain_name', 'order', 'preference', 'flags', 'service', 'regexp',
-        'replacement'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'order': self.options['order'],
-            'preference': self.options['preference'],
-            'flags': self.options['flags'],
-            'service': self.options['service'],
-            'regexp': self.options['regexp'],
-            'replacement': self.options['replacement'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_naptr(
-                view_zones=self.view_zones,
-                naptr_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class NsResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'host_name'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'host_name': self.options['host_name'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_ns(
-                view_zones=self.view_zones,
-                ns_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class PtrResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'ip_address', 'dname'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'ip_address': self.options['ip_address'],
-            'dname': self.options['dname'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_ptr(
-                view_zones=self.view_zones,
-                ptr_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class SoaResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'primary', 'email', 'serial', 'refresh', 'retry',
-        'expire', 'neg_ttl'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'primary': self.options['primary'],
-            'email': self.options['email'],
-            'serial': self.options['serial'],
-            'refresh': self.options['refresh'],
-            'retry': self.options['retry'],
-            'expire': self.options['expire'],
-            'neg_ttl': self.options['neg_ttl'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_soa(
-                view_zones=self.view_zones,
-                soa_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class SrvResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'priority', 'weight', 'port', 'target'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'priority': self.options['priority'],
-            'weight': self.options['weight'],
-            'port': self.options['port'],
-            'target': self.options['target'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_srv(
-                view_zones=self.view_zones,
-                srv_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
-
-
-class TxtResourceRecord(ResourceRecord):
-    REQUIRED_PARAMS = [
-        'domain_name', 'text'
-    ]
-
-    def create_record(self):
-        records = [[{
-            'domain_name': self.options['domain_name'],
-            'text': self.options['text'],
-            'ttl': self.ttl
-        }]]
-
-        try:
-            self.client.Management.ResourceRecord.add_txt(
-                view_zones=self.view_zones,
-                txt_records=records
-            )
-        except Exception as e:
-            raise ResourceRecordException(str(e))
+    def compare(self, records, current):
+        """Returns the records to add and the records to delete
+
+        Both sets are indexed by record key once, so the comparison grows
+        linearly with the size of the zone.
+        """
+        have = dict((x.key, x) for x in current)
+        want = dict()
+        for record in records:
+            want[record.key] = record
+
+        add = []
+        delete = []
+        if self.params['state'] == 'absent':
+            delete = [have[x] for x in want if x in have]
+            return add, delete
+
+        for key, record in iteritems(want):
+            existing = have.get(key)
+            if existing is None:
+                add.append(record)
+            elif existing.ttl != record.ttl:
+                delete.append(existing)
+                add.append(record)
+        if self.params['purge']:
+            types = set(x.type for x in records) - set(['SOA'])
+            delete += [
+                x for key, x in iteritems(have)
+                if key not in want and x.type in types
+            ]
+        return add, delete
 
 
 def main():
     argument_spec = f5_argument_spec()
 
     meta_args = dict(
-        type=dict(default=None, required=True, choices=RECORDS),
-        ttl=dict(default=60),
+        type=dict(choices=RECORDS),
+        ttl=dict(type='int', default=60),
         view=dict(default='external'),
         zone=dict(required=True),
-        options=dict(required=True, type='dict')
+        options=dict(type='dict'),
+        records=dict(type='list'),
+        purge=dict(type='bool', default='no'),
+        batch_size=dict(type='int', default=500)
     )
     argument_spec.update(meta_args)
 
     module = AnsibleModule(
         argument_spec=argument_spec,
-        supports_check_mode=True
+        supports_check_mode=True,
+        mutually_exclusive=[['options', 'records']],
+        required_one_of=[['options', 'records']]
     )
 
-    try:
-        obj = BigIpApiFactory.factory(module)
-        result = obj.flush()
+    if not bigsuds_found:
+        module.fail_json(msg="the python bigsuds module is required")
+    if module.params['batch_size'] < 1:
+        module.fail_json(msg="The batch_size parameter must be at least 1")
 
-        module.exit_json(**result)
+    try:
+        api = bigip_api(
+            module.params['server'],
+            module.params['user'],
+            module.params['password'],
+            module.params['validate_certs'],
+            port=module.params['server_port']
+        )
+        mm = ModuleManager(module, api)
+        result = mm.exec_module()
     except bigsuds.ConnectionError:
         module.fail_json(msg="Could not connect to BIG-IP host")
-    except bigsuds.ServerError as e:
-        if 'folder not found' in str(e):
-            module.fail_json(msg="Partition not found")
-        else:
-            pass
-
-    state = module.params["state"]
-
-    try:
-        record = get_resource_record(module)
-
-        if state == "present":
-            record.create_record()
-            changed = True
-        elif state == "absent":
-            record.delete_record()
-    except Exception as e:
-        module.fail_json(msg=str(e))
+    except (bigsuds.OperationFailed, bigsuds.ServerError, ResourceRecordException) as e:
+        module.fail_json(msg=to_native(e))
 
-    module.exit_json(changed=changed)
+    module.exit_json(**result)
 
-from ansible.module_utils.basic import *
-from ansible.module_utils.f5_utils import *
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,413 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = r'''
+---
+module: bigip_fleet_command
+short_description: Run the same commands on many BIG-IP devices at once
+description:
+  - Runs the same tmsh commands on a list of BIG-IP devices from a single
+    task, and returns the output of each device.
+  - The C(bigip_command) module runs on one device per task, so running it
+    on hundreds of devices means hundreds of module runs, each with its own
+    process, login and discovery of the device. This module logs in to each
+    device once, and runs the commands on several devices at the same time.
+version_added: "2.5"
+options:
+  devices:
+    description:
+      - List of the devices to run the commands on.
+      - Each device is either the address of the device, or a dictionary with
+        the key C(server), and optionally C(server_port), C(user) and
+        C(password).
+      - The C(server_port), C(user) and C(password) arguments of the module
+        are used for the devices that do not specify them.
+    required: True
+  commands:
+    description:
+      - The commands to run on each device. The C(tmsh) prefix is added to
+        commands that do not have it.
+      - Commands are run over the REST API, the same as the C(rest) transport
+        of C(bigip_command).
+    required: True
+  batch:
+    description:
+      - When C(yes), all of the commands are sent to each device in a single
+        request, instead of one request for each command.
+    type: bool
+    default: no
+  concurrency:
+    description:
+      - Number of devices that the commands are run on at the same time.
+    default: 10
+  allow_device_failures:
+    description:
+      - When C(no), the task fails if the commands could not be run on any of
+        the devices. The results of all of the devices are still returned.
+      - When C(yes), the task only fails if the commands could not be run on
+        any device at all.
+    type: bool
+    default: no
+  server:
+    description:
+      - Not used by this module. The devices are given in C(devices).
+notes:
+  - Requires the f5-sdk Python package on the host. This is as easy as pip
+    install f5-sdk.
+  - Commands that change the configuration are run as well, but the module
+    only reports a change when one of the commands starts with C(modify),
+    C(create) or C(delete), as C(bigip_command) does.
+requirements:
+  - f5-sdk >= 2.2.3
+extends_documentation_fragment: f5
+author:
+  - Tim Rupp (@caphrim007)
+'''
+
+EXAMPLES = r'''
+- name: Audit the version and HA status of every BIG-IP
+  bigip_fleet_command:
+    devices: "{{ groups['bigips'] }}"
+    commands:
+      - show sys version
+      - show cm failover-status
+    batch: yes
+    concurrency: 50
+    user: admin
+    password: secret
+  delegate_to: localhost
+  run_once: true
+
+- name: Save the configuration of devices that have different credentials
+  bigip_fleet_command:
+    devices:
+      - lb1.mydomain.com
+      - server: lb2.mydomain.com
+        server_port: 8443
+        user: operator
+        password: other-secret
+    commands: save sys config
+    user: admin
+    password: secret
+  delegate_to: localhost
+'''
+
+RETURN = r'''
+devices:
+  description: The result of each device, in the order of C(devices).
+  returned: always
+  type: complex
+  contains:
+    server:
+      description: Address of the device.
+      returned: always
+      type: string
+      sample: lb1.mydomain.com
+    stdout:
+      description: The output of the commands.
+      returned: success
+      type: list
+      sample: ['...', '...']
+    stdout_lines:
+      description: The value of stdout split into a list.
+      returned: success
+      type: list
+      sample: [['...', '...'], ['...']]
+    failed:
+      description: Whether the commands could not be run on the device.
+      returned: always
+      type: bool
+      sample: false
+    msg:
+      description: The error that occurred on the device.
+      returned: failed
+      type: string
+      sample: 401 Unexpected Error
+    connect_seconds:
+      description: Time that it took to connect to the device.
+      returned: always
+      type: float
+      sample: 0.251
+    elapsed:
+      description: Time that it took to connect to the device and run the
+        commands.
+      returned: always
+      type: float
+      sample: 1.532
+failed_devices:
+  description: Addresses of the devices that the commands could not be run on.
+  returned: always
+  type: list
+  sample: ['lb2.mydomain.com']
+elapsed:
+  description: Time that it took to run the commands on all of the devices.
+  returned: always
+  type: float
+  sample: 12.302
+'''
+
+import re
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.f5_utils import AnsibleF5Parameters
+from ansible.module_utils.f5_utils import F5_COMMON_ARGS
+from ansible.module_utils.f5_utils import HAS_F5SDK
+from ansible.module_utils.f5_utils import F5ModuleError
+from multiprocessing.pool import ThreadPool
+
+try:
+    from library.module_utils.f5networks.common import F5_CACHE_ARGS
+    from library.module_utils.f5networks.common import F5TokenCache
+    from library.module_utils.f5networks.common import build_batch_script
+    from library.module_utils.f5networks.common import get_bigip_mgmt_root
+    from library.module_utils.f5networks.common import no_log_device_passwords
+    from library.module_utils.f5networks.common import parse_device_list
+    from library.module_utils.f5networks.common import split_batch_output
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5_CACHE_ARGS
+    from ansible.module_utils.f5networks.common import F5TokenCache
+    from ansible.module_utils.f5networks.common import build_batch_script
+    from ansible.module_utils.f5networks.common import get_bigip_mgmt_root
+    from ansible.module_utils.f5networks.common import no_log_device_passwords
+    from ansible.module_utils.f5networks.common import parse_device_list
+    from ansible.module_utils.f5networks.common import split_batch_output
+
+try:
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from requests.exceptions import RequestException
+except ImportError:
+    HAS_F5SDK = False
+
+
+class Parameters(AnsibleF5Parameters):
+    @property
+    def devices(self):
+        return parse_device_list(
+            self._values['devices'],
+            server_port=self._values['server_port'],
+            user=self._values['user'],
+            password=self._values['password']
+        )
+
+    @property
+    def commands(self):
+        commands = [self._ensure_tmsh_prefix(x) for x in self._values['commands']]
+        commands.insert(0, 'tmsh modify cli preference pager disabled')
+        return commands
+
+    @property
+    def user_commands(self):
+        return [self._ensure_tmsh_prefix(x) for x in self._values['commands']]
+
+    @property
+    def concurrency(self):
+        if self._values['concurrency'] < 1:
+            raise F5ModuleError(
+                "The 'concurrency' parameter must be at least 1."
+            )
+        return self._values['concurrency']
+
+    def _ensure_tmsh_prefix(self, cmd):
+        cmd = cmd.strip()
+        if cmd[0:5] != 'tmsh ':
+            cmd = 'tmsh ' + cmd.strip()
+        return cmd
+
+
+class DeviceRunner(object):
+    """Runs the commands on one device
+
+    Each device has its own connection, and so its own pool of HTTP
+    connections, which is used for all of the requests to that device.
+    """
+    def __init__(self, device, commands, batch=False, token_cache=None):
+        self.device = device
+        self.commands = commands
+        self.batch = batch
+        self.token_cache = token_cache
+        self.api = None
+
+    def run(self):
+        result = dict(server=self.device['server'], failed=False)
+        start = time.time()
+        try:
+            self.api = self.connect()
+            result['connect_seconds'] = round(time.time() - start, 3)
+            if self.batch:
+                responses = self.execute_batch_on_device(self.commands)
+            else:
+                responses = self.execute_on_device(self.commands)
+            result['stdout'] = responses
+            result['stdout_lines'] = [str(x).split('\n') for x in responses]
+        except (iControlUnexpectedHTTPError, RequestException, F5ModuleError) as ex:
+            result['failed'] = True
+            result['msg'] = str(ex)
+        finally:
+            self.cleanup_token()
+        result.setdefault('connect_seconds', round(time.time() - start, 3))
+        result['elapsed'] = round(time.time() - start, 3)
+        return result
+
+    def connect(self):
+        return get_bigip_mgmt_root(
+            self.device['server'],
+            self.device['user'],
+            self.device['password'],
+            server_port=self.device['server_port'],
+            token_cache=self.token_cache
+        )
+
+    def cleanup_token(self):
+        if self.api is None or self.token_cache is not None:
+            return
+        try:
+            resource = self.api.shared.authz.tokens_s.token.load(
+                name=self.api.icrs.token
+            )
+            resource.delete()
+        except Exception:
+            pass
+
+    def execute_on_device(self, commands):
+        responses = []
+        escape_patterns = r'([$' + "'])"
+        for item in commands:
+            command = re.sub(escape_patterns, r'\\\1', item)
+            output = self.api.tm.util.bash.exec_cmd(
+                'run',
+                utilCmdArgs='-c "{0}"'.format(command)
+            )
+            if hasattr(output, 'commandResult'):
+                responses.append(str(output.commandResult))
+        return responses
+
+    def execute_batch_on_device(self, commands):
+        script, delimiter = build_batch_script(commands)
+        output = self.api.tm.util.bash.exec_cmd(
+            'run',
+            utilCmdArgs='-c "{0}"'.format(script)
+        )
+        if not hasattr(output, 'commandResult'):
+            return []
+        return split_batch_output(str(output.commandResult), delimiter)
+
+
+class ModuleManager(object):
+    def __init__(self, module):
+        self.module = module
+        self.want = Parameters(self.module.params)
+        no_log_device_passwords(self.module, self.module.params.get('devices'))
+        self.token_cache = None
+        if self.module.params.get('token_cache'):
+            self.token_cache = F5TokenCache(self.module.params['token_cache'])
+
+    def exec_module(self):
+        devices = self.want.devices
+        if not devices:
+            raise F5ModuleError("At least one device must be given.")
+        if self.module.check_mode:
+            return dict(changed=False, devices=[], failed_devices=[], elapsed=0.0)
+
+        start = time.time()
+        results = self.run_on_devices(devices)
+        elapsed = round(time.time() - start, 3)
+
+        failed = [x['server'] for x in results if x['failed']]
+        changed = any(
+            x.startswith(('tmsh modify', 'tmsh create', 'tmsh delete'))
+            for x in self.want.user_commands
+        )
+        result = dict(
+            changed=changed and len(failed) < len(results),
+            devices=results,
+            failed_devices=failed,
+            elapsed=elapsed
+        )
+        if failed and (len(failed) == len(results) or not self.want.allow_device_failures):
+            result['msg'] = "The commands could not be run on {0} of {1} devices: {2}".format(
+                len(failed), len(results), ', '.join(failed)
+            )
+            result['failed'] = True
+        return result
+
+    def run_on_devices(self, devices):
+        runners = [
+            DeviceRunner(x, self.want.commands, self.want.batch, self.token_cache)
+            for x in devices
+        ]
+        pool = ThreadPool(min(self.want.concurrency, len(runners)))
+        try:
+            return pool.map(lambda x: x.run(), runners, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+
+class ArgumentSpec(object):
+    def __init__(self):
+        self.supports_check_mode = True
+        self.argument_spec = dict(F5_COMMON_ARGS)
+        self.argument_spec.update(F5_CACHE_ARGS)
+        self.argument_spec.update(dict(
+            # The devices are given in the devices argument instead
+            server=dict(
+                type='str'
+            ),
+            devices=dict(
+                type='list',
+                required=True
+            ),
+            commands=dict(
+                type='list',
+                required=True
+            ),
+            batch=dict(
+                type='bool',
+                default=False
+            ),
+            concurrency=dict(
+                type='int',
+                default=10
+            ),
+            allow_device_failures=dict(
+                type='bool',
+                default=False
+            )
+        ))
+        self.f5_product_name = 'bigip'
+
+
+def main():
+    spec = ArgumentSpec()
+
+    module = AnsibleModule(
+        argument_spec=spec.argument_spec,
+        supports_check_mode=spec.supports_check_mode
+    )
+    if not HAS_F5SDK:
+        module.fail_json(msg="The python f5-sdk module is required")
+
+    try:
+        mm = ModuleManager(module)
+        results = mm.exec_module()
+        if results.get('failed'):
+            module.fail_json(**results)
+        module.exit_json(**results)
+    except F5ModuleError as e:
+        module.fail_json(msg=str(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,16 @@ options:
       - Perform regex filter of response. Filtering is done on the name of
         the resource. Valid filters are anything that can be provided to
         Python's C(re) module.
+  bulk_stats:
+    description:
+      - When C(yes), reads the statistics for each type of pool with a single
+        request to the collection's C(stats) endpoint, instead of one request
+        for every pool.
+      - This greatly reduces the time it takes to collect facts on devices with
+        a large number of pools. The facts that are returned are the same.
+    type: bool
+    default: no
+    version_added: 2.5
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as
     pip install f5-sdk
@@ -52,6 +62,15 @@ EXAMPLES = r'''
     include: pool
     filter: my_pool
   delegate_to: localhost
+
+- name: Get pool facts, reading pool statistics in bulk
+  bigip_gtm_facts:
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+    include: pool
+    bulk_stats: yes
+  delegate_to: localhost
 '''
 
 RETURN = r'''
@@ -178,14 +197,23 @@ try:
 except ImportError:
     import simplejson as json
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.parsing.convert_bool import BOOLEANS_TRUE
 from ansible.module_utils.six import iteritems
-from collections import defaultdict
-from distutils.version import LooseVersion
+from ansible.module_utils.six.moves.urllib.parse import urlparse
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5CollectionQuery
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5FastParameters
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5CollectionQuery
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5FastParameters
 
 try:
     from f5.utils.responses.handlers import Stats
@@ -197,6 +225,7 @@ except ImportError:
 class BaseManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
         self.types = dict(
             a_s='a',
             aaaas='aaaa',
@@ -220,11 +249,7 @@ class BaseManager(object):
             return False
 
     def version_is_less_than_12(self):
-        version = self.client.api.tmos_version
-        if LooseVersion(version) < LooseVersion('12.0.0'):
-            return True
-        else:
-            return False
+        return self.capabilities.version_is_less_than('12.0.0')
 
     def get_facts_from_collection(self, collection, collection_type=None):
         results = []
@@ -235,10 +260,86 @@ class BaseManager(object):
             results.append(facts)
         return results
 
+    def iterate_collection(self, collection):
+        # Subcollections make each member large, so the collection is read
+        # a page at a time rather than all at once.
+        query = F5CollectionQuery(
+            collection, params='expandSubcollections=true', page_size=100
+        )
+        return query.iterate()
+
     def read_stats_from_device(self, resource):
         stats = Stats(resource.stats.load())
         return stats.stat
 
+    def read_stats_collection_from_device(self, collection_path):
+        """Reads the stats of every resource in a collection at once
+
+        The stats of the resources are keyed by the resource segment of their
+        URI. For example, the stats of ``/mgmt/tm/gtm/pool/a/~Common~foo``
+        are found under the ``~Common~foo`` key. Use ``self_link_key`` to get
+        the key for a resource's ``selfLink``.
+
+        Args:
+            collection_path (str): Path of the collection, relative to
+                the ``/mgmt/`` URI. For example ``tm/gtm/pool/a``.
+
+        Returns:
+            dict: The stats of each resource in the collection.
+        """
+        uri = '{0}{1}/stats'.format(
+            self.client.api._meta_data['uri'], collection_path
+        )
+        response = self.client.api.icrs.get(uri)
+        return self.stats_from_collection(response.json(), collection_path)
+
+    def stats_from_collection(self, response, collection_path):
+        results = dict()
+        for link, entry in iteritems(response.get('entries', {})):
+            key = self.self_link_key(link, collection_path)
+            if key is None or 'nestedStats' not in entry:
+                continue
+            entries = entry['nestedStats'].get('entries', {})
+            results[key] = self._key_dot_replace(entries)
+        return results
+
+    def self_link_key(self, link, collection_path):
+        # The entries in a collection's stats are not keyed by the selfLink
+        # of each resource. On 13.x they include the name of the resource a
+        # second time. For example,
+        #
+        #   https://localhost/mgmt/tm/gtm/pool/a/~Common~foo/~Common~foo:A/stats
+        #
+        # So the path segment that follows the collection is used instead.
+        prefix = '/mgmt/{0}/'.format(collection_path)
+        path = urlparse(link).path
+        if not path.startswith(prefix):
+            return None
+        return path[len(prefix):].split('/')[0]
+
+    def read_bulk_stats(self, collection_path):
+        if not self.want.bulk_stats:
+            return None
+        return self.read_stats_collection_from_device(collection_path)
+
+    def read_resource_stats(self, resource, stats, collection_path):
+        if stats is not None:
+            key = self.self_link_key(resource.selfLink, collection_path)
+            if key in stats:
+                return stats[key]
+        # Either bulk stats were not requested, or the resource was created
+        # after the collection's stats were read.
+        return self.read_stats_from_device(resource)
+
+    def _key_dot_replace(self, entries):
+        # Matches the format of the stats returned by the SDK's Stats handler
+        result = dict()
+        for key, value in iteritems(entries):
+            if isinstance(value, dict):
+                value = self._key_dot_replace(value)
+            result[key.replace('.', '_')] = value
+        return result
+
 
 class UntypedManager(BaseManager):
     def exec_module(self):
@@ -296,36 +397,15 @@ class Parameters(AnsibleF5Parameters):
             return requested
 
 
-class BaseParameters(AnsibleF5Parameters):
+class BaseParameters(F5FastParameters):
+    # Built for every resource that is read, so only the values are stored
+    # on each instance.
+    __slots__ = ()
+
     def __init__(self, params=None):
-        self._values = defaultdict(lambda: None)
-        if params:
-            self.update(params=params)
+        super(BaseParameters, self).__init__(params)
         self._values['__warnings'] = []
 
-    def update(self, params=None):
-        if params:
-            for k, v in iteritems(params):
-                if self.api_map is not None and k in self.api_map:
-                    map_key = self.api_map[k]
-                else:
-                    map_key = k
-
-                # Handle weird API parameters like `dns.proxy.__iter__` by
-                # using a map provided by the module developer
-                class_attr = getattr(type(self), map_key, None)
-                if isinstance(class_attr, property):
-                    # There is a mapped value for the api_map key
-                    if class_attr.fset is None:
-                        # If the mapped value does not have an associated setter
-                        self._values[map_key] = v
-                    else:
-                        # The mapped value has a setter
-                        setattr(self, map_key, v)
-                else:
-                    # If the mapped value is not a @property
-                    self._values[map_key] = v
-
     @property
     def enabled(self):
         if self._values['enabled'] is None:
@@ -349,15 +429,10 @@ class BaseParameters(AnsibleF5Parameters):
         del resource['generation']
         del resource['selfLink']
 
-    def to_return(self):
-        result = {}
-        for returnable in self.returnables:
-            result[returnable] = getattr(self, returnable)
-        result = self._filter_params(result)
-        return result
-
 
 class PoolParameters(BaseParameters):
+    __slots__ = ()
+
     api_map = {
         'alternateMode': 'alternate_mode',
         'dynamicRatio': 'dynamic_ratio',
@@ -522,6 +597,8 @@ class PoolParameters(BaseParameters):
 
 
 class WideIpParameters(BaseParameters):
+    __slots__ = ()
+
     api_map = {
         'fullPath': 'full_path',
         'failureRcode': 'failure_return_code',
@@ -581,6 +658,8 @@ class WideIpParameters(BaseParameters):
 
 
 class ServerParameters(BaseParameters):
+    __slots__ = ()
+
     api_map = {
         'fullPath': 'full_path',
         'exposeRouteDomains': 'expose_route_domains',
@@ -720,10 +799,16 @@ class TypedPoolFactManager(TypedManager):
 
     def read_facts(self, collection):
         results = []
+        collection_path = 'tm/gtm/pool/{0}'.format(self.types[collection])
         collection = self.read_collection_from_device(collection)
+        stats = None
         for resource in collection:
+            if not results:
+                # Only read the stats once the collection is known to
+                # have members.
+                stats = self.read_bulk_stats(collection_path)
             attrs = resource.attrs
-            attrs['stats'] = self.read_stats_from_device(resource)
+            attrs['stats'] = self.read_resource_stats(resource, stats, collection_path)
             params = PoolParameters(attrs)
             results.append(params)
         return results
@@ -731,12 +816,7 @@ class TypedPoolFactManager(TypedManager):
     def read_collection_from_device(self, collection_name):
         pools = self.client.api.tm.gtm.pools
         collection = getattr(pools, collection_name)
-        result = collection.get_collection(
-            requests_params=dict(
-                params='expandSubcollections=true'
-            )
-        )
-        return result
+        return self.iterate_collection(collection)
 
 
 class UntypedPoolFactManager(UntypedManager):
@@ -746,21 +826,23 @@ class UntypedPoolFactManager(UntypedManager):
 
     def read_facts(self):
         results = []
+        collection_path = 'tm/gtm/pool'
         collection = self.read_collection_from_device()
+        stats = None
         for resource in collection:
+            if not results:
+                # Only read the stats once the collection is known to
+                # have members.
+                stats = self.read_bulk_stats(collection_path)
             attrs = resource.attrs
-            attrs['stats'] = self.read_stats_from_device(resource)
+            attrs['stats'] = self.read_resource_stats(resource, stats, collection_path)
             params = PoolParameters(attrs)
             results.append(params)
         return results
 
     def read_collection_from_device(self):
-        result = self.client.api.tm.gtm.pools.get_collection(
-            requests_params=dict(
-                params='expandSubcollections=true'
-            )
-        )
-        return result
+        collection = self.client.api.tm.gtm.pools
+        return self.iterate_collection(collection)
 
 
 class WideIpFactManager(BaseManager):
@@ -797,12 +879,7 @@ class TypedWideIpFactManager(TypedManager):
     def read_collection_from_device(self, collection_name):
         wideips = self.client.api.tm.gtm.wideips
         collection = getattr(wideips, collection_name)
-        result = collection.get_collection(
-            requests_params=dict(
-                params='expandSubcollections=true'
-            )
-        )
-        return result
+        return self.iterate_collection(collection)
 
 
 class UntypedWideIpFactManager(UntypedManager):
@@ -820,12 +897,8 @@ class UntypedWideIpFactManager(UntypedManager):
         return results
 
     def read_collection_from_device(self):
-        result = self.client.api.tm.gtm.wideips.get_collection(
-            requests_params=dict(
-                params='expandSubcollections=true'
-            )
-        )
-        return result
+        collection = self.client.api.tm.gtm.wideips
+        return self.iterate_collection(collection)
 
 
 class ServerFactManager(UntypedManager):
@@ -848,17 +921,14 @@ class ServerFactManager(UntypedManager):
         return results
 
     def read_collection_from_device(self):
-        result = self.client.api.tm.gtm.servers.get_collection(
-            requests_params=dict(
-                params='expandSubcollections=true'
-            )
-        )
-        return result
+        collection = self.client.api.tm.gtm.servers
+        return self.iterate_collection(collection)
 
 
 class ModuleManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
         self.want = Parameters(self.client.module.params)
 
     def exec_module(self):
@@ -910,12 +980,7 @@ class ModuleManager(object):
             return ServerFactManager(self.client)
 
     def gtm_provisioned(self):
-        resource = self.client.api.tm.sys.dbs.db.load(
-            name='provisioned.cpu.gtm'
-        )
-        if int(resource.value) == 0:
-            return False
-        return True
+        return self.capabilities.is_provisioned('gtm')
 
 
 class ArgumentSpec(object):
@@ -923,7 +988,8 @@ class ArgumentSpec(object):
         self.supports_check_mode = False
         self.argument_spec = dict(
             include=dict(type='list', required=True),
-            filter=dict(type='str', required=False)
+            filter=dict(type='str', required=False),
+            bulk_stats=dict(type='bool', default=False)
         )
         self.f5_product_name = 'bigip'
 
@@ -934,7 +1000,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
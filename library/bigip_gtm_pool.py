@@ -178,14 +178,18 @@ EXAMPLES = r'''
 '''
 
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
-from distutils.version import LooseVersion
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
 
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
@@ -380,6 +384,7 @@ class Difference(object):
 class ModuleManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
 
     def exec_module(self):
         if not self.gtm_provisioned():
@@ -399,19 +404,10 @@ class ModuleManager(object):
             return UntypedManager(self.client)
 
     def version_is_less_than_12(self):
-        version = self.client.api.tmos_version
-        if LooseVersion(version) < LooseVersion('12.0.0'):
-            return True
-        else:
-            return False
+        return self.capabilities.version_is_less_than('12.0.0')
 
     def gtm_provisioned(self):
-        resource = self.client.api.tm.sys.dbs.db.load(
-            name='provisioned.cpu.gtm'
-        )
-        if int(resource.value) == 0:
-            return False
-        return True
+        return self.capabilities.is_provisioned('gtm')
 
 
 class BaseManager(object):
@@ -693,7 +689,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
@@ -157,7 +157,6 @@ EXAMPLES = r'''
   delegate_to: localhost
 '''
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
@@ -165,6 +164,11 @@ from ansible.module_utils.parsing.convert_bool import BOOLEANS_TRUE
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+
 try:
     from collections import OrderedDict
 except ImportError:
@@ -543,7 +547,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
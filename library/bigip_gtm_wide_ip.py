@@ -124,12 +124,19 @@ state:
 
 import re
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
-from distutils.version import LooseVersion
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import cleanup_tokens
 
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
@@ -371,6 +378,7 @@ class Difference(object):
 class ModuleManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
 
     def exec_module(self):
         if self.version_is_less_than_12():
@@ -386,11 +394,7 @@ class ModuleManager(object):
             return UntypedManager(self.client)
 
     def version_is_less_than_12(self):
-        version = self.client.api.tmos_version
-        if LooseVersion(version) < LooseVersion('12.0.0'):
-            return True
-        else:
-            return False
+        return self.capabilities.version_is_less_than('12.0.0')
 
 
 class BaseManager(object):
@@ -655,23 +659,13 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
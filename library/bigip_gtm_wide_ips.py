@@ -0,0 +1,879 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = r'''
+---
+module: bigip_gtm_wide_ips
+short_description: Manages many GTM wide IPs and pools at once
+description:
+  - Manages a complete set of GTM wide IPs, the pools that they use and the
+    members of those pools, in one task.
+  - The C(bigip_gtm_wide_ip) and C(bigip_gtm_pool) modules manage one object
+    per task, and read that object from the device in every task. This module
+    reads each collection of wide IPs and pools once, with their pools and
+    members, and compares it with the given objects on the Ansible
+    controller. Only the objects that need to be created, changed or deleted
+    are sent to the device.
+version_added: "2.5"
+options:
+  wide_ips:
+    description:
+      - List of the wide IPs.
+      - Each wide IP is a dictionary with the keys C(name) and optionally
+        C(type), C(pool_lb_method), C(state) and C(pools).
+      - C(name) must be a fully qualified domain name. It may be the full
+        path of the wide IP, such as C(/Common/www.example.com).
+      - C(type) defaults to the C(type) argument of the module.
+      - C(state) is C(enabled) or C(disabled). It defaults to C(enabled).
+      - C(pools) is the list of the pools of the wide IP, in order. Each pool
+        is either its name, or a dictionary with the keys C(name) and
+        C(ratio). The ratio defaults to 1. When C(pools) is not given, the
+        pools of an existing wide IP are not changed.
+      - C(pool_lb_method) is not changed on existing wide IPs when it is not
+        given.
+  pools:
+    description:
+      - List of the pools.
+      - Each pool is a dictionary with the keys C(name) and optionally
+        C(type), C(preferred_lb_method), C(alternate_lb_method),
+        C(fallback_lb_method), C(state) and C(members).
+      - C(type) defaults to the C(type) argument of the module.
+      - C(state) is C(enabled) or C(disabled). It defaults to C(enabled).
+      - C(members) is the list of the members of the pool, in order. Each
+        member is either its name, such as C(server1:vs1) for pools of type
+        C(a) and C(aaaa), or a dictionary with the keys C(name) and
+        optionally C(ratio) and C(state). The ratio defaults to 1 and the
+        state to C(enabled). When C(members) is not given, the members of an
+        existing pool are not changed.
+      - The load balancing methods are not changed on existing pools when
+        they are not given.
+  type:
+    description:
+      - The type of the wide IPs and pools that do not specify their own.
+    default: a
+    choices:
+      - a
+      - aaaa
+      - cname
+      - mx
+      - naptr
+      - srv
+  purge:
+    description:
+      - When C(yes), wide IPs and pools in C(partition) that are not given
+        are deleted. Only wide IPs and pools of C(type), or of the types of
+        the given wide IPs and pools, are deleted.
+      - Wide IPs are only deleted when C(wide_ips) is given, and pools only
+        when C(pools) is given. Pools that wide IPs still refer to are never
+        deleted.
+    type: bool
+    default: no
+  concurrency:
+    description:
+      - Number of changes that are sent to the device at the same time.
+      - Ignored when C(transaction) is C(yes).
+    default: 10
+  transaction:
+    description:
+      - When C(yes), all of the changes are made in a single transaction, so
+        that either all or none of them are made.
+    type: bool
+    default: no
+  partition:
+    description:
+      - Partition of the wide IPs and pools whose names are not full paths,
+        and the partition that C(purge) deletes objects from.
+    default: Common
+notes:
+  - Requires the f5-sdk Python package on the host. This is as easy as pip
+    install f5-sdk.
+  - Requires BIG-IP 12.0.0 or later.
+  - Pools are created and changed before wide IPs, and wide IPs are deleted
+    before pools, so that wide IPs always refer to pools that exist.
+requirements:
+  - f5-sdk >= 2.2.3
+extends_documentation_fragment: f5
+author:
+  - Tim Rupp (@caphrim007)
+'''
+
+EXAMPLES = r'''
+- name: Manage all of the wide IPs of the example.com zone
+  bigip_gtm_wide_ips:
+    pools:
+      - name: web_pool
+        preferred_lb_method: round-robin
+        members:
+          - server1:web_vs
+          - name: server2:web_vs
+            ratio: 2
+    wide_ips:
+      - name: www.example.com
+        pool_lb_method: round-robin
+        pools:
+          - web_pool
+      - name: shop.example.com
+        state: disabled
+        pools:
+          - name: web_pool
+            ratio: 5
+    purge: yes
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+  delegate_to: localhost
+
+- name: Change many wide IPs in one transaction
+  bigip_gtm_wide_ips:
+    wide_ips: "{{ wide_ips }}"
+    transaction: yes
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+  delegate_to: localhost
+'''
+
+RETURN = r'''
+wide_ips:
+  description: The wide IPs that were created, changed and deleted.
+  returned: always
+  type: complex
+  contains:
+    created:
+      description: The name and type of each wide IP that was created.
+      returned: always
+      type: list
+      sample: [{"name": "/Common/www.example.com", "type": "a"}]
+    modified:
+      description: The name and type of each wide IP that was changed.
+      returned: always
+      type: list
+      sample: [{"name": "/Common/shop.example.com", "type": "a"}]
+    deleted:
+      description: The name and type of each wide IP that was deleted.
+      returned: always
+      type: list
+      sample: [{"name": "/Common/old.example.com", "type": "a"}]
+pools:
+  description: The pools that were created, changed and deleted.
+  returned: always
+  type: complex
+  contains:
+    created:
+      description: The name and type of each pool that was created.
+      returned: always
+      type: list
+      sample: [{"name": "/Common/web_pool", "type": "a"}]
+    modified:
+      description: The name and type of each pool that was changed.
+      returned: always
+      type: list
+      sample: []
+    deleted:
+      description: The name and type of each pool that was deleted.
+      returned: always
+      type: list
+      sample: []
+timing:
+  description: Time, in seconds, that each phase of the run took.
+  returned: always
+  type: dict
+  sample: {"read": 2.317, "compare": 0.105, "apply_pools": 0.0, "apply_wide_ips": 1.52}
+'''
+
+import re
+import time
+
+from ansible.module_utils.f5_utils import AnsibleF5Parameters
+from ansible.module_utils.f5_utils import HAS_F5SDK
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.six import iteritems
+from ansible.module_utils.six import string_types
+from multiprocessing.pool import ThreadPool
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5FastParameters
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5FastParameters
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
+try:
+    from ansible.module_utils.f5_utils import BigIpTxContext
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from f5.sdk_exception import TransactionSubmitException
+except ImportError:
+    HAS_F5SDK = False
+
+
+RECORD_TYPES = ['a', 'aaaa', 'cname', 'mx', 'naptr', 'srv']
+
+# Only the attributes that are compared are read from the device
+QUERIES = dict(
+    wideip='expandSubcollections=true&$select=name,partition,fullPath,poolLbMode,enabled,disabled,pools',
+    pool='expandSubcollections=true&$select=name,partition,fullPath,loadBalancingMode,'
+         'alternateMode,fallbackMode,enabled,disabled,membersReference',
+)
+
+
+def split_full_path(value):
+    """Returns the partition and the name of a full path"""
+    partition, sep, name = value[1:].partition('/')
+    return partition, name
+
+
+class Parameters(AnsibleF5Parameters):
+    @property
+    def wide_ips(self):
+        return self._build_items('wide_ips', WideIpModuleParameters)
+
+    @property
+    def pools(self):
+        return self._build_items('pools', PoolModuleParameters)
+
+    @property
+    def concurrency(self):
+        if self._values['concurrency'] < 1:
+            raise F5ModuleError(
+                "The 'concurrency' parameter must be at least 1."
+            )
+        return self._values['concurrency']
+
+    def _build_items(self, name, cls):
+        if self._values[name] is None:
+            return []
+        result = []
+        seen = set()
+        for item in self._values[name]:
+            if not isinstance(item, dict):
+                raise F5ModuleError(
+                    "Each of the '{0}' must be a dictionary.".format(name)
+                )
+            params = cls(partition=self.partition, type=self.type)
+            params.update(item)
+            params.validate()
+            if params.key in seen:
+                raise F5ModuleError(
+                    "The {0} '{1}' of type '{2}' is given more than once.".format(
+                        params.kind, params.full_path, params.type
+                    )
+                )
+            seen.add(params.key)
+            result.append(params)
+        return result
+
+
+class GtmParameters(F5FastParameters):
+    """A wide IP or pool, as given to the module or as read from the device
+
+    One is built for every wide IP and pool, on both sides, so these are
+    F5FastParameters. The subclasses for each side have the same
+    ``comparables`` properties, in the same form, so that they can be
+    compared directly.
+    """
+    __slots__ = ()
+
+    # Name of the object in messages, and its collection under /mgmt/tm/gtm/
+    kind = None
+
+    comparables = []
+
+    @property
+    def full_path(self):
+        name = str(self._values['name'])
+        if name.startswith('/'):
+            return name
+        return '/{0}/{1}'.format(self.partition, name)
+
+    @property
+    def key(self):
+        return self.type, self.full_path
+
+    @property
+    def uri_name(self):
+        return self.full_path.replace('/', '~')
+
+    @property
+    def label(self):
+        return dict(name=self.full_path, type=self.type)
+
+    def _fqdn_name(self, value):
+        if value.startswith('/'):
+            return value
+        return '/{0}/{1}'.format(self.partition, value)
+
+
+class ModuleParameters(GtmParameters):
+    __slots__ = ()
+
+    keys = []
+
+    def __init__(self, partition=None, type=None):
+        super(ModuleParameters, self).__init__()
+        self._values['partition'] = partition
+        self._values['type'] = type
+
+    def update(self, params=None):
+        if params:
+            for k, v in iteritems(params):
+                if k not in self.keys:
+                    raise F5ModuleError(
+                        "'{0}' is not a valid key of a {1}.".format(k, self.kind)
+                    )
+                if v is not None:
+                    self._values[k] = v
+
+    def validate(self):
+        if not self._values['name']:
+            raise F5ModuleError(
+                "The name of every {0} must be specified.".format(self.kind)
+            )
+        if self.type not in RECORD_TYPES:
+            raise F5ModuleError(
+                "The type of {0} '{1}' must be one of: {2}.".format(
+                    self.kind, self._values['name'], ', '.join(RECORD_TYPES)
+                )
+            )
+        if self.state not in ['enabled', 'disabled']:
+            raise F5ModuleError(
+                "The state of {0} '{1}' must be 'enabled' or 'disabled'.".format(
+                    self.kind, self._values['name']
+                )
+            )
+
+    @property
+    def state(self):
+        if self._values['state'] is None:
+            return 'enabled'
+        return str(self._values['state'])
+
+    def _ratio_items(self, items, name):
+        result = []
+        for item in items:
+            if isinstance(item, string_types):
+                item = dict(name=item)
+            if not isinstance(item, dict) or not item.get('name'):
+                raise F5ModuleError(
+                    "Each of the {0} of {1} '{2}' must be a name or a "
+                    "dictionary with a name.".format(name, self.kind, self._values['name'])
+                )
+            result.append(dict(
+                name=self._fqdn_name(str(item['name'])),
+                ratio=int(item.get('ratio', None) or 1)
+            ))
+        return result
+
+    def api_params(self, keys=None):
+        """Returns the attributes to send to the device
+
+        Args:
+            keys (list): The ``comparables`` to include. All of them when
+                None.
+        """
+        result = dict()
+        for key in keys or self.comparables:
+            value = getattr(self, key)
+            if value is None:
+                continue
+            if key == 'state':
+                result['enabled'] = value == 'enabled'
+                result['disabled'] = value == 'disabled'
+            else:
+                result.update(self._api_value(key, value))
+        return result
+
+    def _api_value(self, key, value):
+        raise NotImplementedError
+
+
+class ApiParameters(GtmParameters):
+    __slots__ = ()
+
+    def __init__(self, params=None, type=None):
+        super(ApiParameters, self).__init__(params)
+        self._values['type'] = type
+
+    @property
+    def state(self):
+        if self._values['disabled'] is True:
+            return 'disabled'
+        return 'enabled'
+
+
+class WideIpModuleParameters(ModuleParameters):
+    __slots__ = ()
+
+    kind = 'wideip'
+
+    keys = ['name', 'type', 'pool_lb_method', 'state', 'pools']
+
+    comparables = ['pool_lb_method', 'state', 'pools']
+
+    def validate(self):
+        super(WideIpModuleParameters, self).validate()
+        if not re.search(r'.*\..*\..*', self.full_path):
+            raise F5ModuleError(
+                "The wide IP name '{0}' must be a valid FQDN.".format(self._values['name'])
+            )
+
+    @property
+    def pool_lb_method(self):
+        if self._values['pool_lb_method'] is None:
+            return None
+        return str(self._values['pool_lb_method'])
+
+    @property
+    def pools(self):
+        if self._values['pools'] is None:
+            return None
+        return self._ratio_items(self._values['pools'], 'pools')
+
+    def _api_value(self, key, value):
+        if key == 'pool_lb_method':
+            return dict(poolLbMode=value)
+        pools = []
+        for order, pool in enumerate(value):
+            partition, name = split_full_path(pool['name'])
+            pools.append(dict(
+                name=name,
+                partition=partition,
+                ratio=pool['ratio'],
+                order=order
+            ))
+        return dict(pools=pools)
+
+
+class WideIpApiParameters(ApiParameters):
+    __slots__ = ()
+
+    kind = 'wideip'
+
+    @property
+    def pool_lb_method(self):
+        return self._values['poolLbMode']
+
+    @property
+    def pools(self):
+        result = []
+        for pool in sorted(self._values['pools'] or [], key=lambda x: x.get('order', 0)):
+            result.append(dict(
+                name='/{0}/{1}'.format(pool.get('partition', 'Common'), pool['name']),
+                ratio=int(pool.get('ratio', 1))
+            ))
+        return result
+
+
+class PoolModuleParameters(ModuleParameters):
+    __slots__ = ()
+
+    kind = 'pool'
+
+    keys = [
+        'name', 'type', 'preferred_lb_method', 'alternate_lb_method',
+        'fallback_lb_method', 'state', 'members'
+    ]
+
+    comparables = [
+        'preferred_lb_method', 'alternate_lb_method', 'fallback_lb_method',
+        'state', 'members'
+    ]
+
+    api_map = {
+        'preferred_lb_method': 'loadBalancingMode',
+        'alternate_lb_method': 'alternateMode',
+        'fallback_lb_method': 'fallbackMode',
+    }
+
+    @property
+    def preferred_lb_method(self):
+        return self._lb_method('preferred_lb_method')
+
+    @property
+    def alternate_lb_method(self):
+        return self._lb_method('alternate_lb_method')
+
+    @property
+    def fallback_lb_method(self):
+        return self._lb_method('fallback_lb_method')
+
+    def _lb_method(self, key):
+        if self._values[key] is None:
+            return None
+        return str(self._values[key])
+
+    @property
+    def members(self):
+        if self._values['members'] is None:
+            return None
+        result = self._ratio_items(self._values['members'], 'members')
+        for member, item in zip(result, self._values['members']):
+            state = 'enabled'
+            if isinstance(item, dict):
+                state = item.get('state', None) or 'enabled'
+            if state not in ['enabled', 'disabled']:
+                raise F5ModuleError(
+                    "The state of member '{0}' of pool '{1}' must be "
+                    "'enabled' or 'disabled'.".format(item['name'], self._values['name'])
+                )
+            member['state'] = state
+        return result
+
+    def _api_value(self, key, value):
+        if key in self.api_map:
+            return {self.api_map[key]: value}
+        members = []
+        for order, member in enumerate(value):
+            partition, name = split_full_path(member['name'])
+            members.append(dict(
+                name=name,
+                partition=partition,
+                ratio=member['ratio'],
+                memberOrder=order,
+                enabled=member['state'] == 'enabled',
+                disabled=member['state'] == 'disabled'
+            ))
+        return dict(members=members)
+
+
+class PoolApiParameters(ApiParameters):
+    __slots__ = ()
+
+    kind = 'pool'
+
+    @property
+    def preferred_lb_method(self):
+        return self._values['loadBalancingMode']
+
+    @property
+    def alternate_lb_method(self):
+        return self._values['alternateMode']
+
+    @property
+    def fallback_lb_method(self):
+        return self._values['fallbackMode']
+
+    @property
+    def members(self):
+        reference = self._values['membersReference'] or dict()
+        items = sorted(reference.get('items', []), key=lambda x: x.get('memberOrder', 0))
+        result = []
+        for member in items:
+            result.append(dict(
+                name='/{0}/{1}'.format(member.get('partition', 'Common'), member['name']),
+                ratio=int(member.get('ratio', 1)),
+                state='disabled' if member.get('disabled') is True else 'enabled'
+            ))
+        return result
+
+
+class Difference(object):
+    """Works out the objects to create, modify and delete
+
+    Both sets are indexed by type and full path once, so the cost of the
+    comparison grows linearly with the number of objects rather than with
+    the product of the number of wanted and current objects.
+    """
+    def __init__(self, want, have, purge=False, partition='Common', keep=None):
+        self.want = want
+        self.have = have
+        self.purge = purge
+        self.partition = partition
+        self.keep = keep or set()
+
+    def compare(self):
+        """Returns the objects to create, modify and delete
+
+        Returns:
+            tuple: A list of the objects to create, a list of ``(object,
+            keys)`` tuples of the objects to modify and the ``comparables``
+            that changed, and a list of the current objects to delete.
+        """
+        have = dict((x.key, x) for x in self.have)
+        create = []
+        modify = []
+        for item in self.want:
+            current = have.get(item.key)
+            if current is None:
+                create.append(item)
+                continue
+            changes = []
+            for key in item.comparables:
+                value = getattr(item, key)
+                if value is not None and value != getattr(current, key):
+                    changes.append(key)
+            if changes:
+                modify.append((item, changes))
+        delete = []
+        if self.purge:
+            keep = self.keep | set(x.key for x in self.want)
+            delete = [
+                x for x in self.have
+                if x.key not in keep and x.partition == self.partition
+            ]
+        return create, modify, delete
+
+
+class ModuleManager(object):
+    def __init__(self, client):
+        self.client = client
+        self.want = Parameters(self.client.module.params)
+        self.capabilities = F5DeviceCapabilities(self.client)
+        self.timing = dict()
+
+    def exec_module(self):
+        if self.capabilities.version_is_less_than('12.0.0'):
+            raise F5ModuleError(
+                "This module requires BIG-IP 12.0.0 or later."
+            )
+        start = time.time()
+        wide_ips = self.want.wide_ips
+        pools = self.want.pools
+        types = set([self.want.type])
+        types.update(x.type for x in wide_ips + pools)
+
+        try:
+            have = self.timed('read', self.read_from_device, sorted(types))
+            changes = self.timed('compare', self.compare, dict(wideip=wide_ips, pool=pools), have)
+            changed = any(any(x) for x in changes.values())
+            if changed and not self.client.check_mode:
+                self.apply_changes(changes)
+        except iControlUnexpectedHTTPError as e:
+            raise F5ModuleError(str(e))
+        except TransactionSubmitException as e:
+            raise F5ModuleError(
+                "The transaction was rolled back: {0}".format(str(e))
+            )
+        self.timing['total'] = round(time.time() - start, 3)
+
+        result = dict(
+            changed=changed,
+            timing=self.timing
+        )
+        for kind, name in [('wideip', 'wide_ips'), ('pool', 'pools')]:
+            create, modify, delete = changes[kind]
+            result[name] = dict(
+                created=[x.label for x in create],
+                modified=[x[0].label for x in modify],
+                deleted=[x.label for x in delete]
+            )
+        return result
+
+    def timed(self, phase, func, *args):
+        start = time.time()
+        try:
+            return func(*args)
+        finally:
+            self.timing[phase] = round(time.time() - start, 3)
+
+    def compare(self, want, have):
+        # Only the kinds of objects that were given are purged
+        result = dict()
+        result['wideip'] = Difference(
+            want['wideip'], have['wideip'],
+            purge=self.want.purge and self.want._values['wide_ips'] is not None,
+            partition=self.want.partition
+        ).compare()
+        result['pool'] = Difference(
+            want['pool'], have['pool'],
+            purge=self.want.purge and self.want._values['pools'] is not None,
+            partition=self.want.partition,
+            keep=self.referenced_pools(want['wideip'], have['wideip'], result['wideip'][2])
+        ).compare()
+        return result
+
+    def referenced_pools(self, want, have, delete):
+        """Returns the keys of the pools that wide IPs refer to after the changes"""
+        wanted = dict((x.key, x) for x in want)
+        current = dict((x.key, x) for x in have)
+        deleted = set(x.key for x in delete)
+        result = set()
+        for key in set(wanted) | set(current):
+            if key in deleted:
+                continue
+            item = wanted.get(key)
+            if item is None or item.pools is None:
+                item = current.get(key)
+            if item is None:
+                continue
+            result.update((item.type, x['name']) for x in item.pools or [])
+        return result
+
+    def _collection_uri(self, kind, type):
+        return '{0}tm/gtm/{1}/{2}/'.format(
+            self.client.api._meta_data['uri'], kind, type
+        )
+
+    def read_from_device(self, types):
+        collections = [(kind, x) for kind in ['wideip', 'pool'] for x in types]
+        items = self.run_concurrently(self.read_collection_from_device, collections)
+        result = dict(wideip=[], pool=[])
+        for (kind, type), collection in zip(collections, items):
+            result[kind] += collection
+        return result
+
+    def read_collection_from_device(self, collection):
+        kind, type = collection
+        response = self.client.api.icrs.get(
+            self._collection_uri(kind, type), params=QUERIES[kind]
+        )
+        cls = WideIpApiParameters if kind == 'wideip' else PoolApiParameters
+        return [cls(x, type=type) for x in response.json().get('items', [])]
+
+    def run_concurrently(self, func, items):
+        if self.want.concurrency == 1 or len(items) < 2:
+            return [func(x) for x in items]
+        pool = ThreadPool(min(self.want.concurrency, len(items)))
+        try:
+            return pool.map(func, items, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    def operations(self, kind, create, modify, delete):
+        """Returns the requests that make the changes
+
+        Each request is a tuple of the method, URI and body of the request,
+        and the label of the object that it changes.
+        """
+        create_or_modify = []
+        for item in create:
+            params = item.api_params()
+            partition, name = split_full_path(item.full_path)
+            params.update(dict(name=name, partition=partition))
+            create_or_modify.append(
+                ('post', self._collection_uri(kind, item.type), params, item.label)
+            )
+        for item, keys in modify:
+            uri = self._collection_uri(kind, item.type) + item.uri_name
+            create_or_modify.append(('patch', uri, item.api_params(keys), item.label))
+        deletes = []
+        for item in delete:
+            uri = self._collection_uri(kind, item.type) + item.uri_name
+            deletes.append(('delete', uri, None, item.label))
+        return create_or_modify, deletes
+
+    def apply_changes(self, changes):
+        apply_pools, delete_pools = self.operations('pool', *changes['pool'])
+        apply_wide_ips, delete_wide_ips = self.operations('wideip', *changes['wideip'])
+
+        # Wide IPs must only refer to pools that exist
+        phases = [
+            ('apply_pools', apply_pools),
+            ('apply_wide_ips', apply_wide_ips),
+            ('delete_wide_ips', delete_wide_ips),
+            ('delete_pools', delete_pools),
+        ]
+        if self.want.transaction:
+            operations = []
+            for phase, items in phases:
+                operations += items
+            self.timed('transaction', self.apply_in_transaction, operations)
+            return
+        for phase, operations in phases:
+            errors = self.timed(phase, self.apply_on_device, operations)
+            if errors:
+                raise F5ModuleError(
+                    "{0} of {1} changes failed: {2}".format(
+                        len(errors), len(operations), '; '.join(errors)
+                    )
+                )
+
+    def apply_on_device(self, operations):
+        """Sends the requests, and returns the errors of those that failed"""
+        results = self.run_concurrently(self.apply_operation, operations)
+        return [x for x in results if x is not None]
+
+    def apply_operation(self, operation):
+        method, uri, params, label = operation
+        try:
+            self._send(self.client.api, method, uri, params)
+        except iControlUnexpectedHTTPError as ex:
+            return "{0} {1}: {2}".format(label['type'], label['name'], str(ex))
+        return None
+
+    def apply_in_transaction(self, operations):
+        tx = self.client.api.tm.transactions.transaction
+        with BigIpTxContext(tx) as api:
+            for method, uri, params, label in operations:
+                self._send(api, method, uri, params)
+
+    def _send(self, api, method, uri, params):
+        if params is None:
+            getattr(api.icrs, method)(uri)
+        else:
+            getattr(api.icrs, method)(uri, json=params)
+
+
+class ArgumentSpec(object):
+    def __init__(self):
+        self.supports_check_mode = True
+        self.argument_spec = dict(
+            wide_ips=dict(
+                type='list'
+            ),
+            pools=dict(
+                type='list'
+            ),
+            type=dict(
+                default='a',
+                choices=RECORD_TYPES
+            ),
+            purge=dict(
+                type='bool',
+                default='no'
+            ),
+            concurrency=dict(
+                type='int',
+                default=10
+            ),
+            transaction=dict(
+                type='bool',
+                default='no'
+            )
+        )
+        self.f5_product_name = 'bigip'
+        self.required_one_of = [
+            ['wide_ips', 'pools']
+        ]
+
+
+def main():
+    if not HAS_F5SDK:
+        raise F5ModuleError("The python f5-sdk module is required")
+
+    spec = ArgumentSpec()
+
+    client = F5Client(
+        argument_spec=spec.argument_spec,
+        supports_check_mode=spec.supports_check_mode,
+        required_one_of=spec.required_one_of,
+        f5_product_name=spec.f5_product_name
+    )
+
+    try:
+        mm = ModuleManager(client)
+        results = mm.exec_module()
+        cleanup_tokens(client)
+        client.module.exit_json(**results)
+    except F5ModuleError as e:
+        cleanup_tokens(client)
+        client.module.fail_json(msg=str(e))
+
+
+if __name__ == '__main__':
+    main()
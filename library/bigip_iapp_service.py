@@ -212,21 +212,44 @@ EXAMPLES = r'''
 '''
 
 RETURN = r'''
-# only common fields returned
+parameter_changes:
+  description:
+    - The tables, variables and lists of the service that were changed.
+    - For tables, the rows that were added to and removed from each table.
+      The C(columnNames) are included when the columns changed.
+  returned: changed
+  type: complex
+  sample: {"tables": {"pool__members": {"added": [["10.1.1.3", "0"]], "removed": []}}, "variables": ["pool__addr"]}
 '''
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
+import hashlib
+import json
+
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
+from collections import Counter
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
     HAS_F5SDK = False
 
+# Values in the rows of tables are joined with these to compare and hash the
+# rows. Serializing thousands of rows as JSON would cost more than the
+# comparison that this saves, and the characters do not occur in iApp values.
+ROW_SEPARATOR = '\x1f'
+TABLE_SEPARATOR = '\x1e'
+
 
 class Parameters(AnsibleF5Parameters):
     api_map = {
@@ -243,6 +266,7 @@ class Parameters(AnsibleF5Parameters):
 
     def __init__(self, params=None):
         self._values = defaultdict(lambda: None)
+        self._canonical = dict()
         if params:
             self.update(params=params)
         self._values['__warnings'] = []
@@ -294,10 +318,47 @@ class Parameters(AnsibleF5Parameters):
 
     @property
     def tables(self):
+        return self._get_canonical('tables', self._canonical_tables)
+
+    @tables.setter
+    def tables(self, value):
+        self._values['tables'] = value
+        self._canonical = dict()
+
+    @property
+    def variables(self):
+        return self._get_canonical('variables', self._canonical_variables)
+
+    @variables.setter
+    def variables(self, value):
+        self._values['variables'] = value
+        self._canonical = dict()
+
+    @property
+    def lists(self):
+        return self._get_canonical('lists', self._canonical_lists)
+
+    @lists.setter
+    def lists(self, value):
+        self._values['lists'] = value
+        self._canonical = dict()
+
+    def _get_canonical(self, name, converter):
+        """Returns the canonical form of the tables, variables or lists
+
+        Services can have tables with thousands of rows. The canonical form
+        is built once, when it is first asked for, instead of on every
+        access; the setters throw it away when the value changes.
+        """
+        if name not in self._canonical:
+            if not self._values[name]:
+                self._canonical[name] = None
+            else:
+                self._canonical[name] = converter(self._values[name])
+        return self._canonical[name]
+
+    def _canonical_tables(self, tables):
         result = []
-        if not self._values['tables']:
-            return None
-        tables = self._values['tables']
         for table in tables:
             tmp = dict()
             name = table.get('name', None)
@@ -312,23 +373,13 @@ class Parameters(AnsibleF5Parameters):
                 # You cannot have rows without columns
                 rows = table.get('rows', None)
                 if rows:
-                    tmp['rows'] = []
-                    for row in rows:
-                        tmp['rows'].append(dict(row=[str(x) for x in row['row']]))
+                    tmp['rows'] = [dict(row=list(map(str, x['row']))) for x in rows]
             result.append(tmp)
         result = sorted(result, key=lambda k: k['name'])
         return result
 
-    @tables.setter
-    def tables(self, value):
-        self._values['tables'] = value
-
-    @property
-    def variables(self):
+    def _canonical_variables(self, variables):
         result = []
-        if not self._values['variables']:
-            return None
-        variables = self._values['variables']
         for variable in variables:
             tmp = dict((str(k), str(v)) for k, v in iteritems(variable))
             if 'encrypted' not in tmp:
@@ -346,16 +397,8 @@ class Parameters(AnsibleF5Parameters):
         result = sorted(result, key=lambda k: k['name'])
         return result
 
-    @variables.setter
-    def variables(self, value):
-        self._values['variables'] = value
-
-    @property
-    def lists(self):
+    def _canonical_lists(self, lists):
         result = []
-        if not self._values['lists']:
-            return None
-        lists = self._values['lists']
         for list in lists:
             tmp = dict((str(k), str(v)) for k, v in iteritems(list) if k != 'value')
             if 'encrypted' not in list:
@@ -372,9 +415,64 @@ class Parameters(AnsibleF5Parameters):
         result = sorted(result, key=lambda k: k['name'])
         return result
 
-    @lists.setter
-    def lists(self, value):
-        self._values['lists'] = value
+    def digests(self, name):
+        """Returns the content hash of each table, variable or list, by name
+
+        Two services have the same ``name`` parameters when these are equal,
+        so that they can be compared without walking through every row.
+        """
+        key = '{0}_digests'.format(name)
+        if key not in self._canonical:
+            if not self._values[name]:
+                self._canonical[key] = None
+            elif name == 'tables':
+                self._canonical[key] = dict(
+                    (k, v['digest']) for k, v in iteritems(self.table_contents())
+                )
+            else:
+                self._canonical[key] = dict(
+                    (x['name'], self._digest(json.dumps(x, sort_keys=True)))
+                    for x in getattr(self, name)
+                )
+        return self._canonical[key]
+
+    def table_contents(self):
+        """Returns the columns, rows and content hash of each table, by name
+
+        Each row is a single string of its values, which is what the hash is
+        computed from, and what the rows of two tables are compared by. This
+        is done from the values as they were given, so that a table that did
+        not change is never converted to its canonical form.
+        """
+        if 'table_contents' not in self._canonical:
+            result = dict()
+            for table in self._values['tables'] or []:
+                name = table.get('name', None)
+                if name is None:
+                    raise F5ModuleError(
+                        "One of the provided tables does not have a name"
+                    )
+                columns = [str(x) for x in table.get('columnNames', None) or []]
+                rows = []
+                # You cannot have rows without columns
+                if columns:
+                    rows = [
+                        ROW_SEPARATOR.join(map(str, x['row']))
+                        for x in table.get('rows', None) or []
+                    ]
+                content = TABLE_SEPARATOR.join(
+                    [ROW_SEPARATOR.join(columns)] + rows
+                )
+                result[str(name)] = dict(
+                    columns=columns,
+                    rows=rows,
+                    digest=self._digest(content)
+                )
+            self._canonical['table_contents'] = result
+        return self._canonical['table_contents']
+
+    def _digest(self, content):
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
 
     @property
     def parameters(self):
@@ -465,6 +563,7 @@ class Difference(object):
     def __init__(self, want, have=None):
         self.want = want
         self.have = have
+        self.parameter_changes = dict()
 
     def compare(self, param):
         try:
@@ -487,6 +586,68 @@ class Difference(object):
         if self.want.traffic_group != self.have.traffic_group:
             return self.want.traffic_group
 
+    @property
+    def tables(self):
+        return self._compare_parameters('tables')
+
+    @property
+    def variables(self):
+        return self._compare_parameters('variables')
+
+    @property
+    def lists(self):
+        return self._compare_parameters('lists')
+
+    def _compare_parameters(self, param):
+        """Compares tables, variables or lists by their content hashes
+
+        Only the entries whose hashes differ are looked at any further; they
+        are recorded in ``parameter_changes``. For tables, the rows that
+        were added and removed are recorded, rather than the whole table.
+        """
+        want = self.want.digests(param)
+        if want is None:
+            return None
+        have = self.have.digests(param) or dict()
+        if want == have:
+            return None
+        names = [k for k, v in iteritems(want) if have.get(k) != v]
+        names += [k for k in have if k not in want]
+        if param == 'tables':
+            self.parameter_changes[param] = self._diff_tables(names)
+        else:
+            self.parameter_changes[param] = sorted(names)
+        return getattr(self.want, param)
+
+    def _diff_tables(self, names):
+        want = self.want.table_contents()
+        have = self.have.table_contents()
+        result = dict()
+        for name in names:
+            result[name] = self._diff_rows(
+                want.get(name, dict(columns=[], rows=[])),
+                have.get(name, dict(columns=[], rows=[]))
+            )
+        return result
+
+    def _diff_rows(self, want, have):
+        want_rows = want['rows']
+        have_rows = have['rows']
+
+        # Rows that are equal at the same position are in both tables, so
+        # only the other rows need to be counted.
+        size = min(len(want_rows), len(have_rows))
+        unequal = [x for x in range(size) if want_rows[x] != have_rows[x]]
+        want_rows = Counter([want_rows[x] for x in unequal] + want_rows[size:])
+        have_rows = Counter([have_rows[x] for x in unequal] + have_rows[size:])
+        result = dict(
+            added=sorted(x.split(ROW_SEPARATOR) for x in (want_rows - have_rows).elements()),
+            removed=sorted(x.split(ROW_SEPARATOR) for x in (have_rows - want_rows).elements())
+        )
+        if want['columns'] != have['columns']:
+            result['columnNames'] = want['columns']
+        return result
+
 
 class ModuleManager(object):
     def __init__(self, client):
@@ -494,6 +655,8 @@ class ModuleManager(object):
         self.have = None
         self.want = Parameters(self.client.module.params)
         self.changes = Changes()
+        self.parameter_changes = dict()
+        self.resource = None
 
     def _set_changed_options(self):
         changed = {}
@@ -516,6 +679,7 @@ class ModuleManager(object):
                     changed.update(change)
                 else:
                     changed[k] = change
+        self.parameter_changes = diff.parameter_changes
         if changed:
             self.changes = Changes(changed)
             return True
@@ -536,6 +700,8 @@ class ModuleManager(object):
 
         changes = self.changes.to_return()
         result.update(**changes)
+        if self.parameter_changes:
+            result.update(dict(parameter_changes=self.parameter_changes))
         result.update(dict(changed=changed))
         return result
 
@@ -579,17 +745,22 @@ class ModuleManager(object):
     def update_on_device(self):
         params = self.want.api_params()
         params['execute-action'] = 'definition'
-        resource = self.client.api.tm.sys.application.services.service.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.resource
+        if resource is None:
+            resource = self.client.api.tm.sys.application.services.service.load(
+                name=self.want.name,
+                partition=self.want.partition
+            )
         resource.update(**params)
 
     def read_current_from_device(self):
-        result = self.client.api.tm.sys.application.services.service.load(
+        # The service is updated through the same resource, so that it is
+        # not downloaded, with all of its tables, a second time.
+        self.resource = self.client.api.tm.sys.application.services.service.load(
             name=self.want.name,
             partition=self.want.partition
-        ).to_dict()
+        )
+        result = self.resource.to_dict()
         result.pop('_meta_data', None)
         return Parameters(result)
 
@@ -648,20 +819,10 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
@@ -65,6 +65,16 @@ options:
     description:
       - Device partition to manage resources on.
     default: Common
+  checksum_cache:
+    description:
+      - Path to a file on the controller in which to record the checksum that
+        BIG-IP generated for the template, along with a hash of its C(content).
+      - When the C(content) has not changed since it was last recorded, and the
+        checksum of the template on the device is still the recorded one, the
+        template is not uploaded to the device for comparison. This avoids
+        several REST calls and a configuration load on every run.
+      - The file may be shared by all hosts and forks of a play.
+    version_added: 2.5
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk.
@@ -92,6 +102,16 @@ EXAMPLES = r'''
     user: admin
   delegate_to: localhost
 
+- name: Only compare the template on the device when its content changed
+  bigip_iapp_template:
+    content: "{{ lookup('template', 'iapp.tmpl') }}"
+    checksum_cache: /tmp/iapp-template-checksums.json
+    password: secret
+    server: lb.mydomain.com
+    state: present
+    user: admin
+  delegate_to: localhost
+
 - name: Update a template in place that has existing services created from it.
   bigip_iapp_template:
     content: "{{ lookup('template', 'iapp-new.tmpl') }}"
@@ -107,16 +127,30 @@ RETURN = r'''
 # only common fields returned
 '''
 
+import hashlib
 import re
 import uuid
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils._text import to_bytes
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5CollectionQuery
+    from library.module_utils.f5networks.common import F5ControllerCache
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5CollectionQuery
+    from ansible.module_utils.f5networks.common import F5ControllerCache
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
     from f5.utils.iapp_parser import NonextantTemplateNameException
@@ -188,6 +222,13 @@ class Parameters(AnsibleF5Parameters):
     def checksum(self):
         return self._values['tmplChecksum']
 
+    @property
+    def content_hash(self):
+        content = self.content
+        if content is None:
+            return None
+        return hashlib.sha256(to_bytes(content)).hexdigest()
+
     def to_return(self):
         result = {}
         try:
@@ -251,11 +292,19 @@ class Parameters(AnsibleF5Parameters):
         raise NonextantTemplateNameException
 
 
-class ModuleManager(object):
+class ModuleManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(ModuleManager, self).__init__(client)
         self.want = Parameters(self.client.module.params)
         self.changes = Parameters()
+        self.want_checksum = None
+        self.checksum_cache = None
+        if self.want.checksum_cache:
+            self.checksum_cache = F5ControllerCache(self.want.checksum_cache)
+
+            # Computed once because the content is later changed to use a
+            # temporary template name.
+            self.content_hash = self.want.content_hash
 
     def exec_module(self):
         result = dict()
@@ -282,9 +331,13 @@ class ModuleManager(object):
             return self.create()
 
     def update(self):
+        if self.template_matches_cached_checksum():
+            return False
+
         self.have = self.read_current_from_device()
 
         if not self.templates_differ():
+            self.cache_checksum(self.have.checksum)
             return False
 
         if not self.want.force and self.template_in_use():
@@ -297,24 +350,72 @@ class ModuleManager(object):
         # The same process used for creating (load) can be used for updating
         self.create_on_device()
         self._generate_template_checksum_on_device()
+
+        # The temporary template had the same content, so BIG-IP will have
+        # generated the same checksum for the updated one.
+        self.cache_checksum(self.want_checksum)
         return True
 
+    def _get_checksum_cache_key(self):
+        return F5ControllerCache.make_key(
+            self.client.module.params['server'],
+            self.client.module.params['server_port'],
+            self.want.partition,
+            self.want.name
+        )
+
+    def template_matches_cached_checksum(self):
+        """Checks if the template is the one recorded in the checksum cache
+
+        The recorded checksum is only trusted if the content provided to the
+        module is the same as when the checksum was recorded, and the checksum
+        of the template on the device has not changed since then. Templates
+        that were changed on the device will have had their checksum removed
+        or changed.
+
+        :return bool
+        """
+        if self.checksum_cache is None:
+            return False
+        cached = self.checksum_cache.get(self._get_checksum_cache_key())
+        if cached is None or cached['content'] != self.content_hash:
+            return False
+        have = Parameters(self.load().attrs)
+        if have.checksum is None:
+            return False
+        return have.checksum == cached['checksum']
+
+    def cache_checksum(self, checksum):
+        if self.checksum_cache is None or checksum is None:
+            return
+        self.checksum_cache.set(
+            self._get_checksum_cache_key(),
+            dict(
+                content=self.content_hash,
+                checksum=checksum
+            )
+        )
+
     def template_in_use(self):
-        collection = self.client.api.tm.sys.application.services.get_collection()
+        # The tm endpoints cannot filter on the template, but selecting only
+        # it avoids downloading the variables and tables of every service.
+        query = F5CollectionQuery(
+            self.client.api.tm.sys.application.services,
+            select=['name', 'partition', 'template']
+        )
         fullname = '/{0}/{1}'.format(self.want.partition, self.want.name)
-        for resource in collection:
-            if resource.template == fullname:
-                return True
+        if query.first(lambda x: x.get('template') == fullname):
+            return True
         return False
 
     def read_current_from_device(self):
-        self._generate_template_checksum_on_device()
-        resource = self.client.api.tm.sys.application.templates.template.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
-        result = resource.attrs
-        return Parameters(result)
+        resource = self.load()
+        if Parameters(resource.attrs).checksum is None:
+            # A template that is changed on the device loses its checksum,
+            # so one that has a checksum does not need a new one.
+            self._generate_template_checksum_on_device()
+            resource.refresh()
+        return Parameters(resource.attrs)
 
     def absent(self):
         changed = False
@@ -322,12 +423,11 @@ class ModuleManager(object):
             changed = self.remove()
         return changed
 
-    def exists(self):
-        result = self.client.api.tm.sys.application.templates.template.exists(
+    def load_on_device(self):
+        return self.client.api.tm.sys.application.templates.template.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def _remove_iapp_checksum(self):
         """Removes the iApp tmplChecksum
@@ -338,11 +438,7 @@ class ModuleManager(object):
 
         :return:
         """
-        resource = self.client.api.tm.sys.application.templates.template.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
-        resource.modify(tmplChecksum=None)
+        self.load().modify(tmplChecksum=None)
 
     def templates_differ(self):
         # BIG-IP can generate checksums of iApps, but the iApp needs to be
@@ -372,14 +468,22 @@ class ModuleManager(object):
         self.want.update({
             'name': backup
         })
+        self.want_checksum = temp.checksum
         if temp.checksum != self.have.checksum:
             return True
         return False
 
     def _get_temporary_template(self):
+        # The temporary template is loaded by its name. It is not the
+        # resource that this manager loads and remembers.
         self.create_on_device()
-        temp = self.read_current_from_device()
-        self.remove_from_device()
+        self._generate_template_checksum_on_device()
+        resource = self.client.api.tm.sys.application.templates.template.load(
+            name=self.want.name,
+            partition=self.want.partition
+        )
+        temp = Parameters(resource.attrs)
+        resource.delete()
         return temp
 
     def _generate_template_checksum_on_device(self):
@@ -395,6 +499,7 @@ class ModuleManager(object):
         if self.client.check_mode:
             return True
         self.create_on_device()
+        self.forget()
         if self.exists():
             return True
         else:
@@ -422,16 +527,13 @@ class ModuleManager(object):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the iApp template")
         return True
 
     def remove_from_device(self):
-        resource = self.client.api.tm.sys.application.templates.template.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
-        resource.delete()
+        self.load().delete()
 
 
 class ArgumentSpec(object):
@@ -446,25 +548,18 @@ class ArgumentSpec(object):
             force=dict(
                 type='bool'
             ),
-            content=dict()
+            content=dict(),
+            checksum_cache=dict(
+                type='path'
+            )
         )
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
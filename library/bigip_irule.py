@@ -108,11 +108,19 @@ content:
 
 import os
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -204,9 +212,9 @@ class ModuleManager(object):
             return GtmManager(self.client)
 
 
-class BaseManager(object):
+class BaseManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(BaseManager, self).__init__(client)
         self.want = Parameters(self.client.module.params)
         self.changes = Parameters()
 
@@ -264,8 +272,6 @@ class BaseManager(object):
         if self.client.check_mode:
             return True
         self.create_on_device()
-        if not self.exists():
-            raise F5ModuleError("Failed to create the iRule")
         return True
 
     def should_update(self):
@@ -292,91 +298,72 @@ class BaseManager(object):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the iRule")
         return True
 
 
 class LtmManager(BaseManager):
-    def exists(self):
-        result = self.client.api.tm.ltm.rules.rule.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.rules.rule.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def update_on_device(self):
         params = self.changes.api_params()
-        resource = self.client.api.tm.ltm.rules.rule.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.update(**params)
 
     def create_on_device(self):
         params = self.want.api_params()
-        resource = self.client.api.tm.ltm.rules.rule
-        resource.create(
+        resource = self.client.api.tm.ltm.rules.rule.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.rules.rule.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return Parameters(result)
 
     def remove_from_device(self):
-        resource = self.client.api.tm.ltm.rules.rule.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.delete()
 
 
 class GtmManager(BaseManager):
     def read_current_from_device(self):
-        resource = self.client.api.tm.gtm.rules.rule.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return Parameters(result)
 
     def remove_from_device(self):
-        resource = self.client.api.tm.gtm.rules.rule.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.delete()
 
-    def exists(self):
-        result = self.client.api.tm.gtm.rules.rule.exists(
+    def load_on_device(self):
+        return self.client.api.tm.gtm.rules.rule.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def update_on_device(self):
         params = self.changes.api_params()
-        resource = self.client.api.tm.gtm.rules.rule.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.update(**params)
 
     def create_on_device(self):
         params = self.want.api_params()
-        resource = self.client.api.tm.gtm.rules.rule
-        resource.create(
+        resource = self.client.api.tm.gtm.rules.rule.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
 
 class ArgumentSpec(object):
@@ -403,20 +390,10 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
@@ -176,13 +176,21 @@ try:
 except ImportError:
     HAS_NETADDR = False
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -588,7 +596,7 @@ class ModuleManager(object):
             return TcpHalfOpenManager(self.client)
 
 
-class BaseManager(object):
+class BaseManager(F5ResourceManager):
     def _announce_deprecations(self):
         warnings = []
         if self.want:
@@ -658,6 +666,7 @@ class BaseManager(object):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the monitor.")
         return True
@@ -665,7 +674,7 @@ class BaseManager(object):
 
 class TcpManager(BaseManager):
     def __init__(self, client):
-        self.client = client
+        super(TcpManager, self).__init__(client)
         self.have = None
         self.want = ParametersTcp(self.client.module.params)
         self.changes = ParametersTcp()
@@ -706,41 +715,32 @@ class TcpManager(BaseManager):
             self.want.update({'port': '*'})
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.monitor.tcps.tcp.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return ParametersTcp(result)
 
-    def exists(self):
-        result = self.client.api.tm.ltm.monitor.tcps.tcp.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.monitor.tcps.tcp.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def update_on_device(self):
         params = self.changes.api_params()
-        result = self.client.api.tm.ltm.monitor.tcps.tcp.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         result.modify(**params)
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.monitor.tcps.tcp.create(
+        resource = self.client.api.tm.ltm.monitor.tcps.tcp.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
     def remove_from_device(self):
-        result = self.client.api.tm.ltm.monitor.tcps.tcp.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         if result:
             result.delete()
 
@@ -748,7 +748,7 @@ class TcpManager(BaseManager):
 # TODO: Remove this in 2.5 and put it its own module
 class TcpEchoManager(BaseManager):
     def __init__(self, client):
-        self.client = client
+        super(TcpEchoManager, self).__init__(client)
         self.have = None
         self.want = ParametersEcho(self.client.module.params)
         self.changes = ParametersEcho()
@@ -787,41 +787,32 @@ class TcpEchoManager(BaseManager):
         return False
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.monitor.tcp_echos.tcp_echo.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return ParametersEcho(result)
 
-    def exists(self):
-        result = self.client.api.tm.ltm.monitor.tcp_echos.tcp_echo.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.monitor.tcp_echos.tcp_echo.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def update_on_device(self):
         params = self.want.api_params()
-        result = self.client.api.tm.ltm.monitor.tcp_echos.tcp_echo.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         result.modify(**params)
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.monitor.tcp_echos.tcp_echo.create(
+        resource = self.client.api.tm.ltm.monitor.tcp_echos.tcp_echo.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
     def remove_from_device(self):
-        result = self.client.api.tm.ltm.monitor.tcp_echos.tcp_echo.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         if result:
             result.delete()
 
@@ -829,7 +820,7 @@ class TcpEchoManager(BaseManager):
 # TODO: Remove this in 2.5 and put it its own module
 class TcpHalfOpenManager(BaseManager):
     def __init__(self, client):
-        self.client = client
+        super(TcpHalfOpenManager, self).__init__(client)
         self.have = None
         self.want = ParametersHalfOpen(self.client.module.params)
         self.changes = ParametersHalfOpen()
@@ -870,41 +861,32 @@ class TcpHalfOpenManager(BaseManager):
             self.want.update({'port': '*'})
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.monitor.tcp_half_opens.tcp_half_open.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return ParametersHalfOpen(result)
 
-    def exists(self):
-        result = self.client.api.tm.ltm.monitor.tcp_half_opens.tcp_half_open.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.monitor.tcp_half_opens.tcp_half_open.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def update_on_device(self):
         params = self.want.api_params()
-        result = self.client.api.tm.ltm.monitor.tcp_half_opens.tcp_half_open.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         result.modify(**params)
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.monitor.tcp_half_opens.tcp_half_open.create(
+        resource = self.client.api.tm.ltm.monitor.tcp_half_opens.tcp_half_open.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
     def remove_from_device(self):
-        result = self.client.api.tm.ltm.monitor.tcp_half_opens.tcp_half_open.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         if result:
             result.delete()
 
@@ -945,20 +927,10 @@ class ArgumentSpec(object):
         ]
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
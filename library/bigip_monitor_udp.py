@@ -150,13 +150,21 @@ try:
 except ImportError:
     HAS_NETADDR = False
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -381,9 +389,9 @@ class Difference(object):
             return attr1
 
 
-class ModuleManager(object):
+class ModuleManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(ModuleManager, self).__init__(client)
         self.have = None
         self.want = Parameters(self.client.module.params)
         self.changes = Changes()
@@ -472,12 +480,11 @@ class ModuleManager(object):
         self.create_on_device()
         return True
 
-    def exists(self):
-        result = self.client.api.tm.ltm.monitor.udps.udp.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.monitor.udps.udp.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def update(self):
         self.have = self.read_current_from_device()
@@ -492,24 +499,23 @@ class ModuleManager(object):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the resource.")
         return True
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.monitor.udps.udp.create(
+        resource = self.client.api.tm.ltm.monitor.udps.udp.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
     def update_on_device(self):
         params = self.want.api_params()
-        resource = self.client.api.tm.ltm.monitor.udps.udp.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.modify(**params)
 
     def absent(self):
@@ -518,18 +524,12 @@ class ModuleManager(object):
         return False
 
     def remove_from_device(self):
-        resource = self.client.api.tm.ltm.monitor.udps.udp.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         if resource:
             resource.delete()
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.monitor.udps.udp.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return Parameters(result)
 
@@ -557,20 +557,10 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
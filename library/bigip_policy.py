@@ -168,13 +168,22 @@ rules:
 '''
 import re
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
-from distutils.version import LooseVersion
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
 
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
@@ -313,9 +322,9 @@ class ComplexParameters(Parameters):
     ]
 
 
-class BaseManager(object):
+class BaseManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(BaseManager, self).__init__(client)
         self.have = None
 
     def _announce_deprecations(self):
@@ -440,29 +449,22 @@ class SimpleManager(BaseManager):
         return result
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.policys.policy.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         rules = self._get_rule_names(resource)
         result = SimpleParameters(resource.attrs)
         result.update(dict(rules=rules))
         return result
 
-    def exists(self):
-        result = self.client.api.tm.ltm.policys.policy.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.policys.policy.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def update_on_device(self):
         params = self.changes.api_params()
 
-        resource = self.client.api.tm.ltm.policys.policy.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         if params:
             resource.modify(**params)
         self._upsert_policy_rules_on_device(resource)
@@ -484,6 +486,7 @@ class SimpleManager(BaseManager):
             **params
         )
         resource = self.client.api.tm.ltm.policys.policy.create(**params)
+        self.remember(resource)
         self._upsert_policy_rules_on_device(resource)
         return True
 
@@ -506,15 +509,13 @@ class SimpleManager(BaseManager):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the policy")
         return True
 
     def remove_from_device(self):
-        resource = self.client.api.tm.ltm.policys.policy.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.delete()
 
 
@@ -789,6 +790,7 @@ class Difference(object):
 class ModuleManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
 
     def exec_module(self):
         if self.version_is_less_than_12():
@@ -804,11 +806,7 @@ class ModuleManager(object):
             return ComplexManager(self.client)
 
     def version_is_less_than_12(self):
-        version = self.client.api.tmos_version
-        if LooseVersion(version) < LooseVersion('12.1.0'):
-            return True
-        else:
-            return False
+        return self.capabilities.version_is_less_than('12.1.0')
 
 
 class ArgumentSpec(object):
@@ -832,23 +830,13 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
@@ -290,13 +290,21 @@ reselect_tries:
 
 import re
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from netaddr import IPAddress, AddrFormatError
     HAS_NETADDR = True
@@ -594,9 +602,9 @@ class Difference(object):
             return self.want.monitors
 
 
-class ModuleManager(object):
+class ModuleManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(ModuleManager, self).__init__(client)
         self.have = None
         self.want = Parameters(self.client.module.params)
         self.changes = Changes()
@@ -701,6 +709,7 @@ class ModuleManager(object):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the Pool")
         return True
@@ -736,9 +745,10 @@ class ModuleManager(object):
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.pools.pool.create(
+        resource = self.client.api.tm.ltm.pools.pool.create(
             partition=self.want.partition, **params
         )
+        self.remember(resource)
 
     def create_member_on_device(self, poolres):
         poolres.members_s.members.create(
@@ -748,23 +758,17 @@ class ModuleManager(object):
 
     def update_on_device(self):
         params = self.want.api_params()
-        result = self.client.api.tm.ltm.pools.pool.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         result.modify(**params)
 
-    def exists(self):
-        return self.client.api.tm.ltm.pools.pool.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.pools.pool.load(
             name=self.want.name,
             partition=self.want.partition
         )
 
     def remove_from_device(self):
-        result = self.client.api.tm.ltm.pools.pool.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         if self.want.member_name and self.want.port and self.want.pool:
             member = result.members_s.members.load(
                 name=self.want.member_name,
@@ -777,10 +781,7 @@ class ModuleManager(object):
             result.delete()
 
     def read_current_from_device(self):
-        tmp_res = self.client.api.tm.ltm.pools.pool.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        tmp_res = self.load()
         members = tmp_res.members_s.get_collection()
 
         result = tmp_res.attrs
@@ -895,16 +896,6 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
@@ -914,7 +905,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
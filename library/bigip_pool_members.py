@@ -0,0 +1,492 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = r'''
+---
+module: bigip_pool_members
+short_description: Manages all of the members of a BIG-IP LTM pool at once
+description:
+  - Manages the complete list of members of an LTM pool in one task.
+  - The members of the pool are read from the device once and compared with
+    the given list on the Ansible controller. Only the members that need to be
+    added, changed or removed are sent to the device, in a single transaction.
+version_added: "2.5"
+options:
+  pool:
+    description:
+      - Name of the pool whose members are managed.
+    required: True
+  members:
+    description:
+      - List of the members of the pool.
+      - Each member is either a C(host:port) string, or a dictionary with the
+        keys C(host) and C(port), and optionally C(partition), C(description),
+        C(connection_limit), C(rate_limit), C(ratio), C(priority_group) and
+        C(state).
+      - C(host) is the address or the name of the node of the member. When it
+        is an address, BIG-IP creates the node if it does not exist.
+      - C(partition) defaults to the C(partition) argument of the module.
+      - C(state) is one of C(enabled), C(disabled) or C(offline), with the
+        same meaning as in the C(bigip_node) module. It is only changed on
+        the device when it is given.
+      - Attributes that are not given are not changed on existing members.
+    required: True
+  purge:
+    description:
+      - When C(yes), members of the pool that are not in C(members) are
+        removed, so that the pool contains exactly the given members.
+      - When C(no), other members of the pool are left alone.
+      - Ignored when C(state) is C(absent).
+    default: yes
+    type: bool
+  state:
+    description:
+      - When C(present), the given members are added to or updated in the pool.
+      - When C(absent), the given members are removed from the pool.
+    default: present
+    choices:
+      - present
+      - absent
+  partition:
+    description:
+      - Partition of the pool, and the default partition of its members.
+    default: Common
+notes:
+  - Requires the f5-sdk Python package on the host. This is as easy as pip
+    install f5-sdk.
+requirements:
+  - f5-sdk >= 2.2.3
+extends_documentation_fragment: f5
+author:
+  - Tim Rupp (@caphrim007)
+'''
+
+EXAMPLES = r'''
+- name: Set the members of a pool
+  bigip_pool_members:
+    pool: web_pool
+    members:
+      - 10.10.10.10:80
+      - 10.10.10.11:80
+      - host: 10.10.10.12
+        port: 80
+        ratio: 2
+        description: New web server
+    server: lb.mydomain.com
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
+
+- name: Disable one member and leave the others alone
+  bigip_pool_members:
+    pool: web_pool
+    purge: no
+    members:
+      - host: 10.10.10.10
+        port: 80
+        state: disabled
+    server: lb.mydomain.com
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
+
+- name: Remove members from a pool
+  bigip_pool_members:
+    pool: web_pool
+    state: absent
+    members:
+      - 10.10.10.11:80
+    server: lb.mydomain.com
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
+'''
+
+RETURN = r'''
+added:
+  description: Names of the members that were added to the pool.
+  returned: changed
+  type: list
+  sample: ['10.10.10.12:80']
+updated:
+  description: Names of the members that were changed.
+  returned: changed
+  type: list
+  sample: ['10.10.10.10:80']
+removed:
+  description: Names of the members that were removed from the pool.
+  returned: changed
+  type: list
+  sample: ['10.10.10.13:80']
+'''
+
+from ansible.module_utils.f5_utils import AnsibleF5Parameters
+from ansible.module_utils.f5_utils import HAS_F5SDK
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.six import iteritems
+from ansible.module_utils.six import string_types
+from collections import defaultdict
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5FastParameters
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5FastParameters
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
+try:
+    from ansible.module_utils.f5_utils import BigIpTxContext
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from f5.sdk_exception import TransactionSubmitException
+except ImportError:
+    HAS_F5SDK = False
+
+
+class Parameters(AnsibleF5Parameters):
+    returnables = ['added', 'updated', 'removed']
+
+    def __init__(self, params=None):
+        self._values = defaultdict(lambda: None)
+        if params:
+            self.update(params=params)
+
+    def update(self, params=None):
+        if params:
+            for k, v in iteritems(params):
+                self._values[k] = v
+
+    def to_return(self):
+        result = {}
+        for returnable in self.returnables:
+            result[returnable] = getattr(self, returnable)
+        result = self._filter_params(result)
+        return result
+
+    @property
+    def pool_uri_name(self):
+        return '~{0}~{1}'.format(self.partition, self.pool)
+
+    @property
+    def members(self):
+        if self._values['members'] is None:
+            return None
+        result = []
+        for item in self._values['members']:
+            member = MemberParameters(partition=self.partition)
+            if isinstance(item, string_types):
+                member.update(member.split_name(item))
+            elif isinstance(item, dict):
+                member.update(item)
+            else:
+                raise F5ModuleError(
+                    "Each member must be a 'host:port' string or a dictionary."
+                )
+            member.validate()
+            result.append(member)
+        return result
+
+
+class MemberParameters(F5FastParameters):
+    # One is built for every wanted member
+    __slots__ = ()
+
+    api_map = {
+        'connection_limit': 'connectionLimit',
+        'rate_limit': 'rateLimit',
+        'priority_group': 'priorityGroup',
+    }
+
+    keys = [
+        'host', 'port', 'partition', 'description', 'connection_limit',
+        'rate_limit', 'ratio', 'priority_group', 'state'
+    ]
+
+    api_attributes = [
+        'description', 'connectionLimit', 'rateLimit', 'ratio', 'priorityGroup'
+    ]
+
+    # The session and state of a member for each value of ``state``
+    states = {
+        'enabled': dict(session='user-enabled', state='user-up'),
+        'disabled': dict(session='user-disabled', state='user-up'),
+        'offline': dict(session='user-disabled', state='user-down'),
+    }
+
+    def __init__(self, partition=None):
+        super(MemberParameters, self).__init__()
+        self._values['partition'] = partition
+
+    def update(self, params=None):
+        if params:
+            for k, v in iteritems(params):
+                if k not in self.keys:
+                    raise F5ModuleError(
+                        "'{0}' is not a valid key of a pool member.".format(k)
+                    )
+                self._values[self.api_map.get(k, k)] = v
+
+    @staticmethod
+    def split_name(name):
+        # IPv6 members are named with a '.' before the port
+        separator = '.' if name.count(':') > 1 else ':'
+        host, sep, port = name.rpartition(separator)
+        if not sep:
+            raise F5ModuleError(
+                "The member '{0}' must be in the form 'host:port'.".format(name)
+            )
+        return dict(host=host, port=port)
+
+    def validate(self):
+        if not self.host or self.port is None:
+            raise F5ModuleError(
+                "The host and port of every pool member must be specified."
+            )
+        try:
+            int(self.port)
+        except ValueError:
+            raise F5ModuleError(
+                "The port of member '{0}' must be a number.".format(self.host)
+            )
+        if self.state is not None and self.state not in self.states:
+            raise F5ModuleError(
+                "The state of member '{0}' must be one of: {1}.".format(
+                    self.name, ', '.join(sorted(self.states))
+                )
+            )
+
+    @property
+    def name(self):
+        separator = '.' if ':' in self.host else ':'
+        return '{0}{1}{2}'.format(self.host, separator, self.port)
+
+    @property
+    def key(self):
+        return self.partition, self.name
+
+    @property
+    def uri_name(self):
+        return '~{0}~{1}'.format(self.partition, self.name)
+
+    def api_params(self):
+        result = {}
+        for api_attribute in self.api_attributes:
+            result[api_attribute] = self._values[api_attribute]
+        if self.state is not None:
+            result.update(self.states[self.state])
+        result = self._filter_params(result)
+        return result
+
+
+class Difference(object):
+    """Works out the changes needed to turn one member list into another
+
+    Both lists are indexed by member key once, so the cost of the comparison
+    grows linearly with the number of members rather than with the product
+    of the number of wanted and current members.
+    """
+    def __init__(self, want, have, purge=True):
+        self.want = want
+        self.have = have
+        self.purge = purge
+
+    def compare(self):
+        """Returns the members to add, update and remove
+
+        Returns:
+            tuple: A list of the members to add, a list of ``(member,
+            changes)`` tuples for the members to update and a list of the
+            keys of the members to remove.
+        """
+        have = dict(((x.get('partition', 'Common'), x['name']), x) for x in self.have)
+        add = []
+        update = []
+        seen = set()
+        for member in self.want:
+            if member.key in seen:
+                continue
+            seen.add(member.key)
+            current = have.get(member.key)
+            if current is None:
+                add.append(member)
+                continue
+            changes = self._changes(member.api_params(), current)
+            if changes:
+                update.append((member, changes))
+        remove = []
+        if self.purge:
+            remove = [k for k in have if k not in seen]
+        return add, update, remove
+
+    def absent(self):
+        """Returns the keys of the wanted members that exist on the device"""
+        have = set((x.get('partition', 'Common'), x['name']) for x in self.have)
+        result = []
+        for member in self.want:
+            if member.key in have and member.key not in result:
+                result.append(member.key)
+        return result
+
+    def _changes(self, want, have):
+        result = dict()
+        session = want.pop('session', None)
+        state = want.pop('state', None)
+        if session is not None and self._state(have) != (session, state):
+            result.update(dict(session=session, state=state))
+        for k, v in iteritems(want):
+            if str(v) != str(have.get(k, '')):
+                result[k] = v
+        return result
+
+    def _state(self, have):
+        session = 'user-enabled'
+        if have.get('session') == 'user-disabled':
+            session = 'user-disabled'
+        state = 'user-down' if have.get('state') == 'user-down' else 'user-up'
+        return session, state
+
+
+class Changes(Parameters):
+    pass
+
+
+class ModuleManager(object):
+    def __init__(self, client):
+        self.client = client
+        self.want = Parameters(self.client.module.params)
+        self.changes = Changes()
+
+    def exec_module(self):
+        result = dict()
+
+        try:
+            if self.want.state == 'absent':
+                changed = self.absent()
+            else:
+                changed = self.present()
+        except iControlUnexpectedHTTPError as e:
+            raise F5ModuleError(str(e))
+        except TransactionSubmitException as e:
+            raise F5ModuleError(
+                "The transaction was rolled back: {0}".format(str(e))
+            )
+
+        result.update(**self.changes.to_return())
+        result.update(dict(changed=changed))
+        return result
+
+    def present(self):
+        members = self.read_members_from_device()
+        diff = Difference(self.want.members, members, purge=self.want.purge)
+        add, update, remove = diff.compare()
+        if not add and not update and not remove:
+            return False
+        self.changes = Changes(dict(
+            added=[x.name for x in add],
+            updated=[member.name for member, changes in update],
+            removed=[x[1] for x in remove]
+        ))
+        if self.client.check_mode:
+            return True
+        self.update_members_on_device(add, update, remove)
+        return True
+
+    def absent(self):
+        members = self.read_members_from_device()
+        remove = Difference(self.want.members, members).absent()
+        if not remove:
+            return False
+        self.changes = Changes(dict(
+            removed=[x[1] for x in remove]
+        ))
+        if self.client.check_mode:
+            return True
+        self.update_members_on_device([], [], remove)
+        return True
+
+    def _members_uri(self):
+        return '{0}tm/ltm/pool/{1}/members'.format(
+            self.client.api._meta_data['uri'], self.want.pool_uri_name
+        )
+
+    def read_members_from_device(self):
+        try:
+            response = self.client.api.icrs.get(self._members_uri())
+        except iControlUnexpectedHTTPError as e:
+            if e.response.status_code == 404:
+                raise F5ModuleError(
+                    "The pool '{0}' does not exist.".format(self.want.pool)
+                )
+            raise
+        return response.json().get('items', [])
+
+    def update_members_on_device(self, add, update, remove):
+        uri = self._members_uri()
+        tx = self.client.api.tm.transactions.transaction
+        with BigIpTxContext(tx) as api:
+            for partition, name in remove:
+                api.icrs.delete('{0}/~{1}~{2}'.format(uri, partition, name))
+            for member in add:
+                params = member.api_params()
+                params.update(dict(name=member.name, partition=member.partition))
+                api.icrs.post(uri, json=params)
+            for member, changes in update:
+                api.icrs.patch('{0}/{1}'.format(uri, member.uri_name), json=changes)
+
+
+class ArgumentSpec(object):
+    def __init__(self):
+        self.supports_check_mode = True
+        self.argument_spec = dict(
+            pool=dict(required=True),
+            members=dict(
+                type='list',
+                required=True
+            ),
+            purge=dict(
+                type='bool',
+                default='yes'
+            )
+        )
+        self.f5_product_name = 'bigip'
+
+
+def main():
+    if not HAS_F5SDK:
+        raise F5ModuleError("The python f5-sdk module is required")
+
+    spec = ArgumentSpec()
+
+    client = F5Client(
+        argument_spec=spec.argument_spec,
+        supports_check_mode=spec.supports_check_mode,
+        f5_product_name=spec.f5_product_name
+    )
+
+    try:
+        mm = ModuleManager(client)
+        results = mm.exec_module()
+        cleanup_tokens(client)
+        client.module.exit_json(**results)
+    except F5ModuleError as e:
+        cleanup_tokens(client)
+        client.module.fail_json(msg=str(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -24,7 +24,7 @@ options:
   name:
     description:
       - The module to provision in BIG-IP.
-    required: true
+      - Required when C(modules) is not given.
     choices:
       - am
       - afm
@@ -42,6 +42,20 @@ options:
       - vcmp
     aliases:
       - module
+  modules:
+    description:
+      - Provisioning levels of several modules, keyed by the name of the
+        module. The names are the choices of C(name), and the levels are the
+        choices of C(level), or C(none) to de-provision the module.
+      - All of the levels are changed in a single transaction, so that the
+        device goes through one reprovisioning cycle for all of them instead
+        of one for each module.
+      - Modules that are not listed are left alone, except when a module is
+        provisioned at the C(dedicated) level. Every other module is then
+        de-provisioned.
+      - Mutually exclusive with C(name). C(level) and C(state) are ignored
+        when C(modules) is given.
+    version_added: 2.5
   level:
     description:
       - Sets the provisioning level for the requested modules. Changing the
@@ -95,6 +109,19 @@ EXAMPLES = r'''
     user: admin
     validate_certs: no
   delegate_to: localhost
+
+- name: Provision LTM, ASM, AFM and APM with a single reprovisioning
+  bigip_provision:
+    server: lb.mydomain.com
+    modules:
+      ltm: nominal
+      asm: nominal
+      afm: nominal
+      apm: minimum
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
 '''
 
 RETURN = r'''
@@ -103,14 +130,30 @@ level:
   returned: changed
   type: string
   sample: minimum
+modules:
+  description: The new provisioning level of each module that was changed.
+  returned: changed
+  type: dict
+  sample: {"asm": "nominal", "gtm": "none"}
 '''
 
 import time
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.six import iteritems
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5Poller
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5Poller
+    from ansible.module_utils.f5networks.common import cleanup_tokens
 
 try:
     from f5.bigip.contexts import TransactionContextManager
@@ -123,7 +166,15 @@ except ImportError:
 class Parameters(AnsibleF5Parameters):
     api_attributes = ['level']
 
-    returnables = ['level']
+    returnables = ['level', 'modules']
+
+    provisionable = [
+        'afm', 'am', 'sam', 'asm', 'avr', 'fps',
+        'gtm', 'lc', 'ltm', 'pem', 'swg', 'ilx',
+        'apm', 'vcmp'
+    ]
+
+    levels = ['nominal', 'dedicated', 'minimum']
 
     updatables = ['level']
 
@@ -153,6 +204,38 @@ class Parameters(AnsibleF5Parameters):
             return None
         return str(self._values['level'])
 
+    @property
+    def modules(self):
+        if self._values['modules'] is None:
+            return None
+        result = dict()
+        for name, level in iteritems(self._values['modules']):
+            name = str(name)
+            level = str(level)
+            if name not in self.provisionable:
+                raise F5ModuleError(
+                    "The module '{0}' cannot be provisioned. The valid modules are {1}".format(
+                        name, ', '.join(self.provisionable)
+                    )
+                )
+            if level not in self.levels + ['none']:
+                raise F5ModuleError(
+                    "The level of the '{0}' module must be one of {1}".format(
+                        name, ', '.join(self.levels + ['none'])
+                    )
+                )
+            result[name] = level
+        dedicated = [k for k, v in iteritems(result) if v == 'dedicated']
+        if len(dedicated) > 1:
+            raise F5ModuleError(
+                "Only one module can be provisioned at the 'dedicated' level."
+            )
+        if dedicated and any(v != 'none' for k, v in iteritems(result) if k not in dedicated):
+            raise F5ModuleError(
+                "A module provisioned at the 'dedicated' level must be the only provisioned module."
+            )
+        return result
+
 
 class ModuleManager(object):
     def __init__(self, client):
@@ -160,6 +243,7 @@ class ModuleManager(object):
         self.have = None
         self.want = Parameters(self.client.module.params)
         self.changes = Parameters()
+        self.capabilities = F5DeviceCapabilities(self.client)
 
     def _update_changed_options(self):
         changed = {}
@@ -183,7 +267,9 @@ class ModuleManager(object):
         state = self.want.state
 
         try:
-            if state == "present":
+            if self.want.modules is not None:
+                changed = self.update_modules()
+            elif state == "present":
                 changed = self.update()
             elif state == "absent":
                 changed = self.absent()
@@ -212,6 +298,7 @@ class ModuleManager(object):
             return True
 
         self.update_on_device()
+        self.capabilities.invalidate()
         self._wait_for_module_provisioning()
 
         if self.want.module == 'vcmp':
@@ -222,6 +309,51 @@ class ModuleManager(object):
             self._wait_for_asm_ready()
         return True
 
+    def update_modules(self):
+        changes = self._modules_changed_on_device()
+        if not changes:
+            return False
+        self.changes = Parameters(dict(modules=changes))
+        if self.client.check_mode:
+            return True
+
+        self.update_modules_on_device(changes)
+        self.capabilities.invalidate()
+        self._wait_for_module_provisioning()
+
+        if 'vcmp' in changes:
+            self._wait_for_reboot()
+            self._wait_for_module_provisioning()
+
+        if changes.get('asm', 'none') != 'none':
+            self._wait_for_asm_ready()
+        return True
+
+    def _modules_changed_on_device(self):
+        wanted = dict(self.want.modules)
+        current = self.read_levels_from_device()
+        if 'dedicated' in wanted.values():
+            for name in current:
+                wanted.setdefault(name, 'none')
+        result = dict()
+        for name, level in iteritems(wanted):
+            if current.get(name, 'none') != level:
+                result[name] = level
+        return result
+
+    def read_levels_from_device(self):
+        collection = self.client.api.tm.sys.provision.get_collection()
+        return dict((str(x['name']), str(x['level'])) for x in collection)
+
+    def update_modules_on_device(self, changes):
+        tx = self.client.api.tm.transactions.transaction
+        with TransactionContextManager(tx) as api:
+            provision = api.tm.sys.provision
+            for name, level in iteritems(changes):
+                resource = getattr(provision, name)
+                resource = resource.load()
+                resource.update(level=level)
+
     def should_update(self):
         result = self._update_changed_options()
         if result:
@@ -272,6 +404,7 @@ class ModuleManager(object):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.capabilities.invalidate()
         self._wait_for_module_provisioning()
 
         # For vCMP, because it has to reboot, we also wait for mcpd to become available
@@ -293,26 +426,17 @@ class ModuleManager(object):
 
     def _wait_for_module_provisioning(self):
         # To prevent things from running forever, the hack is to check
-        # for mprov's status twice. If mprov is finished, then in most
+        # for mprov's status three times. If mprov is finished, then in most
         # cases (not ASM) the provisioning is probably ready.
-        nops = 0
-
+        #
         # Sleep a little to let provisioning settle and begin properly
-        time.sleep(5)
-
-        while nops < 3:
-            try:
-                if not self._is_mprov_running_on_device():
-                    nops += 1
-                else:
-                    nops = 0
-            except Exception:
-                # This can be caused by restjavad restarting.
-                try:
-                    self.client.reconnect()
-                except Exception:
-                    pass
-            time.sleep(5)
+        poller = F5Poller(interval=5, max_interval=5)
+        poller.poll(
+            self._is_mprov_running_on_device,
+            until=lambda running: not running,
+            stable=3,
+            initial_delay=5
+        )
 
     def _is_mprov_running_on_device(self):
         # /usr/libexec/qemu-kvm is added here to prevent vcmp provisioning
@@ -411,17 +535,13 @@ class ArgumentSpec(object):
         self.supports_check_mode = True
         self.argument_spec = dict(
             module=dict(
-                required=True,
-                choices=[
-                    'afm', 'am', 'sam', 'asm', 'avr', 'fps',
-                    'gtm', 'lc', 'ltm', 'pem', 'swg', 'ilx',
-                    'apm', 'vcmp'
-                ],
+                choices=Parameters.provisionable,
                 aliases=['name']
             ),
+            modules=dict(type='dict'),
             level=dict(
                 default='nominal',
-                choices=['nominal', 'dedicated', 'minimum']
+                choices=Parameters.levels
             ),
             state=dict(
                 default='present',
@@ -429,29 +549,23 @@ class ArgumentSpec(object):
             )
         )
         self.mutually_exclusive = [
-            ['parameters', 'parameters_src']
+            ['module', 'modules']
+        ]
+        self.required_one_of = [
+            ['module', 'modules']
         ]
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
         mutually_exclusive=spec.mutually_exclusive,
+        required_one_of=spec.required_one_of,
     )
 
     try:
@@ -75,6 +75,13 @@ options:
     choices:
       - yes
       - no
+  download_chunk_size:
+    description:
+      - Size, in bytes, of the pieces that the qkview is downloaded in.
+      - Each piece is added to the checksums of the file as it arrives, so
+        the downloaded file is not read again to compute them.
+    default: 524288
+    version_added: 2.5
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk.
@@ -108,17 +115,36 @@ stdout_lines:
   returned: always
   type: list
   sample: [['...', '...'], ['...'], ['...']]
+checksum:
+  description: The SHA1 checksum of the downloaded qkview
+  returned: always
+  type: string
+  sample: 7b46bbe4f8ebfee64761b5313855618f64c64109
+md5sum:
+  description: The MD5 checksum of the downloaded qkview
+  returned: always
+  type: string
+  sample: 96cacab4c259c4598727d7cf2ceb3b45
 '''
 
 import re
 import os
 
 from ansible.module_utils.six import string_types
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
-from distutils.version import LooseVersion
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5FileDownloader
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5FileDownloader
+    from ansible.module_utils.f5networks.common import cleanup_tokens
 
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
@@ -132,7 +158,7 @@ class Parameters(AnsibleF5Parameters):
         'asm_request_log', 'filename_cmd'
     ]
 
-    returnables = ['stdout', 'stdout_lines', 'warnings']
+    returnables = ['stdout', 'stdout_lines', 'warnings', 'checksum', 'md5sum']
 
     @property
     def exclude(self):
@@ -209,6 +235,7 @@ class Parameters(AnsibleF5Parameters):
 class ModuleManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
 
     def exec_module(self):
         if self.is_version_less_than_14():
@@ -231,11 +258,7 @@ class ModuleManager(object):
 
         :return: Bool
         """
-        version = self.client.api.tmos_version
-        if LooseVersion(version) < LooseVersion('14.0.0'):
-            return True
-        else:
-            return False
+        return self.capabilities.version_is_less_than('14.0.0')
 
 
 class BaseManager(object):
@@ -306,7 +329,7 @@ class BaseManager(object):
                 "Failed to move the file to a downloadable location"
             )
 
-        self._download_file()
+        stats = self._download_file()
         if not os.path.exists(self.want.dest):
             raise F5ModuleError(
                 "Failed to save the qkview to local disk"
@@ -321,9 +344,19 @@ class BaseManager(object):
 
         self.changes = Parameters({
             'stdout': response,
-            'stdout_lines': self._to_lines(response)
+            'stdout_lines': self._to_lines(response),
+            'checksum': stats['checksums']['sha1'],
+            'md5sum': stats['checksums']['md5']
         })
 
+    def _download_file(self):
+        downloader = F5FileDownloader(
+            self.client.api,
+            endpoint=self.endpoint,
+            chunk_size=self.want.download_chunk_size
+        )
+        return downloader.download(self.want.filename, self.want.dest)
+
     def _delete_qkview(self):
         tpath_name = '{0}/{1}'.format(self.remote_dir, self.want.filename)
         self.client.api.tm.util.unix_rm.exec_cmd(
@@ -342,6 +375,8 @@ class BaseManager(object):
 
 
 class BulkLocationManager(BaseManager):
+    endpoint = 'bulk'
+
     def __init__(self, client):
         super(BulkLocationManager, self).__init__(client)
         self.remote_dir = '/var/config/rest/bulk'
@@ -359,15 +394,10 @@ class BulkLocationManager(BaseManager):
         except Exception:
             return False
 
-    def _download_file(self):
-        bulk = self.client.api.shared.file_transfer.bulk
-        bulk.download_file(self.want.filename, self.want.dest)
-        if os.path.exists(self.want.dest):
-            return True
-        return False
-
 
 class MadmLocationManager(BaseManager):
+    endpoint = 'madm'
+
     def __init__(self, client):
         super(MadmLocationManager, self).__init__(client)
         self.remote_dir = '/var/config/rest/madm'
@@ -385,13 +415,6 @@ class MadmLocationManager(BaseManager):
         except Exception:
             return False
 
-    def _download_file(self):
-        madm = self.client.api.shared.file_transfer.madm
-        madm.download_file(self.want.filename, self.want.dest)
-        if os.path.exists(self.want.dest):
-            return True
-        return False
-
 
 class ArgumentSpec(object):
     def __init__(self):
@@ -425,25 +448,19 @@ class ArgumentSpec(object):
             dest=dict(
                 type='path',
                 required=True
+            ),
+            download_chunk_size=dict(
+                type='int',
+                default=524288
             )
         )
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
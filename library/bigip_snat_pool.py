@@ -97,11 +97,19 @@ members:
 
 import os
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -203,9 +211,9 @@ class Difference(object):
             return attr1
 
 
-class ModuleManager(object):
+class ModuleManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(ModuleManager, self).__init__(client)
         self.have = None
         self.want = Parameters(self.client.module.params)
         self.changes = Parameters()
@@ -277,19 +285,15 @@ class ModuleManager(object):
         return changed
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.snatpools.snatpool.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return Parameters(result)
 
-    def exists(self):
-        result = self.client.api.tm.ltm.snatpools.snatpool.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.snatpools.snatpool.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
     def should_update(self):
         result = self._update_changed_options()
@@ -309,10 +313,7 @@ class ModuleManager(object):
     def update_on_device(self):
         params = self.changes.api_params()
 
-        resource = self.client.api.tm.ltm.snatpools.snatpool.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.modify(**params)
 
     def create(self):
@@ -320,31 +321,28 @@ class ModuleManager(object):
         if self.client.check_mode:
             return True
         self.create_on_device()
-        if not self.exists():
-            raise F5ModuleError("Failed to create the SNAT pool")
         return True
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.snatpools.snatpool.create(
+        resource = self.client.api.tm.ltm.snatpools.snatpool.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
     def remove(self):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the SNAT pool")
         return True
 
     def remove_from_device(self):
-        resource = self.client.api.tm.ltm.snatpools.snatpool.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.delete()
 
 
@@ -368,16 +366,6 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
@@ -387,7 +375,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
@@ -110,6 +110,16 @@ options:
        - This parameter also makes the C(software_md5sum) and C(hotfix_md5sum)
          mandatory when C(state is C(present), C(activated) or C(installed).
     default: 'no'
+  upload_chunk_size:
+    description:
+      - Size, in bytes, of the pieces that local ISO images are uploaded in.
+      - The image is read from disk one piece at a time, so this is also the
+        most memory the upload uses on the Ansible controller.
+      - An upload that was interrupted is resumed from the pieces that the
+        device already has, and the checksum of the uploaded image is
+        verified against the local file.
+    default: 524288
+    version_added: 2.5
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk
@@ -387,6 +397,15 @@ volume:
   returned: changed
   type: string
   sample: HD1.2
+uploads:
+  description:
+    - Statistics of the upload of each local ISO image.
+    - C(sent) is the number of bytes sent, and C(resumed) the number of bytes
+      that the device already had from an earlier upload.
+    - C(throughput) is in bytes per second.
+  returned: changed
+  type: list
+  sample: [{"size": 2147483648, "sent": 2147483648, "resumed": 0, "seconds": 95.2, "throughput": 22557601, "checksum": "3f7d..."}]
 '''
 
 import io
@@ -395,7 +414,6 @@ import os
 import time
 
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.six import iteritems
@@ -403,6 +421,19 @@ from collections import defaultdict
 from lxml import etree
 from requests.exceptions import ConnectionError
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5FileUploader
+    from library.module_utils.f5networks.common import F5Poller
+    from library.module_utils.f5networks.common import F5PollTimeoutError
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5FileUploader
+    from ansible.module_utils.f5networks.common import F5Poller
+    from ansible.module_utils.f5networks.common import F5PollTimeoutError
+
 try:
     import urlparse
 except ImportError:
@@ -425,7 +456,7 @@ class Parameters(AnsibleF5Parameters):
 
     returnables = [
         'force', 'hotfix', 'state', 'software', 'volume', 'reuse_inactive_volume',
-        'software_md5sum', 'hotfix_md5sum', 'build', 'version'
+        'software_md5sum', 'hotfix_md5sum', 'build', 'version', 'uploads'
     ]
 
     api_attributes = [
@@ -499,11 +530,11 @@ class Parameters(AnsibleF5Parameters):
 
     @property
     def remote_software(self):
-        return self._has_url_scheme(self.want.software)
+        return self._has_url_scheme(self._values['software'])
 
     @property
     def remote_hotfix(self):
-        return self._has_url_scheme(self.want.hotfix)
+        return self._has_url_scheme(self._values['hotfix'])
 
     @property
     def software(self):
@@ -968,52 +999,60 @@ class BaseManager(object):
     def wait_for_images(self, count, hotfix=False):
         current = len(count)
         if hotfix:
-            while True:
-                if len(self.list_hotfixes_on_device()) != current:
-                    break
-            time.sleep(1)
+            list_on_device = self.list_hotfixes_on_device
         else:
-            while True:
-                if len(self.list_images_on_device()) != current:
-                    break
-            time.sleep(1)
+            list_on_device = self.list_images_on_device
+        poller = F5Poller(interval=1, max_interval=10)
+        poller.poll(
+            lambda: len(list_on_device()),
+            until=lambda x: x != current
+        )
 
     def wait_for_device_reboot(self):
         vol = self.want.volume
-        while True:
-            time.sleep(5)
-            try:
-                self._device_reconnect()
-                volume = self.client.api.tm.sys.software.volumes.volume.load(
-                    name=vol
-                )
-                if hasattr(volume, 'active') and volume.active is True:
-                    break
-            except Exception:
-                # Handle all exceptions because if the system is offline (for a
-                # reboot) the REST client will raise exceptions about
-                # connections
-                pass
+
+        def volume_is_active():
+            self._device_reconnect()
+            volume = self.client.api.tm.sys.software.volumes.volume.load(
+                name=vol
+            )
+            return hasattr(volume, 'active') and volume.active is True
+
+        poller = F5Poller(interval=5, max_interval=30)
+
+        # Handle all exceptions because if the system is offline (for a
+        # reboot) the REST client will raise exceptions about connections
+        poller.poll(volume_is_active, ignore=(Exception,), initial_delay=5)
+
+        # The device now runs a different version
+        F5DeviceCapabilities(self.client).invalidate()
 
     def wait_for_software_install_on_device(self):
         # We need to delay this slightly in case the the volume needs to be
         # created first
-        for _ in range(10):
-            try:
-                if self.volume_exists_on_device():
-                    break
-            except ConnectionError:
-                pass
-            time.sleep(5)
+        poller = F5Poller(interval=5, max_interval=5)
+        try:
+            poller.poll(
+                self.volume_exists_on_device, ignore=(ConnectionError,), timeout=50
+            )
+        except F5PollTimeoutError:
+            pass
+
         progress = self.load_volume_on_device()
-        while True:
-            time.sleep(10)
+
+        def refresh_status():
             progress.refresh()
-            status = progress.status
+            return progress.status
+
+        def install_complete(status):
             if 'complete' in status:
-                break
+                return True
             elif 'failed' in status:
                 raise F5ModuleError(status)
+            return False
+
+        poller = F5Poller(interval=5, max_interval=20)
+        poller.poll(refresh_status, until=install_complete, initial_delay=5)
 
     def delete_volume_on_device(self):
         volume = self.load_volume_on_device()
@@ -1102,9 +1141,14 @@ class LocalManager(BaseManager):
         return True
 
     def upload_to_device(self, filepath):
-        self.client.api.cm.autodeploy.software_image_uploads.upload_image(
-            filepath
+        uploader = F5FileUploader(
+            self.client.api,
+            endpoint='image',
+            chunk_size=self.want.upload_chunk_size
         )
+        stats = uploader.upload(filepath)
+        uploads = self.changes.uploads or []
+        self.changes.update(dict(uploads=uploads + [stats]))
 
     def image_exists_on_device(self):
         collection = self.client.api.tm.sys.software.images.get_collection()
@@ -1303,7 +1347,11 @@ class ArgumentSpec(object):
             ),
             volume=dict(),
             software_md5sum=dict(),
-            hotfix_md5sum=dict()
+            hotfix_md5sum=dict(),
+            upload_chunk_size=dict(
+                type='int',
+                default=524288
+            )
         )
         self.f5_product_name = 'bigip'
         self.mutually_exclusive = [
@@ -1317,7 +1365,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
@@ -100,12 +100,16 @@ volumes:
 '''
 
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+
 
 class Parameters(AnsibleF5Parameters):
     returnables = [
@@ -282,7 +286,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
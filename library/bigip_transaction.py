@@ -0,0 +1,564 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = r'''
+---
+module: bigip_transaction
+short_description: Apply many LTM and network objects in a single transaction
+description:
+  - Manages a set of BIG-IP objects, such as nodes, pools, pool members,
+    virtual servers and self IPs, in a single iControl REST transaction.
+  - The current configuration of all objects is read from the device first,
+    one request per type of object, and compared with the desired
+    configuration on the Ansible controller. Only the objects that are
+    missing, different or need to be removed are sent to the device.
+  - All changes are committed together. If any one of them fails, the device
+    rolls back the whole transaction, so a partially created application is
+    never left behind.
+version_added: "2.5"
+options:
+  objects:
+    description:
+      - List of the objects to manage.
+      - Each object is a dictionary that accepts the keys C(type), C(name),
+        C(partition), C(pool), C(state) and C(attributes).
+      - C(type) is the kind of object. Valid values are C(node), C(pool),
+        C(pool_member), C(snat_pool), C(virtual_address), C(virtual_server),
+        C(vlan) and C(self_ip).
+      - C(name) is the name of the object. For pool members this is the
+        C(node:port) pair, for example C(10.10.10.10:80).
+      - C(partition) defaults to the C(partition) argument of the module.
+      - C(pool) is the name of the pool that a C(pool_member) belongs to. It
+        is required for pool members and ignored for all other types.
+      - C(state) is either C(present) or C(absent) and defaults to the
+        C(state) argument of the module.
+      - C(attributes) is a dictionary of attributes of the object, using the
+        names of the iControl REST API, for example C(loadBalancingMode) or
+        C(destination). Only the attributes that are given are compared with
+        the device and updated.
+    required: True
+notes:
+  - Requires the f5-sdk Python package on the host. This is as easy as pip
+    install f5-sdk.
+  - Objects are created and updated in dependency order (VLANs, self IPs,
+    nodes, pools, pool members, SNAT pools, virtual addresses and virtual
+    servers) and removed in the reverse order, before anything is created.
+  - Attribute values are compared as strings, and dictionaries are compared
+    only on the keys that are given, so C(1) matches C("1") and a profile
+    given as C({"name": "http"}) matches the profile read from the device.
+  - References to other objects, such as C(pool), C(monitor), C(destination),
+    C(vlans) and the names of C(profiles), may be given without a partition.
+    They are then in the partition of the object, so C(web_pool) matches
+    C(/Common/web_pool) for an object in the C(Common) partition.
+requirements:
+  - f5-sdk >= 2.2.3
+extends_documentation_fragment: f5
+author:
+  - Tim Rupp (@caphrim007)
+'''
+
+EXAMPLES = r'''
+- name: Deploy a web application in one transaction
+  bigip_transaction:
+    objects:
+      - type: node
+        name: web1
+        attributes:
+          address: 10.10.10.10
+      - type: node
+        name: web2
+        attributes:
+          address: 10.10.10.11
+      - type: pool
+        name: web_pool
+        attributes:
+          loadBalancingMode: least-connections-member
+          monitor: /Common/http
+      - type: pool_member
+        pool: web_pool
+        name: web1:80
+      - type: pool_member
+        pool: web_pool
+        name: web2:80
+      - type: virtual_server
+        name: web_vs
+        attributes:
+          destination: /Common/10.10.20.10:80
+          pool: /Common/web_pool
+          ipProtocol: tcp
+          profiles:
+            - name: http
+            - name: tcp
+    server: lb.mydomain.com
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
+
+- name: Remove the application again
+  bigip_transaction:
+    state: absent
+    objects:
+      - type: virtual_server
+        name: web_vs
+      - type: pool
+        name: web_pool
+      - type: node
+        name: web1
+      - type: node
+        name: web2
+    server: lb.mydomain.com
+    password: secret
+    user: admin
+    validate_certs: no
+  delegate_to: localhost
+'''
+
+RETURN = r'''
+objects:
+  description:
+    - The objects that were created, updated or removed.
+    - The C(changes) key contains the attributes that were sent to the device.
+  returned: changed
+  type: list
+  sample: [{"type": "pool", "name": "web_pool", "partition": "Common", "action": "update", "changes": {"loadBalancingMode": "round-robin"}}]
+'''
+
+from ansible.module_utils.f5_utils import AnsibleF5Parameters
+from ansible.module_utils.f5_utils import HAS_F5SDK
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.six import iteritems
+from ansible.module_utils.six import string_types
+from collections import defaultdict
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
+try:
+    from ansible.module_utils.f5_utils import BigIpTxContext
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from f5.sdk_exception import TransactionSubmitException
+except ImportError:
+    HAS_F5SDK = False
+
+
+class Parameters(AnsibleF5Parameters):
+    returnables = ['objects']
+
+    def __init__(self, params=None):
+        self._values = defaultdict(lambda: None)
+        if params:
+            self.update(params=params)
+
+    def update(self, params=None):
+        if params:
+            for k, v in iteritems(params):
+                self._values[k] = v
+
+    def to_return(self):
+        result = {}
+        for returnable in self.returnables:
+            result[returnable] = getattr(self, returnable)
+        result = self._filter_params(result)
+        return result
+
+    @property
+    def objects(self):
+        if self._values['objects'] is None:
+            return None
+        result = []
+        for item in self._values['objects']:
+            if isinstance(item, ObjectParameters):
+                result.append(item)
+                continue
+            if not isinstance(item, dict):
+                raise F5ModuleError(
+                    "Each item in 'objects' must be a dictionary."
+                )
+            obj = ObjectParameters(item)
+            if obj._values['partition'] is None:
+                obj.partition = self.partition
+            if obj.state is None:
+                obj.update(dict(state=self.state))
+            obj.validate()
+            result.append(obj)
+        return result
+
+
+class ObjectParameters(AnsibleF5Parameters):
+    # The REST collections of the supported types, in the order that they
+    # need to be created in.
+    collections = [
+        ('vlan', 'net/vlan'),
+        ('self_ip', 'net/self'),
+        ('node', 'ltm/node'),
+        ('pool', 'ltm/pool'),
+        ('pool_member', 'ltm/pool/{pool}/members'),
+        ('snat_pool', 'ltm/snatpool'),
+        ('virtual_address', 'ltm/virtual-address'),
+        ('virtual_server', 'ltm/virtual'),
+    ]
+
+    keys = ['type', 'name', 'partition', 'pool', 'state', 'attributes']
+
+    def __init__(self, params=None):
+        self._values = defaultdict(lambda: None)
+        if params:
+            self.update(params=params)
+
+    def update(self, params=None):
+        if params:
+            for k, v in iteritems(params):
+                if k not in self.keys:
+                    raise F5ModuleError(
+                        "'{0}' is not a valid key of an object.".format(k)
+                    )
+                self._values[k] = v
+
+    def validate(self):
+        types = [x[0] for x in self.collections]
+        if self.type not in types:
+            raise F5ModuleError(
+                "The type of an object must be one of: {0}.".format(', '.join(types))
+            )
+        if not self.name:
+            raise F5ModuleError(
+                "A name is required for every object."
+            )
+        if self.type == 'pool_member' and not self.pool:
+            raise F5ModuleError(
+                "The pool of pool member '{0}' must be specified.".format(self.name)
+            )
+        if self.state not in ['present', 'absent']:
+            raise F5ModuleError(
+                "The state of '{0}' must be either 'present' or 'absent'.".format(self.name)
+            )
+        if not isinstance(self.attributes, dict):
+            raise F5ModuleError(
+                "The attributes of '{0}' must be a dictionary.".format(self.name)
+            )
+
+    @property
+    def attributes(self):
+        if self._values['attributes'] is None:
+            return dict()
+        return self._values['attributes']
+
+    @property
+    def order(self):
+        types = [x[0] for x in self.collections]
+        return types.index(self.type)
+
+    @property
+    def collection(self):
+        path = dict(self.collections)[self.type]
+        if self.type == 'pool_member':
+            path = path.format(pool=self._uri_name(self.pool))
+        return path
+
+    @property
+    def key(self):
+        return self.collection, self.partition, self.name
+
+    @property
+    def uri(self):
+        return '{0}/{1}'.format(self.collection, self._uri_name(self.name))
+
+    def _uri_name(self, value):
+        if value.startswith('/'):
+            return value.replace('/', '~')
+        return '~{0}~{1}'.format(self.partition, value)
+
+    def api_params(self):
+        result = dict(self.attributes)
+        result.update(dict(
+            name=self.name,
+            partition=self.partition
+        ))
+        return result
+
+
+class Difference(object):
+    """Compares the wanted attributes of an object with those on the device
+
+    Only the attributes present in ``want`` are compared. Scalar values are
+    compared as stripped strings because the REST API does not always return the type
+    that it accepts (for example, ``connectionLimit``). Dictionaries, such as
+    the items of a ``profiles`` list, are compared on the keys in ``want``
+    only, so that the references and defaults the device adds are ignored.
+
+    References to other objects, such as the ``pool`` of a virtual server,
+    are compared by full path. A name that does not start with ``/`` is in
+    ``partition``, as it is when the device is given that name.
+    """
+    references = [
+        'defaultsFrom', 'destination', 'fallbackPersistence', 'lastHopPool',
+        'monitor', 'persist', 'policies', 'pool', 'profiles', 'rules', 'vlan',
+        'vlans'
+    ]
+
+    # The words of a monitor rule that are not names of monitors, as in
+    # ``min 1 of { /Common/http /Common/tcp }``
+    monitor_keywords = ['and', 'min', 'of', '{', '}']
+
+    def __init__(self, want, have=None, partition='Common'):
+        self.want = want
+        self.have = have or dict()
+        self.partition = partition
+
+    def compare(self):
+        result = dict()
+        for k, v in iteritems(self.want):
+            if not self._matches(v, self._have_value(k), self._reference(None, k)):
+                result[k] = v
+        return result
+
+    def _have_value(self, key):
+        if key in self.have:
+            return self.have[key]
+        # Subcollections, such as the profiles of a virtual server, are
+        # returned as a reference that contains the items when expanded.
+        reference = self.have.get('{0}Reference'.format(key))
+        if isinstance(reference, dict):
+            return reference.get('items', [])
+        return None
+
+    def _reference(self, parent, key):
+        """Returns the reference attribute that ``key`` is a part of, if any"""
+        if key in self.references:
+            return key
+        # The items of a reference list, such as profiles, name the object
+        if key == 'name' and parent is not None:
+            return parent
+        return None
+
+    def _matches(self, want, have, reference=None):
+        if isinstance(want, dict):
+            if not isinstance(have, dict):
+                return False
+            for k, v in iteritems(want):
+                child = self._reference(reference, k)
+                if child is not None and k == 'name' and 'fullPath' in have:
+                    value = have['fullPath']
+                else:
+                    value = have.get(k)
+                if k not in have or not self._matches(v, value, child):
+                    return False
+            return True
+        if isinstance(want, list):
+            if not isinstance(have, list) or len(want) != len(have):
+                return False
+            want = sorted(want, key=lambda x: self._sort_key(x, reference))
+            have = sorted(have, key=lambda x: self._sort_key(x, reference))
+            return all(self._matches(x, y, reference) for x, y in zip(want, have))
+        if isinstance(have, (dict, list)):
+            return False
+        if reference is not None:
+            return self._full_path(want, reference) == self._full_path(have, reference)
+        return self._scalar(want) == self._scalar(have)
+
+    def _scalar(self, value):
+        if isinstance(value, bool):
+            return str(value).lower()
+        if value is None:
+            return ''
+        if isinstance(value, string_types):
+            return value.strip()
+        return str(value)
+
+    def _full_path(self, value, reference):
+        value = self._scalar(value)
+        if reference != 'monitor':
+            return self._fqdn(value)
+        result = []
+        for word in value.split():
+            if word in self.monitor_keywords or word.isdigit():
+                result.append(word)
+            else:
+                result.append(self._fqdn(word))
+        return ' '.join(result)
+
+    def _fqdn(self, value):
+        if not value or value.startswith('/'):
+            return value
+        return '/{0}/{1}'.format(self.partition, value)
+
+    def _sort_key(self, value, reference=None):
+        if isinstance(value, dict):
+            if reference is not None:
+                return self._full_path(value.get('fullPath', value.get('name')), reference)
+            return self._scalar(value.get('name'))
+        if isinstance(value, list):
+            return ''
+        if reference is not None:
+            return self._full_path(value, reference)
+        return self._scalar(value)
+
+
+class Changes(Parameters):
+    @property
+    def objects(self):
+        return self._values['objects']
+
+
+class ModuleManager(object):
+    def __init__(self, client):
+        self.client = client
+        self.want = Parameters(self.client.module.params)
+        self.changes = Changes()
+        self._collections = dict()
+
+    def exec_module(self):
+        result = dict()
+
+        try:
+            plan = self.plan()
+            changed = bool(plan)
+            if changed and not self.client.check_mode:
+                self.apply_on_device(plan)
+        except iControlUnexpectedHTTPError as e:
+            raise F5ModuleError(str(e))
+        except TransactionSubmitException as e:
+            raise F5ModuleError(
+                "The transaction was rolled back: {0}".format(str(e))
+            )
+
+        if changed:
+            self.changes = Changes(dict(
+                objects=[self._describe(obj, action, changes) for obj, action, changes in plan]
+            ))
+        result.update(**self.changes.to_return())
+        result.update(dict(changed=changed))
+        return result
+
+    def _describe(self, obj, action, changes):
+        result = dict(
+            type=obj.type,
+            name=obj.name,
+            partition=obj.partition,
+            action=action
+        )
+        if obj.type == 'pool_member':
+            result['pool'] = obj.pool
+        if changes:
+            result['changes'] = changes
+        return result
+
+    def plan(self):
+        """Works out what needs to be sent to the device
+
+        Returns:
+            A list of ``(object, action, changes)`` tuples in the order that
+            they need to be applied. Objects that are already in the wanted
+            state are left out.
+        """
+        removals = []
+        others = []
+        for obj in self.want.objects:
+            have = self.read_current_from_device(obj)
+            if obj.state == 'absent':
+                if have is not None:
+                    removals.append((obj, 'remove', None))
+            elif have is None:
+                others.append((obj, 'create', obj.api_params()))
+            else:
+                changes = Difference(obj.attributes, have, obj.partition).compare()
+                if changes:
+                    others.append((obj, 'update', changes))
+        removals.sort(key=lambda x: x[0].order, reverse=True)
+        others.sort(key=lambda x: x[0].order)
+        return removals + others
+
+    def read_current_from_device(self, obj):
+        items = self.read_collection_from_device(obj.collection)
+        return items.get((obj.partition, obj.name))
+
+    def read_collection_from_device(self, collection):
+        """Reads all of the members of a collection, once per module run
+
+        Objects of the same type are usually managed together, so reading
+        the whole collection is one request instead of one per object.
+        """
+        if collection in self._collections:
+            return self._collections[collection]
+        uri = '{0}tm/{1}?expandSubcollections=true'.format(
+            self.client.api._meta_data['uri'], collection
+        )
+        try:
+            response = self.client.api.icrs.get(uri)
+            items = response.json().get('items', [])
+        except iControlUnexpectedHTTPError as e:
+            # The members of a pool that does not exist yet
+            if e.response.status_code != 404:
+                raise
+            items = []
+        result = dict()
+        for item in items:
+            result[(item.get('partition', 'Common'), item['name'])] = item
+        self._collections[collection] = result
+        return result
+
+    def apply_on_device(self, plan):
+        base = '{0}tm/'.format(self.client.api._meta_data['uri'])
+        tx = self.client.api.tm.transactions.transaction
+        with BigIpTxContext(tx) as api:
+            for obj, action, changes in plan:
+                if action == 'create':
+                    api.icrs.post(base + obj.collection, json=changes)
+                elif action == 'update':
+                    api.icrs.patch(base + obj.uri, json=changes)
+                elif action == 'remove':
+                    api.icrs.delete(base + obj.uri)
+
+
+class ArgumentSpec(object):
+    def __init__(self):
+        self.supports_check_mode = True
+        self.argument_spec = dict(
+            objects=dict(
+                type='list',
+                required=True
+            )
+        )
+        self.f5_product_name = 'bigip'
+
+
+def main():
+    if not HAS_F5SDK:
+        raise F5ModuleError("The python f5-sdk module is required")
+
+    spec = ArgumentSpec()
+
+    client = F5Client(
+        argument_spec=spec.argument_spec,
+        supports_check_mode=spec.supports_check_mode,
+        f5_product_name=spec.f5_product_name
+    )
+
+    try:
+        mm = ModuleManager(client)
+        results = mm.exec_module()
+        cleanup_tokens(client)
+        client.module.exit_json(**results)
+    except F5ModuleError as e:
+        cleanup_tokens(client)
+        client.module.fail_json(msg=str(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -86,6 +86,16 @@ options:
       - absent
       - installed
       - present
+  upload_chunk_size:
+    description:
+      - Size, in bytes, of the pieces that the UCS file is uploaded in.
+      - The file is read from disk one piece at a time, so this is also the
+        most memory the upload uses on the Ansible controller.
+      - An upload that was interrupted is resumed from the pieces that the
+        device already has, and the checksum of the uploaded file is
+        verified against the local file.
+    default: 524288
+    version_added: 2.5
 notes:
    - Requires the f5-sdk Python package on the host. This is as easy as
      pip install f5-sdk.
@@ -177,7 +187,15 @@ EXAMPLES = r'''
 '''
 
 RETURN = r'''
-# only common fields returned
+upload:
+  description:
+    - Statistics of the upload of the UCS file.
+    - C(sent) is the number of bytes sent, and C(resumed) the number of bytes
+      that the device already had from an earlier upload.
+    - C(throughput) is in bytes per second.
+  returned: changed
+  type: dict
+  sample: {"size": 104857600, "sent": 104857600, "resumed": 0, "seconds": 4.1, "throughput": 25574536, "checksum": "9a0e..."}
 '''
 
 import os
@@ -185,13 +203,24 @@ import re
 import sys
 import time
 
-from distutils.version import LooseVersion
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5FileUploader
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5Poller
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5FileUploader
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5Poller
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from collections import OrderedDict
 except ImportError:
@@ -209,7 +238,7 @@ except ImportError:
 class Parameters(AnsibleF5Parameters):
     api_map = {}
     updatables = []
-    returnables = []
+    returnables = ['upload']
     api_attributes = []
 
     def _check_required_if(self, parameter):
@@ -294,6 +323,7 @@ class Parameters(AnsibleF5Parameters):
 class ModuleManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
 
     def exec_module(self):
         if self.is_version_v1():
@@ -313,11 +343,7 @@ class ModuleManager(object):
 
         :return: Bool
         """
-        version = self.client.api.tmos_version
-        if LooseVersion(version) < LooseVersion('12.1.0'):
-            return True
-        else:
-            return False
+        return self.capabilities.version_is_less_than('12.1.0')
 
 
 class BaseManager(object):
@@ -403,24 +429,16 @@ class BaseManager(object):
                 time.sleep(3)
 
     def wait_for_configuration_reload(self):
-        noops = 0
-        while noops < 4:
-            time.sleep(3)
-            try:
-                output = self.client.api.tm.util.bash.exec_cmd(
-                    'run',
-                    utilCmdArgs='-c "tmsh show sys mcp-state"'
-                )
-            except Exception as ex:
-                # This can be caused by restjavad restarting.
-                continue
-
-            if not hasattr(output, 'commandResult'):
-                continue
+        def read_mcp_state():
+            output = self.client.api.tm.util.bash.exec_cmd(
+                'run',
+                utilCmdArgs='-c "tmsh show sys mcp-state"'
+            )
+            return getattr(output, 'commandResult', None)
 
-            # Need to re-connect here because the REST framework will be restarting
-            # and thus be clearing its authorization cache
-            result = output.commandResult
+        def configuration_reloaded(result):
+            if result is None:
+                return False
             if self._is_config_reloading_failed_on_device(result):
                 raise F5ModuleError(
                     "Failed to reload the configuration. This may be due "
@@ -428,9 +446,19 @@ class BaseManager(object):
                 )
             if self._is_config_reloading_success_on_device(result):
                 if self._is_config_reloading_running_on_device(result):
-                    noops += 1
-                    continue
-            noops = 0
+                    return True
+            return False
+
+        poller = F5Poller(interval=3, max_interval=15)
+
+        # Exceptions can be caused by restjavad restarting.
+        poller.poll(
+            read_mcp_state,
+            until=configuration_reloaded,
+            stable=4,
+            ignore=(Exception,),
+            initial_delay=3
+        )
 
     def _is_config_reloading_success_on_device(self, output):
         succeed = r'Last Configuration Load Status\s+full-config-load-succeed'
@@ -470,12 +498,17 @@ class V1Manager(BaseManager):
         remote_path = "/var/local/ucs"
         tpath_name = '/var/config/rest/downloads'
 
-        upload = self.client.api.shared.file_transfer.uploads
+        uploader = F5FileUploader(
+            self.client.api,
+            endpoint='file',
+            chunk_size=self.want.upload_chunk_size
+        )
 
         try:
-            upload.upload_file(self.want.ucs)
+            stats = uploader.upload(self.want.ucs)
         except IOError as ex:
             raise F5ModuleError(str(ex))
+        self.changes.update(dict(upload=stats))
 
         self.client.api.tm.util.unix_mv.exec_cmd(
             'run',
@@ -531,6 +564,9 @@ class V1Manager(BaseManager):
                 raise F5ModuleError(str(ex))
         self.wait_for_rest_api_restart()
         self.wait_for_configuration_reload()
+
+        # The UCS can change the provisioning and HA state of the device
+        F5DeviceCapabilities(self.client).invalidate()
         return True
 
 
@@ -582,28 +618,22 @@ class ArgumentSpec(object):
                 default='present',
                 choices=['absent', 'installed', 'present']
             ),
-            ucs=dict(required=True)
+            ucs=dict(required=True),
+            upload_chunk_size=dict(
+                type='int',
+                default=524288
+            )
         )
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
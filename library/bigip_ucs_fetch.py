@@ -44,6 +44,21 @@ options:
     description:
       - A directory to save the UCS file into.
     required: yes
+  download_chunk_size:
+    description:
+      - Size, in bytes, of the pieces that the UCS file is downloaded in.
+      - Each piece is added to the checksums of the file as it arrives, so
+        the downloaded file is not read again to compute them.
+    default: 524288
+    version_added: 2.5
+  compute_sha256:
+    description:
+      - Also compute the SHA256 checksum of the downloaded file.
+    default: no
+    choices:
+      - yes
+      - no
+    version_added: 2.5
   encryption_password:
     description:
       - Password to use to encrypt the UCS file if desired
@@ -65,10 +80,12 @@ options:
 notes:
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk.
-  - BIG-IP provides no way to get a checksum of the UCS files on the system
-    via any interface except, perhaps, logging in directly to the box (which
-    would not support appliance mode). Therefore, the best this module can
-    do is check for the existence of the file on disk; no checksumming.
+  - When the bash utility is available on the BIG-IP, the size and SHA1
+    checksum of the remote UCS file are compared with an existing C(dest).
+    If they match, the file is not downloaded again. An interrupted download
+    is resumed, and the checksum of the downloaded file is verified.
+  - In appliance mode the bash utility is not available. The UCS file is
+    then always downloaded, and is not verified.
 requirements:
   - f5-sdk
 author:
@@ -134,6 +151,43 @@ md5sum:
   returned: changed or success
   type: string
   sample: 96cacab4c259c4598727d7cf2ceb3b45
+sha256sum:
+  description: The SHA256 checksum of the downloaded file
+  returned: changed or success, and if compute_sha256=yes
+  type: string
+  sample: 4a5b4e7a6d0ebe8d5ab1d4c3f7bb1a9aa1b6bb8fb4d1c1b6c26d9a0b3b2e8f16
+download:
+  description:
+    - Statistics of the download. C(skipped) is true when C(dest) already
+      matched the UCS on the device.
+  returned: changed or success
+  type: complex
+  contains:
+    size:
+      description: Size of the UCS file, in bytes.
+      returned: changed or success
+      type: int
+      sample: 2147483648
+    received:
+      description: Number of bytes that were downloaded.
+      returned: changed or success
+      type: int
+      sample: 1073741824
+    resumed:
+      description: Number of bytes kept from an interrupted download.
+      returned: changed or success
+      type: int
+      sample: 1073741824
+    skipped:
+      description: Whether C(dest) already matched and nothing was downloaded.
+      returned: changed or success
+      type: bool
+      sample: false
+    throughput:
+      description: Bytes received per second.
+      returned: changed or success
+      type: int
+      sample: 52428800
 mode:
   description: Permissions of the target UCS, after execution
   returned: success
@@ -150,13 +204,22 @@ import os
 import tempfile
 import re
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
-from distutils.version import LooseVersion
+
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5FileDownloader
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5FileDownloader
+    from ansible.module_utils.f5networks.common import cleanup_tokens
 
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
@@ -166,7 +229,10 @@ except ImportError:
 
 class Parameters(AnsibleF5Parameters):
     updatables = []
-    returnables = ['dest', 'src', 'md5sum', 'checksum', 'backup_file']
+    returnables = [
+        'dest', 'src', 'md5sum', 'checksum', 'sha256sum', 'backup_file',
+        'download'
+    ]
     api_attributes = []
     api_map = {}
 
@@ -211,14 +277,17 @@ class Parameters(AnsibleF5Parameters):
 
     @property
     def dest(self):
+        if self._values['dest'] is None:
+            return None
         return os.path.expanduser(self._values['dest'])
 
     @property
     def src(self):
-        if self._values['src'] is not None:
-            return self._values['src']
-        result = next(tempfile._get_candidate_names())
-        return result
+        if self._values['src'] is None:
+            # Generated once, so that the UCS that is created is also the
+            # one that is downloaded
+            self._values['src'] = next(tempfile._get_candidate_names())
+        return self._values['src']
 
     @property
     def fulldest(self):
@@ -271,6 +340,7 @@ class Parameters(AnsibleF5Parameters):
 class ModuleManager(object):
     def __init__(self, client):
         self.client = client
+        self.capabilities = F5DeviceCapabilities(self.client)
 
     def exec_module(self):
         if self.is_version_v1():
@@ -290,11 +360,7 @@ class ModuleManager(object):
 
         :return: bool
         """
-        version = self.client.api.tmos_version
-        if LooseVersion(version) < LooseVersion('12.1.0'):
-            return True
-        else:
-            return False
+        return self.capabilities.version_is_less_than('12.1.0')
 
 
 class BaseManager(object):
@@ -308,19 +374,19 @@ class BaseManager(object):
         result = dict()
 
         try:
-            self.present()
+            changed = self.present()
         except iControlUnexpectedHTTPError as e:
             raise F5ModuleError(str(e))
 
         result.update(**self.changes.to_return())
-        result.update(dict(changed=True))
+        result.update(dict(changed=changed))
         return result
 
     def present(self):
         if self.exists():
-            self.update()
+            return self.update()
         else:
-            self.create()
+            return self.create()
 
     def update(self):
         if os.path.exists(self.want.fulldest):
@@ -328,39 +394,35 @@ class BaseManager(object):
                 raise F5ModuleError(
                     "File '{0}' already exists".format(self.want.fulldest)
                 )
-        self.execute()
+        return self.execute()
 
     def execute(self):
         try:
-            if self.want.backup:
-                if os.path.exists(self.want.fulldest):
-                    backup_file = self.client.module.backup_local(self.want.fulldest)
-                    self.changes.update({'backup_file': backup_file})
-            self.download()
+            stats = self.download()
         except IOError:
             raise F5ModuleError(
                 "Failed to copy: {0} to {1}".format(self.want.src, self.want.fulldest)
             )
 
-        self._set_checksum()
-        self._set_md5sum()
+        checksums = stats.pop('checksums')
+        self.changes.update(dict(
+            dest=self.want.fulldest,
+            src=self.want.src,
+            checksum=checksums['sha1'],
+            md5sum=checksums['md5'],
+            sha256sum=checksums.get('sha256'),
+            download=stats
+        ))
 
         file_args = self.client.module.load_file_common_arguments(self.client.module.params)
-        return self.client.module.set_fs_attributes_if_different(file_args, True)
-
-    def _set_checksum(self):
-        try:
-            result = self.client.module.sha1(self.want.fulldest)
-            self.want.update({'checksum': result})
-        except ValueError:
-            pass
+        return self.client.module.set_fs_attributes_if_different(
+            file_args, not stats['skipped']
+        )
 
-    def _set_md5sum(self):
-        try:
-            result = self.client.module.md5(self.want.fulldest)
-            self.want.update({'md5sum': result})
-        except ValueError:
-            pass
+    def backup(self, dest):
+        if self.want.backup:
+            backup_file = self.client.module.backup_local(dest)
+            self.changes.update({'backup_file': backup_file})
 
     def create(self):
         if self.want.fail_on_missing:
@@ -394,15 +456,25 @@ class BaseManager(object):
             )
 
     def download(self):
-        self.download_from_device()
-        if os.path.exists(self.want.dest):
-            return True
-        raise F5ModuleError(
-            "Failed to download the remote file"
+        algorithms = ['sha1', 'md5']
+        if self.want.compute_sha256:
+            algorithms.append('sha256')
+        downloader = F5FileDownloader(
+            self.client.api,
+            endpoint=self.endpoint,
+            chunk_size=self.want.download_chunk_size,
+            hash_algorithms=algorithms
+        )
+        return downloader.download(
+            os.path.basename(self.want.src),
+            self.want.fulldest,
+            before_replace=self.backup
         )
 
 
 class V1Manager(BaseManager):
+    endpoint = 'madm'
+
     def __init__(self, client):
         super(V1Manager, self).__init__(client)
         self.remote_dir = '/var/config/rest/madm'
@@ -430,17 +502,25 @@ class V1Manager(BaseManager):
             return True
         return False
 
-    def download_from_device(self):
-        madm = self.client.api.shared.file_transfer.madm
-        madm.download_file(self.want.filename, self.want.dest)
-        if os.path.exists(self.want.dest):
-            return True
-        return False
+    def download(self):
+        # Before 12.1, files can only be downloaded from the madm directory.
+        # The UCS is moved there for the download, and back afterwards.
+        self._move_to_download()
+        try:
+            return super(V1Manager, self).download()
+        finally:
+            self._move_from_download()
 
     def _move_to_download(self):
+        return self._move('/var/local/ucs', self.remote_dir)
+
+    def _move_from_download(self):
+        return self._move(self.remote_dir, '/var/local/ucs')
+
+    def _move(self, source, destination):
         try:
-            move_path = '/var/local/ucs/{0} {1}/{0}'.format(
-                self.want.filename, self.remote_dir
+            move_path = '{0}/{2} {1}/{2}'.format(
+                source, destination, os.path.basename(self.want.src)
             )
             self.client.api.tm.util.unix_mv.exec_cmd(
                 'run',
@@ -452,6 +532,8 @@ class V1Manager(BaseManager):
 
 
 class V2Manager(BaseManager):
+    endpoint = 'ucs'
+
     def read_current_from_device(self):
         collection = self.client.api.tm.sys.ucs.load()
         if 'items' not in collection.attrs:
@@ -467,13 +549,6 @@ class V2Manager(BaseManager):
             return True
         return False
 
-    def download_from_device(self):
-        ucs = self.client.api.shared.file_transfer.ucs_downloads
-        ucs.download_file(self.want.src, self.want.dest)
-        if os.path.exists(self.want.dest):
-            return True
-        return False
-
 
 class ArgumentSpec(object):
     def __init__(self):
@@ -489,6 +564,14 @@ class ArgumentSpec(object):
             ),
             encryption_password=dict(no_log=True),
             dest=dict(required=True),
+            download_chunk_size=dict(
+                type='int',
+                default=524288
+            ),
+            compute_sha256=dict(
+                default='no',
+                type='bool'
+            ),
             force=dict(
                 default='yes',
                 type='bool'
@@ -503,23 +586,13 @@ class ArgumentSpec(object):
         self.add_file_common_args = True
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
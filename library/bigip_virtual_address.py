@@ -199,13 +199,21 @@ try:
 except ImportError:
     HAS_NETADDR = False
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.parsing.convert_bool import BOOLEANS_TRUE
 from ansible.module_utils.parsing.convert_bool import BOOLEANS_FALSE
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -392,9 +400,9 @@ class Difference(object):
             return self.want.traffic_group
 
 
-class ModuleManager(object):
+class ModuleManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(ModuleManager, self).__init__(client)
         self.have = None
         self.want = Parameters(self.client.module.params)
         self.changes = Changes()
@@ -462,19 +470,15 @@ class ModuleManager(object):
         return changed
 
     def read_current_from_device(self):
-        resource = self.client.api.tm.ltm.virtual_address_s.virtual_address.load(
-            name=self.want.address,
-            partition=self.want.partition
-        )
+        resource = self.load()
         result = resource.attrs
         return Parameters(result)
 
-    def exists(self):
-        result = self.client.api.tm.ltm.virtual_address_s.virtual_address.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.virtual_address_s.virtual_address.load(
             name=self.want.address,
             partition=self.want.partition
         )
-        return result
 
     def update(self):
         self.have = self.read_current_from_device()
@@ -499,10 +503,7 @@ class ModuleManager(object):
 
     def update_on_device(self):
         params = self.want.api_params()
-        resource = self.client.api.tm.ltm.virtual_address_s.virtual_address.load(
-            name=self.want.address,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.modify(**params)
 
     def create(self):
@@ -512,33 +513,29 @@ class ModuleManager(object):
         if self.client.check_mode:
             return True
         self.create_on_device()
-        if self.exists():
-            return True
-        else:
-            raise F5ModuleError("Failed to create the virtual address")
+        return True
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.virtual_address_s.virtual_address.create(
+        resource = self.client.api.tm.ltm.virtual_address_s.virtual_address.create(
             name=self.want.address,
             partition=self.want.partition,
             address=self.want.address,
             **params
         )
+        self.remember(resource)
 
     def remove(self):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the virtual address")
         return True
 
     def remove_from_device(self):
-        resource = self.client.api.tm.ltm.virtual_address_s.virtual_address.load(
-            name=self.want.address,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.delete()
 
 
@@ -582,16 +579,6 @@ class ArgumentSpec(object):
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
@@ -601,7 +588,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
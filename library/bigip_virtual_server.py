@@ -240,7 +240,6 @@ deleted:
 import netaddr
 import re
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
@@ -249,6 +248,15 @@ from ansible.module_utils.six import iteritems
 from collections import defaultdict
 from collections import namedtuple
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
 
 class Parameters(AnsibleF5Parameters):
     def __init__(self, params=None):
@@ -1090,9 +1098,9 @@ class ModuleManager(object):
         self.client.module.params['name'] = destination.ip
 
 
-class BaseManager(object):
+class BaseManager(F5ResourceManager):
     def __init__(self, client):
-        self.client = client
+        super(BaseManager, self).__init__(client)
         self.have = None
 
     def exec_module(self):
@@ -1168,6 +1176,7 @@ class BaseManager(object):
         if self.client.check_mode:
             return True
         self.remove_from_device()
+        self.forget()
         if self.exists():
             raise F5ModuleError("Failed to delete the resource")
         return True
@@ -1206,13 +1215,6 @@ class VirtualServerManager(BaseManager):
             return True
         return False
 
-    def exists(self):
-        result = self.client.api.tm.ltm.virtuals.virtual.exists(
-            name=self.want.name,
-            partition=self.want.partition
-        )
-        return result
-
     def create(self):
         required_resources = ['destination', 'port']
 
@@ -1245,14 +1247,11 @@ class VirtualServerManager(BaseManager):
 
     def update_on_device(self):
         params = self.changes.api_params()
-        resource = self.client.api.tm.ltm.virtuals.virtual.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.modify(**params)
 
-    def read_current_from_device(self):
-        result = self.client.api.tm.ltm.virtuals.virtual.load(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.virtuals.virtual.load(
             name=self.want.name,
             partition=self.want.partition,
             requests_params=dict(
@@ -1261,6 +1260,9 @@ class VirtualServerManager(BaseManager):
                 )
             )
         )
+
+    def read_current_from_device(self):
+        result = self.load()
         params = result.attrs
         params.update(dict(kind=result.to_dict().get('kind', None)))
         result = VirtualServerApiParameters(params)
@@ -1268,17 +1270,15 @@ class VirtualServerManager(BaseManager):
 
     def create_on_device(self):
         params = self.want.api_params()
-        self.client.api.tm.ltm.virtuals.virtual.create(
+        resource = self.client.api.tm.ltm.virtuals.virtual.create(
             name=self.want.name,
             partition=self.want.partition,
             **params
         )
+        self.remember(resource)
 
     def remove_from_device(self):
-        resource = self.client.api.tm.ltm.virtuals.virtual.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         if resource:
             resource.delete()
 
@@ -1317,27 +1317,20 @@ class VirtualAddressManager(BaseManager):
         return False
 
     def read_current_from_device(self):
-        result = self.client.api.tm.ltm.virtual_address_s.virtual_address.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        result = self.load()
         result = VirtualAddressParameters(result.attrs)
         return result
 
     def update_on_device(self):
         params = self.want.api_params()
-        resource = self.client.api.tm.ltm.virtual_address_s.virtual_address.load(
-            name=self.want.name,
-            partition=self.want.partition
-        )
+        resource = self.load()
         resource.modify(**params)
 
-    def exists(self):
-        result = self.client.api.tm.ltm.virtual_address_s.virtual_address.exists(
+    def load_on_device(self):
+        return self.client.api.tm.ltm.virtual_address_s.virtual_address.load(
             name=self.want.name,
             partition=self.want.partition
         )
-        return result
 
 
 class ArgumentSpec(object):
@@ -1396,23 +1389,13 @@ class ArgumentSpec(object):
         ]
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
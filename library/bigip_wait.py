@@ -40,7 +40,26 @@ options:
   msg:
     description:
       - This overrides the normal error message from a failure to meet the required conditions.
+  devices:
+    description:
+      - List of devices to wait for at the same time, instead of the device
+        given in C(server).
+      - Each device is either the address of the device, or a dictionary with
+        the key C(server), and optionally C(server_port), C(user) and
+        C(password). The C(server_port), C(user) and C(password) arguments of
+        the module are used for the devices that do not specify them.
+      - The task fails if any of the devices is not ready within C(timeout).
+    version_added: 2.5
+  concurrency:
+    description:
+      - Number of devices in C(devices) that are waited for at the same time.
+    default: 20
+    version_added: 2.5
 notes:
+  - Each check first opens a TCP connection to the device, then makes an
+    unauthenticated request to its REST API. The module only logs in to the
+    device once the REST API answers, so that a device that is still
+    rebooting is not sent logins that can only time out.
   - Requires the f5-sdk Python package on the host. This is as easy as pip
     install f5-sdk.
 requirements:
@@ -73,17 +92,53 @@ EXAMPLES = r'''
     server: lb.mydomain.com
     user: admin
   delegate_to: localhost
+
+- name: Wait for all of the BIG-IPs of a rolling upgrade to be ready
+  bigip_wait:
+    devices: "{{ groups['bigips'] }}"
+    timeout: 1800
+    password: secret
+    user: admin
+  delegate_to: localhost
+  run_once: true
 '''
 
 RETURN = r'''
-# only common fields returned
+elapsed:
+  description: Seconds that it took for the device, or all of the devices, to be ready.
+  returned: always
+  type: int
+  sample: 96
+devices:
+  description: The result of each device, when C(devices) is given.
+  returned: When C(devices) is given.
+  type: complex
+  contains:
+    server:
+      description: Address of the device.
+      returned: always
+      type: string
+      sample: lb1.mydomain.com
+    ready:
+      description: Whether the device was ready within C(timeout).
+      returned: always
+      type: bool
+      sample: true
+    elapsed:
+      description: Seconds from the start of the task until the device was ready.
+      returned: always
+      type: int
+      sample: 87
+  sample: hash/dictionary of values
 '''
 
 import datetime
 import signal
+import socket
 import time
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
 from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
@@ -91,10 +146,24 @@ from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.f5_utils import F5_COMMON_ARGS
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
 try:
+    from library.module_utils.f5networks.common import F5Poller
+    from library.module_utils.f5networks.common import no_log_device_passwords
+    from library.module_utils.f5networks.common import parse_device_list
+    from library.module_utils.f5networks.common import cleanup_tokens
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Poller
+    from ansible.module_utils.f5networks.common import no_log_device_passwords
+    from ansible.module_utils.f5networks.common import parse_device_list
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+
+try:
+    import requests
     from f5.bigip import ManagementRoot as BigIpMgmt
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from requests.exceptions import RequestException
 except ImportError:
     HAS_F5SDK = False
 
@@ -239,53 +308,87 @@ class Parameters(AnsibleF5Parameters):
             return None
         return int(self._values['sleep'])
 
+    @property
+    def devices(self):
+        if self._values['devices'] is None:
+            return None
+        return parse_device_list(
+            self._values['devices'],
+            server_port=self._values['server_port'],
+            user=self._values['user'],
+            password=self._values['password']
+        )
+
+    @property
+    def concurrency(self):
+        if self._values['concurrency'] is None:
+            return None
+        if self._values['concurrency'] < 1:
+            raise F5ModuleError(
+                "The 'concurrency' parameter must be at least 1."
+            )
+        return self._values['concurrency']
+
 
 class Changes(Parameters):
-    pass
+    returnables = [
+        'elapsed', 'devices'
+    ]
 
+    @property
+    def devices(self):
+        return self._values['devices']
 
-class ModuleManager(object):
-    def __init__(self, client):
-        self.client = client
-        self.have = None
-        self.want = Parameters(self.client.module.params)
-        self.changes = Parameters()
 
-    def exec_module(self):
-        result = dict()
+class DeviceClient(object):
+    """Connection to one of the devices in ``devices``
 
+    Provides the parts of AnsibleF5ClientStub that DeviceWaiter uses.
+    """
+    def __init__(self, device):
+        self._connect_params = dict(device)
+        self.api = None
+
+    def connect(self):
         try:
-            changed = self.execute()
-        except iControlUnexpectedHTTPError as e:
-            raise F5ModuleError(str(e))
+            self.api = BigIpMgmt(
+                self._connect_params['server'],
+                self._connect_params['user'],
+                self._connect_params['password'],
+                port=self._connect_params['server_port'],
+                timeout=1,
+                token='tmos'
+            )
+            return True
+        except Exception:
+            return False
 
-        changes = self.changes.to_return()
-        result.update(**changes)
-        result.update(dict(changed=changed))
-        self._announce_deprecations(result)
-        return result
 
-    def _announce_deprecations(self, result):
-        warnings = result.pop('__warnings', [])
-        for warning in warnings:
-            self.client.module.deprecate(
-                msg=warning['msg'],
-                version=warning['version']
-            )
+class DeviceWaiter(object):
+    """Waits for one device to be ready to accept configuration
 
-    def execute(self):
-        signal.signal(
-            signal.SIGALRM,
-            lambda sig, frame: hard_timeout(self.client, self.want, start)
-        )
+    Each check goes through stages that cost more and more, and stops at the
+    first one that fails. A TCP connection to the device is attempted first,
+    then an unauthenticated request is sent to the REST API, and only when
+    that answers is a login attempted. A device that is rebooting therefore
+    does not have logins sent to it that can only fail after a timeout.
+    """
+    # Seconds to wait for the TCP connection and for the REST API to answer
+    probe_timeout = 5
 
-        # setup handler before scheduling signal, to eliminate a race
-        signal.alarm(int(self.want.timeout))
+    def __init__(self, client, want):
+        self.client = client
+        self.want = want
 
-        start = datetime.datetime.utcnow()
-        if self.want.delay:
-            time.sleep(float(self.want.delay))
-        end = start + datetime.timedelta(seconds=int(self.want.timeout))
+    def wait_until(self, end):
+        """Waits for the device to be ready
+
+        Args:
+            end (datetime): Time at which to give up.
+
+        Returns:
+            bool: Whether the device became ready before ``end``.
+        """
         while datetime.datetime.utcnow() < end:
             time.sleep(int(self.want.sleep))
             try:
@@ -302,7 +405,7 @@ class ModuleManager(object):
 
                 if self._is_mprov_running_on_device():
                     self._wait_for_module_provisioning()
-                break
+                return True
             except Exception:
                 # The types of exception's we're handling here are "REST API is not
                 # ready" exceptions.
@@ -331,19 +434,43 @@ class ModuleManager(object):
                 #   exceeded with url: /mgmt/shared/authn/login (Caused by
                 #   SSLError(SSLError(\"bad handshake: SysCallError(-1, 'Unexpected EOF')\",),)),
                 continue
-        else:
-            elapsed = datetime.datetime.utcnow() - start
-            self.client.module.fail_json(
-                msg=self.want.msg or "Timeout when waiting for BIG-IP", elapsed=elapsed.seconds
-            )
-        elapsed = datetime.datetime.utcnow() - start
-        self.changes.update({'elapsed': elapsed.seconds})
         return False
 
     def _connect_to_device(self):
+        if not self._port_is_open():
+            return False
+        if not self._rest_api_answers():
+            return False
         result = self.client.connect()
         return result
 
+    def _port_is_open(self):
+        params = self.client._connect_params
+        try:
+            sock = socket.create_connection(
+                (params['server'], params['server_port']),
+                timeout=self.probe_timeout
+            )
+        except (socket.error, socket.timeout):
+            return False
+        sock.close()
+        return True
+
+    def _rest_api_answers(self):
+        params = self.client._connect_params
+        uri = 'https://{0}:{1}/mgmt/tm/sys/'.format(
+            params['server'], params['server_port']
+        )
+        try:
+            response = requests.get(
+                uri, verify=False, timeout=self.probe_timeout
+            )
+        except RequestException:
+            return False
+        # Without credentials, a REST API that is up rejects the request.
+        # While the device starts, other errors are returned instead.
+        return response.status_code in [200, 401]
+
     def _device_is_rebooting(self):
         output = self.client.api.tm.util.bash.exec_cmd(
             'run',
@@ -357,21 +484,20 @@ class ModuleManager(object):
 
     def _wait_for_module_provisioning(self):
         # To prevent things from running forever, the hack is to check
-        # for mprov's status twice. If mprov is finished, then in most
-        # cases (not ASM) the provisioning is probably ready.
-        nops = 0
-        # Sleep a little to let provisioning settle and begin properly
-        time.sleep(5)
-        while nops < 4:
-            try:
-                if not self._is_mprov_running_on_device():
-                    nops += 1
-                else:
-                    nops = 0
-            except Exception:
-                # This can be caused by restjavad restarting.
-                pass
-            time.sleep(10)
+        # for mprov's status several times. If mprov is finished, then in
+        # most cases (not ASM) the provisioning is probably ready.
+        poller = F5Poller(interval=10, max_interval=30)
+
+        # Sleep a little to let provisioning settle and begin properly.
+        #
+        # Exceptions can be caused by restjavad restarting.
+        poller.poll(
+            self._is_mprov_running_on_device,
+            until=lambda running: not running,
+            stable=4,
+            ignore=(Exception,),
+            initial_delay=5
+        )
 
     def _is_mprov_running_on_device(self):
         output = self.client.api.tm.util.bash.exec_cmd(
@@ -382,6 +508,130 @@ class ModuleManager(object):
             return True
         return False
 
+    def cleanup_token(self):
+        if self.client.api is None:
+            return
+        try:
+            resource = self.client.api.shared.authz.tokens_s.token.load(
+                name=self.client.api.icrs.token
+            )
+            resource.delete()
+        except Exception:
+            pass
+
+
+class ModuleManager(DeviceWaiter):
+    def __init__(self, client):
+        self.client = client
+        self.have = None
+        self.want = Parameters(self.client.module.params)
+        no_log_device_passwords(self.client.module, self.client.module.params.get('devices'))
+        self.changes = Changes()
+
+    def exec_module(self):
+        result = dict()
+
+        try:
+            if self.want.devices is not None:
+                changed = self.execute_on_devices()
+            else:
+                changed = self.execute()
+        except iControlUnexpectedHTTPError as e:
+            raise F5ModuleError(str(e))
+
+        changes = self.changes.to_return()
+        result.update(**changes)
+        result.update(dict(changed=changed))
+        self._announce_deprecations(result)
+        return result
+
+    def _announce_deprecations(self, result):
+        warnings = result.pop('__warnings', [])
+        for warning in warnings:
+            self.client.module.deprecate(
+                msg=warning['msg'],
+                version=warning['version']
+            )
+
+    def execute(self):
+        signal.signal(
+            signal.SIGALRM,
+            lambda sig, frame: hard_timeout(self.client, self.want, start)
+        )
+
+        # setup handler before scheduling signal, to eliminate a race
+        signal.alarm(int(self.want.timeout))
+
+        start = datetime.datetime.utcnow()
+        if self.want.delay:
+            time.sleep(float(self.want.delay))
+        end = start + datetime.timedelta(seconds=int(self.want.timeout))
+        if not self.wait_until(end):
+            elapsed = datetime.datetime.utcnow() - start
+            self.client.module.fail_json(
+                msg=self.want.msg or "Timeout when waiting for BIG-IP", elapsed=elapsed.seconds
+            )
+        elapsed = datetime.datetime.utcnow() - start
+        self.changes.update({'elapsed': elapsed.seconds})
+        return False
+
+    def execute_on_devices(self):
+        devices = self.want.devices
+        if not devices:
+            raise F5ModuleError("At least one device must be given.")
+
+        signal.signal(
+            signal.SIGALRM,
+            lambda sig, frame: hard_timeout(self.client, self.want, start)
+        )
+
+        # Each device gives up by itself once the timeout is over. This only
+        # stops a device whose last check is still running long after that.
+        signal.alarm(int(self.want.timeout) + 60)
+
+        start = datetime.datetime.utcnow()
+        if self.want.delay:
+            time.sleep(float(self.want.delay))
+        end = start + datetime.timedelta(seconds=int(self.want.timeout))
+
+        waiters = [self.get_waiter(x) for x in devices]
+        pool = ThreadPool(min(self.want.concurrency, len(waiters)))
+        try:
+            results = pool.map(
+                lambda x: self.wait_for_waiter(x, start, end), waiters, chunksize=1
+            )
+        finally:
+            pool.close()
+            pool.join()
+            signal.alarm(0)
+
+        elapsed = datetime.datetime.utcnow() - start
+        self.changes.update(dict(elapsed=elapsed.seconds, devices=results))
+        failed = [x['server'] for x in results if not x['ready']]
+        if failed:
+            self.client.module.fail_json(
+                msg=self.want.msg or "Timeout when waiting for BIG-IP: {0}".format(
+                    ', '.join(failed)
+                ),
+                **self.changes.to_return()
+            )
+        return False
+
+    def get_waiter(self, device):
+        return DeviceWaiter(DeviceClient(device), self.want)
+
+    def wait_for_waiter(self, waiter, start, end):
+        try:
+            ready = waiter.wait_until(end)
+        finally:
+            waiter.cleanup_token()
+        elapsed = datetime.datetime.utcnow() - start
+        return dict(
+            server=waiter.client._connect_params['server'],
+            ready=ready,
+            elapsed=elapsed.seconds
+        )
+
 
 class ArgumentSpec(object):
     def __init__(self):
@@ -390,21 +640,19 @@ class ArgumentSpec(object):
             timeout=dict(default=7200, type='int'),
             delay=dict(default=0, type='int'),
             sleep=dict(default=1, type='int'),
-            msg=dict()
+            msg=dict(),
+            devices=dict(type='list'),
+            concurrency=dict(default=20, type='int'),
+            # The devices are given in the devices argument instead
+            server=dict(
+                type='str',
+                fallback=(env_fallback, ['F5_SERVER'])
+            )
         )
+        self.required_one_of = [['server', 'devices']]
         self.f5_product_name = 'bigip'
 
 
-def cleanup_tokens(client):
-    try:
-        resource = client.api.shared.authz.tokens_s.token.load(
-            name=client.api.icrs.token
-        )
-        resource.delete()
-    except Exception:
-        pass
-
-
 def main():
     if not HAS_F5SDK:
         raise F5ModuleError("The python f5-sdk module is required")
@@ -414,6 +662,7 @@ def main():
     client = AnsibleF5ClientStub(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
+        required_one_of=spec.required_one_of,
         f5_product_name=spec.f5_product_name,
     )
 
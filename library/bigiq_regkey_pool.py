@@ -70,13 +70,19 @@ description:
 '''
 
 
-from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import AnsibleF5Parameters
 from ansible.module_utils.f5_utils import HAS_F5SDK
 from ansible.module_utils.f5_utils import F5ModuleError
 from ansible.module_utils.six import iteritems
 from collections import defaultdict
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5CollectionQuery
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5CollectionQuery
+
 try:
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
 except ImportError:
@@ -165,8 +171,12 @@ class ModuleParameters(Parameters):
 
         :return:
         """
-        collection = self.client.api.cm.device.licensing.pool.regkey.licenses_s.get_collection()
-        resource = next((x for x in collection if x.name == self._values['name']), None)
+        query = F5CollectionQuery(
+            self.client.api.cm.device.licensing.pool.regkey.licenses_s,
+            filter='name eq {0}'.format(F5CollectionQuery.quote(self._values['name'])),
+            page_size=500
+        )
+        resource = query.first(lambda x: x.name == self._values['name'])
         if resource:
             return resource.id
         else:
@@ -371,7 +381,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
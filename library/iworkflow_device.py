@@ -70,13 +70,17 @@ RETURN = '''
 
 import time
 from ansible.module_utils.f5_utils import (
-    AnsibleF5Client,
     AnsibleF5Parameters,
     F5ModuleError,
     HAS_F5SDK,
     iControlUnexpectedHTTPError
 )
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+
 
 class Parameters(AnsibleF5Parameters):
     api_map = {
@@ -303,7 +307,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
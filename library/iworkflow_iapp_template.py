@@ -86,7 +86,6 @@ import re
 import time
 
 from ansible.module_utils.f5_utils import (
-    AnsibleF5Client,
     AnsibleF5Parameters,
     defaultdict,
     F5ModuleError,
@@ -99,6 +98,11 @@ from f5.utils.iapp_parser import (
     NonextantTemplateNameException
 )
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+
 
 class Parameters(AnsibleF5Parameters):
     api_map = {
@@ -354,7 +358,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
@@ -57,7 +57,6 @@ RETURN = '''
 import time
 
 from ansible.module_utils.f5_utils import (
-    AnsibleF5Client,
     AnsibleF5Parameters,
     defaultdict,
     F5ModuleError,
@@ -66,6 +65,11 @@ from ansible.module_utils.f5_utils import (
     defaultdict
 )
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+
 
 class Parameters(AnsibleF5Parameters):
     returnables = []
@@ -346,7 +350,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
@@ -159,7 +159,6 @@ import netaddr
 import time
 
 from ansible.module_utils.f5_utils import (
-    AnsibleF5Client,
     AnsibleF5Parameters,
     F5ModuleError,
     HAS_F5SDK,
@@ -168,6 +167,13 @@ from ansible.module_utils.f5_utils import (
     iControlUnexpectedHTTPError
 )
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5CollectionQuery
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5CollectionQuery
+
 
 class Device(object):
     def __init__(self, *args, **kwargs):
@@ -234,7 +240,10 @@ class Device(object):
 
     def _get_device_collection(self):
         dg = self.client.api.shared.resolver.device_groups
-        return dg.cm_cloud_managed_devices.devices_s.get_collection()
+        query = F5CollectionQuery(
+            dg.cm_cloud_managed_devices.devices_s, page_size=500
+        )
+        return query.iterate()
 
     @property
     def selfLink(self):
@@ -291,7 +300,10 @@ class Connector(object):
         self._values['resource'] = resource
 
     def _get_connector_collection(self):
-        return self.client.api.cm.cloud.connectors.locals.get_collection()
+        query = F5CollectionQuery(
+            self.client.api.cm.cloud.connectors.locals, page_size=500
+        )
+        return query.iterate()
 
     @property
     def name(self):
@@ -669,8 +681,8 @@ class ModuleManager(object):
 
     def exists(self):
         connector = self.want.connector.resource
-        collection = connector.nodes_s.get_collection()
-        for resource in collection:
+        query = F5CollectionQuery(connector.nodes_s, page_size=500)
+        for resource in query.iterate():
             if resource.ipAddress == self.want.device.address:
                 return True
         return False
@@ -772,8 +784,8 @@ class ModuleManager(object):
 
     def remove_from_device(self):
         connector = self.want.connector.resource
-        collection = connector.nodes_s.get_collection()
-        for resource in collection:
+        query = F5CollectionQuery(connector.nodes_s, page_size=500)
+        for resource in query.iterate():
             if resource.ipAddress == self.want.device.ip_address:
                 resource.delete()
                 return True
@@ -823,7 +835,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name,
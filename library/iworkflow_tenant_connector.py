@@ -90,7 +90,6 @@ RETURN = '''
 import re
 
 from ansible.module_utils.f5_utils import (
-    AnsibleF5Client,
     AnsibleF5Parameters,
     defaultdict,
     F5ModuleError,
@@ -98,6 +97,11 @@ from ansible.module_utils.f5_utils import (
     iteritems
 )
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+
 
 class Connector(object):
     def __init__(self, *args, **kwargs):
@@ -412,7 +416,7 @@ def main():
 
     spec = ArgumentSpec()
 
-    client = AnsibleF5Client(
+    client = F5Client(
         argument_spec=spec.argument_spec,
         supports_check_mode=spec.supports_check_mode,
         f5_product_name=spec.f5_product_name
@@ -3,6 +3,50 @@
 # Copyright: (c) 2017, F5 Networks Inc.
 # GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import errno
+import fcntl
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import uuid
+
+from distutils.version import LooseVersion
+
+try:
+    from f5.bigip import ManagementRoot as BigIpMgmt
+    from icontrol.exceptions import iControlUnexpectedHTTPError
+    from requests.exceptions import ChunkedEncodingError
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+except ImportError:
+    pass
+
+from ansible.module_utils.basic import env_fallback
+from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.six import iteritems
+from ansible.module_utils.six import string_types
+
+
+F5_CACHE_ARGS = dict(
+    token_cache=dict(
+        type='path',
+        fallback=(env_fallback, ['F5_TOKEN_CACHE'])
+    ),
+    capabilities_cache=dict(
+        type='path',
+        fallback=(env_fallback, ['F5_CAPABILITIES_CACHE'])
+    )
+)
+
 
 class Noop(object):
     """Represent no-operation required
@@ -25,6 +69,10 @@ def fqdn_name(partition, value):
 
 
 def cleanup_tokens(client):
+    if getattr(client, 'token_cache', None) is not None:
+        # Cached tokens are shared with other module runs and must not be
+        # removed from the device.
+        return
     try:
         resource = client.api.shared.authz.tokens_s.token.load(
             name=client.api.icrs.token
@@ -32,3 +80,1341 @@ def cleanup_tokens(client):
         resource.delete()
     except Exception:
         pass
+
+
+class F5ControllerCache(object):
+    """Key/value store in a JSON file on the controller
+
+    Modules run in separate processes, often many of them in parallel forks,
+    so nothing that they learn about a device survives the end of a task.
+    This class lets modules persist small pieces of information (tokens,
+    checksums, device facts) between runs.
+
+    Access to the file is serialized with an exclusive lock on a sidecar
+    ``.lock`` file and the file is replaced atomically on write. Entries may
+    have an expiration time, after which they are no longer returned and are
+    eventually pruned from the file.
+    """
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+
+    @staticmethod
+    def make_key(*args):
+        key = ':'.join(str(x) for x in args)
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _lock(self):
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def _unlock(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def _read(self):
+        try:
+            with open(self.path) as fh:
+                result = json.load(fh)
+        except (IOError, OSError) as ex:
+            if ex.errno == errno.ENOENT:
+                return dict()
+            raise
+        except ValueError:
+            # A corrupt cache is treated as an empty one. It will be
+            # overwritten the next time an entry is stored.
+            return dict()
+        if not isinstance(result, dict):
+            return dict()
+        return result
+
+    def _write(self, entries):
+        now = time.time()
+        entries = dict(
+            (k, v) for k, v in iteritems(entries)
+            if v.get('expiration') is None or v['expiration'] > now
+        )
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.f5-cache')
+        try:
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(entries, fh)
+            os.rename(tmp, self.path)
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+    def get_entry(self, key, min_ttl=0):
+        """Returns the entry, including its expiration, stored at ``key``
+
+        Entries that expire within ``min_ttl`` seconds are not returned.
+        """
+        fd = self._lock()
+        try:
+            entries = self._read()
+        finally:
+            self._unlock(fd)
+        entry = entries.get(key)
+        if not isinstance(entry, dict) or 'value' not in entry:
+            return None
+        expiration = entry.get('expiration')
+        if expiration is not None and expiration - time.time() <= min_ttl:
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        return entry['value']
+
+    def set(self, key, value, expiration=None):
+        fd = self._lock()
+        try:
+            entries = self._read()
+            entries[key] = dict(
+                value=value,
+                expiration=expiration
+            )
+            self._write(entries)
+        finally:
+            self._unlock(fd)
+
+    def remove(self, key):
+        fd = self._lock()
+        try:
+            entries = self._read()
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+        finally:
+            self._unlock(fd)
+
+
+class F5TokenCache(F5ControllerCache):
+    """Controller-side store of iControl REST authentication tokens
+
+    Each module run normally logs in to the remote device to get a new token
+    and then deletes that token before it exits. When the same device is
+    the target of many tasks, those logins become a significant part of the
+    total run time and load the device's authentication daemon.
+
+    This cache lets subsequent module runs (including those in parallel
+    forks) re-use tokens. Tokens that are within ``refresh_window`` seconds
+    of expiring are not handed out. This causes the caller to log in again,
+    and therefore refresh the token, before the device would reject it.
+    """
+    def __init__(self, path, refresh_window=120):
+        super(F5TokenCache, self).__init__(path)
+        self.refresh_window = refresh_window
+
+    @staticmethod
+    def make_key(server, server_port, user, provider):
+        return F5ControllerCache.make_key(server, server_port, user, provider)
+
+    def get(self, key):
+        entry = self.get_entry(key, min_ttl=self.refresh_window)
+        if entry is None:
+            return None
+        return dict(
+            token=entry['value'],
+            expiration=entry['expiration']
+        )
+
+    def set(self, key, token, expiration):
+        super(F5TokenCache, self).set(key, token, expiration=expiration)
+
+
+class F5ConfigSyncQueue(F5ControllerCache):
+    """Controller-side record of device groups with changes to sync
+
+    A full or incremental config-sync takes seconds to minutes, and blocks
+    other syncs of the device group while it runs. Playbooks that sync after
+    every group of changes therefore spend most of their time syncing
+    configuration that the next task changes again.
+
+    Instead, each change can be recorded here with ``mark_dirty``, and the
+    device group synced once, when ``pending`` reports enough changes or
+    changes that are old enough, or at the end of the play. After the sync,
+    the changes that were pending when it started are removed with
+    ``consume``; changes marked by other tasks while it ran are kept for the
+    next sync. Records that were never synced expire after ``ttl`` seconds.
+    """
+    def __init__(self, path, ttl=86400):
+        super(F5ConfigSyncQueue, self).__init__(path)
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(server, server_port, device_group):
+        return F5ControllerCache.make_key(
+            server, server_port, 'configsync', device_group
+        )
+
+    def mark_dirty(self, key, changes=1):
+        """Adds ``changes`` to the device group's count of pending changes
+
+        Returns:
+            dict: The pending changes; the number of ``changes`` and the
+                time ``since`` which the first of them is pending.
+        """
+        fd = self._lock()
+        try:
+            entries = self._read()
+            entry = entries.get(key)
+            now = time.time()
+            if not isinstance(entry, dict) or not isinstance(entry.get('value'), dict):
+                entry = dict(
+                    value=dict(changes=0, since=now),
+                    expiration=now + self.ttl
+                )
+            entry['value']['changes'] += changes
+            entries[key] = entry
+            self._write(entries)
+        finally:
+            self._unlock(fd)
+        return entry['value']
+
+    def pending(self, key):
+        """Returns the pending changes of the device group, or None"""
+        return self.get(key)
+
+    def consume(self, key, changes, since=None):
+        """Removes ``changes`` synced changes from the device group's count
+
+        Changes that were marked after the sync started are kept. They are
+        reported as pending ``since`` the start of the sync.
+
+        Returns:
+            dict: The changes that are still pending, or None.
+        """
+        fd = self._lock()
+        try:
+            entries = self._read()
+            entry = entries.get(key)
+            if not isinstance(entry, dict) or not isinstance(entry.get('value'), dict):
+                return None
+            entry['value']['changes'] -= changes
+            if entry['value']['changes'] <= 0:
+                del entries[key]
+                self._write(entries)
+                return None
+            if since is not None:
+                entry['value']['since'] = since
+            self._write(entries)
+        finally:
+            self._unlock(fd)
+        return entry['value']
+
+    def clear(self, key):
+        self.remove(key)
+
+
+def get_bigip_mgmt_root(server, user, password, server_port=443, token_cache=None):
+    """Connects to a BIG-IP, re-using a token from ``token_cache`` if possible
+
+    Args:
+        token_cache (F5TokenCache): Cache of tokens shared with other module
+            runs. When None, a new token is always requested.
+
+    Returns:
+        ManagementRoot: The SDK's connection to the device.
+    """
+    if token_cache is None:
+        return BigIpMgmt(server, user, password, port=server_port, token='tmos')
+
+    key = F5TokenCache.make_key(server, server_port, user, 'tmos')
+    cached = token_cache.get(key)
+    if cached is not None:
+        try:
+            result = BigIpMgmt(
+                server, user, password, port=server_port,
+                token_to_use=cached['token']
+            )
+        except iControlUnexpectedHTTPError:
+            # The token was removed from the device before it expired;
+            # for example by a reboot or by a user logging out.
+            token_cache.remove(key)
+        else:
+            # Re-using a token leaves the session with placeholder
+            # credentials. Restore the real ones so that the SDK can
+            # transparently get a new token if this one expires during
+            # a long running task.
+            auth = result.icrs.session.auth
+            auth.username = user
+            auth.password = password
+            auth.login_provider_name = 'tmos'
+            auth.expiration = cached['expiration']
+            return result
+
+    result = BigIpMgmt(server, user, password, port=server_port, token='tmos')
+    auth = result.icrs.session.auth
+    if auth.token is not None and auth.expiration is not None:
+        token_cache.set(key, auth.token, auth.expiration)
+    return result
+
+
+class F5Client(AnsibleF5Client):
+    """AnsibleF5Client that can share tokens with other module runs
+
+    Adds the ``token_cache`` option to the module. When it is given, the
+    connection to a BIG-IP re-uses a token from the cache, and stores new
+    tokens there, instead of always asking the device for a new token.
+
+    It also adds the ``capabilities_cache`` option, which is read by
+    F5DeviceCapabilities.
+
+    Both options are only added to BIG-IP modules. The connections to other
+    products do not use them.
+    """
+    def __init__(self, argument_spec=None, **kwargs):
+        self.token_cache = None
+        merged_arg_spec = dict()
+        if kwargs.get('f5_product_name', 'bigip') == 'bigip':
+            merged_arg_spec.update(F5_CACHE_ARGS)
+        if argument_spec:
+            merged_arg_spec.update(argument_spec)
+        super(F5Client, self).__init__(argument_spec=merged_arg_spec, **kwargs)
+
+    def _get_mgmt_root(self, type, **kwargs):
+        path = self.module.params.get('token_cache')
+        if type != 'bigip' or not path:
+            return super(F5Client, self)._get_mgmt_root(type, **kwargs)
+        self.token_cache = F5TokenCache(path)
+        return get_bigip_mgmt_root(
+            kwargs['server'],
+            kwargs['user'],
+            kwargs['password'],
+            server_port=kwargs['server_port'],
+            token_cache=self.token_cache
+        )
+
+
+def parse_device_list(devices, server_port=443, user=None, password=None):
+    """Normalizes a list of devices given to a module that runs on many
+
+    Args:
+        devices (list): Each device is either the address of a device, or a
+            dict with a ``server`` key and, optionally, ``server_port``,
+            ``user`` and ``password`` keys.
+        server_port (int): Port of the devices that do not specify one.
+        user (str): User of the devices that do not specify one.
+        password (str): Password of the devices that do not specify one.
+
+    Returns:
+        list: A dict with the ``server``, ``server_port``, ``user`` and
+        ``password`` of each device.
+    """
+    keys = ['server', 'server_port', 'user', 'password']
+    result = []
+    for item in devices:
+        if isinstance(item, string_types):
+            item = dict(server=item)
+        elif not isinstance(item, dict) or not item.get('server'):
+            raise F5ModuleError(
+                "Each device must be an address, or a dictionary with a 'server' key."
+            )
+        unknown = [x for x in item if x not in keys]
+        if unknown:
+            raise F5ModuleError(
+                "Unsupported keys for a device: {0}".format(', '.join(unknown))
+            )
+        result.append(dict(
+            server=str(item['server']),
+            server_port=int(item.get('server_port') or server_port),
+            user=item.get('user') or user,
+            password=item.get('password') or password
+        ))
+    return result
+
+
+def no_log_device_passwords(module, devices):
+    """Masks the password of each of ``devices`` in the module's output
+
+    The ``devices`` of a module are a plain list, so Ansible does not know
+    that the dicts in it can have a ``password``. Without this, the
+    passwords are returned in the ``invocation`` of the module's result.
+    """
+    for item in devices or []:
+        if isinstance(item, dict) and item.get('password'):
+            module.no_log_values.add(str(item['password']))
+
+
+def build_batch_script(commands):
+    """Builds a bash script that runs all ``commands`` in one invocation
+
+    Each command is preceded by an ``echo`` of a delimiter that is unique
+    to the script and includes the index of the command, so that the output
+    can be split with ``split_batch_output``.
+
+    Returns:
+        tuple: The script, to be run with ``bash -c``, and its delimiter.
+    """
+    escape_patterns = r'([$' + "'])"
+    delimiter = 'f5-ansible-batch-{0}'.format(uuid.uuid4().hex)
+    script = []
+    for index, item in enumerate(commands):
+        command = re.sub(escape_patterns, r'\\\1', item)
+        script.append('echo {0}-{1}'.format(delimiter, index))
+        script.append(command)
+    return '; '.join(script), delimiter
+
+
+def split_batch_output(output, delimiter):
+    """Splits the output of a ``build_batch_script`` script by command
+
+    Commands that did not produce any output are not included.
+    """
+    responses = []
+    pattern = re.compile(re.escape(delimiter) + r'-\d+\n')
+    # Anything before the first delimiter is not from any command
+    for result in pattern.split(output)[1:]:
+        if result:
+            responses.append(result)
+    return responses
+
+
+class F5ParameterValues(dict):
+    """Values of F5FastParameters. Missing values are None"""
+    __slots__ = ()
+
+    def __missing__(self, key):
+        return None
+
+
+class F5FastParameters(object):
+    """Variant of AnsibleF5Parameters for modules that handle many resources
+
+    AnsibleF5Parameters looks up the ``api_map`` and the class attributes for
+    every parameter of every instance, and ``to_return()`` style loops go
+    through ``getattr()``, which for values without a property first fails
+    the normal attribute lookup before falling back to ``__getattr__``.
+    For a module that builds parameters for thousands of resources per run,
+    such as a facts module, these lookups take most of its time.
+
+    This class works out, once per class, where each parameter is stored
+    and which property reads or writes it. Instances only hold a plain
+    dict of values; subclasses that declare ``__slots__ = ()`` have no
+    other per-instance storage.
+
+    It behaves as AnsibleF5Parameters does, and also provides the usual
+    ``update()``, ``to_return()`` and ``api_params()`` methods.
+    """
+    __slots__ = ('_values',)
+
+    api_map = None
+    api_attributes = []
+    returnables = []
+
+    def __init__(self, params=None):
+        self._values = F5ParameterValues()
+        if params:
+            self.update(params=params)
+
+    @classmethod
+    def _class_table(cls, name):
+        # Each class has its own tables, so they are looked up in the class'
+        # own __dict__ rather than inherited from a parent class.
+        table = cls.__dict__.get(name)
+        if table is None:
+            table = dict()
+            setattr(cls, name, table)
+        return table
+
+    @classmethod
+    def _setter_for(cls, key):
+        table = cls._class_table('_setters')
+        if key not in table:
+            map_key = key
+            if cls.api_map is not None and key in cls.api_map:
+                map_key = cls.api_map[key]
+            attr = getattr(cls, map_key, None)
+            setter = None
+            if isinstance(attr, property):
+                setter = attr.fset
+            table[key] = (map_key, setter)
+        return table[key]
+
+    @classmethod
+    def _getters_for(cls, name):
+        table = cls._class_table('_getters')
+        if name not in table:
+            api_map = cls.api_map or dict()
+            if name == 'api_attributes':
+                keys = [(x, api_map.get(x, x)) for x in cls.api_attributes]
+            else:
+                keys = [(x, x) for x in getattr(cls, name)]
+            getters = []
+            for key, attr_name in keys:
+                attr = getattr(cls, attr_name, None)
+                getter = None
+                if isinstance(attr, property):
+                    getter = attr.fget
+                getters.append((key, attr_name, getter))
+            table[name] = getters
+        return table[name]
+
+    def update(self, params=None):
+        if not params:
+            return
+        setters = self._class_table('_setters')
+        values = self._values
+        for k, v in iteritems(params):
+            entry = setters.get(k)
+            if entry is None:
+                entry = self._setter_for(k)
+            map_key, setter = entry
+            if setter is None:
+                values[map_key] = v
+            else:
+                setter(self, v)
+
+    def __getattr__(self, item):
+        if item == '_values':
+            # Not set yet, for example while an instance is being copied.
+            raise AttributeError(item)
+        return self._values[item]
+
+    def _read(self, name):
+        result = dict()
+        values = self._values
+        for key, attr_name, getter in self._getters_for(name):
+            if getter is None:
+                value = values[attr_name]
+            else:
+                value = getter(self)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def to_return(self):
+        return self._read('returnables')
+
+    def api_params(self):
+        return self._read('api_attributes')
+
+    @property
+    def partition(self):
+        if self._values['partition'] is None:
+            return 'Common'
+        return self._values['partition'].strip('/')
+
+    @partition.setter
+    def partition(self, value):
+        self._values['partition'] = value
+
+    def _filter_params(self, params):
+        return dict((k, v) for k, v in iteritems(params) if v is not None)
+
+
+class F5PollTimeoutError(F5ModuleError):
+    pass
+
+
+class F5Poller(object):
+    """Repeatedly calls a function until its result satisfies a condition
+
+    Many operations on a device, such as installing software or reloading
+    the configuration, finish some time after the REST call that starts
+    them has returned. This class implements the waiting for those
+    operations in one place so that modules do not need their own loops.
+
+    The time between polls starts at ``interval`` and is multiplied by
+    ``backoff`` after each poll that did not satisfy the condition, up to
+    ``max_interval``. A random ``jitter`` (a fraction of the interval) is
+    added so that many forks polling the same device do not do so in
+    lockstep.
+
+    Some conditions are only trustworthy after they have been observed
+    several times in a row; for example, mprov not running. The ``stable``
+    argument to ``poll`` specifies the number of consecutive polls that
+    must satisfy the condition. While counting those, the interval is kept
+    at ``interval`` so that the length of the quiet period stays the same.
+
+    Counters for the number of polls, the time spent waiting on the
+    function and the number of timeouts are kept across calls to ``poll``
+    and can be read with ``stats``.
+    """
+    def __init__(self, interval=1, max_interval=30, backoff=2.0, jitter=0.1,
+                 timeout=None, sleep=None, clock=None):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self._sleep = sleep or time.sleep
+        self._clock = clock or time.time
+        self.polls = 0
+        self.timeouts = 0
+        self.latency = 0.0
+        self.elapsed = 0.0
+
+    def stats(self):
+        return dict(
+            polls=self.polls,
+            timeouts=self.timeouts,
+            latency=self.latency,
+            elapsed=self.elapsed
+        )
+
+    def _next_interval(self, current):
+        result = min(current * self.backoff, self.max_interval)
+        return max(result, self.interval)
+
+    def _jittered(self, interval):
+        if not self.jitter:
+            return interval
+        return max(0, interval + random.uniform(-1, 1) * self.jitter * interval)
+
+    def poll(self, func, until=None, stable=1, ignore=None, initial_delay=0,
+             timeout=None, msg=None):
+        """Calls ``func`` until ``until`` returns True for its result
+
+        Args:
+            func: Callable, taking no arguments, that reads the current state
+                from the device.
+            until: Callable that receives the result of ``func`` and returns
+                True when the operation is complete. It may raise an exception
+                to stop polling, for example when the operation failed. When
+                not provided, the truthiness of the result is used.
+            stable (int): Number of consecutive polls that must satisfy
+                ``until`` before polling stops.
+            ignore (tuple): Exception classes raised by ``func`` that are
+                treated as "not complete yet". For example, connection errors
+                while a device is rebooting.
+            initial_delay (int): Seconds to wait before the first poll.
+            timeout (int): Seconds after which ``F5PollTimeoutError`` is raised.
+                Overrides the ``timeout`` given to the constructor.
+            msg (str): Message of the ``F5PollTimeoutError``.
+
+        Returns:
+            The result of the last call to ``func``.
+
+        Raises:
+            F5PollTimeoutError: The condition was not met before the deadline.
+        """
+        if until is None:
+            until = bool
+        if ignore is None:
+            ignore = ()
+        if timeout is None:
+            timeout = self.timeout
+
+        start = self._clock()
+        deadline = None
+        if timeout is not None:
+            deadline = start + timeout
+
+        interval = self.interval
+        matches = 0
+        if initial_delay:
+            self._sleep(initial_delay)
+        while True:
+            self.polls += 1
+            before = self._clock()
+            try:
+                result = func()
+                failed = False
+            except ignore:
+                result = None
+                failed = True
+            after = self._clock()
+            self.latency += after - before
+            self.elapsed = after - start
+
+            done = not failed and until(result)
+
+            if done:
+                matches += 1
+                if matches >= stable:
+                    return result
+                interval = self.interval
+            else:
+                matches = 0
+
+            if deadline is not None and after + interval > deadline:
+                self.timeouts += 1
+                raise F5PollTimeoutError(
+                    msg or "Timed out after {0} seconds waiting for the device".format(int(after - start))
+                )
+            self._sleep(self._jittered(interval))
+            if not done:
+                interval = self._next_interval(interval)
+
+
+class F5CollectionQuery(object):
+    """Reads only the members of a collection that a module is interested in
+
+    Calling ``get_collection()`` on a collection with no arguments downloads
+    every member, with all of its attributes, only for the module to look
+    for one of them by name. On devices with hundreds of ASM policies or
+    iApp services that is several megabytes per lookup.
+
+    This class sends an OData ``$filter`` and/or ``$select`` with the
+    request instead, so that the device does the searching and returns
+    only the attributes needed. Support for ``$filter`` differs between
+    REST workers (the ``tm`` endpoints, for instance, only filter on
+    ``partition``), so the filter only narrows the result; callers should
+    still compare the returned members themselves.
+
+    When ``$select`` omits ``kind``, the SDK returns the members as plain
+    dicts rather than as resource objects.
+
+    With a ``page_size``, ``iterate()`` reads the collection that many
+    members at a time with ``$top`` and ``$skip``. Only one page is held in
+    memory at once, and a caller that stops iterating early, such as
+    ``first()``, does not read the remaining pages at all. Collections
+    with tens of thousands of members, such as the licenses of a BIG-IQ
+    registration key pool, are best read this way. Some workers ignore
+    ``$top`` and ``$skip``; the members that they return are read only once.
+
+    Args:
+        params (str): Other query parameters to send with each request.
+            For example ``expandSubcollections=true``.
+        page_size (int): Number of members to read per request. When None,
+            the collection is read with a single request.
+    """
+    def __init__(self, collection, filter=None, select=None, params=None,
+                 page_size=None):
+        self.collection = collection
+        self.filter = filter
+        self.select = select
+        self.extra_params = params
+        self.page_size = page_size
+
+    @staticmethod
+    def quote(value):
+        """Quotes a value as an OData string literal"""
+        return "'{0}'".format(str(value).replace("'", "''"))
+
+    @property
+    def params(self):
+        result = []
+        if self.filter:
+            result.append('$filter={0}'.format(self.filter))
+        if self.select:
+            result.append('$select={0}'.format(','.join(self.select)))
+        if self.extra_params:
+            result.append(self.extra_params)
+        return '&'.join(result)
+
+    def _read(self, params):
+        if not params:
+            return self.collection.get_collection()
+        return self.collection.get_collection(
+            requests_params=dict(params=params)
+        )
+
+    def get(self):
+        if self.page_size is not None:
+            return list(self.iterate())
+        return self._read(self.params)
+
+    def pages(self):
+        """Yields the members of the collection one page at a time"""
+        if self.page_size is None:
+            yield self._read(self.params)
+            return
+        skip = 0
+        first = None
+        while True:
+            params = [self.params] if self.params else []
+            params.append('$top={0}&$skip={1}'.format(self.page_size, skip))
+            page = self._read('&'.join(params))
+            if page:
+                key = self._identity(page[0])
+                if skip and key is not None and key == first:
+                    # The worker ignores $skip and returned the first page
+                    # again. When it also ignores $top, that only shows when
+                    # the collection has exactly page_size members. Read the
+                    # members after the ones already returned in one go.
+                    rest = self._read(self.params)[skip:]
+                    if rest:
+                        yield rest
+                    return
+                first = key
+                yield page
+            # A short page is the last one. Workers that ignore $top return
+            # the whole collection in the first page, which is longer.
+            if len(page) != self.page_size:
+                return
+            skip += self.page_size
+
+    @staticmethod
+    def _identity(item):
+        if isinstance(item, dict):
+            return item.get('selfLink') or item.get('name') or item
+        return getattr(item, 'selfLink', None) or getattr(item, 'name', None)
+
+    def iterate(self):
+        """Yields the members of the collection"""
+        for page in self.pages():
+            for item in page:
+                yield item
+
+    def first(self, predicate=None):
+        """Returns the first member matching ``predicate``, or None"""
+        for item in self.iterate():
+            if predicate is None or predicate(item):
+                return item
+        return None
+
+
+class F5ResourceManager(object):
+    """Base for managers that load the resource they manage once per run
+
+    A typical run of a module checks ``exists()``, reads the resource to
+    compare it with the module's arguments and then loads it again to call
+    ``modify()`` on it; three round trips where one GET and one PATCH would
+    do. Managers that subclass this class implement ``load_on_device()``
+    instead, and use ``load()`` wherever they need the resource. It is read
+    from the device the first time only.
+
+    ``exists()`` is answered by that same read: a 404 means the resource
+    does not exist. ``modify()`` of the SDK sends a PATCH to the resource's
+    URI and updates the loaded object, including its ``generation``, from
+    the response; so the cached resource stays current after an update.
+
+    After the resource is created or deleted, the manager should call
+    ``remember()`` with the new resource, or ``forget()``, so that the next
+    ``load()`` does not return what was read before.
+    """
+    def __init__(self, client):
+        self.client = client
+        self._resource = None
+        self._loaded = False
+
+    def load_on_device(self):
+        """Loads the resource from the device
+
+        Returns:
+            The SDK resource. Raises ``iControlUnexpectedHTTPError`` with a
+            404 status when the resource does not exist.
+        """
+        raise NotImplementedError
+
+    def load(self):
+        """Returns the resource, or None when it does not exist"""
+        if not self._loaded:
+            try:
+                self._resource = self.load_on_device()
+            except iControlUnexpectedHTTPError as ex:
+                if ex.response.status_code != 404:
+                    raise
+                self._resource = None
+            self._loaded = True
+        return self._resource
+
+    def exists(self):
+        return self.load() is not None
+
+    @property
+    def generation(self):
+        """The generation of the resource when it was last read or changed"""
+        return getattr(self.load(), 'generation', None)
+
+    def remember(self, resource):
+        self._resource = resource
+        self._loaded = True
+
+    def forget(self):
+        self._resource = None
+        self._loaded = False
+
+
+class F5DeviceCapabilities(object):
+    """Version, provisioned modules and HA state of a BIG-IP
+
+    Modules branch on what the device is: the version decides which REST
+    endpoints to use and the provisioning decides whether a feature, such
+    as GTM, can be used at all. Each module run otherwise reads these again
+    from the device, although they only change when the device is upgraded,
+    reprovisioned or has a UCS loaded.
+
+    Every value is read from the device the first time it is asked for.
+    When the module was given a ``capabilities_cache`` path (or
+    ``F5_CAPABILITIES_CACHE``), the values are also stored there, per
+    device, for ``ttl`` seconds; so later module runs against the same
+    device do not read them again. Modules that change any of these values
+    must call ``invalidate()`` afterwards.
+
+    The version is always known to the SDK once it is connected, so asking
+    for it costs no request; it is cached with the rest for consistency.
+    """
+    def __init__(self, client, ttl=3600):
+        self.client = client
+        self.ttl = ttl
+        self.cache = None
+        path = self.client.module.params.get('capabilities_cache')
+        if path:
+            self.cache = F5ControllerCache(path)
+        self._values = None
+        self._expiration = None
+
+    def _get_cache_key(self):
+        params = self.client.module.params
+        return F5ControllerCache.make_key(
+            params['server'], params['server_port'], 'capabilities'
+        )
+
+    def _load(self):
+        if self._values is not None:
+            return self._values
+        self._values = dict()
+        if self.cache is not None:
+            entry = self.cache.get_entry(self._get_cache_key())
+            if entry is not None and isinstance(entry['value'], dict):
+                self._values = entry['value']
+                self._expiration = entry['expiration']
+        return self._values
+
+    def _get(self, name, reader):
+        values = self._load()
+        if name in values:
+            return values[name]
+        values[name] = reader()
+        if self.cache is not None:
+            # Values that are added to an entry expire along with the values
+            # that were already in it.
+            if self._expiration is None:
+                self._expiration = time.time() + self.ttl
+            self.cache.set(
+                self._get_cache_key(), values, expiration=self._expiration
+            )
+        return values[name]
+
+    @property
+    def version(self):
+        return self._get('version', lambda: str(self.client.api.tmos_version))
+
+    @property
+    def build(self):
+        return self._get('build', self.read_build_from_device)
+
+    @property
+    def provisioned(self):
+        """Names of the modules that are provisioned at any level"""
+        return self._get('provisioned', self.read_provisioned_from_device)
+
+    @property
+    def ha_state(self):
+        """Failover state of the device, such as ``active`` or ``standby``"""
+        return self._get('ha_state', self.read_ha_state_from_device)
+
+    def version_is_less_than(self, version):
+        return LooseVersion(self.version) < LooseVersion(version)
+
+    def is_provisioned(self, module):
+        return module in self.provisioned
+
+    def invalidate(self):
+        """Forgets the values, here and in the cache"""
+        self._values = None
+        self._expiration = None
+        if self.cache is not None:
+            self.cache.remove(self._get_cache_key())
+
+    def read_build_from_device(self):
+        resource = self.client.api.tm.sys.version.load()
+        for entry in resource.entries.values():
+            stats = entry['nestedStats']['entries']
+            return str(stats['Build']['description'])
+        return None
+
+    def read_provisioned_from_device(self):
+        collection = self.client.api.tm.sys.provision.get_collection()
+        return sorted(
+            str(x['name']) for x in collection if str(x['level']) != 'none'
+        )
+
+    def read_ha_state_from_device(self):
+        resource = self.client.api.tm.sys.dbs.db.load(name='failover.state')
+        return str(resource.value)
+
+
+class F5FileTransfer(object):
+    """Base of the classes that move files between the controller and a device
+
+    The ``endpoints`` map the name of a file transfer endpoint to its URI
+    below ``/mgmt/`` and the directory on the device that it reads from or
+    writes to. The size and checksum of a file in that directory are read
+    with the bash utility. Devices in appliance mode do not allow it; on
+    those, ``has_bash`` becomes False and the size and checksum are unknown.
+    """
+    endpoints = {}
+
+    def __init__(self, api, endpoint, chunk_size=512 * 1024, resume=True,
+                 retries=3, clock=None):
+        self.api = api
+        self.uri, self.directory = self.endpoints[endpoint]
+        self.chunk_size = chunk_size
+        self.resume = resume
+        self.retries = retries
+        self.has_bash = True
+        self._clock = clock or time.time
+
+    def _run(self, command):
+        """Returns the output of a bash command, or None if bash is not allowed"""
+        if not self.has_bash:
+            return None
+        try:
+            output = self.api.tm.util.bash.exec_cmd(
+                'run',
+                utilCmdArgs='-c "{0}"'.format(command)
+            )
+        except iControlUnexpectedHTTPError:
+            self.has_bash = False
+            return None
+        return getattr(output, 'commandResult', '')
+
+    def _remote_path(self, name):
+        return "'{0}/{1}'".format(self.directory, name.replace("'", ''))
+
+    def _file_uri(self, name):
+        return '{0}{1}/{2}'.format(self.api._meta_data['uri'], self.uri, name)
+
+    def _finish(self, stats, start, transferred):
+        stats['seconds'] = self._clock() - start
+        if stats['seconds'] > 0:
+            stats['throughput'] = int(transferred / stats['seconds'])
+        else:
+            stats['throughput'] = 0
+        return stats
+
+    def remote_size(self, name):
+        """Returns the size of the file on the device
+
+        Returns:
+            int: The size, 0 if the file is missing or None if it is unknown.
+        """
+        result = self._run('stat -c %s {0}'.format(self._remote_path(name)))
+        if result is None:
+            return None
+        try:
+            return int(result.strip())
+        except ValueError:
+            return 0
+
+    def remote_checksum(self, name, algorithm):
+        """Returns the checksum of the file on the device, or None if unknown"""
+        result = self._run('{0}sum {1}'.format(algorithm, self._remote_path(name)))
+        if not result:
+            return None
+        return result.split()[0]
+
+
+class F5FileUploader(F5FileTransfer):
+    """Streams a file from the controller to one of the upload endpoints
+
+    The upload helpers of the SDK read the whole file into memory to learn
+    its size and always start from the first byte. For multi-gigabyte ISOs
+    and UCS archives this holds the whole image in RAM on the controller,
+    and a connection that drops near the end means starting over.
+
+    This class reads the file with a buffer of ``chunk_size`` bytes and
+    sends each chunk with a ``Content-Range`` header, hashing it on the way.
+    Before sending, the size of the file on the device is read; when the
+    device already has the start of the file (from an earlier, interrupted
+    upload) the upload resumes after it. A connection error during the
+    upload is retried, again resuming from what the device has.
+
+    When the upload is done, the checksum of the file on the device is
+    compared with the one computed while reading. A mismatch after a resumed
+    upload restarts it from the beginning once; otherwise it is an error.
+
+    On devices where the bash utility is not available, such as those in
+    appliance mode, uploads always start from the first byte and are not
+    verified.
+    """
+    endpoints = {
+        'file': ('shared/file-transfer/uploads', '/var/config/rest/downloads'),
+        'image': ('cm/autodeploy/software-image-uploads', '/shared/images'),
+    }
+
+    def __init__(self, api, endpoint='file', chunk_size=512 * 1024,
+                 hash_algorithm='sha256', resume=True, retries=3, clock=None):
+        super(F5FileUploader, self).__init__(
+            api, endpoint, chunk_size=chunk_size, resume=resume,
+            retries=retries, clock=clock
+        )
+        self.hash_algorithm = hash_algorithm
+
+    def remote_checksum(self, name, algorithm=None):
+        return super(F5FileUploader, self).remote_checksum(
+            name, algorithm or self.hash_algorithm
+        )
+
+    def _post(self, name, chunk, start, size):
+        headers = {
+            'Content-Range': '{0}-{1}/{2}'.format(start, start + len(chunk) - 1, size),
+            'Content-Type': 'application/octet-stream'
+        }
+        self.api.icrs.post(self._file_uri(name), data=chunk, headers=headers)
+
+    def _transfer(self, path, name, size, offset, stats):
+        """Reads the file once, sending everything after ``offset``
+
+        Returns:
+            The checksum of the whole local file.
+        """
+        digest = hashlib.new(self.hash_algorithm)
+        position = 0
+        with io.open(path, 'rb', buffering=self.chunk_size) as fh:
+            while position < size:
+                chunk = fh.read(self.chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                end = position + len(chunk)
+                if end > offset:
+                    start = max(position, offset)
+                    self._post(name, chunk[start - position:], start, size)
+                    stats['sent'] += end - start
+                position = end
+        return digest.hexdigest()
+
+    def upload(self, path, name=None):
+        """Uploads a file, resuming a previous upload of it when possible
+
+        Args:
+            path (str): Path of the file on the controller.
+            name (str): Name of the file on the device. Defaults to the
+                basename of ``path``.
+
+        Returns:
+            dict: The number of bytes of the file (``size``), sent (``sent``)
+            and already on the device (``resumed``), the ``checksum`` of the
+            file, the ``seconds`` that the upload took and the ``throughput``
+            in bytes per second.
+
+        Raises:
+            F5ModuleError: The upload failed, or the checksum of the file on
+                the device does not match.
+        """
+        name = name or os.path.basename(path)
+        size = os.path.getsize(path)
+        start = self._clock()
+        stats = dict(size=size, sent=0, resumed=0)
+
+        offset = 0
+        if self.resume:
+            offset = self.remote_size(name) or 0
+            if offset > size:
+                offset = 0
+        stats['resumed'] = offset
+
+        attempts = 0
+        restarted = False
+        while True:
+            try:
+                checksum = self._transfer(path, name, size, offset, stats)
+            except (iControlUnexpectedHTTPError, RequestsConnectionError) as ex:
+                attempts += 1
+                if attempts > self.retries:
+                    raise F5ModuleError(
+                        "Failed to upload {0} after {1} attempts: {2}".format(name, attempts, str(ex))
+                    )
+                offset = min(self.remote_size(name) or 0, size)
+                continue
+
+            if self.remote_checksum(name) == checksum or not self.has_bash:
+                break
+            if offset == 0 or restarted:
+                raise F5ModuleError(
+                    "The {0} checksum of {1} on the device does not match the local file".format(
+                        self.hash_algorithm, name
+                    )
+                )
+            # What the device had from an earlier upload was not the start
+            # of this file.
+            restarted = True
+            offset = 0
+
+        stats['checksum'] = checksum
+        return self._finish(stats, start, stats['sent'])
+
+
+class F5FileDownloader(F5FileTransfer):
+    """Streams a file from one of the download endpoints to the controller
+
+    The download helpers of the SDK only write the file to disk. Modules
+    that report checksums of the file then read it back, once per
+    algorithm, which for a multi-gigabyte UCS archive or qkview is several
+    times the work of the download itself. They also always start from the
+    first byte.
+
+    This class requests the file in ranges of ``chunk_size`` bytes and feeds
+    each piece to every one of the ``hash_algorithms`` as it is written, so
+    the file is never read back. It is written to ``<dest>.part`` and only
+    renamed to ``dest`` once it is complete.
+
+    The size and checksum of the file on the device are read with the bash
+    utility. When they are known:
+
+    * an existing ``dest`` of the same size and checksum is kept and nothing
+      is downloaded.
+    * the ``.part`` file of an interrupted download is resumed. If the result
+      does not match, the download restarts from the beginning once.
+    * the checksum of the downloaded file is verified.
+
+    On devices where the bash utility is not available, such as those in
+    appliance mode, the size is taken from the first response instead and the
+    file is always downloaded in full.
+
+    The first of the ``hash_algorithms`` is the one compared with the device.
+    """
+    endpoints = {
+        'madm': ('shared/file-transfer/madm', '/var/config/rest/madm'),
+        'bulk': ('shared/file-transfer/bulk', '/var/config/rest/bulk'),
+        'ucs': ('shared/file-transfer/ucs-downloads', '/var/local/ucs'),
+    }
+
+    def __init__(self, api, endpoint='madm', chunk_size=512 * 1024,
+                 hash_algorithms=('sha1', 'md5'), resume=True, retries=3, clock=None):
+        super(F5FileDownloader, self).__init__(
+            api, endpoint, chunk_size=chunk_size, resume=resume,
+            retries=retries, clock=clock
+        )
+        self.hash_algorithms = list(hash_algorithms)
+
+    def _digests(self):
+        return dict((x, hashlib.new(x)) for x in self.hash_algorithms)
+
+    def _hash_local(self, path, digests):
+        with io.open(path, 'rb', buffering=self.chunk_size) as fh:
+            while True:
+                chunk = fh.read(self.chunk_size)
+                if not chunk:
+                    break
+                for digest in digests.values():
+                    digest.update(chunk)
+
+    def _get(self, name, start, end, size):
+        headers = {
+            'Content-Range': '{0}-{1}/{2}'.format(start, end, size),
+            'Content-Type': 'application/octet-stream'
+        }
+        return self.api.icrs.get(self._file_uri(name), headers=headers, stream=True)
+
+    def probe_size(self, name):
+        """Returns the size of the file from the response to a one byte request"""
+        response = self._get(name, 0, 0, 0)
+        try:
+            return int(response.headers['Content-Range'].split('/')[-1])
+        except (KeyError, ValueError):
+            raise F5ModuleError(
+                "The device did not report the size of {0}".format(name)
+            )
+        finally:
+            response.close()
+
+    def _transfer(self, name, part, size, offset, digests, stats):
+        """Appends everything after ``offset`` to ``part``, hashing it"""
+        position = offset
+        with io.open(part, 'ab') as fh:
+            while position < size:
+                end = min(position + self.chunk_size, size) - 1
+                response = self._get(name, position, end, size)
+                start = position
+                for piece in response.iter_content(self.chunk_size):
+                    fh.write(piece)
+                    for digest in digests.values():
+                        digest.update(piece)
+                    position += len(piece)
+                response.close()
+                stats['received'] += position - start
+                if position == start:
+                    raise F5ModuleError(
+                        "The device sent no data for {0} at offset {1}".format(name, start)
+                    )
+
+    def download(self, name, dest, before_replace=None):
+        """Downloads a file, unless ``dest`` already has its content
+
+        Args:
+            name (str): Name of the file on the device.
+            dest (str): Path of the file on the controller.
+            before_replace (callable): Called with ``dest`` right before an
+                existing ``dest`` is replaced, for example to back it up.
+
+        Returns:
+            dict: The number of bytes of the file (``size``), received
+            (``received``) and resumed from an earlier download
+            (``resumed``), whether the download was ``skipped`` because
+            ``dest`` matched, the ``checksums`` of the file keyed by
+            algorithm, the ``seconds`` that the download took and the
+            ``throughput`` in bytes per second.
+
+        Raises:
+            F5ModuleError: The download failed, or the checksum of the file
+                does not match the one on the device.
+        """
+        start = self._clock()
+        stats = dict(received=0, resumed=0, skipped=False)
+        algorithm = self.hash_algorithms[0]
+        part = '{0}.part'.format(dest)
+
+        size = self.remote_size(name)
+        expected = None
+        if size:
+            expected = self.remote_checksum(name, algorithm)
+        else:
+            # Without bash the size is None, and neither an existing dest
+            # nor a partial download can be checked against the device.
+            size = self.probe_size(name)
+        stats['size'] = size
+
+        if expected and os.path.isfile(dest) and os.path.getsize(dest) == size:
+            digests = self._digests()
+            self._hash_local(dest, digests)
+            if digests[algorithm].hexdigest() == expected:
+                stats['skipped'] = True
+                stats['checksums'] = dict((k, v.hexdigest()) for k, v in iteritems(digests))
+                return self._finish(stats, start, 0)
+
+        digests = self._digests()
+        offset = 0
+        if os.path.isfile(part):
+            offset = os.path.getsize(part)
+            # A download can only be resumed when its result can be verified
+            if not self.resume or not expected or offset > size:
+                os.remove(part)
+                offset = 0
+            else:
+                self._hash_local(part, digests)
+        stats['resumed'] = offset
+
+        attempts = 0
+        restarted = False
+        while True:
+            try:
+                self._transfer(name, part, size, offset, digests, stats)
+            except (iControlUnexpectedHTTPError, RequestsConnectionError, ChunkedEncodingError) as ex:
+                attempts += 1
+                if attempts > self.retries:
+                    raise F5ModuleError(
+                        "Failed to download {0} after {1} attempts: {2}".format(name, attempts, str(ex))
+                    )
+                # Everything written to the part file has also been hashed
+                offset = os.path.getsize(part)
+                continue
+
+            if expected is None or digests[algorithm].hexdigest() == expected:
+                break
+            if stats['resumed'] == 0 or restarted:
+                os.remove(part)
+                raise F5ModuleError(
+                    "The {0} checksum of {1} does not match the file on the device".format(
+                        algorithm, name
+                    )
+                )
+            # What an earlier download left behind was not the start of
+            # this file.
+            restarted = True
+            os.remove(part)
+            offset = 0
+            digests = self._digests()
+
+        if before_replace is not None and os.path.exists(dest):
+            before_replace(dest)
+        os.rename(part, dest)
+        stats['checksums'] = dict((k, v.hexdigest()) for k, v in iteritems(digests))
+        return self._finish(stats, start, stats['received'])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+class ModuleDocFragment(object):
+    # Standard F5 documentation fragment
+    DOCUMENTATION = '''
+options:
+  password:
+    description:
+      - The password for the user account used to connect to the BIG-IP.
+      - You may omit this option by setting the environment variable C(F5_PASSWORD).
+    required: true
+    aliases: ['pass', 'pwd']
+  server:
+    description:
+      - The BIG-IP host.
+      - You may omit this option by setting the environment variable C(F5_SERVER).
+    required: true
+  server_port:
+    description:
+      - The BIG-IP server port.
+      - You may omit this option by setting the environment variable C(F5_SERVER_PORT).
+    default: 443
+    version_added: 2.2
+  user:
+    description:
+      - The username to connect to the BIG-IP with. This user must have
+        administrative privileges on the device.
+      - You may omit this option by setting the environment variable C(F5_USER).
+    required: true
+  validate_certs:
+    description:
+      - If C(no), SSL certificates are not validated. Use this only
+        on personally controlled sites using self-signed certificates.
+      - You may omit this option by setting the environment variable
+        C(F5_VALIDATE_CERTS).
+    default: yes
+    choices:
+      - yes
+      - no
+    version_added: 2.0
+  token_cache:
+    description:
+      - Path of a file on the Ansible controller in which authentication
+        tokens are shared between module runs.
+      - When set, a task re-uses a token that an earlier task got for the same
+        device and user, instead of asking the BIG-IP for a new one. Tokens in
+        the cache are not removed from the device when the task finishes.
+      - The file holds tokens that grant access to your devices. Keep it
+        readable only by the user that runs Ansible.
+      - You may omit this option by setting the environment variable C(F5_TOKEN_CACHE).
+      - Only BIG-IP modules accept this option.
+    version_added: 2.5
+  capabilities_cache:
+    description:
+      - Path of a file on the Ansible controller in which the version,
+        provisioned modules and failover state of devices are shared between
+        module runs, for up to an hour.
+      - Modules that use these values read them from the cache instead of
+        from the device. Modules that change them, such as M(bigip_provision),
+        M(bigip_software) and M(bigip_ucs), remove the device from the cache.
+      - You may omit this option by setting the environment variable C(F5_CAPABILITIES_CACHE).
+      - Only BIG-IP modules accept this option.
+    version_added: 2.5
+notes:
+  - For more information on using Ansible to manage F5 Networks devices see U(https://www.ansible.com/ansible-f5).
+  - Requires the f5-sdk Python package on the host. This is as easy as C(pip install f5-sdk).
+requirements:
+  - f5-sdk
+'''
@@ -0,0 +1,530 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""A local stand-in for the iControl REST API of a BIG-IP
+
+The stand-in keeps the configuration of a device as a dictionary of JSON
+objects keyed by their path below ``/mgmt/``, and implements just enough of
+the REST semantics for the F5 modules to run against it:
+
+* ``GET`` of an object returns it. ``GET`` of a path that has objects below
+  it returns them as a collection. Missing objects are a 404. The
+  ``expandSubcollections`` and ``$select`` query parameters are supported
+  on collections.
+* ``POST`` to a collection creates an object named ``~partition~name``.
+* ``PATCH`` and ``PUT`` update an object, ``DELETE`` removes it.
+* Token logins, transactions, ``tm/util/bash`` and the file upload and
+  download endpoints are handled specially.
+
+The device is seeded from the JSON fixtures of the unit tests. Each object
+is stored under the path of its ``selfLink``, so the fixtures can be used
+as they are.
+
+Every request is recorded with its size and duration so that the cost of a
+module run can be reported. A fixed latency can be added to every request
+to simulate a device on the other side of a WAN.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import copy
+import hashlib
+import json
+import os
+import re
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+
+from ansible.module_utils.six.moves import BaseHTTPServer
+from ansible.module_utils.six.moves import socketserver
+from ansible.module_utils.six.moves.urllib.parse import parse_qs
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), '..', 'unit', 'fixtures')
+
+UPLOAD_DIRECTORIES = {
+    'shared/file-transfer/uploads': '/var/config/rest/downloads',
+    'cm/autodeploy/software-image-uploads': '/shared/images',
+}
+
+DOWNLOAD_DIRECTORIES = {
+    'shared/file-transfer/madm': '/var/config/rest/madm',
+    'shared/file-transfer/bulk': '/var/config/rest/bulk',
+    'shared/file-transfer/ucs-downloads': '/var/local/ucs',
+}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_PATH, name)) as fh:
+        return json.load(fh)
+
+
+def server_context():
+    """Returns an SSL context with a throwaway self-signed certificate
+
+    The certificate and its key are made with the ``openssl`` command in a
+    temporary directory, which is removed once they are loaded.
+    """
+    directory = tempfile.mkdtemp(prefix='f5-benchmark-')
+    cert = os.path.join(directory, 'localhost.crt')
+    key = os.path.join(directory, 'localhost.key')
+    try:
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call(
+                ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                 '-days', '1', '-subj', '/CN=localhost',
+                 '-keyout', key, '-out', cert],
+                stdout=devnull, stderr=devnull
+            )
+        context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        context.load_cert_chain(cert, key)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return context
+
+
+def path_of(link):
+    """Returns the path of a link relative to ``/mgmt/``"""
+    path = urlsplit(link).path
+    if path.startswith('/mgmt/'):
+        path = path[len('/mgmt/'):]
+    return path.lstrip('/')
+
+
+class FileContent(object):
+    """A response that is a range of a file rather than JSON"""
+    def __init__(self, content, content_range):
+        self.content = content
+        self.content_range = content_range
+
+
+class RequestRecord(object):
+    def __init__(self, method, path, status, sent, received, seconds):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.sent = sent
+        self.received = received
+        self.seconds = seconds
+
+
+class FakeDevice(object):
+    """The configuration and request log of a stand-in device
+
+    Args:
+        version (str): TMOS version reported by the device.
+        latency (float): Seconds added to every request.
+    """
+    def __init__(self, version='12.1.0', latency=0.0):
+        self.version = version
+        self.latency = latency
+        self.objects = dict()
+        self.files = dict()
+        self.commands = []
+        self.transactions = dict()
+        self.requests = []
+        self._lock = threading.Lock()
+        self.seed_object('tm/sys', dict(
+            kind='tm:sys:syscollectionstate',
+            selfLink='https://localhost/mgmt/tm/sys?ver={0}'.format(version),
+            items=[]
+        ))
+
+    def seed_object(self, path, value):
+        self.objects[path.strip('/')] = value
+
+    def seed(self, value):
+        """Adds the objects of a fixture to the device
+
+        Args:
+            value: The name of a fixture file, or the content of one. It
+                may be a single object, a collection or a list of objects.
+        """
+        if not isinstance(value, (dict, list)):
+            value = load_fixture(value)
+        if isinstance(value, list):
+            for item in value:
+                self.seed(item)
+        elif 'items' in value and 'entries' not in value:
+            for item in value['items']:
+                self.seed(item)
+        else:
+            self.seed_object(path_of(value['selfLink']), copy.deepcopy(value))
+
+    def add_command(self, pattern, output):
+        """Sets the output of ``tm/util/bash`` commands matching ``pattern``
+
+        The output may also be a callable. It is called with the device and
+        the arguments of the command, so that commands can change the device.
+        """
+        self.commands.append((re.compile(pattern), output))
+
+    def reset_requests(self):
+        self.requests = []
+
+    def summary(self):
+        result = dict(
+            requests=len(self.requests),
+            sent=sum(x.sent for x in self.requests),
+            received=sum(x.received for x in self.requests),
+            seconds=sum(x.seconds for x in self.requests),
+            methods=dict()
+        )
+        for record in self.requests:
+            result['methods'][record.method] = result['methods'].get(record.method, 0) + 1
+        return result
+
+    # Request handling
+
+    def handle(self, method, path, query, headers, body):
+        # The SDK requests collections with a trailing slash. That is the
+        # only way to tell an empty collection from a missing resource when
+        # the resource has no partition in its name, such as an image.
+        collection = path.endswith('/')
+        path = path.strip('/')
+        with self._lock:
+            tx = headers.get('X-F5-REST-Coordination-Id')
+            if tx and not path.startswith('tm/transaction'):
+                return self._queue_command(tx, method, path, body)
+            return self._dispatch(method, path, query, headers, body, collection)
+
+    def _dispatch(self, method, path, query, headers, body, collection=False):
+        if path == 'shared/authn/login':
+            return self._login(body)
+        if path.startswith('tm/transaction'):
+            return self._transaction(method, path, body)
+        if path == 'tm/util/bash':
+            return self._bash(body)
+        for endpoint in UPLOAD_DIRECTORIES:
+            if path.startswith(endpoint + '/') and method == 'POST':
+                return self._upload(endpoint, path, headers, body)
+        for endpoint in DOWNLOAD_DIRECTORIES:
+            if path.startswith(endpoint + '/') and method == 'GET':
+                return self._download(endpoint, path, headers)
+        if method == 'GET':
+            status, response = self._get(path, collection)
+            if status == 200 and 'items' in response and query:
+                response = self._query(response, parse_qs(query))
+            return status, response
+        elif method == 'POST':
+            return self._create(path, self._json(body))
+        elif method in ['PATCH', 'PUT']:
+            return self._modify(path, self._json(body))
+        elif method == 'DELETE':
+            return self._delete(path)
+        return 405, self._error(405, 'Method not allowed')
+
+    def _json(self, body):
+        if not body:
+            return dict()
+        return json.loads(body.decode('utf-8'))
+
+    def _error(self, code, message):
+        return dict(code=code, message=message, errorStack=[])
+
+    def _link(self, path):
+        return 'https://localhost/mgmt/{0}?ver={1}'.format(path, self.version)
+
+    def _kind(self, path, suffix='state'):
+        parts = [x for x in path.split('/') if not x.startswith('~')]
+        return '{0}:{1}{2}'.format(':'.join(parts), parts[-1], suffix)
+
+    def _children(self, path):
+        prefix = path + '/'
+        result = []
+        for key in sorted(self.objects):
+            name = key[len(prefix):]
+            if key.startswith(prefix) and '/' not in name and name != 'stats':
+                result.append(self.objects[key])
+        return result
+
+    def _get(self, path, collection=False):
+        if path in self.objects:
+            return 200, self.objects[path]
+        if path.endswith('/stats'):
+            stats = self._resource_stats(path)
+            if stats is not None:
+                return 200, stats
+        children = self._children(path)
+        parent = path.rsplit('/', 1)[0]
+        if children or parent in self.objects or collection:
+            return 200, dict(
+                kind=self._kind(path, 'collectionstate'),
+                selfLink=self._link(path),
+                items=children
+            )
+        return 404, self._error(404, 'The requested object ({0}) was not found.'.format(path))
+
+    def _query(self, response, query):
+        items = copy.deepcopy(response['items'])
+        if query.get('expandSubcollections') == ['true']:
+            for item in items:
+                for key, value in item.items():
+                    if key.endswith('Reference') and isinstance(value, dict) and value.get('isSubcollection'):
+                        value['items'] = self._children(path_of(value['link']))
+        if '$select' in query:
+            select = query['$select'][0].split(',')
+            items = [dict((k, v) for k, v in x.items() if k in select) for x in items]
+        return dict(response, items=items)
+
+    def _resource_stats(self, path):
+        # The stats of a single resource, taken from the stats of its
+        # collection when only those were seeded.
+        resource = path[:-len('/stats')]
+        collection = resource.rsplit('/', 1)[0]
+        stats = self.objects.get(collection + '/stats')
+        if stats is None:
+            return None
+        prefix = '/mgmt/{0}/'.format(resource)
+        for link, entry in stats.get('entries', {}).items():
+            if urlsplit(link).path.startswith(prefix):
+                return dict(
+                    kind=stats['kind'],
+                    selfLink=self._link(path),
+                    entries={link: entry}
+                )
+        return None
+
+    def _create(self, path, body):
+        name = body.get('name')
+        if not name:
+            return 400, self._error(400, 'The name is required')
+        if 'partition' in body:
+            key = '{0}/~{1}~{2}'.format(path, body['partition'], name)
+        else:
+            key = '{0}/{1}'.format(path, name)
+        if key in self.objects:
+            return 409, self._error(409, 'The object ({0}) already exists.'.format(key))
+        value = dict(body)
+        value.update(dict(
+            kind=self._kind(path),
+            generation=1,
+            selfLink=self._link(key)
+        ))
+        if 'partition' in body:
+            value['fullPath'] = '/{0}/{1}'.format(body['partition'], name)
+        self.objects[key] = value
+        return 200, value
+
+    def _modify(self, path, body):
+        if path not in self.objects:
+            return 404, self._error(404, 'The requested object ({0}) was not found.'.format(path))
+        value = self.objects[path]
+        value.update(body)
+        value['generation'] = value.get('generation', 0) + 1
+        return 200, value
+
+    def _delete(self, path):
+        if path not in self.objects:
+            return 404, self._error(404, 'The requested object ({0}) was not found.'.format(path))
+        prefix = path + '/'
+        for key in list(self.objects):
+            if key == path or key.startswith(prefix):
+                del self.objects[key]
+        return 200, None
+
+    def _login(self, body):
+        token = hashlib.sha1(os.urandom(16)).hexdigest().upper()[:26]
+        now = int(time.time() * 1000000)
+        value = dict(
+            token=token,
+            name=token,
+            userName=self._json(body).get('username'),
+            timeout=1200,
+            startTime='',
+            lastUpdateMicros=now,
+            expirationMicros=now + 1200 * 1000000,
+            kind='shared:authz:tokens:authtokenitemstate',
+            selfLink='https://localhost/mgmt/shared/authz/tokens/{0}'.format(token)
+        )
+        self.objects['shared/authz/tokens/{0}'.format(token)] = value
+        return 200, dict(username=value['userName'], token=value)
+
+    def _transaction(self, method, path, body):
+        if method == 'POST' and path == 'tm/transaction':
+            trans_id = int(time.time() * 1000) + len(self.transactions)
+            self.transactions[trans_id] = []
+            return 200, dict(
+                transId=trans_id,
+                state='STARTED',
+                kind='tm:transactionstate',
+                selfLink=self._link('tm/transaction/{0}'.format(trans_id))
+            )
+        trans_id = int(path.split('/')[2])
+        if trans_id not in self.transactions:
+            return 404, self._error(404, 'Transaction {0} not found'.format(trans_id))
+        if method == 'GET':
+            return 200, dict(
+                transId=trans_id,
+                state='STARTED',
+                kind='tm:transactionstate',
+                selfLink=self._link(path)
+            )
+        if method == 'PATCH' and self._json(body).get('state') == 'VALIDATING':
+            commands = self.transactions.pop(trans_id)
+            # A transaction either applies completely or not at all
+            snapshot = copy.deepcopy(self.objects)
+            for method, path, body in commands:
+                status, response = self._dispatch(method, path, '', {}, body)
+                if status >= 400:
+                    self.objects = snapshot
+                    return 400, self._error(400, 'transaction failed:{0}'.format(response['message']))
+            return 200, dict(
+                transId=trans_id,
+                state='COMPLETED',
+                kind='tm:transactionstate',
+                selfLink=self._link(path)
+            )
+        return 400, self._error(400, 'Unsupported transaction request')
+
+    def _queue_command(self, tx, method, path, body):
+        trans_id = int(tx)
+        if trans_id not in self.transactions:
+            return 404, self._error(404, 'Transaction {0} not found'.format(tx))
+        if method == 'GET':
+            return self._get(path)
+        self.transactions[trans_id].append((method, path, body))
+        return 200, dict(
+            transId=trans_id,
+            evalOrder=len(self.transactions[trans_id]),
+            method=method,
+            uri=path,
+            kind='tm:transaction:commandsstate',
+            selfLink=self._link('tm/transaction/{0}/commands/{1}'.format(
+                trans_id, len(self.transactions[trans_id])
+            ))
+        )
+
+    def _bash(self, body):
+        args = self._json(body).get('utilCmdArgs', '')
+        output = self._file_command(args)
+        if output is None:
+            output = ''
+            for pattern, value in self.commands:
+                if pattern.search(args):
+                    output = value(self, args) if callable(value) else value
+                    break
+        result = dict(
+            kind='tm:util:bash:runstate',
+            command='run',
+            utilCmdArgs=args
+        )
+        if output:
+            result['commandResult'] = output
+        return 200, result
+
+    def _file_command(self, args):
+        # The commands used to resume and verify file transfers
+        match = re.search(r"(stat -c %s|sha1sum|sha256sum|md5sum) '([^']+)'", args)
+        if not match:
+            return None
+        path = match.group(2)
+        if path not in self.files:
+            return ''
+        if match.group(1).endswith('sum'):
+            digest = hashlib.new(match.group(1)[:-3], self.files[path])
+            return '{0}  {1}\n'.format(digest.hexdigest(), path)
+        return '{0}\n'.format(len(self.files[path]))
+
+    def _upload(self, endpoint, path, headers, body):
+        name = path[len(endpoint) + 1:]
+        match = re.match(r'(\d+)-(\d+)/(\d+)', headers.get('Content-Range', ''))
+        if not match:
+            return 400, self._error(400, 'Content-Range is required')
+        start = int(match.group(1))
+        target = '{0}/{1}'.format(UPLOAD_DIRECTORIES[endpoint], name)
+        self.files[target] = self.files.get(target, b'')[:start] + body
+        return 200, dict(remainingByteCount=int(match.group(3)) - start - len(body))
+
+    def _download(self, endpoint, path, headers):
+        name = path[len(endpoint) + 1:]
+        source = '{0}/{1}'.format(DOWNLOAD_DIRECTORIES[endpoint], name)
+        if source not in self.files:
+            return 404, self._error(404, 'The file ({0}) was not found.'.format(source))
+        content = self.files[source]
+        match = re.match(r'(\d+)-(\d+)/(\d+)', headers.get('Content-Range', ''))
+        if not match:
+            return 400, self._error(400, 'Content-Range is required')
+        start = int(match.group(1))
+        end = min(int(match.group(2)), len(content) - 1)
+        return 200, FileContent(
+            content[start:end + 1], '{0}-{1}/{2}'.format(start, end, len(content))
+        )
+
+
+class RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately. Without this, every response
+    # waits for the delayed ACK of the client.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        start = time.time()
+        device = self.server.device
+        if device.latency:
+            time.sleep(device.latency)
+
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, response = device.handle(
+            self.command, path_of(parts.path), parts.query, self.headers, body
+        )
+
+        self.send_response(status)
+        if isinstance(response, FileContent):
+            payload = response.content
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Range', response.content_range)
+        else:
+            payload = b'' if response is None else json.dumps(response).encode('utf-8')
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+        device.requests.append(RequestRecord(
+            self.command, parts.path, status, length, len(payload), time.time() - start
+        ))
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_PATCH = _handle
+    do_DELETE = _handle
+
+
+class FakeServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """HTTPS server for a ``FakeDevice`` on a free port of 127.0.0.1"""
+    daemon_threads = True
+
+    def __init__(self, device):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), RequestHandler)
+        self.device = device
+        self.socket = server_context().wrap_socket(self.socket, server_side=True)
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
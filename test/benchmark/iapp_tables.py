@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Measures the comparison of bigip_iapp_service parameters with large tables
+
+A service with a pool member table of the given number of rows is compared
+with the same service, and with the service with one row changed. This is
+done as the module does it, by building the parameters from the arguments
+and from the device, comparing them and, when they differ, getting the API
+parameters of the wanted service; and as it was done when the canonical form of the tables was
+built on every access and the tables were compared row by row.
+
+Usage:
+
+    python test/benchmark/iapp_tables.py [rows]
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import copy
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from library.bigip_iapp_service import Difference
+from library.bigip_iapp_service import Parameters
+
+
+class UncachedParameters(Parameters):
+    """Builds the canonical form on every access, as the module used to"""
+    def _get_canonical(self, name, converter):
+        if not self._values[name]:
+            return None
+        return converter(self._values[name])
+
+    def _canonical_tables(self, tables):
+        result = []
+        for table in tables:
+            tmp = dict()
+            tmp['name'] = str(table['name'])
+            columns = table.get('columnNames', None)
+            if columns:
+                tmp['columnNames'] = [str(x) for x in columns]
+                rows = table.get('rows', None)
+                if rows:
+                    tmp['rows'] = []
+                    for row in rows:
+                        tmp['rows'].append(dict(row=[str(x) for x in row['row']]))
+            result.append(tmp)
+        result = sorted(result, key=lambda k: k['name'])
+        return result
+
+
+def service(count):
+    rows = []
+    for i in range(count):
+        rows.append(dict(row=[
+            '10.{0}.{1}.{2}'.format(i // 65536 % 256, i // 256 % 256, i % 256),
+            80,
+            0
+        ]))
+    variables = []
+    for i in range(50):
+        variables.append(dict(name='var__{0}'.format(i), value=str(i)))
+    return dict(
+        tables=[
+            dict(name='pool__hosts', columnNames=['name'], rows=[dict(row=['www.example.com'])]),
+            dict(name='pool__members', columnNames=['addr', 'port', 'connection_limit'], rows=rows),
+        ],
+        variables=variables,
+        lists=[dict(name='irules__irules', value=['/Common/foo', '/Common/bar'])]
+    )
+
+
+def compare_by_digest(want, have):
+    params = Parameters(want)
+    diff = Difference(params, Parameters(have))
+    changed = [x for x in ('tables', 'variables', 'lists') if diff.compare(x) is not None]
+    if changed:
+        params.api_params()
+    return changed
+
+
+def compare_by_value(want, have):
+    params = UncachedParameters(want)
+    current = UncachedParameters(have)
+    changed = []
+    for key in ('tables', 'variables', 'lists'):
+        attr1 = getattr(params, key)
+        if attr1 is not None and attr1 != getattr(current, key):
+            changed.append(key)
+    if changed:
+        params.api_params()
+    return changed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    have = service(count)
+    one_row_changed = copy.deepcopy(have)
+    one_row_changed['tables'][1]['rows'][count // 2]['row'][2] = 100
+
+    print('{0:>16} {1:>16} {2:>12}'.format('case', 'method', 'seconds'))
+    for case, want in (('unchanged', have), ('one row changed', one_row_changed)):
+        timings = []
+        for method in (compare_by_value, compare_by_digest):
+            assert method(want, have) == ([] if want is have else ['tables'])
+            seconds = min(timeit.repeat(
+                lambda: method(want, have), number=1, repeat=5
+            ))
+            timings.append(seconds)
+            print('{0:>16} {1:>16} {2:>12.6f}'.format(case, method.__name__, seconds))
+        print('{0:>16} {1:>16} {2:>11.2f}x'.format(case, 'speedup', timings[0] / timings[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Compares AnsibleF5Parameters with F5FastParameters
+
+The same parameters class is defined on top of each base class. For every
+resource, each of them is built from the attributes that the REST API
+returns, then ``to_return()`` and ``api_params()`` are called and the
+resource is compared with the wanted parameters, as a module's
+``_update_changed_options()`` does.
+
+Usage:
+
+    python test/benchmark/parameters.py [resources]
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from ansible.module_utils.f5_utils import AnsibleF5Parameters
+from library.module_utils.f5networks.common import F5FastParameters
+
+
+def define(base):
+    class Parameters(base):
+        api_map = {
+            'loadBalancingMode': 'lb_method',
+            'allowNat': 'allow_nat',
+            'allowSnat': 'allow_snat',
+            'minActiveMembers': 'min_active_members',
+            'reselectTries': 'reselect_tries',
+            'serviceDownAction': 'service_down_action',
+            'slowRampTime': 'slow_ramp_time',
+            'fullPath': 'full_path',
+        }
+
+        api_attributes = [
+            'description', 'loadBalancingMode', 'monitor', 'allowNat',
+            'allowSnat', 'minActiveMembers', 'reselectTries',
+            'serviceDownAction', 'slowRampTime'
+        ]
+
+        returnables = [
+            'name', 'full_path', 'description', 'lb_method', 'monitors',
+            'allow_nat', 'allow_snat', 'min_active_members', 'reselect_tries',
+            'service_down_action', 'slow_ramp_time'
+        ]
+
+        updatables = [
+            'description', 'lb_method', 'monitors', 'slow_ramp_time'
+        ]
+
+        if base is AnsibleF5Parameters:
+            def to_return(self):
+                result = {}
+                for returnable in self.returnables:
+                    result[returnable] = getattr(self, returnable)
+                result = self._filter_params(result)
+                return result
+
+            def api_params(self):
+                result = {}
+                for api_attribute in self.api_attributes:
+                    if self.api_map is not None and api_attribute in self.api_map:
+                        result[api_attribute] = getattr(self, self.api_map[api_attribute])
+                    else:
+                        result[api_attribute] = getattr(self, api_attribute)
+                result = self._filter_params(result)
+                return result
+        else:
+            __slots__ = ()
+
+        @property
+        def lb_method(self):
+            if self._values['lb_method'] is None:
+                return None
+            return str(self._values['lb_method']).replace('_', '-')
+
+        @property
+        def monitors(self):
+            if self._values['monitors'] is None:
+                return None
+            return sorted(self._values['monitors'])
+
+        @property
+        def monitor(self):
+            if self.monitors is None:
+                return None
+            return ' and '.join(self.monitors)
+
+        @monitor.setter
+        def monitor(self, value):
+            self._values['monitors'] = [x.strip() for x in value.split('and')]
+
+    return Parameters
+
+
+def resources(count):
+    result = []
+    for i in range(count):
+        result.append(dict(
+            kind='tm:ltm:pool:poolstate',
+            name='pool{0}'.format(i),
+            partition='Common',
+            fullPath='/Common/pool{0}'.format(i),
+            generation=i,
+            selfLink='https://localhost/mgmt/tm/ltm/pool/~Common~pool{0}'.format(i),
+            allowNat='yes',
+            allowSnat='yes',
+            description='Pool {0}'.format(i),
+            loadBalancingMode='round-robin',
+            minActiveMembers=0,
+            monitor='/Common/http and /Common/tcp',
+            reselectTries=0,
+            serviceDownAction='none',
+            slowRampTime=10 + i % 2,
+        ))
+    return result
+
+
+def workload(cls, items, want):
+    for item in items:
+        have = cls(item)
+        have.to_return()
+        have.api_params()
+        changed = {}
+        for key in cls.updatables:
+            attr1 = getattr(want, key)
+            if attr1 is not None and attr1 != getattr(have, key):
+                changed[key] = attr1
+        if changed:
+            cls(changed)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    items = resources(count)
+
+    print('{0:>24} {1:>12} {2:>16}'.format('base class', 'seconds', 'usec/resource'))
+    timings = []
+    for base in (AnsibleF5Parameters, F5FastParameters):
+        cls = define(base)
+        want = cls(dict(lb_method='round_robin', slow_ramp_time=10))
+        seconds = min(timeit.repeat(
+            lambda: workload(cls, items, want), number=1, repeat=5
+        ))
+        timings.append(seconds)
+        print('{0:>24} {1:>12.6f} {2:>16.3f}'.format(
+            base.__name__, seconds, seconds / count * 1e6
+        ))
+    print('speedup: {0:.2f}x'.format(timings[0] / timings[1]))
+
+
+if __name__ == '__main__':
+    main()
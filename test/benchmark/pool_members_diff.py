@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Measures the member diff of bigip_pool_members for growing pool sizes
+
+The diff should grow linearly with the number of members. The time per
+member that is printed should therefore stay roughly the same from the
+smallest pool to the largest one.
+
+Usage:
+
+    python test/benchmark/pool_members_diff.py [max_members]
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from library.bigip_pool_members import Difference
+from library.bigip_pool_members import Parameters
+
+
+def address(i):
+    return '10.{0}.{1}.{2}'.format(i // 65536 % 256, i // 256 % 256, i % 256)
+
+
+def current_members(count):
+    result = []
+    for i in range(count):
+        result.append(dict(
+            name='{0}:80'.format(address(i)),
+            partition='Common',
+            address=address(i),
+            connectionLimit=0,
+            ratio=1,
+            priorityGroup=0,
+            rateLimit='disabled',
+            session='monitor-enabled',
+            state='up'
+        ))
+    return result
+
+
+def wanted_members(count):
+    # A tenth of the members are new, a tenth have a different ratio and a
+    # tenth of the current members are missing, so all three code paths run.
+    result = []
+    for i in range(count // 10, count + count // 10):
+        member = dict(host=address(i), port=80)
+        if i % 10 == 0:
+            member['ratio'] = 2
+        result.append(member)
+    return Parameters(dict(pool='bench', members=result)).members
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    sizes = []
+    size = largest
+    while size >= 100:
+        sizes.insert(0, size)
+        size //= 2
+
+    print('{0:>8} {1:>12} {2:>16}'.format('members', 'seconds', 'usec/member'))
+    for size in sizes:
+        have = current_members(size)
+        want = wanted_members(size)
+        repeat = max(1, 20000 // size)
+        seconds = min(timeit.repeat(
+            lambda: Difference(want, have).compare(), number=repeat, repeat=3
+        )) / repeat
+        print('{0:>8} {1:>12.6f} {2:>16.3f}'.format(size, seconds, seconds / size * 1e6))
+
+
+if __name__ == '__main__':
+    main()
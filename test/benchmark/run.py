@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Runs modules end to end against a local stand-in for a BIG-IP
+
+No device is needed. Each scenario starts a stand-in iControl REST server
+(see ``fake_icontrol.py``), seeds it from the unit test fixtures and runs the
+module in this process, exactly as Ansible would run it. The report has the
+number of requests that the module made, the bytes sent and received and
+how long the run took.
+
+Latency can be added to every request to see how a module behaves against a
+device that is far away. The requests that a module makes are then usually
+what its run time is made of.
+
+Usage:
+
+    python test/benchmark/run.py [--latency SECONDS] [--repeat N]
+                                 [--verbose] [scenario filter...]
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import ansible.module_utils.basic
+
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.six import StringIO
+from importlib import import_module
+
+from test.benchmark.fake_icontrol import FakeDevice
+from test.benchmark.fake_icontrol import FakeServer
+from test.benchmark.scenarios import SCENARIOS
+
+
+def run_module(module, args, port):
+    """Runs ``main()`` of a module and returns the result that it printed"""
+    params = dict(
+        server='127.0.0.1',
+        server_port=port,
+        user='admin',
+        password='admin',
+        validate_certs='no'
+    )
+    params.update(args)
+    ansible.module_utils.basic._ANSIBLE_ARGS = to_bytes(
+        json.dumps(dict(ANSIBLE_MODULE_ARGS=params))
+    )
+    module = import_module('library.{0}'.format(module))
+
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    try:
+        module.main()
+    except SystemExit:
+        pass
+    finally:
+        output = sys.stdout.getvalue()
+        sys.stdout = stdout
+    try:
+        return json.loads(output)
+    except ValueError:
+        return dict(failed=True, msg=output)
+
+
+def run_scenario(scenario, latency):
+    device = FakeDevice(latency=latency)
+    if scenario.setup:
+        scenario.setup(device)
+    server = FakeServer(device).start()
+    try:
+        start = time.time()
+        result = run_module(scenario.module, scenario.args, server.port)
+        elapsed = time.time() - start
+    finally:
+        server.stop()
+
+    error = None
+    if result.get('failed'):
+        error = result.get('msg')
+    elif scenario.changed is not None and result.get('changed') != scenario.changed:
+        error = 'expected changed={0}, got changed={1}'.format(
+            scenario.changed, result.get('changed')
+        )
+    return device, elapsed, error
+
+
+def print_requests(device):
+    for record in device.requests:
+        print('    {0:6} {1:3} {2:>9} {3:>9} {4:8.4f}  {5}'.format(
+            record.method, record.status, record.sent, record.received,
+            record.seconds, record.path
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('filters', nargs='*', help='Only run scenarios whose name contains one of these')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of times to run each scenario')
+    parser.add_argument('--verbose', action='store_true', help='List every request that was made')
+    args = parser.parse_args()
+
+    # The stand-in uses a self-signed certificate
+    warnings.simplefilter('ignore')
+
+    header = '{0:40} {1:>8} {2:>12} {3:>12} {4:>9}'.format(
+        'scenario', 'requests', 'sent', 'received', 'seconds'
+    )
+    print(header)
+    print('-' * len(header))
+
+    failed = False
+    for scenario in SCENARIOS:
+        if args.filters and not any(x in scenario.name for x in args.filters):
+            continue
+        times = []
+        for i in range(args.repeat):
+            device, elapsed, error = run_scenario(scenario, args.latency)
+            if error:
+                break
+            times.append(elapsed)
+        if error:
+            failed = True
+            print('{0:40} FAILED: {1}'.format(scenario.name, error))
+            continue
+        summary = device.summary()
+        print('{0:40} {1:8} {2:12} {3:12} {4:9.3f}'.format(
+            scenario.name, summary['requests'], summary['sent'],
+            summary['received'], min(times)
+        ))
+        if args.verbose:
+            print_requests(device)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Module runs measured by the benchmark harness
+
+Each scenario seeds a ``FakeDevice`` and then runs one module against it with
+the given arguments. Scenarios that should not change the device (the second
+run of an idempotent task) say so with ``changed=False``; the harness fails
+the scenario when the module reports otherwise.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import copy
+import os
+import tempfile
+
+from .fake_icontrol import load_fixture
+
+
+class Scenario(object):
+    def __init__(self, name, module, args, setup=None, changed=None):
+        self.name = name
+        self.module = module
+        self.args = args
+        self.setup = setup
+        self.changed = changed
+
+
+def address(i):
+    return '10.{0}.{1}.{2}'.format(i // 65536 % 256, i // 256 % 256, i % 256)
+
+
+def seed_pool(device):
+    device.seed('load_ltm_pool.json')
+
+
+def seed_virtual_server(device):
+    device.seed('load_ltm_virtual_1.json')
+
+
+def seed_gtm_pools(count):
+    def setup(device):
+        device.seed_object('tm/sys/provision/gtm', dict(
+            kind='tm:sys:provision:provisionstate',
+            name='gtm',
+            level='nominal',
+            selfLink='https://localhost/mgmt/tm/sys/provision/gtm?ver=12.1.0'
+        ))
+        template = load_fixture('load_gtm_pool_a_collection.json')['items'][0]
+        stats = load_fixture('load_gtm_pool_a_collection_stats.json')
+        link, entry = list(stats['entries'].items())[0]
+        entries = dict()
+        for i in range(count):
+            name = 'pool{0}'.format(i)
+            pool = copy.deepcopy(template)
+            pool['name'] = name
+            pool['fullPath'] = '/Common/{0}'.format(name)
+            pool['selfLink'] = pool['selfLink'].replace('foo.pool', name)
+            device.seed(pool)
+            entries[link.replace('foo.pool', name)] = entry
+        stats['entries'] = entries
+        device.seed(stats)
+    return setup
+
+
+def seed_pool_members(count):
+    def setup(device):
+        device.seed_object('tm/ltm/pool/~Common~web_pool', dict(
+            kind='tm:ltm:pool:poolstate',
+            name='web_pool',
+            partition='Common',
+            fullPath='/Common/web_pool',
+            selfLink='https://localhost/mgmt/tm/ltm/pool/~Common~web_pool?ver=12.1.0'
+        ))
+        template = load_fixture('load_ltm_pool_members_collection.json')['items'][0]
+        for i in range(count):
+            name = '{0}:80'.format(address(i))
+            member = copy.deepcopy(template)
+            member['name'] = name
+            member['address'] = address(i)
+            member['fullPath'] = '/Common/{0}'.format(name)
+            member['selfLink'] = member['selfLink'].replace('10.10.10.10:80', name)
+            device.seed(member)
+    return setup
+
+
+def seed_ltm_pools(count, members):
+    def setup(device):
+        pool_template = load_fixture('load_ltm_pool_collection.json')['items'][0]
+        member_template = load_fixture('load_ltm_pool_members_collection.json')['items'][0]
+        for i in range(count):
+            name = 'pool{0}'.format(i)
+            pool = copy.deepcopy(pool_template)
+            pool['name'] = name
+            pool['fullPath'] = '/Common/{0}'.format(name)
+            pool['selfLink'] = pool['selfLink'].replace('web_pool', name)
+            pool['membersReference']['link'] = pool['membersReference']['link'].replace('web_pool', name)
+            device.seed(pool)
+            for j in range(members):
+                member = copy.deepcopy(member_template)
+                member['name'] = '{0}:80'.format(address(i * members + j))
+                member['address'] = address(i * members + j)
+                member['fullPath'] = '/Common/{0}'.format(member['name'])
+                member['selfLink'] = member['selfLink'].replace(
+                    'web_pool', name
+                ).replace('10.10.10.10:80', member['name'])
+                device.seed(member)
+    return setup
+
+
+def wanted_members(count):
+    # A tenth of the current members are replaced by new ones
+    return ['{0}:80'.format(address(i)) for i in range(count // 10, count + count // 10)]
+
+
+def seed_remote_image(device):
+    images = load_fixture('list_images_after_upload_remote.json')
+    device.seed(images[1:])
+    iso = images[0]['name']
+
+    def download(device, args):
+        device.seed(images[0])
+
+    device.add_command(r'curl \S+\.md5 ', '')
+    device.add_command(r'cat /shared/images/\S+\.md5', '{0}  {1}\n'.format(images[0]['checksum'], iso))
+    device.add_command(r'curl \S+\.iso ', download)
+    device.add_command(r'md5sum -c', '{0}: OK\n'.format(iso))
+
+
+def seed_images(device):
+    device.seed('list_images_after_upload_remote.json')
+
+
+UCS_CONTENT = os.urandom(16 * 1024 * 1024)
+UCS_DEST = os.path.join(tempfile.gettempdir(), 'f5-benchmark-backup.ucs')
+
+
+def seed_ucs(dest_matches):
+    def setup(device):
+        device.seed_object('tm/sys/ucs', dict(
+            kind='tm:sys:ucs:ucsstate',
+            selfLink='https://localhost/mgmt/tm/sys/ucs?ver=12.1.0',
+            items=[dict(apiRawValues=dict(filename='/var/local/ucs/backup.ucs'))]
+        ))
+        device.files['/var/local/ucs/backup.ucs'] = UCS_CONTENT
+        if dest_matches:
+            with open(UCS_DEST, 'wb') as fh:
+                fh.write(UCS_CONTENT)
+        elif os.path.exists(UCS_DEST):
+            os.remove(UCS_DEST)
+    return setup
+
+
+SOFTWARE_ARGS = dict(
+    software='http://fake.domain/BIGIP-12.1.2.0.0.249.iso',
+    software_md5sum='http://fake.domain/BIGIP-12.1.2.0.0.249.iso.md5',
+    remote_src='yes',
+    state='present'
+)
+
+SCENARIOS = [
+    Scenario(
+        'bigip_pool create', 'bigip_pool',
+        dict(name='test_pool', lb_method='round-robin', description='test',
+             monitor_type='m_of_n', quorum=1, monitors=['/Common/http', '/Common/inband']),
+        changed=True
+    ),
+    Scenario(
+        'bigip_pool unchanged', 'bigip_pool',
+        dict(name='test_pool', lb_method='round-robin', description='test',
+             monitor_type='m_of_n', quorum=1, monitors=['/Common/http', '/Common/inband']),
+        setup=seed_pool, changed=False
+    ),
+    Scenario(
+        'bigip_pool update', 'bigip_pool',
+        dict(name='test_pool', lb_method='round-robin', description='changed',
+             monitor_type='m_of_n', quorum=1, monitors=['/Common/http', '/Common/inband']),
+        setup=seed_pool, changed=True
+    ),
+    Scenario(
+        'bigip_virtual_server create', 'bigip_virtual_server',
+        dict(name='my-vs', destination='10.10.10.10', port=443, pool='test_pool',
+             description='Test Virtual Server', snat='Automap'),
+        setup=seed_pool, changed=True
+    ),
+    Scenario(
+        'bigip_virtual_server update', 'bigip_virtual_server',
+        dict(name='my-virtual-server', description='changed'),
+        setup=seed_virtual_server, changed=True
+    ),
+    Scenario(
+        'bigip_pool_members 1000 members', 'bigip_pool_members',
+        dict(pool='web_pool', members=wanted_members(1000)),
+        setup=seed_pool_members(1000), changed=True
+    ),
+    Scenario(
+        'bigip_gtm_facts 100 pools', 'bigip_gtm_facts',
+        dict(include=['pool']),
+        setup=seed_gtm_pools(100), changed=True
+    ),
+    Scenario(
+        'bigip_gtm_facts 100 pools bulk_stats', 'bigip_gtm_facts',
+        dict(include=['pool'], bulk_stats='yes'),
+        setup=seed_gtm_pools(100), changed=True
+    ),
+    Scenario(
+        'bigip_device_facts 100 pools', 'bigip_device_facts',
+        dict(include=['pool']),
+        setup=seed_ltm_pools(100, 10), changed=False
+    ),
+    Scenario(
+        'bigip_device_facts 100 pools compact', 'bigip_device_facts',
+        dict(include=['pool'], properties=['loadBalancingMode'], compact='yes'),
+        setup=seed_ltm_pools(100, 10), changed=False
+    ),
+    Scenario(
+        'bigip_ucs_fetch 16MB', 'bigip_ucs_fetch',
+        dict(src='backup.ucs', dest=UCS_DEST),
+        setup=seed_ucs(False), changed=True
+    ),
+    Scenario(
+        'bigip_ucs_fetch 16MB unchanged', 'bigip_ucs_fetch',
+        dict(src='backup.ucs', dest=UCS_DEST),
+        setup=seed_ucs(True), changed=False
+    ),
+    Scenario(
+        'bigip_software remote download', 'bigip_software',
+        SOFTWARE_ARGS, setup=seed_remote_image, changed=True
+    ),
+    Scenario(
+        'bigip_software unchanged', 'bigip_software',
+        SOFTWARE_ARGS, setup=seed_images, changed=False
+    ),
+]
@@ -53,6 +53,7 @@ modules = [
     'bigip_configsync_action.py',
     'bigip_device_connectivity.py',
     'bigip_device_dns.py',
+    'bigip_device_facts.py',
     'bigip_device_group.py',
     'bigip_device_group_member.py',
     'bigip_device_ntp.py',
@@ -62,12 +63,14 @@ modules = [
     'bigip_dns_record_facts.py',
     'bigip_dns_zone.py',
     'bigip_drop_connection.py',
+    'bigip_fleet_command.py',
     'bigip_gtm_datacenter.py',
     'bigip_gtm_facts.py',
     'bigip_gtm_pool.py',
     'bigip_gtm_server.py',
     'bigip_gtm_virtual_server.py',
     'bigip_gtm_wide_ip.py',
+    'bigip_gtm_wide_ips.py',
     'bigip_hostname.py',
     'bigip_iapp_service.py',
     'bigip_iapp_template.py',
@@ -84,6 +87,7 @@ modules = [
     'bigip_policy.py',
     'bigip_policy_rule.py',
     'bigip_pool.py',
+    'bigip_pool_members.py',
     'bigip_profile_client_ssl.py',
     'bigip_provision.py',
     'bigip_qkview.py',
@@ -106,6 +110,7 @@ modules = [
     'bigip_static_route.py',
     'bigip_sys_db.py',
     'bigip_sys_global.py',
+    'bigip_transaction.py',
     'bigip_ucs.py',
     'bigip_ucs_fetch.py',
     'bigip_user.py',
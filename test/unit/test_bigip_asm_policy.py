@@ -599,3 +599,36 @@ class TestManager(unittest.TestCase):
         with pytest.raises(F5ModuleError) as err:
             mm.exec_module()
         assert str(err.value) == msg
+
+    def test_exists_uses_filtered_query(self, *args):
+        set_module_args(dict(
+            name='fake_policy',
+            state='present',
+            server='localhost',
+            password='password',
+            user='admin',
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.api = Mock()
+        policies = client.api.tm.asm.policies_s
+        policies.get_collection.return_value = [
+            dict(name='fake_policy', partition='Other'),
+            dict(name='fake_policy', partition='Common')
+        ]
+
+        v1 = V1Manager(client)
+
+        assert v1.exists() is True
+        params = policies.get_collection.call_args[1]['requests_params']['params']
+        assert "$filter=contains(name,'fake_policy') and contains(partition,'Common')" in params
+        assert '$select=name,partition' in params
+
+        policies.get_collection.return_value = [
+            dict(name='fake_policy_2', partition='Common')
+        ]
+        assert v1.exists() is False
@@ -15,6 +15,7 @@ if sys.version_info < (2, 7):
     raise SkipTest("F5 Ansible modules require Python >= 2.7")
 
 from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
 from ansible.compat.tests.mock import patch
 from ansible.module_utils.f5_utils import AnsibleF5Client
 
@@ -140,3 +141,65 @@ class TestManager(unittest.TestCase):
         mm.exec_module()
         self.assertEqual(self.run_commands.call_count, 1)
         self.assertEqual(self.execute_on_device.call_count, 0)
+
+
+@patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
+       return_value=True)
+class TestBatchManager(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = ArgumentSpec()
+
+    def fake_bash(self, outputs):
+        def exec_cmd(command, utilCmdArgs=None):
+            # Emulate bash by replacing each echo'd delimiter with its output
+            parts = utilCmdArgs[4:-1].split('; ')
+            result = ''
+            for part in parts:
+                if part.startswith('echo '):
+                    result += part[5:] + '\n'
+                else:
+                    result += outputs.get(part, '')
+            return Mock(commandResult=result)
+        return exec_cmd
+
+    def test_run_batched_commands(self, *args):
+        set_module_args(dict(
+            commands=[
+                "tmsh show sys version",
+                "tmsh list ltm virtual"
+            ],
+            wait_for=[
+                "result[0] contains BIG-IP",
+                "result[1] contains my-vs"
+            ],
+            batch=True,
+            server='localhost',
+            user='admin',
+            password='password'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.api = Mock()
+        client.api.tm.util.bash.exec_cmd = Mock(side_effect=self.fake_bash({
+            'tmsh show sys version': 'Sys::Version\nMain Package\n  Product  BIG-IP\n',
+            'tmsh list ltm virtual': 'ltm virtual my-vs {\n    destination 1.1.1.1:80\n}\n',
+        }))
+        mm = ModuleManager(client)
+        mm.parse_commands = Mock(return_value=[
+            dict(command='tmsh modify cli preference pager disabled'),
+            dict(command='tmsh show sys version'),
+            dict(command='tmsh list ltm virtual'),
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert client.api.tm.util.bash.exec_cmd.call_count == 1
+        assert len(results['stdout']) == 2
+        assert results['stdout'][0] == 'Sys::Version\nMain Package\n  Product  BIG-IP\n'
+        assert results['stdout'][1] == 'ltm virtual my-vs {\n    destination 1.1.1.1:80\n}\n'
@@ -8,7 +8,9 @@ __metaclass__ = type
 
 import os
 import json
+import shutil
 import sys
+import tempfile
 
 from nose.plugins.skip import SkipTest
 if sys.version_info < (2, 7):
@@ -73,6 +75,13 @@ class TestParameters(unittest.TestCase):
         assert p.reset == 'yes'
         assert p.merge_content == 'asdasd'
 
+    def test_merge_hash_is_normalized(self):
+        p1 = Parameters(dict(merge_content='ltm pool foo {\n    description bar\n}\n'))
+        p2 = Parameters(dict(merge_content='ltm pool foo {  \r\n\n    description bar\r\n}'))
+        p3 = Parameters(dict(merge_content='ltm pool foo {\n    description baz\n}\n'))
+        assert p1.merge_hash == p2.merge_hash
+        assert p1.merge_hash != p3.merge_hash
+
 
 @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
        return_value=True)
@@ -111,3 +120,109 @@ class TestManager(unittest.TestCase):
         results = mm.exec_module()
 
         assert results['changed'] is True
+
+
+@patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
+       return_value=True)
+class TestSkipUnchangedMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = ArgumentSpec()
+        self.tempdir = tempfile.mkdtemp()
+        self.cache = os.path.join(self.tempdir, 'merges.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def create_manager(self, generation, **kwargs):
+        args = dict(
+            merge_content='ltm pool foo { }',
+            verify='no',
+            skip_unchanged_merge='yes',
+            server='localhost',
+            user='admin',
+            password='password'
+        )
+        args.update(kwargs)
+        set_module_args(args)
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+        mm.read_config_generation_from_device = Mock(return_value=generation)
+        mm.upload_to_device = Mock(return_value=True)
+        mm.move_on_device = Mock(return_value=True)
+        mm.merge_on_device = Mock(return_value='merged')
+        mm.remove_temporary_file = Mock(return_value=True)
+        mm.save_on_device = Mock(return_value='saved')
+        return mm
+
+    def test_merge_is_skipped_when_unchanged(self, *args):
+        mm = self.create_manager('1500000000', merge_cache=self.cache)
+        results = mm.exec_module()
+        assert results['changed'] is True
+        assert mm.merge_on_device.call_count == 1
+
+        mm = self.create_manager('1500000000', merge_cache=self.cache)
+        results = mm.exec_module()
+        assert results['changed'] is False
+        assert mm.merge_on_device.call_count == 0
+        assert mm.save_on_device.call_count == 0
+
+    def test_merge_when_device_changed(self, *args):
+        mm = self.create_manager('1500000000', merge_cache=self.cache)
+        mm.exec_module()
+
+        mm = self.create_manager('1500000100', merge_cache=self.cache)
+        results = mm.exec_module()
+        assert results['changed'] is True
+        assert mm.merge_on_device.call_count == 1
+
+    def test_merge_when_content_changed(self, *args):
+        mm = self.create_manager('1500000000', merge_cache=self.cache)
+        mm.exec_module()
+
+        mm = self.create_manager(
+            '1500000000', merge_cache=self.cache, merge_content='ltm pool bar { }'
+        )
+        results = mm.exec_module()
+        assert results['changed'] is True
+        assert mm.merge_on_device.call_count == 1
+
+    def test_verify_is_always_run(self, *args):
+        mm = self.create_manager('1500000000', merge_cache=self.cache, verify='yes')
+        mm.exec_module()
+        mm = self.create_manager('1500000000', merge_cache=self.cache, verify='yes')
+        results = mm.exec_module()
+        assert results['changed'] is True
+        assert mm.merge_on_device.call_count == 1
+
+    def test_record_on_device(self, *args):
+        mm = self.create_manager('1500000000')
+        mm.client.api = Mock()
+        output = Mock(commandResult='{0} 1500000000\n'.format(mm.want.merge_hash))
+        mm.client.api.tm.util.bash.exec_cmd.return_value = output
+
+        results = mm.exec_module()
+        assert results['changed'] is False
+        assert 'cat /shared/tmp/f5-ansible-config-merge' in \
+            mm.client.api.tm.util.bash.exec_cmd.call_args[1]['utilCmdArgs']
+
+        mm.record_merge_on_device(dict(content='abc', generation='1500000100'))
+        command = mm.client.api.tm.util.bash.exec_cmd.call_args[1]['utilCmdArgs']
+        assert 'echo abc 1500000100 > /shared/tmp/f5-ansible-config-merge' in command
+
+    def test_merge_without_bash(self, *args):
+        mm = self.create_manager('1500000000')
+        mm.client.api = Mock()
+        mm.client.api.tm.util.bash.exec_cmd.side_effect = iControlUnexpectedHTTPError(
+            '403 Forbidden', response=Mock(status_code=403)
+        )
+
+        results = mm.exec_module()
+        assert results['changed'] is True
+        assert mm.merge_on_device.call_count == 1
+        # The record was read and written, and neither failed the module
+        assert mm.client.api.tm.util.bash.exec_cmd.call_count == 2
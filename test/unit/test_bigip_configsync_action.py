@@ -8,7 +8,9 @@ __metaclass__ = type
 
 import os
 import json
+import shutil
 import sys
+import tempfile
 
 from nose.plugins.skip import SkipTest
 if sys.version_info < (2, 7):
@@ -18,18 +20,19 @@ from ansible.compat.tests import unittest
 from ansible.compat.tests.mock import Mock
 from ansible.compat.tests.mock import patch
 from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.f5_utils import F5ModuleError
 
 try:
-    from library.bigip_configsync_actions import Parameters
-    from library.bigip_configsync_actions import ModuleManager
-    from library.bigip_configsync_actions import ArgumentSpec
+    from library.bigip_configsync_action import Parameters
+    from library.bigip_configsync_action import ModuleManager
+    from library.bigip_configsync_action import ArgumentSpec
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
     from test.unit.modules.utils import set_module_args
 except ImportError:
     try:
-        from ansible.modules.network.f5.bigip_configsync_actions import Parameters
-        from ansible.modules.network.f5.bigip_configsync_actions import ModuleManager
-        from ansible.modules.network.f5.bigip_configsync_actions import ArgumentSpec
+        from ansible.modules.network.f5.bigip_configsync_action import Parameters
+        from ansible.modules.network.f5.bigip_configsync_action import ModuleManager
+        from ansible.modules.network.f5.bigip_configsync_action import ArgumentSpec
         from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
         from units.modules.utils import set_module_args
     except ImportError:
@@ -87,19 +90,27 @@ class TestParameters(unittest.TestCase):
 
 @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
        return_value=True)
+@patch('time.sleep')
 class TestManager(unittest.TestCase):
 
     def setUp(self):
         self.spec = ArgumentSpec()
+        self.tmpdir = tempfile.mkdtemp()
+        self.sync_cache = os.path.join(self.tmpdir, 'sync.json')
 
-    def test_update_agent_status_traps(self, *args):
-        set_module_args(dict(
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def create_manager(self, **kwargs):
+        args = dict(
             sync_device_to_group='yes',
             device_group="foo",
             password='passsword',
             server='localhost',
             user='admin'
-        ))
+        )
+        args.update(kwargs)
+        set_module_args(args)
 
         client = AnsibleF5Client(
             argument_spec=self.spec.argument_spec,
@@ -110,15 +121,122 @@ class TestManager(unittest.TestCase):
 
         # Override methods to force specific logic in the module to happen
         mm._device_group_exists = Mock(return_value=True)
-        mm._sync_to_group_required = Mock(return_value=False)
         mm.execute_on_device = Mock(return_value=True)
-        mm.read_current_from_device = Mock(return_value=None)
+        return mm
+
+    def test_update_agent_status_traps(self, *args):
+        mm = self.create_manager()
+        mm.read_current_from_device = Mock(side_effect=[
+            dict(status='Changes Pending', details=[]),
+            dict(status='Changes Pending', details=[]),
+            dict(status='Not All Devices Synced', details=[]),
+            dict(status='In Sync', details=[])
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert results['deferred'] is False
+        assert mm.read_current_from_device.call_count == 4
+
+    def test_sync_failure(self, *args):
+        mm = self.create_manager()
+        mm.read_current_from_device = Mock(side_effect=[
+            dict(status='Changes Pending', details=[]),
+            dict(status='Changes Pending', details=[
+                'foo (Changes Pending): There is a possible change conflict',
+                ' - Recommended action: Synchronize bigip2 to group foo'
+            ])
+        ])
+
+        with self.assertRaises(F5ModuleError) as ex:
+            mm.exec_module()
+        assert 'Recommended action: Synchronize bigip2' in str(ex.exception)
+
+    def test_read_status_of_device_group(self, *args):
+        mm = self.create_manager()
+        resource = Mock(entries=load_fixture('load_cm_sync_status.json')['entries'])
+        mm.client.api = Mock()
+        mm.client.api.tm.cm.sync_status.load.return_value = resource
+
+        # The device is not in sync, because of another device group
+        current = mm.read_current_from_device()
+        assert current == dict(
+            status='In Sync',
+            details=['foo (In Sync): All devices in the device group are in sync']
+        )
+
+        mm.want.update(dict(device_group='other-group'))
+        current = mm.read_current_from_device()
+        assert current == dict(
+            status='Changes Pending',
+            details=[
+                'other-group (Changes Pending): There is a possible change conflict between bigip1 and bigip2.',
+                ' - Recommended action: Synchronize bigip1 to group other-group'
+            ]
+        )
+
+    def test_defer_until_max_pending_changes(self, *args):
+        mm = self.create_manager(defer='yes', sync_cache=self.sync_cache, max_pending_changes=3)
+        mm.read_current_from_device = Mock(return_value=dict(status='Changes Pending', details=[]))
+
+        for count in (1, 2):
+            results = mm.exec_module()
+            assert results['changed'] is False
+            assert results['deferred'] is True
+            assert results['pending_changes'] == count
+        assert mm.execute_on_device.called is False
+
+        # The third change runs a single sync of all of them
+        mm.read_current_from_device = Mock(side_effect=[
+            dict(status='Changes Pending', details=[]),
+            dict(status='In Sync', details=[])
+        ])
+        results = mm.exec_module()
+        assert results['changed'] is True
+        assert results['deferred'] is False
+        assert mm.execute_on_device.call_count == 1
 
-        mm._get_status_from_resource = Mock()
-        mm._get_status_from_resource.side_effect = [
-            'Changes Pending', 'Awaiting Initial Sync', 'In Sync'
-        ]
+        key = mm._get_queue_key()
+        assert mm.queue.pending(key) is None
 
+    def test_flush_pending_changes(self, *args):
+        mm = self.create_manager(defer='yes', sync_cache=self.sync_cache)
+        results = mm.exec_module()
+        assert results['deferred'] is True
+        assert mm.queue.pending(mm._get_queue_key())['changes'] == 1
+
+        mm = self.create_manager(sync_cache=self.sync_cache)
+        mm.read_current_from_device = Mock(side_effect=[
+            dict(status='Changes Pending', details=[]),
+            dict(status='In Sync', details=[])
+        ])
         results = mm.exec_module()
+        assert results['changed'] is True
+        assert mm.queue.pending(mm._get_queue_key()) is None
 
+    def test_changes_marked_during_sync_are_kept(self, *args):
+        mm = self.create_manager(defer='yes', sync_cache=self.sync_cache, max_pending_changes=2)
+        results = mm.exec_module()
+        assert results['deferred'] is True
+
+        # Another task marks a change of the device group while this one syncs
+        def sync():
+            mm.queue.mark_dirty(mm._get_queue_key())
+            return True
+
+        mm.execute_on_device = Mock(side_effect=sync)
+        mm.read_current_from_device = Mock(side_effect=[
+            dict(status='Changes Pending', details=[]),
+            dict(status='In Sync', details=[])
+        ])
+        results = mm.exec_module()
         assert results['changed'] is True
+        assert results['deferred'] is False
+        assert mm.queue.pending(mm._get_queue_key())['changes'] == 1
+
+    def test_defer_requires_sync_cache(self, *args):
+        mm = self.create_manager(defer='yes')
+        with self.assertRaises(F5ModuleError) as ex:
+            mm.exec_module()
+        assert "'sync_cache' parameter is required" in str(ex.exception)
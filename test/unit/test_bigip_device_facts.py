@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import json
+import sys
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.f5_utils import F5ModuleError
+
+try:
+    from library.bigip_device_facts import Parameters
+    from library.bigip_device_facts import ModuleManager
+    from library.bigip_device_facts import ArgumentSpec
+    from library.bigip_device_facts import CATEGORIES
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from test.unit.modules.utils import set_module_args
+except ImportError:
+    try:
+        from ansible.modules.network.f5.bigip_device_facts import Parameters
+        from ansible.modules.network.f5.bigip_device_facts import ModuleManager
+        from ansible.modules.network.f5.bigip_device_facts import ArgumentSpec
+        from ansible.modules.network.f5.bigip_device_facts import CATEGORIES
+        from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+        from units.modules.utils import set_module_args
+    except ImportError:
+        raise SkipTest("F5 Ansible modules require the f5-sdk Python library")
+
+fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures')
+fixture_data = {}
+
+
+def load_fixture(name):
+    path = os.path.join(fixture_path, name)
+
+    if path in fixture_data:
+        return fixture_data[path]
+
+    with open(path) as f:
+        data = f.read()
+
+    try:
+        data = json.loads(data)
+    except Exception:
+        pass
+
+    fixture_data[path] = data
+    return data
+
+
+class TestParameters(unittest.TestCase):
+    def test_module_parameters(self):
+        args = dict(
+            include=['pool', 'vlan'],
+            concurrency=2
+        )
+
+        p = Parameters(args)
+        assert p.include == ['pool', 'vlan']
+        assert p.concurrency == 2
+
+    def test_include_all(self):
+        p = Parameters(dict(include=['all']))
+        assert p.include == sorted(CATEGORIES)
+        assert 'system_info' not in p.include
+
+    def test_invalid_include(self):
+        p = Parameters(dict(include=['pool', 'foo']))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.include
+        assert "The valid 'include' choices" in str(ex.exception)
+
+
+@patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
+       return_value=True)
+class TestManager(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = ArgumentSpec()
+        self.responses = {
+            'ltm/pool/': load_fixture('load_ltm_pool_collection.json'),
+            'ltm/virtual/': load_fixture('load_ltm_virtual_collection.json'),
+        }
+        self.requests = []
+
+    def get(self, uri, params=None):
+        self.requests.append((uri, params))
+        path = uri[len('https://localhost/mgmt/tm/'):]
+        if path not in self.responses:
+            response = Mock(status_code=404)
+            raise iControlUnexpectedHTTPError('404 Not Found', response=response)
+        return Mock(json=Mock(return_value=self.responses[path]))
+
+    def create_manager(self, *args):
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.api = Mock()
+        client.api._meta_data = dict(uri='https://localhost/mgmt/')
+        client.api.icrs.get = Mock(side_effect=self.get)
+        return ModuleManager(client)
+
+    def test_read_categories(self, *args):
+        set_module_args(dict(
+            include=['pool', 'virtual_server', 'vlan'],
+            server='localhost',
+            password='password',
+            user='admin'
+        ))
+        mm = self.create_manager()
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert results['pool'][0]['name'] == 'web_pool'
+        assert results['pool'][0]['kind'] == 'tm:ltm:pool:poolstate'
+        assert results['virtual_server'][0]['profilesReference']['items'][0]['name'] == 'http'
+        # The vlan collection was not found
+        assert results['vlan'] == []
+
+        # One request for each category, with its subcollections
+        assert len(self.requests) == 3
+        assert all(x[1] == 'expandSubcollections=true' for x in self.requests)
+
+    def test_properties_are_selected(self, *args):
+        set_module_args(dict(
+            include=['pool'],
+            properties=['loadBalancingMode', 'name'],
+            server='localhost',
+            password='password',
+            user='admin'
+        ))
+        mm = self.create_manager()
+        mm.exec_module()
+
+        assert self.requests == [(
+            'https://localhost/mgmt/tm/ltm/pool/',
+            'expandSubcollections=true&$select=name,partition,fullPath,membersReference,loadBalancingMode'
+        )]
+
+    def test_compact_and_filter(self, *args):
+        virtual = load_fixture('load_ltm_virtual_collection.json')
+        other = dict(virtual['items'][0], name='other_vs')
+        self.responses['ltm/virtual/'] = dict(items=virtual['items'] + [other])
+        set_module_args(dict(
+            include=['pool', 'virtual_server'],
+            filter='^web',
+            compact='yes',
+            server='localhost',
+            password='password',
+            user='admin'
+        ))
+        mm = self.create_manager()
+        results = mm.exec_module()
+
+        assert len(results['virtual_server']) == 1
+        virtual = results['virtual_server'][0]
+        assert 'kind' not in virtual
+        assert 'selfLink' not in virtual
+        assert 'generation' not in virtual
+        assert 'profilesReference' not in virtual
+        assert virtual['profiles'] == [dict(
+            name='http', partition='Common', fullPath='/Common/http', context='all'
+        )]
+        # A reference without items is only a link
+        assert 'membersReference' not in results['pool'][0]
+        assert 'members' not in results['pool'][0]
+
+    def test_filter_matches_anywhere_in_name(self, *args):
+        virtual = load_fixture('load_ltm_virtual_collection.json')
+        other = dict(virtual['items'][0], name='other_server')
+        self.responses['ltm/virtual/'] = dict(items=virtual['items'] + [other])
+        set_module_args(dict(
+            include=['virtual_server'],
+            filter='_vs',
+            server='localhost',
+            password='password',
+            user='admin'
+        ))
+        mm = self.create_manager()
+        results = mm.exec_module()
+
+        assert [x['name'] for x in results['virtual_server']] == ['web_vs']
+
+    def test_address_class_filters_type(self, *args):
+        self.responses['ltm/data-group/internal/'] = dict(items=[
+            dict(name='private_net', type='ip', records=[dict(name='10.0.0.0/8')]),
+            dict(name='hosts', type='string', records=[dict(name='www')]),
+        ])
+        set_module_args(dict(
+            include=['address_class'],
+            server='localhost',
+            password='password',
+            user='admin'
+        ))
+        mm = self.create_manager()
+        results = mm.exec_module()
+
+        assert [x['name'] for x in results['address_class']] == ['private_net']
+
+    def test_unexpected_error(self, *args):
+        set_module_args(dict(
+            include=['pool'],
+            server='localhost',
+            password='password',
+            user='admin'
+        ))
+        mm = self.create_manager()
+        response = Mock(status_code=401)
+        mm.client.api.icrs.get = Mock(
+            side_effect=iControlUnexpectedHTTPError('401 Unauthorized', response=response)
+        )
+
+        with self.assertRaises(F5ModuleError) as ex:
+            mm.exec_module()
+        assert '401 Unauthorized' in str(ex.exception)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import sys
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+
+try:
+    from library.bigip_dns_record import ResourceRecord
+    from library.bigip_dns_record import ResourceRecordException
+    from library.bigip_dns_record import ZoneRunner
+    from library.bigip_dns_record import ModuleManager
+except ImportError:
+    try:
+        from ansible.modules.network.f5.bigip_dns_record import ResourceRecord
+        from ansible.modules.network.f5.bigip_dns_record import ResourceRecordException
+        from ansible.modules.network.f5.bigip_dns_record import ZoneRunner
+        from ansible.modules.network.f5.bigip_dns_record import ModuleManager
+    except ImportError:
+        raise SkipTest("F5 Ansible modules require the bigsuds Python library")
+
+
+ZONE_RECORDS = [
+    'example.com. 86400 IN SOA ns1.example.com. hostmaster.example.com. 2017101801 10800 3600 604800 86400',
+    'example.com. 86400 IN NS ns1.example.com.',
+    'www.example.com. 60 IN A 10.1.1.1',
+    'mail.example.com. 60 IN A 10.1.1.2',
+    'old.example.com. 60 IN A 10.1.1.3',
+    'web.example.com. 300 IN CNAME www.example.com.',
+    'example.com. 60 IN TXT "v=spf1 mx -all"',
+]
+
+
+class TestResourceRecord(unittest.TestCase):
+    def test_from_options(self):
+        record = ResourceRecord.from_options(
+            'CNAME', dict(domain_name='Web', cname='WWW.example.com', ttl=300), 'example.com.', 60
+        )
+        assert record.key == ('web.example.com.', 'CNAME', ('www.example.com.',))
+        assert record.ttl == 300
+        assert record.to_icontrol() == dict(
+            domain_name='web.example.com.', cname='www.example.com.', ttl=300
+        )
+
+        record = ResourceRecord.from_options(
+            'A', dict(domain_name='www.example.com', ip_address='10.1.1.1'), 'example.com.', 60
+        )
+        assert record.name == 'www.example.com.'
+        assert record.ttl == 60
+
+    def test_from_text(self):
+        records = [ResourceRecord.from_text(x) for x in ZONE_RECORDS]
+        assert records[0].rdata[0:2] == ('ns1.example.com.', 'hostmaster.example.com.')
+        assert records[2].key == ('www.example.com.', 'A', ('10.1.1.1',))
+        assert records[6].rdata == ('v=spf1 mx -all',)
+
+        record = ResourceRecord.from_text('1.1.1.10.in-addr.arpa. 60 IN PTR www.example.com.')
+        assert record.key == ('10.1.1.1', 'PTR', ('www.example.com.',))
+        assert ResourceRecord.from_text('example.com. 60 IN SPF "v=spf1"') is None
+
+    def test_invalid_options(self):
+        with self.assertRaises(ResourceRecordException) as ex:
+            ResourceRecord.from_options('A', dict(domain_name='www'), 'example.com.', 60)
+        assert 'Required param ip_address' in str(ex.exception)
+
+        with self.assertRaises(ResourceRecordException) as ex:
+            ResourceRecord.from_options(
+                'A', dict(domain_name='www', ip_address='10.1.1.1', foo='bar'), 'example.com.', 60
+            )
+        assert 'Unsupported params for A record: foo' in str(ex.exception)
+
+
+class TestZoneRunner(unittest.TestCase):
+    def test_batches(self):
+        api = Mock()
+        zone = ZoneRunner(api, 'internal', 'example.com.', batch_size=2)
+        records = [
+            ResourceRecord.from_options(
+                'A', dict(domain_name='host%d' % i, ip_address='10.1.1.%d' % i), 'example.com.', 60
+            ) for i in range(5)
+        ]
+        records.append(ResourceRecord.from_options(
+            'CNAME', dict(domain_name='web', cname='host1.example.com'), 'example.com.', 60
+        ))
+        zone.add(records)
+
+        calls = api.Management.ResourceRecord.add_a.call_args_list
+        assert [len(x[1]['a_records'][0]) for x in calls] == [2, 2, 1]
+        assert calls[0][1]['view_zones'] == [dict(view_name='internal', zone_name='example.com.')]
+        assert calls[0][1]['sync_ptrs'] == [1]
+        assert api.Management.ResourceRecord.add_cname.call_count == 1
+
+
+class TestManager(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Mock()
+        self.api.Management.ResourceRecord.get_rrs.return_value = [ZONE_RECORDS]
+
+    def create_manager(self, **kwargs):
+        params = dict(
+            zone='example.com',
+            view='external',
+            type=None,
+            options=None,
+            records=None,
+            ttl=60,
+            purge=False,
+            batch_size=500,
+            state='present'
+        )
+        params.update(kwargs)
+        module = Mock(params=params, check_mode=False)
+        return ModuleManager(module, self.api)
+
+    def test_single_record_exists(self, *args):
+        mm = self.create_manager(
+            type='A', options=dict(domain_name='www.example.com', ip_address='10.1.1.1')
+        )
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert self.api.Management.ResourceRecord.get_rrs.call_count == 1
+        assert self.api.Management.ResourceRecord.add_a.called is False
+        # No record type that needs a newer version was given
+        assert self.api.System.SystemInfo.get_version.called is False
+
+    def test_sync_records(self, *args):
+        mm = self.create_manager(
+            records=[
+                dict(type='A', domain_name='www', ip_address='10.1.1.1'),
+                dict(type='A', domain_name='mail', ip_address='10.1.1.2', ttl=120),
+                dict(type='A', domain_name='new', ip_address='10.1.1.4'),
+                dict(type='CNAME', domain_name='web', cname='www.example.com', ttl=300),
+            ],
+            purge=True
+        )
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert sorted(results['added']) == [
+            'mail.example.com. 120 IN A 10.1.1.2',
+            'new.example.com. 60 IN A 10.1.1.4',
+        ]
+        # The record whose TTL changed is replaced. Records of types that
+        # were not given are kept.
+        assert sorted(results['deleted']) == [
+            'mail.example.com. 60 IN A 10.1.1.2',
+            'old.example.com. 60 IN A 10.1.1.3',
+        ]
+        rr = self.api.Management.ResourceRecord
+        assert len(rr.delete_a.call_args[1]['a_records'][0]) == 2
+        assert len(rr.add_a.call_args[1]['a_records'][0]) == 2
+        assert rr.add_cname.called is False
+        assert rr.delete_txt.called is False
+
+    def test_absent(self, *args):
+        mm = self.create_manager(
+            records=[
+                dict(type='A', domain_name='old', ip_address='10.1.1.3'),
+                dict(type='A', domain_name='missing', ip_address='10.1.1.9'),
+            ],
+            state='absent'
+        )
+        results = mm.exec_module()
+
+        assert results['deleted'] == ['old.example.com. 60 IN A 10.1.1.3']
+        assert results['added'] == []
+
+    def test_check_mode(self, *args):
+        mm = self.create_manager(
+            records=[dict(type='A', domain_name='new', ip_address='10.1.1.4')]
+        )
+        mm.module.check_mode = True
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert self.api.Management.ResourceRecord.add_a.called is False
+
+    def test_version_check(self, *args):
+        self.api.System.SystemInfo.get_version.return_value = 'BIG-IP_v11.3.0'
+        mm = self.create_manager(
+            records=[dict(
+                type='DS', domain_name='example.com', key_tag=1, algorithm=8,
+                digest_type=2, digest='ABCDEF'
+            )]
+        )
+        with self.assertRaises(ResourceRecordException) as ex:
+            mm.exec_module()
+        assert 'version 11.3.0 does not support' in str(ex.exception)
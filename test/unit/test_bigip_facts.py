@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import sys
+import threading
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+
+try:
+    from suds import MethodNotFound
+except ImportError:
+    raise SkipTest("The legacy bigip_facts module requires the suds Python library")
+
+try:
+    from library._bigip_facts import F5
+    from library._bigip_facts import FieldFetcher
+    from library._bigip_facts import Interfaces
+    from library._bigip_facts import generate_dict
+    from library._bigip_facts import generate_simple_dict
+except ImportError:
+    try:
+        from ansible.modules.network.f5._bigip_facts import F5
+        from ansible.modules.network.f5._bigip_facts import FieldFetcher
+        from ansible.modules.network.f5._bigip_facts import Interfaces
+        from ansible.modules.network.f5._bigip_facts import generate_dict
+        from ansible.modules.network.f5._bigip_facts import generate_simple_dict
+    except ImportError:
+        raise SkipTest("F5 Ansible modules require the bigsuds Python library")
+
+
+class FakeInterfacesApi(object):
+    """Records the thread and API instance that each call is made on"""
+    def __init__(self, calls, names):
+        self.calls = calls
+        self.Networking = Mock()
+        interfaces = self.Networking.Interfaces
+        interfaces.get_list.return_value = names
+        interfaces.get_description.side_effect = self.values('description')
+        interfaces.get_mtu.side_effect = self.values('mtu')
+        interfaces.get_media.side_effect = MethodNotFound('get_media')
+
+    def values(self, field):
+        def call(names):
+            self.calls.append((field, self, threading.current_thread().name))
+            return ['{0}-{1}'.format(field, x) for x in names]
+        return call
+
+
+class TestFieldFetcher(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.api = FakeInterfacesApi(self.calls, ['1.1', '1.2', 'mgmt'])
+        self.f5 = Mock()
+        self.f5.new_api.side_effect = lambda: FakeInterfacesApi(self.calls, [])
+
+    def test_generate_dict(self):
+        interfaces = Interfaces(self.api)
+        result = generate_dict(interfaces, ['description', 'media', 'mtu'])
+
+        assert result == {
+            '1.1': dict(description='description-1.1', mtu='mtu-1.1'),
+            '1.2': dict(description='description-1.2', mtu='mtu-1.2'),
+            'mgmt': dict(description='description-mgmt', mtu='mtu-mgmt'),
+        }
+        assert all(x[1] is self.api for x in self.calls)
+        assert self.api.Networking.Interfaces.get_list.call_count == 1
+
+    def test_generate_dict_concurrently(self):
+        fetcher = FieldFetcher(self.f5, concurrency=4)
+        interfaces = Interfaces(self.api)
+        try:
+            result = generate_dict(interfaces, ['description', 'media', 'mtu'], fetcher)
+        finally:
+            fetcher.close()
+
+        assert result == generate_dict(Interfaces(self.api), ['description', 'media', 'mtu'])
+        # Each field was fetched on the API instance of its thread
+        threaded = self.calls[:2]
+        assert all(x[1] is not self.api for x in threaded)
+        assert len(set(x[1] for x in threaded)) == len(set(x[2] for x in threaded))
+        assert interfaces.api is self.api
+
+    def test_filter_is_applied_once(self):
+        interfaces = Interfaces(self.api, regex='^1')
+        result = generate_dict(interfaces, ['description'])
+
+        assert sorted(result) == ['1.1', '1.2']
+        assert interfaces.get_list() == ['1.1', '1.2']
+
+    def test_generate_simple_dict_skips_unsupported(self):
+        api_obj = Mock()
+        api_obj.get_uptime.return_value = 100
+        api_obj.get_time.side_effect = MethodNotFound('get_time')
+        result = generate_simple_dict(api_obj, ['uptime', 'time'], FieldFetcher())
+
+        assert result == dict(uptime=100)
+
+    def test_new_api_uses_session(self):
+        api = Mock()
+        api.System.Session.get_session_identifier.return_value = 1234
+        with_session = Mock()
+        api.with_session_id.return_value = with_session
+        with patch('{0}.bigip_api'.format(F5.__module__), return_value=api):
+            f5 = F5('localhost', 'admin', 'secret', session=True, concurrency=2)
+            assert f5.new_api() is with_session
+
+        assert f5.get_api() is with_session
+        api.with_session_id.assert_called_with(1234)
+        assert f5.fetcher.concurrency == 2
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import sys
+import threading
+import time
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import remove_values
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.f5_utils import HAS_F5SDK
+
+try:
+    from library.bigip_fleet_command import Parameters
+    from library.bigip_fleet_command import DeviceRunner
+    from library.bigip_fleet_command import ModuleManager
+    from library.bigip_fleet_command import ArgumentSpec
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from test.unit.modules.utils import set_module_args
+except ImportError:
+    try:
+        from ansible.modules.network.f5.bigip_fleet_command import Parameters
+        from ansible.modules.network.f5.bigip_fleet_command import DeviceRunner
+        from ansible.modules.network.f5.bigip_fleet_command import ModuleManager
+        from ansible.modules.network.f5.bigip_fleet_command import ArgumentSpec
+        from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+        from units.modules.utils import set_module_args
+    except ImportError:
+        if HAS_F5SDK:
+            # Only a missing f5-sdk may skip these tests
+            raise
+        raise SkipTest("F5 Ansible modules require the f5-sdk Python library")
+
+
+class TestParameters(unittest.TestCase):
+    def test_module_parameters(self):
+        args = dict(
+            devices=[
+                'lb1.mydomain.com',
+                dict(server='lb2.mydomain.com', server_port=8443, user='operator')
+            ],
+            commands=['show sys version', 'tmsh list ltm virtual'],
+            user='admin',
+            password='secret',
+            server_port=443
+        )
+
+        p = Parameters(args)
+        assert p.devices == [
+            dict(server='lb1.mydomain.com', server_port=443, user='admin', password='secret'),
+            dict(server='lb2.mydomain.com', server_port=8443, user='operator', password='secret'),
+        ]
+        assert p.commands == [
+            'tmsh modify cli preference pager disabled',
+            'tmsh show sys version',
+            'tmsh list ltm virtual'
+        ]
+
+    def test_invalid_devices(self):
+        p = Parameters(dict(devices=[dict(server_port=443)]))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.devices
+        assert "'server' key" in str(ex.exception)
+
+        p = Parameters(dict(devices=[dict(server='lb1', foo='bar')]))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.devices
+        assert "Unsupported keys for a device: foo" in str(ex.exception)
+
+
+class TestManager(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = ArgumentSpec()
+        self.threads = set()
+
+    def create_manager(self, **kwargs):
+        args = dict(
+            devices=['lb1', 'lb2', 'lb3'],
+            commands=['show sys version'],
+            concurrency=3,
+            user='admin',
+            password='secret'
+        )
+        args.update(kwargs)
+        set_module_args(args)
+        module = AnsibleModule(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode
+        )
+        return ModuleManager(module)
+
+    def connect(self, failing=()):
+        def connect(runner):
+            self.threads.add(threading.current_thread().name)
+            # Gives the other threads time to pick up the other devices
+            time.sleep(0.05)
+            if runner.device['server'] in failing:
+                raise iControlUnexpectedHTTPError('401 Unauthorized', response=Mock(status_code=401))
+            api = Mock()
+            api.tm.util.bash.exec_cmd.side_effect = self.bash(runner.device['server'])
+            return api
+        return connect
+
+    def bash(self, server):
+        # Echoes the commands, prefixed with the server
+        def run(*args, **kwargs):
+            script = kwargs['utilCmdArgs'][4:-1]
+            output = []
+            for command in script.split('; '):
+                if command.startswith('echo '):
+                    output.append(command[5:])
+                else:
+                    output.append('{0}: {1}'.format(server, command))
+            return Mock(commandResult='\n'.join(output) + '\n')
+        return run
+
+    def test_device_passwords_are_masked(self, *args):
+        mm = self.create_manager(devices=[
+            'lb1', dict(server='lb2', password='other-secret')
+        ])
+
+        invocation = remove_values(mm.module.params, mm.module.no_log_values)
+        assert 'other-secret' not in str(invocation)
+        assert mm.want.devices[1]['password'] == 'other-secret'
+
+    def test_run_on_all_devices(self, *args):
+        mm = self.create_manager()
+        with patch.object(DeviceRunner, 'connect', autospec=True, side_effect=self.connect()):
+            results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert results['failed_devices'] == []
+        assert [x['server'] for x in results['devices']] == ['lb1', 'lb2', 'lb3']
+        for device in results['devices']:
+            assert device['failed'] is False
+            assert device['stdout'][1] == '{0}: tmsh show sys version\n'.format(device['server'])
+            assert 'elapsed' in device
+            assert 'connect_seconds' in device
+        assert len(self.threads) > 1
+
+    def test_batch(self, *args):
+        mm = self.create_manager(batch='yes')
+        with patch.object(DeviceRunner, 'connect', autospec=True, side_effect=self.connect()):
+            results = mm.exec_module()
+
+        for device in results['devices']:
+            assert device['stdout'] == [
+                '{0}: tmsh modify cli preference pager disabled\n'.format(device['server']),
+                '{0}: tmsh show sys version\n'.format(device['server'])
+            ]
+
+    def test_failed_device(self, *args):
+        mm = self.create_manager()
+        with patch.object(DeviceRunner, 'connect', autospec=True, side_effect=self.connect(['lb2'])):
+            results = mm.exec_module()
+
+        assert results['failed'] is True
+        assert results['failed_devices'] == ['lb2']
+        assert '1 of 3 devices' in results['msg']
+        assert results['devices'][1]['failed'] is True
+        assert '401 Unauthorized' in results['devices'][1]['msg']
+        assert results['devices'][0]['failed'] is False
+
+    def test_allow_device_failures(self, *args):
+        mm = self.create_manager(allow_device_failures='yes', commands=['modify sys db foo value bar'])
+        with patch.object(DeviceRunner, 'connect', autospec=True, side_effect=self.connect(['lb2'])):
+            results = mm.exec_module()
+
+        assert 'failed' not in results
+        assert results['changed'] is True
+        assert results['failed_devices'] == ['lb2']
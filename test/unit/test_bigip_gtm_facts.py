@@ -151,3 +151,75 @@ class TestManager(unittest.TestCase):
         assert 'pool' in results
         assert len(results['pool']) > 0
         assert 'load_balancing_mode' in results['pool'][0]
+
+    def test_get_typed_pool_facts_bulk_stats(self, *args):
+        set_module_args(dict(
+            include='pool',
+            bulk_stats=True,
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        fixture1 = load_fixture('load_gtm_pool_a_collection.json')
+        fixture2 = load_fixture('load_gtm_pool_a_collection_stats.json')
+        collection = [FakeARecord(attrs=x) for x in fixture1['items']]
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+
+        # Override methods in the specific type of manager
+        tfm = TypedPoolFactManager(client)
+        tfm.read_collection_from_device = Mock(
+            side_effect=lambda x: collection if x == 'a_s' else []
+        )
+        tfm.read_stats_collection_from_device = Mock(
+            return_value=tfm.stats_from_collection(fixture2, 'tm/gtm/pool/a')
+        )
+        tfm.read_stats_from_device = Mock()
+
+        tm = PoolFactManager(client)
+        tm.version_is_less_than_12 = Mock(return_value=False)
+        tm.get_manager = Mock(return_value=tfm)
+
+        # Override methods to force specific logic in the module to happen
+        mm = ModuleManager(client)
+        mm.get_manager = Mock(return_value=tm)
+        mm.gtm_provisioned = Mock(return_value=True)
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert len(results['pool']) == 1
+        assert results['pool'][0]['name'] == 'foo.pool'
+        assert results['pool'][0]['availability_state'] == 'offline'
+        assert results['pool'][0]['enabled_state'] == 'enabled'
+        assert results['pool'][0]['availability_status'] == 'red'
+        tfm.read_stats_collection_from_device.assert_called_once_with('tm/gtm/pool/a')
+        assert tfm.read_stats_from_device.call_count == 0
+
+    def test_stats_from_collection_keys(self, *args):
+        set_module_args(dict(
+            include='pool',
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+        fixture = load_fixture('load_gtm_pool_a_collection_stats.json')
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        tfm = TypedPoolFactManager(client)
+        stats = tfm.stats_from_collection(fixture, 'tm/gtm/pool/a')
+
+        assert sorted(stats.keys()) == ['~Common~bar.pool', '~Common~foo.pool']
+        assert stats['~Common~bar.pool']['status_availabilityState']['description'] == 'available'
+        assert tfm.self_link_key(
+            'https://localhost/mgmt/tm/gtm/pool/a/~Common~foo.pool?ver=13.0.0', 'tm/gtm/pool/a'
+        ) == '~Common~foo.pool'
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import json
+import sys
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.f5_utils import HAS_F5SDK
+
+try:
+    from library.bigip_gtm_wide_ips import Parameters
+    from library.bigip_gtm_wide_ips import WideIpApiParameters
+    from library.bigip_gtm_wide_ips import PoolApiParameters
+    from library.bigip_gtm_wide_ips import ModuleManager
+    from library.bigip_gtm_wide_ips import ArgumentSpec
+    from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+    from test.unit.modules.utils import set_module_args
+except ImportError:
+    try:
+        from ansible.modules.network.f5.bigip_gtm_wide_ips import Parameters
+        from ansible.modules.network.f5.bigip_gtm_wide_ips import WideIpApiParameters
+        from ansible.modules.network.f5.bigip_gtm_wide_ips import PoolApiParameters
+        from ansible.modules.network.f5.bigip_gtm_wide_ips import ModuleManager
+        from ansible.modules.network.f5.bigip_gtm_wide_ips import ArgumentSpec
+        from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
+        from units.modules.utils import set_module_args
+    except ImportError:
+        if HAS_F5SDK:
+            # Only a missing f5-sdk may skip these tests
+            raise
+        raise SkipTest("F5 Ansible modules require the f5-sdk Python library")
+
+fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures')
+fixture_data = {}
+
+
+def load_fixture(name):
+    path = os.path.join(fixture_path, name)
+
+    if path in fixture_data:
+        return fixture_data[path]
+
+    with open(path) as f:
+        data = f.read()
+
+    try:
+        data = json.loads(data)
+    except Exception:
+        pass
+
+    fixture_data[path] = data
+    return data
+
+
+class TestParameters(unittest.TestCase):
+    def test_module_parameters(self):
+        args = dict(
+            type='a',
+            partition='Common',
+            wide_ips=[
+                dict(
+                    name='www.example.com',
+                    pool_lb_method='round-robin',
+                    pools=['web_pool', dict(name='/Other/backup_pool', ratio=3)]
+                ),
+                dict(name='/Other/www.example.com', type='aaaa')
+            ],
+            pools=[
+                dict(
+                    name='web_pool',
+                    members=['server1:web_vs', dict(name='server2:web_vs', ratio=2, state='disabled')]
+                )
+            ]
+        )
+
+        p = Parameters(args)
+        wide_ips = p.wide_ips
+        assert wide_ips[0].key == ('a', '/Common/www.example.com')
+        assert wide_ips[0].state == 'enabled'
+        assert wide_ips[0].pools == [
+            dict(name='/Common/web_pool', ratio=1),
+            dict(name='/Other/backup_pool', ratio=3)
+        ]
+        assert wide_ips[1].key == ('aaaa', '/Other/www.example.com')
+        assert wide_ips[1].pools is None
+        assert wide_ips[1].pool_lb_method is None
+
+        pools = p.pools
+        assert pools[0].members == [
+            dict(name='/Common/server1:web_vs', ratio=1, state='enabled'),
+            dict(name='/Common/server2:web_vs', ratio=2, state='disabled')
+        ]
+        assert pools[0].api_params(['members']) == dict(members=[
+            dict(name='server1:web_vs', partition='Common', ratio=1, memberOrder=0,
+                 enabled=True, disabled=False),
+            dict(name='server2:web_vs', partition='Common', ratio=2, memberOrder=1,
+                 enabled=False, disabled=True),
+        ])
+
+    def test_api_parameters(self):
+        items = load_fixture('load_gtm_wideip_a_collection_expanded.json')['items']
+        p = WideIpApiParameters(items[1], type='a')
+        assert p.key == ('a', '/Common/shop.example.com')
+        assert p.pool_lb_method == 'ratio'
+        assert p.state == 'enabled'
+        # Pools are in the order of the wide IP
+        assert p.pools == [
+            dict(name='/Common/web_pool', ratio=5),
+            dict(name='/Common/backup_pool', ratio=1)
+        ]
+        assert WideIpApiParameters(items[2], type='a').state == 'disabled'
+
+        items = load_fixture('load_gtm_pool_a_collection_expanded.json')['items']
+        p = PoolApiParameters(items[0], type='a')
+        assert p.preferred_lb_method == 'round-robin'
+        assert [x['name'] for x in p.members] == ['/Common/server1:web_vs', '/Common/server2:web_vs']
+        assert PoolApiParameters(items[1], type='a').members == []
+
+    def test_invalid_items(self):
+        p = Parameters(dict(type='a', wide_ips=[dict(name='www')]))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.wide_ips
+        assert 'must be a valid FQDN' in str(ex.exception)
+
+        p = Parameters(dict(type='a', wide_ips=[dict(name='www.example.com', foo='bar')]))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.wide_ips
+        assert "'foo' is not a valid key of a wideip" in str(ex.exception)
+
+        p = Parameters(dict(type='a', pools=[dict(name='web_pool'), dict(name='/Common/web_pool')]))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.pools
+        assert "given more than once" in str(ex.exception)
+
+
+@patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
+       return_value=True)
+class TestManager(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = ArgumentSpec()
+        self.responses = {
+            'gtm/wideip/a/': load_fixture('load_gtm_wideip_a_collection_expanded.json'),
+            'gtm/pool/a/': load_fixture('load_gtm_pool_a_collection_expanded.json'),
+        }
+        self.requests = []
+        self.failing = set()
+
+    def get(self, uri, params=None):
+        path = uri[len('https://localhost/mgmt/tm/'):]
+        if path not in self.responses:
+            return Mock(json=Mock(return_value=dict()))
+        return Mock(json=Mock(return_value=self.responses[path]))
+
+    def send(self, method):
+        def send(uri, json=None):
+            path = uri[len('https://localhost/mgmt/tm/'):]
+            self.requests.append((method, path, json))
+            if path in self.failing:
+                raise iControlUnexpectedHTTPError('400 Bad Request', response=Mock(status_code=400))
+        return send
+
+    def create_manager(self, **kwargs):
+        args = dict(
+            pools=[
+                dict(
+                    name='web_pool',
+                    preferred_lb_method='round-robin',
+                    members=['server1:web_vs', dict(name='server2:web_vs', ratio=2)]
+                ),
+                dict(name='backup_pool')
+            ],
+            wide_ips=[
+                dict(name='www.example.com', pools=['web_pool']),
+                dict(
+                    name='shop.example.com',
+                    pool_lb_method='ratio',
+                    pools=[dict(name='web_pool', ratio=5), 'backup_pool']
+                ),
+                dict(name='old.example.com', state='disabled')
+            ],
+            server='localhost',
+            password='password',
+            user='admin'
+        )
+        args.update(kwargs)
+        set_module_args(args)
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            required_one_of=self.spec.required_one_of,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.api = Mock()
+        client.api._meta_data = dict(uri='https://localhost/mgmt/')
+        client.api.icrs.get = Mock(side_effect=self.get)
+        client.api.icrs.post = Mock(side_effect=self.send('post'))
+        client.api.icrs.patch = Mock(side_effect=self.send('patch'))
+        client.api.icrs.delete = Mock(side_effect=self.send('delete'))
+        mm = ModuleManager(client)
+        mm.capabilities.version_is_less_than = Mock(return_value=False)
+        return mm
+
+    def test_no_changes(self, *args):
+        mm = self.create_manager()
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert self.requests == []
+        assert results['wide_ips'] == dict(created=[], modified=[], deleted=[])
+        # Each collection is read once, with its subcollections
+        assert mm.client.api.icrs.get.call_count == 2
+        for call in mm.client.api.icrs.get.call_args_list:
+            assert call[1]['params'].startswith('expandSubcollections=true')
+        assert 'read' in results['timing']
+        assert 'compare' in results['timing']
+
+    def test_create_modify_and_purge(self, *args):
+        mm = self.create_manager(
+            pools=[
+                dict(name='web_pool', members=['server1:web_vs']),
+                dict(name='new_pool', members=['server3:web_vs'])
+            ],
+            wide_ips=[
+                dict(name='www.example.com', pools=['new_pool']),
+                dict(name='new.example.com', pools=['web_pool']),
+            ],
+            purge='yes',
+            concurrency=1
+        )
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert results['pools'] == dict(
+            created=[dict(name='/Common/new_pool', type='a')],
+            modified=[dict(name='/Common/web_pool', type='a')],
+            deleted=[dict(name='/Common/backup_pool', type='a')]
+        )
+        assert results['wide_ips']['deleted'] == [
+            dict(name='/Common/shop.example.com', type='a'),
+            dict(name='/Common/old.example.com', type='a')
+        ]
+        # Pools are created before the wide IPs that use them, and deleted
+        # after the wide IPs that used them
+        assert [x[:2] for x in self.requests] == [
+            ('post', 'gtm/pool/a/'),
+            ('patch', 'gtm/pool/a/~Common~web_pool'),
+            ('post', 'gtm/wideip/a/'),
+            ('patch', 'gtm/wideip/a/~Common~www.example.com'),
+            ('delete', 'gtm/wideip/a/~Common~shop.example.com'),
+            ('delete', 'gtm/wideip/a/~Common~old.example.com'),
+            ('delete', 'gtm/pool/a/~Common~backup_pool'),
+        ]
+        assert self.requests[1][2] == dict(members=[dict(
+            name='server1:web_vs', partition='Common', ratio=1, memberOrder=0,
+            enabled=True, disabled=False
+        )])
+        assert self.requests[3][2] == dict(pools=[
+            dict(name='new_pool', partition='Common', ratio=1, order=0)
+        ])
+        assert self.requests[2][2]['name'] == 'new.example.com'
+        assert self.requests[2][2]['partition'] == 'Common'
+        for phase in ['apply_pools', 'apply_wide_ips', 'delete_wide_ips', 'delete_pools']:
+            assert phase in results['timing']
+
+    def test_purge_only_kinds_given(self, *args):
+        mm = self.create_manager(
+            pools=None,
+            wide_ips=[dict(name='www.example.com')],
+            purge='yes'
+        )
+        results = mm.exec_module()
+
+        assert results['wide_ips']['deleted'] == [
+            dict(name='/Common/shop.example.com', type='a'),
+            dict(name='/Common/old.example.com', type='a')
+        ]
+        assert results['pools'] == dict(created=[], modified=[], deleted=[])
+
+    def test_purge_keeps_referenced_pools(self, *args):
+        mm = self.create_manager(
+            pools=[dict(name='web_pool')],
+            wide_ips=[dict(name='shop.example.com')],
+            purge='yes'
+        )
+        results = mm.exec_module()
+
+        assert [x['name'] for x in results['wide_ips']['deleted']] == [
+            '/Common/www.example.com', '/Common/old.example.com'
+        ]
+        # shop.example.com still uses backup_pool
+        assert results['pools']['deleted'] == []
+        assert [x[0] for x in self.requests] == ['delete', 'delete']
+
+    def test_check_mode(self, *args):
+        mm = self.create_manager(
+            wide_ips=[dict(name='www.example.com', state='disabled')],
+            _ansible_check_mode=True
+        )
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert results['wide_ips']['modified'] == [dict(name='/Common/www.example.com', type='a')]
+        assert self.requests == []
+
+    def test_transaction(self, *args):
+        mm = self.create_manager(
+            wide_ips=[dict(name='www.example.com', state='disabled')],
+            transaction='yes'
+        )
+        mm.apply_in_transaction = Mock()
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        operations = mm.apply_in_transaction.call_args[0][0]
+        assert [x[:2] for x in operations] == [
+            ('patch', 'https://localhost/mgmt/tm/gtm/wideip/a/~Common~www.example.com')
+        ]
+        assert operations[0][2] == dict(enabled=False, disabled=True)
+        assert 'transaction' in results['timing']
+
+    def test_failed_changes(self, *args):
+        self.failing.add('gtm/pool/a/')
+        mm = self.create_manager(
+            pools=[dict(name='new_pool')],
+            wide_ips=[dict(name='new.example.com', pools=['new_pool'])]
+        )
+        with self.assertRaises(F5ModuleError) as ex:
+            mm.exec_module()
+
+        assert '1 of 1 changes failed' in str(ex.exception)
+        assert 'a /Common/new_pool: 400 Bad Request' in str(ex.exception)
+        # The wide IPs are not changed after pools could not be
+        assert [x[1] for x in self.requests] == ['gtm/pool/a/']
+
+    def test_unsupported_version(self, *args):
+        mm = self.create_manager()
+        mm.capabilities.version_is_less_than = Mock(return_value=True)
+        with self.assertRaises(F5ModuleError) as ex:
+            mm.exec_module()
+        assert '12.0.0 or later' in str(ex.exception)
@@ -301,6 +301,30 @@ class TestParameters(unittest.TestCase):
         p = Parameters(args)
         assert p.template == '/Common/foo'
 
+    def test_digests_of_equal_tables(self):
+        members = dict(
+            name='pool__members',
+            columnNames=['addr', 'port'],
+            rows=[dict(row=['10.1.1.1', 80]), dict(row=['10.1.1.2', 80])]
+        )
+        hosts = dict(name='pool__hosts', columnNames=['name'], rows=[dict(row=['www'])])
+        p1 = Parameters(dict(tables=[members, hosts]))
+        p2 = Parameters(dict(tables=[
+            hosts,
+            dict(members, rows=[dict(row=['10.1.1.1', '80']), dict(row=['10.1.1.2', '80'])])
+        ]))
+        assert p1.digests('tables') == p2.digests('tables')
+
+        p2.tables = [hosts, dict(members, rows=[dict(row=['10.1.1.1', '80'])])]
+        assert p1.digests('tables')['pool__hosts'] == p2.digests('tables')['pool__hosts']
+        assert p1.digests('tables')['pool__members'] != p2.digests('tables')['pool__members']
+        assert len(p2.tables[1]['rows']) == 1
+
+    def test_digests_without_parameters(self):
+        p = Parameters(dict(name='foo'))
+        assert p.digests('tables') is None
+        assert p.digests('variables') is None
+
 
 @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
        return_value=True)
@@ -366,3 +390,72 @@ class TestManager(unittest.TestCase):
 
         results = mm.exec_module()
         assert results['changed'] is True
+
+    def test_update_reports_changed_rows(self, *args):
+        members = dict(
+            name='pool__members',
+            columnNames=['addr', 'port'],
+            rows=[dict(row=['10.1.1.{0}'.format(x), '80']) for x in range(100)]
+        )
+        wanted = dict(members, rows=members['rows'][:50] + members['rows'][51:] + [dict(row=['10.1.2.1', '80'])])
+        set_module_args(dict(
+            name='foo',
+            template='f5.http',
+            parameters=dict(tables=[wanted], variables=[dict(name='pool__addr', value='10.2.2.2')]),
+            state='present',
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+        current = Parameters(dict(
+            template='/Common/f5.http',
+            tables=[members],
+            variables=[dict(name='pool__addr', value='10.1.1.1', encrypted='no')]
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+        mm.exists = Mock(return_value=True)
+        mm.update_on_device = Mock(return_value=True)
+        mm.read_current_from_device = Mock(return_value=current)
+
+        results = mm.exec_module()
+        assert results['changed'] is True
+        assert results['parameter_changes'] == dict(
+            tables=dict(pool__members=dict(
+                added=[['10.1.2.1', '80']],
+                removed=[['10.1.1.50', '80']]
+            )),
+            variables=['pool__addr']
+        )
+
+    def test_update_with_equal_tables(self, *args):
+        tables = [dict(name='pool__hosts', columnNames=['name'], rows=[dict(row=['www'])])]
+        set_module_args(dict(
+            name='foo',
+            template='f5.http',
+            parameters=dict(tables=tables),
+            state='present',
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+        mm.exists = Mock(return_value=True)
+        mm.update_on_device = Mock(return_value=True)
+        mm.read_current_from_device = Mock(return_value=Parameters(dict(tables=tables)))
+
+        results = mm.exec_module()
+        assert results['changed'] is False
+        assert 'parameter_changes' not in results
+        assert mm.update_on_device.called is False
@@ -8,7 +8,9 @@ __metaclass__ = type
 
 import os
 import json
+import shutil
 import sys
+import tempfile
 
 from nose.plugins.skip import SkipTest
 if sys.version_info < (2, 7):
@@ -129,6 +131,66 @@ class TestManager(unittest.TestCase):
 
         assert results['changed'] is True
 
+    def test_update_iapp_template_checksum_cache(self, *args):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+
+        set_module_args(dict(
+            content=load_fixture('basic-iapp.tmpl'),
+            checksum_cache=os.path.join(tmpdir, 'checksums.json'),
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        fixture = load_fixture('load_sys_application_template_w_new_checksum.json')
+        current = Parameters(fixture)
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+
+        # The first run compares the template on the device and records
+        # the checksum
+        mm = ModuleManager(client)
+        mm.exists = Mock(return_value=True)
+        mm.read_current_from_device = Mock(return_value=current)
+        mm._get_temporary_template = Mock(return_value=current)
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert mm._get_temporary_template.call_count == 1
+
+        # The second run only needs to read the template on the device once
+        client.api = Mock()
+        templates = client.api.tm.sys.application.templates
+        templates.template.load.return_value = Mock(attrs=fixture)
+        mm = ModuleManager(client)
+        mm.read_current_from_device = Mock(return_value=current)
+        mm._get_temporary_template = Mock(return_value=current)
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert templates.template.load.call_count == 1
+        assert templates.template.exists.called is False
+        assert mm.read_current_from_device.call_count == 0
+        assert mm._get_temporary_template.call_count == 0
+
+        # A template that was changed on the device is compared again
+        changed = dict(fixture, tmplChecksum='0000')
+        templates.template.load.return_value = Mock(attrs=changed)
+        mm = ModuleManager(client)
+        mm.read_current_from_device = Mock(return_value=current)
+        mm._get_temporary_template = Mock(return_value=current)
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert mm._get_temporary_template.call_count == 1
+
     def test_delete_iapp_template(self, *args):
         set_module_args(dict(
             content=load_fixture('basic-iapp.tmpl'),
@@ -175,3 +237,33 @@ class TestManager(unittest.TestCase):
         results = mm.exec_module()
 
         assert results['changed'] is False
+
+    def test_template_in_use_selects_only_template(self, *args):
+        set_module_args(dict(
+            content=load_fixture('basic-iapp.tmpl'),
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.api = Mock()
+        services = client.api.tm.sys.application.services
+        services.get_collection.return_value = [
+            dict(name='foo', partition='Common', template='/Common/other')
+        ]
+        mm = ModuleManager(client)
+
+        assert mm.template_in_use() is False
+        services.get_collection.assert_called_once_with(
+            requests_params=dict(params='$select=name,partition,template')
+        )
+
+        services.get_collection.return_value.append(
+            dict(name='bar', partition='Common', template='/Common/good_templ')
+        )
+        assert mm.template_in_use() is True
@@ -141,3 +141,36 @@ class TestManager(unittest.TestCase):
         results = mm.exec_module()
 
         assert results['changed'] is False
+
+    def test_update_loads_node_once(self, *args):
+        set_module_args(dict(
+            host='10.20.30.40',
+            name='mytestserver',
+            monitors=[
+                '/Common/icmp'
+            ],
+            partition='Common',
+            state='offline',
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.api = Mock()
+        resource = Mock(attrs=load_fixture('load_ltm_node_3.json'))
+        client.api.tm.ltm.nodes.node.load.return_value = resource
+        mm = ModuleManager(client)
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        # exists(), the read of the current settings and both updates all
+        # use the node that was loaded first
+        assert client.api.tm.ltm.nodes.node.load.call_count == 1
+        assert client.api.tm.ltm.nodes.node.exists.called is False
+        assert resource.modify.call_count == 2
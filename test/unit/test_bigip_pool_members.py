@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import json
+import sys
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.f5_utils import F5ModuleError
+from ansible.module_utils.f5_utils import HAS_F5SDK
+
+try:
+    from library.bigip_pool_members import Parameters
+    from library.bigip_pool_members import Difference
+    from library.bigip_pool_members import ModuleManager
+    from library.bigip_pool_members import ArgumentSpec
+    from test.unit.modules.utils import set_module_args
+except ImportError:
+    try:
+        from ansible.modules.network.f5.bigip_pool_members import Parameters
+        from ansible.modules.network.f5.bigip_pool_members import Difference
+        from ansible.modules.network.f5.bigip_pool_members import ModuleManager
+        from ansible.modules.network.f5.bigip_pool_members import ArgumentSpec
+        from units.modules.utils import set_module_args
+    except ImportError:
+        if HAS_F5SDK:
+            # Only a missing f5-sdk may skip these tests
+            raise
+        raise SkipTest("F5 Ansible modules require the f5-sdk Python library")
+
+fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures')
+fixture_data = {}
+
+
+def load_fixture(name):
+    path = os.path.join(fixture_path, name)
+
+    if path in fixture_data:
+        return fixture_data[path]
+
+    with open(path) as f:
+        data = f.read()
+
+    try:
+        data = json.loads(data)
+    except Exception:
+        pass
+
+    fixture_data[path] = data
+    return data
+
+
+class TestParameters(unittest.TestCase):
+    def test_module_parameters(self):
+        args = dict(
+            pool='web_pool',
+            partition='Foo',
+            members=[
+                '10.10.10.10:80',
+                '2001:db8::1.443',
+                dict(host='web3', port=8080, partition='Common', connection_limit=10, state='offline')
+            ]
+        )
+
+        p = Parameters(args)
+        assert p.pool_uri_name == '~Foo~web_pool'
+        first, second, third = p.members
+        assert first.key == ('Foo', '10.10.10.10:80')
+        assert first.api_params() == dict()
+        assert second.host == '2001:db8::1'
+        assert second.name == '2001:db8::1.443'
+        assert third.uri_name == '~Common~web3:8080'
+        assert third.api_params() == dict(
+            connectionLimit=10, session='user-disabled', state='user-down'
+        )
+
+    def test_invalid_members(self):
+        bad = [
+            '10.10.10.10',
+            dict(host='10.10.10.10'),
+            dict(host='10.10.10.10', port='http'),
+            dict(host='10.10.10.10', port=80, state='forced_offline'),
+            dict(host='10.10.10.10', port=80, address='10.10.10.10'),
+            80
+        ]
+        for item in bad:
+            p = Parameters(dict(pool='web_pool', members=[item]))
+            with self.assertRaises(F5ModuleError):
+                p.members
+
+
+class TestDifference(unittest.TestCase):
+    def setUp(self):
+        self.have = load_fixture('load_ltm_pool_members_collection.json')['items']
+
+    def members(self, members):
+        return Parameters(dict(pool='web_pool', members=members)).members
+
+    def test_add_update_remove(self):
+        want = self.members([
+            dict(host='10.10.10.10', port=80, ratio=1, state='enabled'),
+            dict(host='10.10.10.11', port=80, description='web2', state='disabled'),
+            dict(host='10.10.10.12', port=80, ratio=2),
+            dict(host='10.10.10.10', port=80, ratio=5),
+        ])
+
+        add, update, remove = Difference(want, self.have).compare()
+        assert [x.name for x in add] == ['10.10.10.12:80']
+        assert update == []
+        assert remove == [('Common', '2001:db8::1.80')]
+
+    def test_changes(self):
+        want = self.members([
+            dict(host='10.10.10.10', port=80, ratio=3, state='disabled'),
+            dict(host='10.10.10.11', port=80, state='enabled'),
+            '2001:db8::1.80'
+        ])
+
+        add, update, remove = Difference(want, self.have).compare()
+        assert add == []
+        assert remove == []
+        assert [(x.name, y) for x, y in update] == [
+            ('10.10.10.10:80', dict(ratio=3, session='user-disabled', state='user-up')),
+            ('10.10.10.11:80', dict(session='user-enabled', state='user-up'))
+        ]
+
+    def test_no_purge(self):
+        want = self.members(['10.10.10.12:80'])
+        add, update, remove = Difference(want, self.have, purge=False).compare()
+        assert len(add) == 1
+        assert remove == []
+
+    def test_absent(self):
+        want = self.members(['10.10.10.11:80', '10.10.10.12:80', '10.10.10.11:80'])
+        assert Difference(want, self.have).absent() == [('Common', '10.10.10.11:80')]
+
+
+@patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
+       return_value=True)
+class TestManager(unittest.TestCase):
+    def setUp(self):
+        self.spec = ArgumentSpec()
+
+    def get_manager(self, **kwargs):
+        args = dict(
+            pool='web_pool',
+            server='localhost',
+            password='password',
+            user='admin'
+        )
+        args.update(kwargs)
+        set_module_args(args)
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+        mm.read_members_from_device = Mock(
+            return_value=load_fixture('load_ltm_pool_members_collection.json')['items']
+        )
+        mm.update_members_on_device = Mock(return_value=True)
+        return mm
+
+    def test_sync_members(self, *args):
+        mm = self.get_manager(members=[
+            '10.10.10.10:80',
+            dict(host='10.10.10.11', port=80, state='disabled'),
+            dict(host='10.10.10.12', port=80, description='web3')
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert results['added'] == ['10.10.10.12:80']
+        assert results['updated'] == []
+        assert results['removed'] == ['2001:db8::1.80']
+        assert mm.read_members_from_device.call_count == 1
+        assert mm.update_members_on_device.call_count == 1
+
+    def test_sync_members_idempotent(self, *args):
+        mm = self.get_manager(members=[
+            '10.10.10.10:80', '10.10.10.11:80', '2001:db8::1.80'
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert mm.update_members_on_device.call_count == 0
+
+    def test_remove_members(self, *args):
+        mm = self.get_manager(state='absent', members=['10.10.10.11:80', '10.10.10.12:80'])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert results['removed'] == ['10.10.10.11:80']
+        mm.update_members_on_device.assert_called_once_with([], [], [('Common', '10.10.10.11:80')])
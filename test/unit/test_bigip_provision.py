@@ -18,6 +18,7 @@ from ansible.compat.tests import unittest
 from ansible.compat.tests.mock import Mock
 from ansible.compat.tests.mock import patch
 from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.f5_utils import F5ModuleError
 
 try:
     from library.bigip_provision import Parameters
@@ -68,6 +69,29 @@ class TestParameters(unittest.TestCase):
         p = Parameters(args)
         assert p.module == 'gtm'
 
+    def test_module_parameters_modules(self):
+        args = dict(
+            modules=dict(ltm='nominal', asm='minimum', gtm='none')
+        )
+        p = Parameters(args)
+        assert p.modules == dict(ltm='nominal', asm='minimum', gtm='none')
+
+    def test_module_parameters_modules_invalid(self):
+        p = Parameters(dict(modules=dict(foo='nominal')))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.modules
+        assert "The module 'foo' cannot be provisioned" in str(ex.exception)
+
+        p = Parameters(dict(modules=dict(ltm='maximum')))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.modules
+        assert "The level of the 'ltm' module" in str(ex.exception)
+
+        p = Parameters(dict(modules=dict(swg='dedicated', ltm='nominal')))
+        with self.assertRaises(F5ModuleError) as ex:
+            p.modules
+        assert "must be the only provisioned module" in str(ex.exception)
+
 
 @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
        return_value=True)
@@ -136,3 +160,84 @@ class TestManager(unittest.TestCase):
                     f5_product_name=self.spec.f5_product_name
                 )
                 mo.assert_not_called()
+
+    def test_provision_several_modules(self, *args):
+        set_module_args(dict(
+            modules=dict(ltm='nominal', asm='nominal', afm='nominal', apm='minimum'),
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+
+        mm.read_levels_from_device = Mock(
+            return_value=dict(ltm='nominal', asm='none', afm='none', apm='none', gtm='none')
+        )
+        mm.update_modules_on_device = Mock(return_value=True)
+        mm._wait_for_module_provisioning = Mock()
+        mm._wait_for_asm_ready = Mock()
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert results['modules'] == dict(asm='nominal', afm='nominal', apm='minimum')
+
+        # All of the changes are made at once, followed by a single wait
+        mm.update_modules_on_device.assert_called_once_with(
+            dict(asm='nominal', afm='nominal', apm='minimum')
+        )
+        assert mm._wait_for_module_provisioning.call_count == 1
+        assert mm._wait_for_asm_ready.call_count == 1
+
+    def test_provision_several_modules_unchanged(self, *args):
+        set_module_args(dict(
+            modules=dict(ltm='nominal', gtm='none'),
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+
+        mm.read_levels_from_device = Mock(return_value=dict(ltm='nominal', gtm='none'))
+        mm.update_modules_on_device = Mock(return_value=True)
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert mm.update_modules_on_device.call_count == 0
+
+    def test_provision_dedicated_module_in_modules(self, *args):
+        set_module_args(dict(
+            modules=dict(swg='dedicated'),
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+
+        mm.read_levels_from_device = Mock(return_value=dict(ltm='nominal', swg='none', gtm='none'))
+        mm.update_modules_on_device = Mock(return_value=True)
+        mm._wait_for_module_provisioning = Mock()
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert results['modules'] == dict(swg='dedicated', ltm='none')
@@ -119,7 +119,9 @@ class TestMadmLocationManager(unittest.TestCase):
         tm.exists = Mock(return_value=False)
         tm.execute_on_device = Mock(return_value=True)
         tm._move_qkview_to_download = Mock(return_value=True)
-        tm._download_file = Mock(return_value=True)
+        tm._download_file = Mock(return_value=dict(
+            checksums=dict(sha1='7b46bbe4f8ebfee64761b5313855618f64c64109', md5='96cacab4c259c4598727d7cf2ceb3b45')
+        ))
         tm._delete_qkview = Mock(return_value=True)
 
         # Override methods to force specific logic in the module to happen
@@ -132,6 +134,7 @@ class TestMadmLocationManager(unittest.TestCase):
             results = mm.exec_module()
 
         assert results['changed'] is False
+        assert results['checksum'] == '7b46bbe4f8ebfee64761b5313855618f64c64109'
 
 
 @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
@@ -160,7 +163,9 @@ class TestBulkLocationManager(unittest.TestCase):
         tm.exists = Mock(return_value=False)
         tm.execute_on_device = Mock(return_value=True)
         tm._move_qkview_to_download = Mock(return_value=True)
-        tm._download_file = Mock(return_value=True)
+        tm._download_file = Mock(return_value=dict(
+            checksums=dict(sha1='7b46bbe4f8ebfee64761b5313855618f64c64109', md5='96cacab4c259c4598727d7cf2ceb3b45')
+        ))
         tm._delete_qkview = Mock(return_value=True)
 
         # Override methods to force specific logic in the module to happen
@@ -173,3 +178,4 @@ class TestBulkLocationManager(unittest.TestCase):
             results = mm.exec_module()
 
         assert results['changed'] is False
+        assert results['checksum'] == '7b46bbe4f8ebfee64761b5313855618f64c64109'
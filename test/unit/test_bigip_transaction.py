@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import json
+import sys
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+from ansible.module_utils.f5_utils import AnsibleF5Client
+from ansible.module_utils.f5_utils import F5ModuleError
+
+try:
+    from library.bigip_transaction import Parameters
+    from library.bigip_transaction import Difference
+    from library.bigip_transaction import ModuleManager
+    from library.bigip_transaction import ArgumentSpec
+    from test.unit.modules.utils import set_module_args
+except ImportError:
+    try:
+        from ansible.modules.network.f5.bigip_transaction import Parameters
+        from ansible.modules.network.f5.bigip_transaction import Difference
+        from ansible.modules.network.f5.bigip_transaction import ModuleManager
+        from ansible.modules.network.f5.bigip_transaction import ArgumentSpec
+        from units.modules.utils import set_module_args
+    except ImportError:
+        raise SkipTest("F5 Ansible modules require the f5-sdk Python library")
+
+fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures')
+fixture_data = {}
+
+
+def load_fixture(name):
+    path = os.path.join(fixture_path, name)
+
+    if path in fixture_data:
+        return fixture_data[path]
+
+    with open(path) as f:
+        data = f.read()
+
+    try:
+        data = json.loads(data)
+    except Exception:
+        pass
+
+    fixture_data[path] = data
+    return data
+
+
+def collection_items(name):
+    result = dict()
+    for item in load_fixture(name)['items']:
+        result[(item['partition'], item['name'])] = item
+    return result
+
+
+class TestParameters(unittest.TestCase):
+    def test_module_parameters(self):
+        args = dict(
+            partition='Foo',
+            state='present',
+            objects=[
+                dict(type='node', name='web1', attributes=dict(address='10.10.10.10')),
+                dict(type='pool_member', name='web1:80', pool='web_pool', state='absent'),
+                dict(type='pool', name='web_pool', partition='Common')
+            ]
+        )
+
+        p = Parameters(args)
+        node, member, pool = p.objects
+        assert node.partition == 'Foo'
+        assert node.state == 'present'
+        assert node.uri == 'ltm/node/~Foo~web1'
+        assert node.api_params() == dict(name='web1', partition='Foo', address='10.10.10.10')
+        assert member.state == 'absent'
+        assert member.collection == 'ltm/pool/~Foo~web_pool/members'
+        assert member.uri == 'ltm/pool/~Foo~web_pool/members/~Foo~web1:80'
+        assert pool.partition == 'Common'
+        assert pool.attributes == dict()
+
+    def test_invalid_objects(self):
+        bad = [
+            dict(type='rule', name='foo'),
+            dict(type='node'),
+            dict(type='pool_member', name='web1:80'),
+            dict(type='node', name='foo', state='enabled'),
+            dict(type='node', name='foo', address='10.10.10.10'),
+        ]
+        for item in bad:
+            p = Parameters(dict(partition='Common', state='present', objects=[item]))
+            with self.assertRaises(F5ModuleError):
+                p.objects
+
+    def test_difference(self):
+        have = load_fixture('load_ltm_virtual_collection.json')['items'][0]
+
+        want = dict(
+            destination='/Common/10.10.20.10:80',
+            connectionLimit='0',
+            enabled=True,
+            profiles=[dict(name='http')]
+        )
+        assert Difference(want, have).compare() == dict()
+
+        want = dict(
+            destination='/Common/10.10.20.11:80',
+            profiles=[dict(name='http'), dict(name='tcp')],
+            description='web'
+        )
+        assert Difference(want, have).compare() == want
+
+    def test_difference_of_short_names(self):
+        have = load_fixture('load_ltm_virtual_collection.json')['items'][0]
+
+        want = dict(
+            destination='10.10.20.10:80',
+            pool='web_pool',
+            profiles=[dict(name='/Common/http')]
+        )
+        assert Difference(want, have, 'Common').compare() == dict()
+        assert Difference(want, have, 'Other').compare() == dict(
+            destination='10.10.20.10:80', pool='web_pool'
+        )
+
+        have = dict(monitor='/Common/http and /Common/tcp ')
+        assert Difference(dict(monitor='http and tcp'), have).compare() == dict()
+        assert Difference(dict(monitor='http'), have).compare() == dict(monitor='http')
+
+
+@patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
+       return_value=True)
+class TestManager(unittest.TestCase):
+    def setUp(self):
+        self.spec = ArgumentSpec()
+        self.collections = {
+            'ltm/node': dict(),
+            'ltm/pool': collection_items('load_ltm_pool_collection.json'),
+            'ltm/pool/~Common~web_pool/members': dict(),
+            'ltm/virtual': collection_items('load_ltm_virtual_collection.json')
+        }
+
+    def get_manager(self, objects):
+        set_module_args(dict(
+            objects=objects,
+            server='localhost',
+            password='password',
+            user='admin'
+        ))
+
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        mm = ModuleManager(client)
+        mm.read_collection_from_device = Mock(side_effect=lambda x: self.collections[x])
+        mm.apply_on_device = Mock(return_value=True)
+        return mm
+
+    def test_apply_in_dependency_order(self, *args):
+        mm = self.get_manager([
+            dict(type='virtual_server', name='web_vs', attributes=dict(pool='/Common/web_pool')),
+            dict(type='pool_member', name='web1:80', pool='web_pool'),
+            dict(type='pool', name='web_pool', attributes=dict(loadBalancingMode='least-connections-member')),
+            dict(type='node', name='web1', attributes=dict(address='10.10.10.10')),
+            dict(type='node', name='old', state='absent'),
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        assert mm.apply_on_device.call_count == 1
+        plan = mm.apply_on_device.call_args[0][0]
+        assert [(x[0].type, x[1]) for x in plan] == [
+            ('node', 'create'), ('pool', 'update'), ('pool_member', 'create')
+        ]
+        assert plan[1][2] == dict(loadBalancingMode='least-connections-member')
+        assert results['objects'][1] == dict(
+            type='pool', name='web_pool', partition='Common', action='update',
+            changes=dict(loadBalancingMode='least-connections-member')
+        )
+
+    def test_removals_come_first_in_reverse_order(self, *args):
+        self.collections['ltm/node'] = {('Common', 'web1'): dict(name='web1', partition='Common')}
+        mm = self.get_manager([
+            dict(type='node', name='web1', state='absent'),
+            dict(type='virtual_server', name='web_vs', state='absent'),
+            dict(type='pool', name='web_pool', state='absent'),
+            dict(type='node', name='web2', attributes=dict(address='10.10.10.11')),
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is True
+        plan = mm.apply_on_device.call_args[0][0]
+        assert [(x[0].type, x[1]) for x in plan] == [
+            ('virtual_server', 'remove'), ('pool', 'remove'), ('node', 'remove'), ('node', 'create')
+        ]
+
+    def test_idempotent(self, *args):
+        mm = self.get_manager([
+            dict(type='pool', name='web_pool', attributes=dict(loadBalancingMode='round-robin', monitor='/Common/http')),
+            dict(type='virtual_server', name='web_vs', attributes=dict(profiles=[dict(name='http')])),
+            dict(type='node', name='web1', state='absent'),
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert mm.apply_on_device.call_count == 0
+
+    def test_idempotent_with_short_names(self, *args):
+        mm = self.get_manager([
+            dict(type='pool', name='web_pool', attributes=dict(monitor='http')),
+            dict(type='virtual_server', name='web_vs', attributes=dict(
+                pool='web_pool', destination='10.10.20.10:80', profiles=[dict(name='http')]
+            )),
+        ])
+
+        results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert mm.apply_on_device.call_count == 0
+
+    def test_apply_in_one_transaction(self, *args):
+        mm = self.get_manager([
+            dict(type='node', name='web1', attributes=dict(address='10.10.10.10')),
+            dict(type='pool', name='web_pool', attributes=dict(loadBalancingMode='least-connections-member')),
+            dict(type='virtual_server', name='web_vs', state='absent'),
+        ])
+        plan = mm.plan()
+
+        api = Mock()
+        mm.client.api = Mock()
+        mm.client.api._meta_data = dict(uri='https://localhost:443/mgmt/')
+        context = Mock()
+        context.return_value.__enter__ = Mock(return_value=api)
+        context.return_value.__exit__ = Mock(return_value=False)
+        with patch.object(sys.modules[ModuleManager.__module__], 'BigIpTxContext', context):
+            ModuleManager.apply_on_device(mm, plan)
+
+        assert context.call_count == 1
+        api.icrs.delete.assert_called_once_with(
+            'https://localhost:443/mgmt/tm/ltm/virtual/~Common~web_vs'
+        )
+        api.icrs.post.assert_called_once_with(
+            'https://localhost:443/mgmt/tm/ltm/node',
+            json=dict(name='web1', partition='Common', address='10.10.10.10')
+        )
+        api.icrs.patch.assert_called_once_with(
+            'https://localhost:443/mgmt/tm/ltm/pool/~Common~web_pool',
+            json=dict(loadBalancingMode='least-connections-member')
+        )
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017 F5 Networks Inc.
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import sys
+
+from nose.plugins.skip import SkipTest
+if sys.version_info < (2, 7):
+    raise SkipTest("F5 Ansible modules require Python >= 2.7")
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+from ansible.module_utils.f5_utils import AnsibleF5Client
+
+try:
+    from library.bigip_ucs_fetch import ArgumentSpec
+    from library.bigip_ucs_fetch import BaseManager
+    from library.bigip_ucs_fetch import V1Manager
+    from test.unit.modules.utils import set_module_args
+except ImportError:
+    try:
+        from ansible.modules.network.f5.bigip_ucs_fetch import ArgumentSpec
+        from ansible.modules.network.f5.bigip_ucs_fetch import BaseManager
+        from ansible.modules.network.f5.bigip_ucs_fetch import V1Manager
+        from units.modules.utils import set_module_args
+    except ImportError:
+        raise SkipTest("F5 Ansible modules require the f5-sdk Python library")
+
+
+@patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root',
+       return_value=True)
+class TestV1Manager(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = ArgumentSpec()
+
+    def create_manager(self):
+        set_module_args(dict(
+            src='backup.ucs',
+            dest='/tmp/backup.ucs',
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+        client = AnsibleF5Client(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.api = Mock()
+        return V1Manager(client)
+
+    def test_download_from_madm(self, *args):
+        mm = self.create_manager()
+        calls = []
+        mm.client.api.tm.util.unix_mv.exec_cmd.side_effect = \
+            lambda *args, **kwargs: calls.append(kwargs['utilCmdArgs'])
+
+        def download():
+            calls.append('download')
+            return dict()
+
+        with patch.object(BaseManager, 'download', side_effect=download):
+            mm.download()
+
+        assert calls == [
+            '/var/local/ucs/backup.ucs /var/config/rest/madm/backup.ucs',
+            'download',
+            '/var/config/rest/madm/backup.ucs /var/local/ucs/backup.ucs'
+        ]
+
+    def test_ucs_is_moved_back_after_failed_download(self, *args):
+        mm = self.create_manager()
+
+        with patch.object(BaseManager, 'download', side_effect=IOError):
+            with self.assertRaises(IOError):
+                mm.download()
+
+        calls = mm.client.api.tm.util.unix_mv.exec_cmd.call_args_list
+        assert calls[-1][1]['utilCmdArgs'] == \
+            '/var/config/rest/madm/backup.ucs /var/local/ucs/backup.ucs'
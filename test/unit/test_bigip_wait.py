@@ -18,6 +18,7 @@ if sys.version_info < (2, 7):
 from ansible.compat.tests import unittest
 from ansible.compat.tests.mock import Mock
 from ansible.compat.tests.mock import patch
+from ansible.module_utils.basic import remove_values
 from ansible.module_utils.f5_utils import AnsibleF5Client
 from ansible.module_utils.f5_utils import F5ModuleError
 
@@ -26,6 +27,7 @@ try:
     from library.bigip_wait import ModuleManager
     from library.bigip_wait import ArgumentSpec
     from library.bigip_wait import AnsibleF5ClientStub
+    from library.bigip_wait import DeviceWaiter
     from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
     from test.unit.modules.utils import set_module_args
 except ImportError:
@@ -34,6 +36,7 @@ except ImportError:
         from ansible.modules.network.f5.bigip_wait import ModuleManager
         from ansible.modules.network.f5.bigip_wait import ArgumentSpec
         from ansible.modules.network.f5.bigip_wait import AnsibleF5ClientStub
+        from ansible.modules.network.f5.bigip_wait import DeviceWaiter
         from ansible.module_utils.f5_utils import iControlUnexpectedHTTPError
         from units.modules.utils import set_module_args
     except ImportError:
@@ -120,3 +123,103 @@ class TestManager(unittest.TestCase):
 
         assert results['changed'] is False
         assert results['elapsed'] == 1
+
+    def test_login_only_when_rest_api_answers(self, *args):
+        set_module_args(dict(
+            password='passsword',
+            server='localhost',
+            user='admin'
+        ))
+
+        client = AnsibleF5ClientStub(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.connect = Mock(return_value=True)
+
+        mm = ModuleManager(client)
+        mm._port_is_open = Mock(return_value=False)
+        mm._rest_api_answers = Mock(return_value=False)
+        assert mm._connect_to_device() is False
+        assert mm._rest_api_answers.call_count == 0
+
+        mm._port_is_open = Mock(return_value=True)
+        assert mm._connect_to_device() is False
+        assert client.connect.call_count == 0
+
+        mm._rest_api_answers = Mock(return_value=True)
+        assert mm._connect_to_device() is True
+        assert client.connect.call_count == 1
+
+    def test_wait_for_devices(self, *args):
+        set_module_args(dict(
+            devices=['lb1', dict(server='lb2', server_port=8443)],
+            sleep=0,
+            password='passsword',
+            user='admin'
+        ))
+
+        client = AnsibleF5ClientStub(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+
+        mm = ModuleManager(client)
+        with patch.object(DeviceWaiter, '_connect_to_device', return_value=True):
+            with patch.object(DeviceWaiter, '_device_is_rebooting', return_value=False):
+                with patch.object(DeviceWaiter, '_is_mprov_running_on_device', return_value=False):
+                    results = mm.exec_module()
+
+        assert results['changed'] is False
+        assert [x['server'] for x in results['devices']] == ['lb1', 'lb2']
+        assert all(x['ready'] is True for x in results['devices'])
+        assert all('elapsed' in x for x in results['devices'])
+
+    def test_device_passwords_are_masked(self, *args):
+        set_module_args(dict(
+            devices=['lb1', dict(server='lb2', password='other-secret')],
+            password='passsword',
+            user='admin'
+        ))
+
+        client = AnsibleF5ClientStub(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        ModuleManager(client)
+
+        invocation = remove_values(client.module.params, client.module.no_log_values)
+        assert 'other-secret' not in str(invocation)
+
+    def test_wait_for_devices_timeout(self, *args):
+        set_module_args(dict(
+            devices=['lb1', 'lb2'],
+            sleep=0,
+            timeout=1,
+            password='passsword',
+            user='admin'
+        ))
+
+        client = AnsibleF5ClientStub(
+            argument_spec=self.spec.argument_spec,
+            supports_check_mode=self.spec.supports_check_mode,
+            f5_product_name=self.spec.f5_product_name
+        )
+        client.module.fail_json = Mock()
+
+        def connect(waiter):
+            return waiter.client._connect_params['server'] == 'lb1'
+
+        mm = ModuleManager(client)
+        with patch.object(DeviceWaiter, '_connect_to_device', autospec=True, side_effect=connect):
+            with patch.object(DeviceWaiter, '_device_is_rebooting', return_value=False):
+                with patch.object(DeviceWaiter, '_is_mprov_running_on_device', return_value=False):
+                    mm.exec_module()
+
+        kwargs = client.module.fail_json.call_args[1]
+        assert kwargs['msg'] == 'Timeout when waiting for BIG-IP: lb2'
+        assert kwargs['devices'][0]['ready'] is True
+        assert kwargs['devices'][1]['ready'] is False
@@ -7,11 +7,60 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
 from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import Mock
+from ansible.compat.tests.mock import patch
+from icontrol.exceptions import iControlUnexpectedHTTPError
+from requests.exceptions import ConnectionError as RequestsConnectionError
 from ansible.module_utils.f5_utils import (
-    AnsibleF5Parameters
+    AnsibleF5Parameters,
+    F5ModuleError
 )
 
+try:
+    from library.module_utils.f5networks.common import F5Client
+    from library.module_utils.f5networks.common import F5CollectionQuery
+    from library.module_utils.f5networks.common import F5ConfigSyncQueue
+    from library.module_utils.f5networks.common import F5ControllerCache
+    from library.module_utils.f5networks.common import F5DeviceCapabilities
+    from library.module_utils.f5networks.common import F5FastParameters
+    from library.module_utils.f5networks.common import F5FileDownloader
+    from library.module_utils.f5networks.common import F5FileUploader
+    from library.module_utils.f5networks.common import F5ResourceManager
+    from library.module_utils.f5networks.common import F5TokenCache
+    from library.module_utils.f5networks.common import F5Poller
+    from library.module_utils.f5networks.common import F5PollTimeoutError
+    from library.module_utils.f5networks.common import build_batch_script
+    from library.module_utils.f5networks.common import cleanup_tokens
+    from library.module_utils.f5networks.common import split_batch_output
+    from test.unit.modules.utils import set_module_args
+except ImportError:
+    from ansible.module_utils.f5networks.common import F5Client
+    from ansible.module_utils.f5networks.common import F5CollectionQuery
+    from ansible.module_utils.f5networks.common import F5ConfigSyncQueue
+    from ansible.module_utils.f5networks.common import F5ControllerCache
+    from ansible.module_utils.f5networks.common import F5DeviceCapabilities
+    from ansible.module_utils.f5networks.common import F5FastParameters
+    from ansible.module_utils.f5networks.common import F5FileDownloader
+    from ansible.module_utils.f5networks.common import F5FileUploader
+    from ansible.module_utils.f5networks.common import F5ResourceManager
+    from ansible.module_utils.f5networks.common import F5TokenCache
+    from ansible.module_utils.f5networks.common import F5Poller
+    from ansible.module_utils.f5networks.common import F5PollTimeoutError
+    from ansible.module_utils.f5networks.common import build_batch_script
+    from ansible.module_utils.f5networks.common import cleanup_tokens
+    from ansible.module_utils.f5networks.common import split_batch_output
+    from units.modules.utils import set_module_args
+
 
 class TestRegular(unittest.TestCase):
     class Foo(AnsibleF5Parameters):
@@ -201,3 +250,855 @@ class TestAssureNoInstanceAttributes(unittest.TestCase):
         assert test.destination == '10.10.10.10'
         assert test.reject == 'yes'
         assert 'destination' not in dir(test)
+
+
+class TestFastParameters(unittest.TestCase):
+    class Foo(F5FastParameters):
+        __slots__ = ()
+
+        api_map = {
+            'loadBalancingMode': 'lb_method',
+            'dns.proxy.__iter__': 'dns_proxy'
+        }
+        api_attributes = ['loadBalancingMode', 'description', 'dns.proxy.__iter__']
+        returnables = ['lb_method', 'description', 'monitors', 'partition']
+
+        @property
+        def lb_method(self):
+            return self._values['lb_method'].replace('_', '-')
+
+        @property
+        def monitors(self):
+            return self._values['monitors']
+
+        @monitors.setter
+        def monitors(self, value):
+            self._values['monitors'] = sorted(value)
+
+    class Bar(Foo):
+        __slots__ = ()
+
+        api_map = {'lbMode': 'lb_method'}
+
+    def test_run(self):
+        p = self.Foo(dict(
+            loadBalancingMode='round_robin',
+            description='foo',
+            monitors=['tcp', 'http'],
+            other='bar'
+        ))
+
+        assert p.lb_method == 'round-robin'
+        assert p.monitors == ['http', 'tcp']
+        assert p.other == 'bar'
+        assert p.missing is None
+        assert p.partition == 'Common'
+        assert p.to_return() == dict(
+            lb_method='round-robin', description='foo',
+            monitors=['http', 'tcp'], partition='Common'
+        )
+        assert p.api_params() == dict(
+            loadBalancingMode='round-robin', description='foo'
+        )
+
+    def test_api_map_with_punctuation(self):
+        p = self.Foo({'dns.proxy.__iter__': 'yes', 'loadBalancingMode': 'ratio'})
+        assert p.dns_proxy == 'yes'
+        assert p.api_params()['dns.proxy.__iter__'] == 'yes'
+
+    def test_subclasses_have_their_own_maps(self):
+        self.Foo(dict(loadBalancingMode='ratio'))
+        p = self.Bar(dict(lbMode='ratio', loadBalancingMode='round_robin'))
+
+        assert p.lb_method == 'ratio'
+        assert p.loadBalancingMode == 'round_robin'
+
+    def test_no_instance_attributes(self):
+        p = self.Foo(dict(description='foo'))
+        with self.assertRaises(AttributeError):
+            p.description = 'bar'
+
+
+class TestControllerCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_set_and_get(self):
+        key = F5ControllerCache.make_key('localhost', 443, 'Common', 'foo')
+        F5ControllerCache(self.path).set(key, dict(checksum='abc'))
+
+        assert F5ControllerCache(self.path).get(key) == dict(checksum='abc')
+
+    def test_expired_entries_are_not_returned(self):
+        cache = F5ControllerCache(self.path)
+        cache.set('expired', 'foo', expiration=time.time() - 1)
+        cache.set('valid', 'bar', expiration=time.time() + 60)
+
+        assert cache.get('expired') is None
+        assert cache.get('valid') == 'bar'
+        assert cache.get_entry('valid', min_ttl=120) is None
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'tokens.json')
+        self.key = F5TokenCache.make_key('localhost', 443, 'admin', 'tmos')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_set_and_get(self):
+        cache = F5TokenCache(self.path)
+        cache.set(self.key, 'ABCDEF', time.time() + 1200)
+
+        result = F5TokenCache(self.path).get(self.key)
+        assert result['token'] == 'ABCDEF'
+
+    def test_key_includes_all_connection_details(self):
+        keys = set([
+            self.key,
+            F5TokenCache.make_key('otherhost', 443, 'admin', 'tmos'),
+            F5TokenCache.make_key('localhost', 8443, 'admin', 'tmos'),
+            F5TokenCache.make_key('localhost', 443, 'operator', 'tmos'),
+            F5TokenCache.make_key('localhost', 443, 'admin', 'local'),
+        ])
+        assert len(keys) == 5
+
+    def test_token_near_expiration_is_not_returned(self):
+        cache = F5TokenCache(self.path, refresh_window=120)
+        cache.set(self.key, 'ABCDEF', time.time() + 60)
+        assert cache.get(self.key) is None
+
+    def test_expired_tokens_are_pruned(self):
+        cache = F5TokenCache(self.path)
+        other = F5TokenCache.make_key('otherhost', 443, 'admin', 'tmos')
+        cache.set(other, 'EXPIRED', time.time() - 1)
+        cache.set(self.key, 'ABCDEF', time.time() + 1200)
+
+        with open(self.path) as fh:
+            data = json.load(fh)
+        assert other not in data
+        assert self.key in data
+
+    def test_remove(self):
+        cache = F5TokenCache(self.path)
+        cache.set(self.key, 'ABCDEF', time.time() + 1200)
+        cache.remove(self.key)
+        assert cache.get(self.key) is None
+
+    def test_missing_or_corrupt_file(self):
+        cache = F5TokenCache(self.path)
+        assert cache.get(self.key) is None
+
+        with open(self.path, 'w') as fh:
+            fh.write('not json')
+        assert cache.get(self.key) is None
+
+        cache.set(self.key, 'ABCDEF', time.time() + 1200)
+        assert cache.get(self.key)['token'] == 'ABCDEF'
+
+
+class TestClient(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'tokens.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root')
+    def test_without_token_cache(self, *args):
+        set_module_args(dict(
+            server='localhost',
+            user='admin',
+            password='password'
+        ))
+        client = F5Client(argument_spec=dict(name=dict()))
+
+        assert client.token_cache is None
+        assert client.api is args[0].return_value
+
+    @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root')
+    def test_capabilities_cache(self, *args):
+        set_module_args(dict(
+            server='localhost',
+            user='admin',
+            password='password',
+            capabilities_cache=os.path.join(self.tmpdir, 'capabilities.json')
+        ))
+        client = F5Client()
+        client.api.tmos_version = '12.1.2'
+        F5DeviceCapabilities(client).version
+
+        capabilities = F5DeviceCapabilities(client)
+        del client.api.tmos_version
+        assert capabilities.version == '12.1.2'
+
+    @patch('ansible.module_utils.f5_utils.AnsibleF5Client._get_mgmt_root')
+    def test_caches_only_for_bigip(self, *args):
+        set_module_args(dict(
+            server='localhost',
+            user='admin',
+            password='password'
+        ))
+        client = F5Client(f5_product_name='iworkflow')
+
+        assert 'token_cache' not in client.module.params
+        assert 'capabilities_cache' not in client.module.params
+
+    def test_token_is_shared_between_clients(self):
+        set_module_args(dict(
+            server='localhost',
+            user='admin',
+            password='password',
+            token_cache=self.path
+        ))
+        common = sys.modules[F5Client.__module__]
+        with patch.object(common, 'BigIpMgmt') as mgmt:
+            auth = mgmt.return_value.icrs.session.auth
+            auth.token = 'ABCDEF'
+            auth.expiration = time.time() + 1200
+            client = F5Client()
+            assert mgmt.call_args[1]['token'] == 'tmos'
+
+            mgmt.reset_mock()
+            F5Client()
+            assert mgmt.call_args[1]['token_to_use'] == 'ABCDEF'
+
+        # Cached tokens stay on the device for the next module run
+        cleanup_tokens(client)
+        assert client.api.shared.authz.tokens_s.token.load.called is False
+
+
+class TestConfigSyncQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'sync.json')
+        self.key = F5ConfigSyncQueue.make_key('localhost', 443, 'foo-group')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_changes_are_counted(self):
+        start = time.time()
+        F5ConfigSyncQueue(self.path).mark_dirty(self.key)
+        F5ConfigSyncQueue(self.path).mark_dirty(self.key, changes=2)
+
+        pending = F5ConfigSyncQueue(self.path).pending(self.key)
+        assert pending['changes'] == 3
+        assert pending['since'] >= start
+
+    def test_clear(self):
+        queue = F5ConfigSyncQueue(self.path)
+        other = F5ConfigSyncQueue.make_key('localhost', 443, 'other-group')
+        queue.mark_dirty(self.key)
+        queue.mark_dirty(other)
+        queue.clear(self.key)
+
+        assert queue.pending(self.key) is None
+        assert queue.pending(other)['changes'] == 1
+
+    def test_consume(self):
+        queue = F5ConfigSyncQueue(self.path)
+        queue.mark_dirty(self.key, changes=3)
+        queue.mark_dirty(self.key, changes=2)
+
+        pending = queue.consume(self.key, 3, since=12345.0)
+        assert pending == dict(changes=2, since=12345.0)
+        assert queue.pending(self.key)['changes'] == 2
+
+        assert queue.consume(self.key, 2) is None
+        assert queue.pending(self.key) is None
+        assert queue.consume(self.key, 1) is None
+
+
+class TestBatchScript(unittest.TestCase):
+    def test_build(self):
+        script, delimiter = build_batch_script(['tmsh show sys version', "echo '$HOME'"])
+        assert delimiter.startswith('f5-ansible-batch-')
+        assert script.split('; ') == [
+            'echo {0}-0'.format(delimiter),
+            'tmsh show sys version',
+            'echo {0}-1'.format(delimiter),
+            "echo \\'\\$HOME\\'"
+        ]
+
+    def test_split_output_without_trailing_newline(self):
+        output = 'junk\nabc-0\nfirst\nabc-1\nabc-2\nthird'
+        results = split_batch_output(output, 'abc')
+
+        assert results == ['first\n', 'third']
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestPoller(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def poller(self, **kwargs):
+        kwargs.setdefault('jitter', 0)
+        return F5Poller(sleep=self.clock.sleep, clock=self.clock.time, **kwargs)
+
+    def test_returns_first_result_matching_condition(self):
+        results = iter([1, 1, 1, 2])
+        poller = self.poller(interval=1, max_interval=3)
+        result = poller.poll(lambda: next(results), until=lambda x: x != 1)
+
+        assert result == 2
+        assert poller.polls == 4
+        assert self.clock.sleeps == [1, 2, 3]
+
+    def test_stable_requires_consecutive_matches(self):
+        results = iter([False, False, True, False, True, True, True])
+        poller = self.poller(interval=5, max_interval=30)
+        poller.poll(lambda: next(results), stable=3)
+
+        assert poller.polls == 7
+        # Interval is reset while counting consecutive matches
+        assert self.clock.sleeps == [5, 10, 5, 5, 5, 5]
+
+    def test_ignored_exceptions_count_as_not_complete(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ValueError('device is rebooting')
+            return True
+
+        poller = self.poller(interval=1)
+        assert poller.poll(func, ignore=(ValueError,)) is True
+        assert poller.polls == 3
+
+    def test_other_exceptions_propagate(self):
+        def until(result):
+            raise F5ModuleError('install failed')
+
+        poller = self.poller(interval=1)
+        with self.assertRaises(F5ModuleError):
+            poller.poll(lambda: 'failed', until=until, ignore=(Exception,))
+
+    def test_timeout(self):
+        poller = self.poller(interval=1, max_interval=4, timeout=10)
+        with self.assertRaises(F5PollTimeoutError):
+            poller.poll(lambda: False)
+
+        assert poller.timeouts == 1
+        assert self.clock.now <= 10
+
+    def test_initial_delay_and_jitter(self):
+        poller = F5Poller(
+            interval=10, jitter=0.5, sleep=self.clock.sleep, clock=self.clock.time
+        )
+        results = iter([False, True])
+        poller.poll(lambda: next(results), initial_delay=7)
+
+        assert self.clock.sleeps[0] == 7
+        assert 5 <= self.clock.sleeps[1] <= 15
+
+
+class TestCollectionQuery(unittest.TestCase):
+    def test_quote(self):
+        assert F5CollectionQuery.quote('foo') == "'foo'"
+        assert F5CollectionQuery.quote("o'brien") == "'o''brien'"
+
+    def test_filter_and_select_are_sent_to_device(self):
+        collection = Mock()
+        collection.get_collection.return_value = [dict(name='foo')]
+        query = F5CollectionQuery(
+            collection, filter="name eq 'foo'", select=['name', 'partition']
+        )
+
+        assert query.get() == [dict(name='foo')]
+        collection.get_collection.assert_called_once_with(
+            requests_params=dict(params="$filter=name eq 'foo'&$select=name,partition")
+        )
+
+    def test_no_query_reads_whole_collection(self):
+        collection = Mock()
+        collection.get_collection.return_value = []
+        F5CollectionQuery(collection).get()
+        collection.get_collection.assert_called_once_with()
+
+    def test_first(self):
+        collection = Mock()
+        collection.get_collection.return_value = [
+            dict(name='foo', partition='Foo'),
+            dict(name='foo', partition='Common')
+        ]
+        query = F5CollectionQuery(collection, select=['name', 'partition'])
+
+        assert query.first()['partition'] == 'Foo'
+        assert query.first(lambda x: x['partition'] == 'Common')['partition'] == 'Common'
+        assert query.first(lambda x: x['partition'] == 'Bar') is None
+
+    def paged_collection(self, count):
+        items = [dict(name='item{0}'.format(x)) for x in range(count)]
+
+        def get_collection(requests_params):
+            params = dict(x.split('=') for x in requests_params['params'].split('&'))
+            top, skip = int(params['$top']), int(params['$skip'])
+            return items[skip:skip + top]
+
+        collection = Mock()
+        collection.get_collection.side_effect = get_collection
+        return collection
+
+    def test_paged_iterate(self):
+        collection = self.paged_collection(25)
+        query = F5CollectionQuery(
+            collection, params='expandSubcollections=true', page_size=10
+        )
+
+        names = [x['name'] for x in query.iterate()]
+        assert names == ['item{0}'.format(x) for x in range(25)]
+        assert [x[1]['requests_params'] for x in collection.get_collection.call_args_list] == [
+            dict(params='expandSubcollections=true&$top=10&$skip=0'),
+            dict(params='expandSubcollections=true&$top=10&$skip=10'),
+            dict(params='expandSubcollections=true&$top=10&$skip=20'),
+        ]
+
+    def test_paged_collection_of_whole_pages(self):
+        collection = self.paged_collection(20)
+        query = F5CollectionQuery(collection, page_size=10)
+
+        assert len(query.get()) == 20
+        # The empty third page shows that there are no more members
+        assert collection.get_collection.call_count == 3
+
+    def test_paged_first_stops_early(self):
+        collection = self.paged_collection(1000)
+        query = F5CollectionQuery(collection, page_size=10)
+
+        assert query.first(lambda x: x['name'] == 'item15')['name'] == 'item15'
+        assert collection.get_collection.call_count == 2
+
+    def test_paging_ignored_by_device(self):
+        collection = Mock()
+        collection.get_collection.return_value = [dict(name='foo')] * 15
+        query = F5CollectionQuery(collection, page_size=10)
+
+        assert len(query.get()) == 15
+        assert collection.get_collection.call_count == 1
+
+    def test_paging_ignored_by_device_with_whole_page(self):
+        collection = Mock()
+        collection.get_collection.return_value = [
+            dict(name='item{0}'.format(x)) for x in range(10)
+        ]
+        query = F5CollectionQuery(collection, page_size=10)
+
+        assert len(query.get()) == 10
+        assert collection.get_collection.call_count == 3
+
+    def test_skip_ignored_by_device(self):
+        items = [dict(name='item{0}'.format(x)) for x in range(25)]
+
+        def get_collection(requests_params=None):
+            if requests_params is None:
+                return items
+            params = dict(x.split('=') for x in requests_params['params'].split('&'))
+            return items[:int(params['$top'])]
+
+        collection = Mock()
+        collection.get_collection.side_effect = get_collection
+        query = F5CollectionQuery(collection, page_size=10)
+
+        assert [x['name'] for x in query.iterate()] == ['item{0}'.format(x) for x in range(25)]
+        # The rest of the collection is read without $top and $skip
+        collection.get_collection.assert_called_with()
+
+
+class FakeResourceManager(F5ResourceManager):
+    def __init__(self, load_on_device):
+        super(FakeResourceManager, self).__init__(Mock())
+        self.load_on_device = load_on_device
+
+
+def http_error(status):
+    return iControlUnexpectedHTTPError(
+        '{0} Error'.format(status), response=Mock(status_code=status)
+    )
+
+
+class TestResourceManager(unittest.TestCase):
+    def test_resource_is_loaded_once(self):
+        resource = Mock(generation=5)
+        load = Mock(return_value=resource)
+        mm = FakeResourceManager(load)
+
+        assert mm.exists() is True
+        assert mm.load() is resource
+        assert mm.generation == 5
+        assert load.call_count == 1
+
+    def test_not_found_means_absent(self):
+        load = Mock(side_effect=http_error(404))
+        mm = FakeResourceManager(load)
+
+        assert mm.exists() is False
+        assert mm.load() is None
+        assert mm.generation is None
+        assert load.call_count == 1
+
+    def test_other_errors_propagate(self):
+        mm = FakeResourceManager(Mock(side_effect=http_error(401)))
+
+        with self.assertRaises(iControlUnexpectedHTTPError):
+            mm.exists()
+
+    def test_remember_and_forget(self):
+        load = Mock(side_effect=http_error(404))
+        mm = FakeResourceManager(load)
+        assert mm.exists() is False
+
+        created = Mock()
+        mm.remember(created)
+        assert mm.load() is created
+
+        mm.forget()
+        assert mm.exists() is False
+        assert load.call_count == 2
+
+
+def capabilities_client(path=None):
+    client = Mock()
+    client.module.params = dict(
+        server='localhost', server_port=443, capabilities_cache=path
+    )
+    client.api.tmos_version = '12.1.2'
+    client.api.tm.sys.version.load.return_value = Mock(entries={
+        'https://localhost/mgmt/tm/sys/version/0': dict(nestedStats=dict(entries=dict(
+            Build=dict(description='0.0.249'),
+            Version=dict(description='12.1.2')
+        )))
+    })
+    client.api.tm.sys.provision.get_collection.return_value = [
+        dict(name='ltm', level='nominal'),
+        dict(name='gtm', level='minimum'),
+        dict(name='asm', level='none'),
+    ]
+    client.api.tm.sys.dbs.db.load.return_value = Mock(value='active')
+    return client
+
+
+class TestDeviceCapabilities(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'capabilities.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_values_are_read_once(self):
+        client = capabilities_client()
+        capabilities = F5DeviceCapabilities(client)
+
+        assert capabilities.version_is_less_than('13.0.0') is True
+        assert capabilities.version_is_less_than('12.1.0') is False
+        assert capabilities.build == '0.0.249'
+        assert capabilities.provisioned == ['gtm', 'ltm']
+        assert capabilities.is_provisioned('gtm') is True
+        assert capabilities.is_provisioned('asm') is False
+        assert capabilities.ha_state == 'active'
+        assert capabilities.is_provisioned('ltm') is True
+        assert client.api.tm.sys.provision.get_collection.call_count == 1
+
+    def test_values_are_shared_through_the_cache(self):
+        client = capabilities_client(self.path)
+        assert F5DeviceCapabilities(client).is_provisioned('gtm') is True
+
+        other = capabilities_client(self.path)
+        capabilities = F5DeviceCapabilities(other)
+        assert capabilities.is_provisioned('gtm') is True
+        assert other.api.tm.sys.provision.get_collection.call_count == 0
+
+        # Values that were not cached yet are read from the device
+        assert capabilities.ha_state == 'active'
+        assert other.api.tm.sys.dbs.db.load.call_count == 1
+
+    def test_cached_values_expire(self):
+        client = capabilities_client(self.path)
+        F5DeviceCapabilities(client, ttl=-1).provisioned
+
+        capabilities = F5DeviceCapabilities(client)
+        capabilities.provisioned
+        assert client.api.tm.sys.provision.get_collection.call_count == 2
+
+    def test_invalidate(self):
+        client = capabilities_client(self.path)
+        F5DeviceCapabilities(client).provisioned
+        F5DeviceCapabilities(client).invalidate()
+
+        assert F5ControllerCache(self.path).get_entry(
+            F5ControllerCache.make_key('localhost', 443, 'capabilities')
+        ) is None
+        F5DeviceCapabilities(client).provisioned
+        assert client.api.tm.sys.provision.get_collection.call_count == 2
+
+
+class FakeUploadDevice(object):
+    """Stand-in for the upload endpoints and bash utility of a device"""
+    def __init__(self):
+        self.files = dict()
+        self.posts = []
+        self.fail_after = None
+        self.api = Mock()
+        self.api._meta_data = dict(uri='https://localhost:443/mgmt/')
+        self.api.icrs.post.side_effect = self.post
+        self.api.tm.util.bash.exec_cmd.side_effect = self.run
+
+    def post(self, uri, data=None, headers=None):
+        if self.fail_after is not None and len(self.posts) >= self.fail_after:
+            self.fail_after = None
+            raise RequestsConnectionError('Connection aborted')
+        name = uri.rsplit('/', 1)[1]
+        start, end, size = re.match(r'(\d+)-(\d+)/(\d+)', headers['Content-Range']).groups()
+        assert int(end) - int(start) + 1 == len(data)
+        content = self.files.get(name, b'')[:int(start)]
+        self.files[name] = content + data
+        self.posts.append(int(start))
+
+    def run(self, command, utilCmdArgs=None):
+        name = re.search(r"'[^']+/([^'/]+)'", utilCmdArgs).group(1)
+        result = Mock()
+        result.commandResult = ''
+        if name in self.files:
+            if 'stat -c' in utilCmdArgs:
+                result.commandResult = '{0}\n'.format(len(self.files[name]))
+            else:
+                digest = hashlib.sha256(self.files[name]).hexdigest()
+                result.commandResult = '{0}  /var/config/rest/downloads/{1}\n'.format(digest, name)
+        return result
+
+
+class TestFileUploader(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'backup.ucs')
+        self.content = os.urandom(10000)
+        with open(self.path, 'wb') as fh:
+            fh.write(self.content)
+        self.device = FakeUploadDevice()
+        self.uploader = F5FileUploader(self.device.api, chunk_size=1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_upload(self):
+        stats = self.uploader.upload(self.path)
+
+        assert self.device.files['backup.ucs'] == self.content
+        assert self.device.posts == list(range(0, 10000, 1024))
+        assert stats['size'] == 10000
+        assert stats['sent'] == 10000
+        assert stats['resumed'] == 0
+        assert stats['checksum'] == hashlib.sha256(self.content).hexdigest()
+        assert 'throughput' in stats
+
+    def test_resume_partial_upload(self):
+        self.device.files['backup.ucs'] = self.content[:3000]
+        stats = self.uploader.upload(self.path)
+
+        assert self.device.files['backup.ucs'] == self.content
+        assert self.device.posts[0] == 3000
+        assert stats['sent'] == 7000
+        assert stats['resumed'] == 3000
+
+    def test_complete_file_is_not_sent_again(self):
+        self.device.files['backup.ucs'] = self.content
+        stats = self.uploader.upload(self.path)
+
+        assert self.device.posts == []
+        assert stats['sent'] == 0
+
+    def test_partial_file_of_other_content_restarts(self):
+        self.device.files['backup.ucs'] = os.urandom(3000)
+        stats = self.uploader.upload(self.path)
+
+        assert self.device.files['backup.ucs'] == self.content
+        assert self.device.posts[-10] == 0
+        assert stats['sent'] == 17000
+
+    def test_connection_errors_are_retried(self):
+        self.device.fail_after = 4
+        stats = self.uploader.upload(self.path)
+
+        assert self.device.files['backup.ucs'] == self.content
+        assert self.device.posts[4] == 4096
+        assert stats['sent'] == 10000
+
+    def test_checksum_mismatch(self):
+        self.device.api.tm.util.bash.exec_cmd.side_effect = None
+        self.device.api.tm.util.bash.exec_cmd.return_value = Mock(commandResult='0123abcd  file')
+        with self.assertRaises(F5ModuleError):
+            self.uploader.upload(self.path)
+
+    def test_without_bash_upload_is_not_resumed(self):
+        self.device.files['backup.ucs'] = self.content[:3000]
+        self.device.api.tm.util.bash.exec_cmd.side_effect = http_error(403)
+        self.device.fail_after = 4
+        stats = self.uploader.upload(self.path)
+
+        assert self.uploader.has_bash is False
+        assert self.device.api.tm.util.bash.exec_cmd.call_count == 1
+        assert self.device.files['backup.ucs'] == self.content
+        assert self.device.posts[:5] == [0, 1024, 2048, 3072, 0]
+        assert stats['resumed'] == 0
+        assert stats['sent'] == 14096
+
+
+class FakeDownloadDevice(object):
+    """Stand-in for the download endpoints and bash utility of a device"""
+    def __init__(self, content):
+        self.content = content
+        self.gets = []
+        self.fail_after = None
+        self.api = Mock()
+        self.api._meta_data = dict(uri='https://localhost:443/mgmt/')
+        self.api.icrs.get.side_effect = self.get
+        self.api.tm.util.bash.exec_cmd.side_effect = self.run
+
+    def get(self, uri, headers=None, stream=False):
+        if self.fail_after is not None and len(self.gets) >= self.fail_after:
+            self.fail_after = None
+            raise RequestsConnectionError('Connection aborted')
+        start, end, size = [int(x) for x in re.match(r'(\d+)-(\d+)/(\d+)', headers['Content-Range']).groups()]
+        self.gets.append(start)
+        chunk = self.content[start:end + 1]
+        response = Mock()
+        response.headers = {
+            'Content-Range': '{0}-{1}/{2}'.format(start, end, len(self.content))
+        }
+        response.iter_content.return_value = [chunk[i:i + 100] for i in range(0, len(chunk), 100)]
+        return response
+
+    def run(self, command, utilCmdArgs=None):
+        result = Mock()
+        result.commandResult = ''
+        if 'stat -c' in utilCmdArgs:
+            result.commandResult = '{0}\n'.format(len(self.content))
+        else:
+            digest = hashlib.sha1(self.content).hexdigest()
+            result.commandResult = '{0}  /var/local/ucs/backup.ucs\n'.format(digest)
+        return result
+
+
+class TestFileDownloader(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.dest = os.path.join(self.dir, 'backup.ucs')
+        self.content = os.urandom(10000)
+        self.device = FakeDownloadDevice(self.content)
+        self.downloader = F5FileDownloader(
+            self.device.api, endpoint='ucs', chunk_size=1024,
+            hash_algorithms=['sha1', 'md5', 'sha256']
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def read_dest(self):
+        with open(self.dest, 'rb') as fh:
+            return fh.read()
+
+    def test_download(self):
+        stats = self.downloader.download('backup.ucs', self.dest)
+
+        assert self.read_dest() == self.content
+        assert not os.path.exists(self.dest + '.part')
+        assert self.device.gets == list(range(0, 10000, 1024))
+        assert stats['size'] == 10000
+        assert stats['received'] == 10000
+        assert stats['skipped'] is False
+        assert stats['checksums']['sha1'] == hashlib.sha1(self.content).hexdigest()
+        assert stats['checksums']['md5'] == hashlib.md5(self.content).hexdigest()
+        assert stats['checksums']['sha256'] == hashlib.sha256(self.content).hexdigest()
+
+    def test_matching_dest_is_not_downloaded(self):
+        with open(self.dest, 'wb') as fh:
+            fh.write(self.content)
+        stats = self.downloader.download('backup.ucs', self.dest)
+
+        assert self.device.gets == []
+        assert stats['skipped'] is True
+        assert stats['received'] == 0
+        assert stats['checksums']['md5'] == hashlib.md5(self.content).hexdigest()
+
+    def test_different_dest_is_replaced(self):
+        with open(self.dest, 'wb') as fh:
+            fh.write(os.urandom(10000))
+        replaced = []
+        stats = self.downloader.download('backup.ucs', self.dest, before_replace=replaced.append)
+
+        assert self.read_dest() == self.content
+        assert replaced == [self.dest]
+        assert stats['skipped'] is False
+
+    def test_resume_partial_download(self):
+        with open(self.dest + '.part', 'wb') as fh:
+            fh.write(self.content[:3000])
+        stats = self.downloader.download('backup.ucs', self.dest)
+
+        assert self.read_dest() == self.content
+        assert self.device.gets[0] == 3000
+        assert stats['received'] == 7000
+        assert stats['resumed'] == 3000
+        assert stats['checksums']['sha1'] == hashlib.sha1(self.content).hexdigest()
+
+    def test_partial_file_of_other_content_restarts(self):
+        with open(self.dest + '.part', 'wb') as fh:
+            fh.write(os.urandom(3000))
+        stats = self.downloader.download('backup.ucs', self.dest)
+
+        assert self.read_dest() == self.content
+        assert self.device.gets[7] == 0
+        assert stats['received'] == 17000
+
+    def test_connection_errors_are_retried(self):
+        self.device.fail_after = 4
+        stats = self.downloader.download('backup.ucs', self.dest)
+
+        assert self.read_dest() == self.content
+        assert self.device.gets[4] == 4096
+        assert stats['received'] == 10000
+
+    def test_without_bash_size_is_probed(self):
+        self.device.api.tm.util.bash.exec_cmd.side_effect = http_error(403)
+        with open(self.dest, 'wb') as fh:
+            fh.write(self.content)
+        with open(self.dest + '.part', 'wb') as fh:
+            fh.write(self.content[:3000])
+        stats = self.downloader.download('backup.ucs', self.dest)
+
+        assert self.downloader.has_bash is False
+        assert self.read_dest() == self.content
+        assert stats['resumed'] == 0
+        assert self.device.gets[:2] == [0, 0]
+        assert stats['skipped'] is False
+        assert stats['received'] == 10000
+
+    def test_checksum_mismatch(self):
+        self.device.content = os.urandom(10000)
+        self.device.api.tm.util.bash.exec_cmd.side_effect = None
+        self.device.api.tm.util.bash.exec_cmd.return_value = Mock(commandResult='10000')
+        with self.assertRaises(F5ModuleError):
+            self.downloader.download('backup.ucs', self.dest)
+        assert not os.path.exists(self.dest)